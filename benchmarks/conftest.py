@@ -0,0 +1,139 @@
+"""
+Shared fixtures and regression thresholds for the ANAFI benchmark suite.
+
+Run with: pytest benchmarks/ --benchmark-only --benchmark-json=benchmarks/results.json
+
+Benchmarks are skipped in the regular test run unless `--benchmark-only` is
+passed or `ANAFI_BENCHMARKS=1` is set. Every benchmark listed in
+`thresholds.json` fails when its mean time exceeds the threshold multiplied by
+`ANAFI_BENCH_TOLERANCE` (default 1.0); the threshold is also written to the
+JSON results under `extra_info`.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+THRESHOLDS_PATH = Path(__file__).with_name("thresholds.json")
+
+# Tamaños de portafolio para las rutas por lote
+PORTFOLIO_SIZES = [1, 1_000, 100_000]
+# Las rutas que escriben un archivo por negocio (PDF, Excel, gráficos) se miden a menor escala
+FILE_BATCH_SIZES = [1, 100]
+# Cada negocio distinto son tres gráficos nuevos (~0.1 s cada uno)
+CHART_BATCH_SIZES = [1, 10]
+
+
+def _enabled(config) -> bool:
+    return bool(config.getoption("benchmark_only", False) or os.getenv("ANAFI_BENCHMARKS"))
+
+
+def pytest_collection_modifyitems(config, items):
+    if _enabled(config):
+        return
+    skip = pytest.mark.skip(reason="Benchmark: usa --benchmark-only o ANAFI_BENCHMARKS=1")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+
+def load_thresholds() -> dict:
+    """Umbral de tiempo medio (segundos) por benchmark."""
+    if not THRESHOLDS_PATH.exists():
+        return {}
+    return json.loads(THRESHOLDS_PATH.read_text(encoding="utf-8"))
+
+
+def benchmark_key(nodeid: str) -> str:
+    """Identificador estable de un benchmark: archivo::prueba[parámetros]."""
+    return nodeid.split("/")[-1]
+
+
+@pytest.fixture(scope="session")
+def thresholds():
+    return load_thresholds()
+
+
+@pytest.fixture(autouse=True)
+def regression_threshold(request, thresholds):
+    """Falla el benchmark si su tiempo medio supera el umbral registrado."""
+    if "benchmark" not in request.fixturenames:
+        yield
+        return
+
+    benchmark = request.getfixturevalue("benchmark")
+    limit = thresholds.get(benchmark_key(request.node.nodeid))
+    tolerance = float(os.getenv("ANAFI_BENCH_TOLERANCE", "1.0"))
+    if limit is not None:
+        benchmark.extra_info["umbral_s"] = limit * tolerance
+    yield
+
+    stats = getattr(benchmark, "stats", None)
+    if limit is None or stats is None:
+        return
+    mean = stats.stats.mean
+    if mean > limit * tolerance:
+        pytest.fail(
+            f"Regresión de rendimiento: media {mean * 1000:.2f} ms > umbral {limit * tolerance * 1000:.2f} ms",
+            pytrace=False,
+        )
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    """Carpeta de reportes temporal (las herramientas solo escriben dentro de ella)."""
+    monkeypatch.setenv("ANAFI_REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for benchmarking."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+def make_portfolio(size: int, seed: int = 42) -> dict:
+    """Portafolio aleatorio reproducible, por columnas."""
+    rng = np.random.default_rng(seed)
+    return {
+        "costos_fijos_mensuales": rng.uniform(500, 20000, size).round(2),
+        "costo_variable_unitario": rng.uniform(1, 20, size).round(2),
+        "precio_venta_unitario": rng.uniform(5, 40, size).round(2),
+        "volumen_ventas_estimado": rng.integers(100, 5000, size),
+        "inversion_inicial": rng.uniform(5000, 200000, size).round(2),
+    }
+
+
+def portfolio_rows(portfolio: dict) -> list:
+    """Convierte un portafolio por columnas en una lista de negocios (diccionarios)."""
+    size = len(portfolio["costos_fijos_mensuales"])
+    return [
+        {
+            "nombre_negocio": f"Negocio {i}",
+            "tipo_negocio": "comercio",
+            **{field: column[i].item() for field, column in portfolio.items()},
+        }
+        for i in range(size)
+    ]
+
+
+_portfolios: dict = {}
+
+
+@pytest.fixture
+def portfolio(request):
+    """Portafolio por columnas del tamaño indicado en `request.param` (se genera una vez)."""
+    size = request.param
+    if size not in _portfolios:
+        _portfolios[size] = make_portfolio(size)
+    return _portfolios[size]
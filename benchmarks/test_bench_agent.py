@@ -0,0 +1,92 @@
+"""
+Agent-level benchmarks on the offline replay model: graph overhead, parallel
+dispatch and state growth, without calling OpenAI.
+
+Run with: pytest benchmarks/test_bench_agent.py --benchmark-only
+"""
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage
+from src.graph.builder import build_anafi_agent, get_sub_agent_specs
+from src.graph.dispatch import ParallelDispatcher, build_subagent_runners
+from src.graph.file_store import BUSINESS_DATA_PATH
+from src.llm.cache import SQLiteLLMCache, set_llm_cache
+from src.llm.replay import ReplayChatModel
+
+REQUEST = "Analiza mi negocio y genera un reporte"
+# Latencia artificial por llamada al modelo (0 = solo la sobrecarga del grafo)
+LATENCIES = [0.0, 0.05]
+# Turnos previos en la conversación
+HISTORY_TURNS = [0, 5, 20]
+
+
+def replay_dispatcher(latency_s: float) -> ParallelDispatcher:
+    specs = [
+        {**spec, "model": ReplayChatModel.from_recording(spec["name"], latency_s=latency_s)}
+        for spec in get_sub_agent_specs("replay")
+    ]
+    return ParallelDispatcher(build_subagent_runners(specs))
+
+
+@pytest.fixture(scope="module")
+def agent():
+    return build_anafi_agent("replay")
+
+
+_histories: dict = {}
+
+
+def conversation(agent, turns: int) -> dict:
+    """Estado tras `turns` análisis completos en la misma conversación (se genera una vez)."""
+    if turns not in _histories:
+        state = {"messages": []}
+        for _ in range(turns):
+            state = agent.invoke({**state, "messages": state["messages"] + [HumanMessage(content=REQUEST)]})
+        _histories[turns] = state
+    return _histories[turns]
+
+
+class TestAgentTurn:
+    """Benchmarks for a full turn through the supervisor and the sub-agents."""
+
+    def test_full_turn(self, benchmark, agent):
+        """Sobrecarga del grafo: supervisor, cinco subagentes y 17 herramientas sin latencia del modelo."""
+        benchmark(agent.invoke, {"messages": [HumanMessage(content=REQUEST)]})
+
+    @pytest.mark.parametrize("turns", HISTORY_TURNS)
+    def test_state_growth(self, benchmark, agent, turns):
+        """Un turno más sobre una conversación con historial y archivos acumulados."""
+        state = conversation(agent, turns)
+        inputs = {**state, "messages": state["messages"] + [HumanMessage(content=REQUEST)]}
+        benchmark(agent.invoke, inputs)
+
+
+class TestLLMCache:
+    """Benchmarks for a repeated turn answered from the LLM response cache."""
+
+    def test_cached_turn(self, benchmark, agent):
+        """Mismo turno resuelto por la caché: sin latencia del modelo, mide la sobrecarga frente a test_full_turn."""
+        inputs = {"messages": [HumanMessage(content=REQUEST)]}
+        cache = SQLiteLLMCache(":memory:")
+        set_llm_cache(cache)
+        try:
+            agent.invoke(inputs)
+            benchmark(agent.invoke, inputs)
+        finally:
+            set_llm_cache(None)
+        assert cache.stats()["hits"] > 0
+
+
+class TestParallelDispatch:
+    """Benchmarks for the parallel full-analysis node."""
+
+    @pytest.mark.parametrize("latency_s", LATENCIES)
+    def test_full_analysis(self, benchmark, sample_business_data, latency_s):
+        """Con latencia, el tiempo de reloj refleja las oleadas y no la suma de subagentes."""
+        dispatcher = replay_dispatcher(latency_s)
+        state = {
+            "messages": [HumanMessage(content="Análisis completo")],
+            "files": {BUSINESS_DATA_PATH: {"content": json.dumps(sample_business_data), "encoding": "utf-8"}},
+        }
+        benchmark.pedantic(dispatcher.run, args=(state,), rounds=5)
@@ -0,0 +1,74 @@
+"""
+Benchmarks for the portfolio (batch) paths at 1, 1k and 100k businesses.
+
+Run with: pytest benchmarks/test_bench_batch.py --benchmark-only
+"""
+import pytest
+from benchmarks.conftest import CHART_BATCH_SIZES, FILE_BATCH_SIZES, PORTFOLIO_SIZES, make_portfolio, portfolio_rows
+from src.engine.alerts import evaluate_portfolio
+from src.engine.goal_seek import goal_seek_batch
+from src.engine.metrics import compute_portfolio_metrics, load_business_data
+from src.reports.charts import get_chart_cache, render_charts_batch
+from src.reports.context import AnalysisContext, context_columns
+from src.storage.business_store import ingest_business_rows
+from src.tools import create_excel_report, create_pdf_report, generate_alerts
+
+sizes = pytest.mark.parametrize("portfolio", PORTFOLIO_SIZES, indirect=True)
+
+
+class TestEngineBatch:
+    """Benchmarks for the vectorized engine over whole portfolios."""
+
+    @sizes
+    def test_compute_portfolio_metrics(self, benchmark, portfolio):
+        benchmark(compute_portfolio_metrics, portfolio)
+
+    @sizes
+    def test_evaluate_portfolio(self, benchmark, portfolio):
+        benchmark(evaluate_portfolio, portfolio)
+
+    @sizes
+    def test_goal_seek_closed_form(self, benchmark, portfolio):
+        benchmark(goal_seek_batch, portfolio, "precio_venta", "roi", 25.0)
+
+    @sizes
+    def test_goal_seek_numeric(self, benchmark, portfolio):
+        benchmark(goal_seek_batch, portfolio, "precio_venta", "punto_equilibrio_unidades", 500.0)
+
+
+class TestIngestion:
+    """Benchmarks for validating and storing businesses in bulk."""
+
+    @pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+    def test_ingest_business_rows(self, benchmark, size):
+        rows = portfolio_rows(make_portfolio(size))
+        benchmark.pedantic(ingest_business_rows, args=(rows,), rounds=3 if size > 1_000 else 10)
+
+
+class TestReportBatch:
+    """Benchmarks for the report tools in batch mode."""
+
+    @pytest.mark.parametrize("size", PORTFOLIO_SIZES)
+    def test_context_columns(self, benchmark, size):
+        contexts = [AnalysisContext.from_data(row) for row in portfolio_rows(make_portfolio(size))]
+        benchmark(context_columns, contexts)
+
+    @pytest.mark.parametrize("size", PORTFOLIO_SIZES[:2])
+    def test_generate_alerts_batch(self, benchmark, size):
+        rows = portfolio_rows(make_portfolio(size))
+        benchmark.pedantic(generate_alerts, args=(rows,), kwargs={"tool_call_id": "bench"}, rounds=3)
+
+    @pytest.mark.parametrize("size", CHART_BATCH_SIZES)
+    def test_render_charts_batch(self, benchmark, size):
+        businesses = [load_business_data(row) for row in portfolio_rows(make_portfolio(size))]
+        benchmark.pedantic(render_charts_batch, args=(businesses,), setup=get_chart_cache().clear, rounds=3)
+
+    @pytest.mark.parametrize("size", FILE_BATCH_SIZES)
+    def test_create_pdf_report_batch(self, benchmark, size, reports_dir):
+        rows = portfolio_rows(make_portfolio(size))
+        benchmark.pedantic(create_pdf_report, args=(rows, "lote"), rounds=3)
+
+    @pytest.mark.parametrize("size", FILE_BATCH_SIZES)
+    def test_create_excel_report_batch(self, benchmark, size, reports_dir):
+        rows = portfolio_rows(make_portfolio(size))
+        benchmark.pedantic(create_excel_report, args=(rows, "lote"), rounds=3)
@@ -0,0 +1,82 @@
+"""
+Benchmarks for long-horizon cashflows and large scenario workloads.
+
+Run with: pytest benchmarks/test_bench_scenarios.py --benchmark-only
+"""
+import pytest
+from src.engine.cashflow import project_cashflow_series
+from src.engine.metrics import load_business_data
+from src.engine.montecarlo import run_monte_carlo
+from src.engine.sensitivity import sweep_sensitivity_grid
+from src.storage.scenario_store import (
+    InMemoryScenarioStore,
+    SQLiteScenarioStore,
+    get_scenario_store,
+    scenario_scope,
+    set_scenario_store,
+)
+from src.tools import compare_scenarios, create_scenario
+
+SEASONALITY = [0.8, 0.85, 0.9, 1.0, 1.0, 1.05, 1.1, 1.1, 1.0, 0.95, 1.1, 1.3]
+
+
+@pytest.fixture
+def business(sample_business_data):
+    return load_business_data(sample_business_data)
+
+
+class TestLongHorizonCashflow:
+    """Benchmarks for cashflow projections up to 50 years."""
+
+    @pytest.mark.parametrize("months", [12, 120, 600])
+    def test_monthly(self, benchmark, business, months):
+        benchmark(
+            project_cashflow_series, business, months=months, growth_rate=5.0,
+            cost_inflation=3.0, seasonality=SEASONALITY, investments=[{"periodo": 6, "monto": 5000}],
+        )
+
+    @pytest.mark.parametrize("months", [12, 600])
+    def test_daily(self, benchmark, business, months):
+        benchmark(project_cashflow_series, business, months=months, frequency="diaria", growth_rate=5.0)
+
+
+class TestScenarioComparison:
+    """Benchmarks for comparing many saved scenarios."""
+
+    @pytest.fixture(params=["memoria", "sqlite"])
+    def store(self, request, tmp_path):
+        store = InMemoryScenarioStore() if request.param == "memoria" else SQLiteScenarioStore(str(tmp_path / "escenarios.db"))
+        set_scenario_store(store)
+        yield store
+        set_scenario_store(None)
+
+    @pytest.mark.parametrize("count", [10, 100, 1_000])
+    def test_compare_scenarios(self, benchmark, store, sample_business_data, count):
+        for i in range(count):
+            create_scenario(sample_business_data, "personalizado", {
+                "nombre": f"Escenario {i}",
+                "precio_venta": 8.0 + i * 0.01,
+                "volumen_ventas": 800 + i,
+            })
+        scenario_ids = get_scenario_store().list_ids(scenario_scope(load_business_data(sample_business_data)))
+        assert len(scenario_ids) == count
+
+        benchmark(compare_scenarios, sample_business_data, scenario_ids)
+
+
+class TestStochasticScenarios:
+    """Benchmarks for Monte Carlo and sensitivity sweeps."""
+
+    @pytest.mark.parametrize("draws", [1_000, 100_000, 1_000_000])
+    def test_monte_carlo(self, benchmark, business, draws):
+        distributions = {
+            "precio_venta": {"tipo": "normal", "desviacion": 1.0},
+            "volumen_ventas": {"tipo": "triangular", "minimo": 700, "maximo": 1300},
+            "costo_variable": {"tipo": "uniforme", "minimo": 2.5, "maximo": 3.5},
+        }
+        benchmark(run_monte_carlo, business, distributions, n_draws=draws, seed=42)
+
+    @pytest.mark.parametrize("steps", [11, 51])
+    def test_sensitivity_grid(self, benchmark, business, steps):
+        parameters = {"precio_venta": [-20, 20], "costo_variable": [-10, 10], "volumen_ventas": [-30, 30]}
+        benchmark(sweep_sensitivity_grid, business, parameters, steps=steps)
@@ -0,0 +1,36 @@
+"""
+Cold-start benchmarks: importing the graph and building it for the first time.
+
+Run with: pytest benchmarks/test_bench_startup.py --benchmark-only
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_python(code: str) -> None:
+    """Ejecuta código en un intérprete nuevo (arranque en frío, sin módulos en caché)."""
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-benchmark")}
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+class TestColdStart:
+    """Benchmarks for process startup."""
+
+    def test_interpreter(self, benchmark):
+        """Referencia: intérprete vacío."""
+        benchmark.pedantic(run_python, args=("pass",), rounds=5)
+
+    @pytest.mark.parametrize("module", ["src.tools", "src.graph.builder"])
+    def test_import(self, benchmark, module):
+        benchmark.pedantic(run_python, args=(f"import {module}",), rounds=5)
+
+    def test_first_build(self, benchmark):
+        """Primera construcción del grafo completo (modelo, subagentes y herramientas)."""
+        code = "from src.graph.builder import get_anafi_agent; get_anafi_agent()"
+        benchmark.pedantic(run_python, args=(code,), rounds=2)
@@ -0,0 +1,126 @@
+"""
+Benchmarks for every agent tool exported by src.tools (one business per call).
+
+Run with: pytest benchmarks/test_bench_tools.py --benchmark-only
+"""
+import inspect
+
+import pytest
+import src.tools as tools
+from src.reports.charts import get_chart_cache
+from src.storage.scenario_store import InMemoryScenarioStore, set_scenario_store
+from src.tools import tool_cache
+
+SINGLE_ARGS = dict(
+    costos_fijos_mensuales=5000.0,
+    costo_variable_unitario=3.0,
+    precio_venta_unitario=10.0,
+    volumen_ventas_estimado=1000,
+)
+
+
+def uncached(tool):
+    """La función original de una herramienta (sin caché ni instrumentación)."""
+    return inspect.unwrap(tool)
+
+
+@pytest.fixture(autouse=True)
+def isolated_stores():
+    """Almacén de escenarios propio y cachés vacías en cada benchmark."""
+    set_scenario_store(InMemoryScenarioStore())
+    tool_cache.clear()
+    yield
+    set_scenario_store(None)
+    tool_cache.clear()
+
+
+class TestDataInputTools:
+    """Benchmarks for data input tools."""
+
+    def test_validate_financial_data(self, benchmark):
+        benchmark(uncached(tools.validate_financial_data), "precio_venta_unitario", 10.0, 3.0)
+
+    def test_save_business_data(self, benchmark, sample_business_data):
+        benchmark(uncached(tools.save_business_data), sample_business_data)
+
+
+class TestBasicCalculationTools:
+    """Benchmarks for basic calculation tools."""
+
+    def test_calculate_total_costs(self, benchmark):
+        benchmark(uncached(tools.calculate_total_costs), 5000.0, 3.0, 1000)
+
+    def test_calculate_breakeven_point(self, benchmark):
+        benchmark(uncached(tools.calculate_breakeven_point), **SINGLE_ARGS)
+
+    def test_calculate_profit(self, benchmark):
+        benchmark(uncached(tools.calculate_profit), **SINGLE_ARGS)
+
+    def test_calculate_profitability_ratios(self, benchmark):
+        benchmark(uncached(tools.calculate_profitability_ratios), inversion_inicial=50000.0, **SINGLE_ARGS)
+
+    def test_calculate_target_value(self, benchmark):
+        benchmark(uncached(tools.calculate_target_value), "precio_venta", "utilidad_neta", 5000.0, **SINGLE_ARGS)
+
+    def test_memoized_hit(self, benchmark):
+        """Una llamada repetida que se resuelve desde la caché de herramientas."""
+        tools.calculate_profit(**SINGLE_ARGS)
+        benchmark(tools.calculate_profit, **SINGLE_ARGS)
+
+
+class TestAdvancedAnalysisTools:
+    """Benchmarks for advanced analysis tools."""
+
+    def test_project_cashflow(self, benchmark, sample_business_data):
+        benchmark(uncached(tools.project_cashflow), sample_business_data, months=12)
+
+    def test_generate_income_statement(self, benchmark, sample_business_data):
+        benchmark(uncached(tools.generate_income_statement), sample_business_data)
+
+    def test_create_business_canvas(self, benchmark, sample_business_data):
+        benchmark(uncached(tools.create_business_canvas), sample_business_data)
+
+
+class TestScenarioTools:
+    """Benchmarks for scenario tools."""
+
+    def test_create_scenario(self, benchmark, sample_business_data):
+        benchmark(tools.create_scenario, sample_business_data, "optimista")
+
+    def test_create_scenario_montecarlo(self, benchmark, sample_business_data):
+        parameters = {
+            "distribuciones": {"precio_venta": {"tipo": "normal", "desviacion": 1.0}},
+            "simulaciones": 100_000,
+            "semilla": 42,
+        }
+        benchmark(tools.create_scenario, sample_business_data, "montecarlo", parameters)
+
+    def test_compare_scenarios(self, benchmark, sample_business_data):
+        for tipo in ("pesimista", "moderado", "optimista"):
+            tools.create_scenario(sample_business_data, tipo)
+        benchmark(tools.compare_scenarios, sample_business_data, ["pesimista", "moderado", "optimista"])
+
+    def test_simulate_parameter_change(self, benchmark, sample_business_data):
+        benchmark(uncached(tools.simulate_parameter_change), sample_business_data, "precio_venta", 10.0)
+
+    def test_simulate_sensitivity_grid(self, benchmark, sample_business_data):
+        parameters = {"precio_venta": [-20, 20], "costo_variable": [-10, 10], "volumen_ventas": [-30, 30]}
+        benchmark(uncached(tools.simulate_sensitivity_grid), sample_business_data, parameters, 21)
+
+
+class TestReportTools:
+    """Benchmarks for report tools (no cache: charts are redrawn each round)."""
+
+    def test_generate_charts(self, benchmark, sample_business_data):
+        benchmark.pedantic(
+            tools.generate_charts, args=(sample_business_data,), setup=get_chart_cache().clear, rounds=5
+        )
+
+    def test_generate_alerts(self, benchmark, sample_business_data):
+        benchmark(tools.generate_alerts, sample_business_data)
+
+    def test_create_pdf_report(self, benchmark, sample_business_data, reports_dir):
+        benchmark.pedantic(tools.create_pdf_report, args=(sample_business_data, "reporte.pdf"), rounds=5)
+
+    def test_create_excel_report(self, benchmark, sample_business_data, reports_dir):
+        benchmark.pedantic(tools.create_excel_report, args=(sample_business_data, "reporte.xlsx"), rounds=5)
@@ -0,0 +1,42 @@
+"""Regenerate benchmarks/thresholds.json from a pytest-benchmark JSON results file."""
+import argparse
+import json
+import math
+
+from benchmarks.conftest import THRESHOLDS_PATH, benchmark_key
+
+# Holgura por defecto sobre la media medida (las máquinas de CI son más lentas y ruidosas)
+DEFAULT_FACTOR = 3.0
+# Umbral mínimo en segundos: por debajo, el ruido del planificador y del reloj domina la medida
+MIN_THRESHOLD_S = 0.001
+
+
+def thresholds_from_results(
+    results: dict,
+    factor: float = DEFAULT_FACTOR,
+    floor: float = MIN_THRESHOLD_S,
+) -> dict:
+    """Umbral por benchmark = max(media × factor, floor), redondeado hacia arriba a 2 cifras significativas."""
+    thresholds = {}
+    for bench in results["benchmarks"]:
+        limit = max(bench["stats"]["mean"] * factor, floor)
+        digits = 1 - int(math.floor(math.log10(limit)))
+        thresholds[benchmark_key(bench["fullname"])] = math.ceil(limit * 10 ** digits) / 10 ** digits
+    return dict(sorted(thresholds.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("results", help="Archivo generado con --benchmark-json")
+    parser.add_argument("--factor", type=float, default=DEFAULT_FACTOR, help="Holgura sobre la media medida")
+    parser.add_argument("--floor", type=float, default=MIN_THRESHOLD_S, help="Umbral mínimo en segundos")
+    args = parser.parse_args()
+
+    with open(args.results, encoding="utf-8") as f:
+        thresholds = thresholds_from_results(json.load(f), args.factor, args.floor)
+    THRESHOLDS_PATH.write_text(json.dumps(thresholds, indent=2) + "\n", encoding="utf-8")
+    print(f"✅ {len(thresholds)} umbrales escritos en {THRESHOLDS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,39 @@
-from src.prompts.sub_agent_prompts import *
-from src.tools import *
+import importlib
+from functools import lru_cache
+from typing import List
+
+from src.prompts.sub_agent_prompts import (
+    ADVANCED_ANALYSIS_AGENT_INSTRUCTIONS,
+    BASIC_CALCULATIONS_AGENT_INSTRUCTIONS,
+    DATA_INPUT_AGENT_INSTRUCTIONS,
+    REPORT_GENERATION_AGENT_INSTRUCTIONS,
+    SCENARIO_ANALYSIS_AGENT_INSTRUCTIONS,
+)
+
+# Las herramientas se declaran por nombre y se resuelven en `get_sub_agents()`,
+# de modo que importar esta configuración no carga los módulos de herramientas.
 
 data_input_agent = {
     "name": "data_input_agent",
     "description": "Delega a este agente para recopilar y validar todos los datos financieros del usuario mediante conversación guiada.",
     "system_prompt": DATA_INPUT_AGENT_INSTRUCTIONS,
     "tools": [
-        validate_financial_data,
-        save_business_data,
+        "validate_financial_data",
+        "save_business_data",
     ],
     "model": "openai:gpt-4o-mini"
 }
 
 basic_calculations_agent = {
     "name": "basic_calculations_agent",
-    "description": "Delega a este agente para calcular métricas financieras básicas: costos totales, punto de equilibrio, utilidad y rentabilidad.",
+    "description": "Delega a este agente para calcular métricas financieras básicas: costos totales, punto de equilibrio, utilidad, rentabilidad y el valor requerido para alcanzar una meta (goal seek).",
     "system_prompt": BASIC_CALCULATIONS_AGENT_INSTRUCTIONS,
     "tools": [
-        calculate_total_costs,
-        calculate_breakeven_point,
-        calculate_profit,
-        calculate_profitability_ratios,
+        "calculate_total_costs",
+        "calculate_breakeven_point",
+        "calculate_profit",
+        "calculate_profitability_ratios",
+        "calculate_target_value",
     ],
     "model": "openai:gpt-4o-mini"
 }
@@ -30,9 +43,9 @@ advanced_analysis_agent = {
     "description": "Delega a este agente para generar análisis financieros avanzados: flujo de efectivo, estado de resultados y Business Model Canvas.",
     "system_prompt": ADVANCED_ANALYSIS_AGENT_INSTRUCTIONS,
     "tools": [
-        project_cashflow,
-        generate_income_statement,
-        create_business_canvas,
+        "project_cashflow",
+        "generate_income_statement",
+        "create_business_canvas",
     ],
     "model": "openai:gpt-4o-mini"
 }
@@ -42,9 +55,10 @@ scenario_analysis_agent = {
     "description": "Delega a este agente para simular diferentes escenarios financieros y comparar resultados.",
     "system_prompt": SCENARIO_ANALYSIS_AGENT_INSTRUCTIONS,
     "tools": [
-        create_scenario,
-        compare_scenarios,
-        simulate_parameter_change,
+        "create_scenario",
+        "compare_scenarios",
+        "simulate_parameter_change",
+        "simulate_sensitivity_grid",
     ],
     "model": "openai:gpt-4o-mini"
 }
@@ -54,10 +68,44 @@ report_generation_agent = {
     "description": "Delega a este agente para consolidar todos los análisis y generar reportes finales en PDF/Excel con visualizaciones.",
     "system_prompt": REPORT_GENERATION_AGENT_INSTRUCTIONS,
     "tools": [
-        generate_charts,
-        create_pdf_report,
-        create_excel_report,
-        generate_alerts,
+        "generate_charts",
+        "create_pdf_report",
+        "create_excel_report",
+        "generate_alerts",
     ],
     "model": "openai:gpt-4o-mini"
 }
+
+# Dependencias entre subagentes: los que solo dependen de los datos de entrada
+# pueden ejecutarse en paralelo; el reporte espera a que terminen todos.
+SUBAGENT_DEPENDENCIES = {
+    "data_input_agent": (),
+    "basic_calculations_agent": ("data_input_agent",),
+    "advanced_analysis_agent": ("data_input_agent",),
+    "scenario_analysis_agent": ("data_input_agent",),
+    "report_generation_agent": (
+        "basic_calculations_agent",
+        "advanced_analysis_agent",
+        "scenario_analysis_agent",
+    ),
+}
+
+SUB_AGENTS = [
+    data_input_agent,
+    basic_calculations_agent,
+    advanced_analysis_agent,
+    scenario_analysis_agent,
+    report_generation_agent,
+]
+
+
+def resolve_tools(spec: dict) -> dict:
+    """Copia de la especificación de un subagente con sus herramientas ya importadas."""
+    tools = importlib.import_module("src.tools")
+    return {**spec, "tools": [getattr(tools, name) for name in spec["tools"]]}
+
+
+@lru_cache(maxsize=1)
+def get_sub_agents() -> List[dict]:
+    """Especificaciones de los subagentes listas para `create_deep_agent` (se resuelven una vez)."""
+    return [resolve_tools(spec) for spec in SUB_AGENTS]
@@ -0,0 +1,15 @@
+from .metrics import (
+    BatchMetrics,
+    compute_batch_metrics,
+    compute_metrics,
+    compute_portfolio_metrics,
+    load_business_data,
+)
+
+__all__ = [
+    "BatchMetrics",
+    "compute_batch_metrics",
+    "compute_metrics",
+    "compute_portfolio_metrics",
+    "load_business_data",
+]
@@ -0,0 +1,496 @@
+"""Declarative alert rules compiled into a vectorized evaluator."""
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from src.engine.metrics import BatchMetrics, compute_batch_metrics, compute_portfolio_metrics
+from src.models.financial_data import BusinessInputData
+from src.models.reports import Alert
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("critica", "advertencia", "informacion")
+
+# Umbrales con nombre: las reglas los referencian y cada cliente puede redefinirlos
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "ros_minimo": 10.0,  # %
+    "ros_excelente": 20.0,  # %
+    "roi_minimo": 15.0,  # % anual
+    "utilidad_minima": 1000.0,  # $/mes
+    "equilibrio_critico": 100.0,  # % del volumen estimado
+    "margen_seguridad_minimo": 80.0,  # % del volumen estimado
+    "margen_seguridad_holgado": 50.0,  # % del volumen estimado
+    "racha_negativa_maxima": 3.0,  # meses
+}
+
+_OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+_CONDITION = re.compile(r"^\s*([a-z_][a-z0-9_]*)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Regla de alerta.
+
+    Las condiciones son textos "métrica operador umbral" (ej. "utilidad_neta < 0" o
+    "rentabilidad_sobre_ventas < ros_minimo") y se combinan con AND; sin condiciones,
+    la regla siempre se cumple. Dentro de un mismo `grupo` solo se activa la primera
+    regla que se cumpla, en el orden de la tabla (equivale a un if/elif/else).
+    """
+    id: str
+    severidad: str
+    mensaje: str
+    condiciones: Tuple[str, ...] = ()
+    grupo: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, raw: Mapping) -> "AlertRule":
+        condiciones = raw.get("condiciones", ())
+        if isinstance(condiciones, str):
+            condiciones = (condiciones,)
+        return cls(
+            id=raw["id"],
+            severidad=raw["severidad"],
+            mensaje=raw["mensaje"],
+            condiciones=tuple(condiciones),
+            grupo=raw.get("grupo"),
+        )
+
+
+def _rule(id, severidad, mensaje, *condiciones, grupo=None) -> AlertRule:
+    return AlertRule(id=id, severidad=severidad, mensaje=mensaje, condiciones=condiciones, grupo=grupo)
+
+
+# Tabla de reglas por conjunto (cada herramienta evalúa el suyo)
+DEFAULT_RULES: Dict[str, Tuple[AlertRule, ...]] = {
+    "alertas": (
+        _rule(
+            "equilibrio_mayor_ventas", "critica",
+            "Punto de equilibrio ({punto_equilibrio_unidades:.0f} und) MAYOR que ventas proyectadas ({volumen_ventas_estimado:.0f} und). Negocio NO viable.",
+            "equilibrio_sobre_volumen > equilibrio_critico",
+        ),
+        _rule(
+            "perdidas", "critica",
+            "Utilidad neta NEGATIVA (${utilidad_neta:,.2f}). El negocio genera pérdidas.",
+            "utilidad_neta < 0",
+        ),
+        _rule(
+            "ros_bajo", "advertencia",
+            "Rentabilidad baja (ROS: {rentabilidad_sobre_ventas:.2f}%). Considere optimizar costos o aumentar precios.",
+            "rentabilidad_sobre_ventas < ros_minimo", "utilidad_neta > 0",
+        ),
+        _rule(
+            "equilibrio_cercano", "advertencia",
+            "Punto de equilibrio muy cercano a ventas estimadas. Poco margen de seguridad.",
+            "equilibrio_sobre_volumen > margen_seguridad_minimo",
+        ),
+        _rule(
+            "roi_bajo", "advertencia",
+            "ROI anual bajo ({rentabilidad_sobre_inversion:.2f}%). La inversión podría no ser atractiva.",
+            "rentabilidad_sobre_inversion < roi_minimo",
+        ),
+        _rule(
+            "ros_excelente", "informacion",
+            "Excelente rentabilidad (ROS: {rentabilidad_sobre_ventas:.2f}%). El negocio es muy rentable.",
+            "utilidad_neta > 0", "rentabilidad_sobre_ventas >= ros_excelente",
+        ),
+        _rule(
+            "margen_seguridad_holgado", "informacion",
+            "Buen margen de seguridad. Punto de equilibrio al {equilibrio_sobre_volumen:.1f}% de ventas estimadas.",
+            "equilibrio_sobre_volumen < margen_seguridad_holgado",
+        ),
+    ),
+    "recomendaciones": (
+        _rule(
+            "perdidas", "critica",
+            "⚠️ CRÍTICO: El negocio genera pérdidas. Considere reducir costos o aumentar precios.",
+            "utilidad_neta < 0", grupo="utilidad",
+        ),
+        _rule(
+            "utilidad_baja", "advertencia",
+            "⚠️ Utilidad baja. Busque oportunidades para mejorar márgenes.",
+            "utilidad_neta < utilidad_minima", grupo="utilidad",
+        ),
+        _rule("rentable", "informacion", "✅ El negocio es rentable.", grupo="utilidad"),
+        _rule(
+            "ros_bajo", "advertencia",
+            "⚠️ Rentabilidad sobre ventas baja (<{ros_minimo:g}%). Optimice estructura de costos.",
+            "rentabilidad_sobre_ventas < ros_minimo", grupo="ros",
+        ),
+        _rule(
+            "ros_aceptable", "informacion",
+            "✓ Rentabilidad aceptable. Hay espacio para mejora.",
+            "rentabilidad_sobre_ventas < ros_excelente", grupo="ros",
+        ),
+        _rule("ros_excelente", "informacion", "✅ Excelente rentabilidad sobre ventas.", grupo="ros"),
+        _rule(
+            "equilibrio_mayor_ventas", "critica",
+            "⚠️ CRÍTICO: Punto de equilibrio mayor que ventas estimadas. Revise modelo de negocio.",
+            "equilibrio_sobre_volumen > equilibrio_critico", grupo="equilibrio",
+        ),
+        _rule(
+            "equilibrio_cercano", "advertencia",
+            "⚠️ Punto de equilibrio muy cercano a ventas estimadas. Poco margen de seguridad.",
+            "equilibrio_sobre_volumen > margen_seguridad_minimo", grupo="equilibrio",
+        ),
+        _rule(
+            "margen_seguridad", "informacion",
+            "✅ Margen de seguridad adecuado sobre punto de equilibrio.",
+            grupo="equilibrio",
+        ),
+    ),
+    "equilibrio": (
+        _rule(
+            "equilibrio_mayor_ventas", "critica",
+            "⚠️ ALERTA CRÍTICA: El punto de equilibrio ({punto_equilibrio_unidades:.0f} unidades) es MAYOR que las ventas proyectadas ({volumen_ventas_estimado:.0f} unidades). El negocio NO sería viable con estos parámetros.",
+            "equilibrio_sobre_volumen > equilibrio_critico",
+        ),
+    ),
+    "utilidad": (
+        _rule(
+            "perdidas", "critica",
+            "⚠️ ALERTA: El negocio está generando PÉRDIDAS. La utilidad neta es negativa.",
+            "utilidad_neta < 0", grupo="utilidad",
+        ),
+        _rule(
+            "ros_bajo", "advertencia",
+            "⚠️ ADVERTENCIA: La utilidad neta es menor al {ros_minimo:g}% de las ventas. Considera optimizar costos o aumentar precios.",
+            "rentabilidad_sobre_ventas < ros_minimo", grupo="utilidad",
+        ),
+    ),
+    "rentabilidad": (
+        _rule(
+            "ros_bajo", "advertencia",
+            "⚠️ ADVERTENCIA: La rentabilidad sobre ventas (ROS) es menor al {ros_minimo:g}%. Considera optimizar costos.",
+            "rentabilidad_sobre_ventas < ros_minimo",
+        ),
+        _rule(
+            "roi_bajo", "advertencia",
+            "⚠️ ADVERTENCIA: El ROI anual es menor al {roi_minimo:g}%. La inversión podría no ser atractiva.",
+            "rentabilidad_sobre_inversion < roi_minimo",
+        ),
+    ),
+    "flujo": (
+        _rule(
+            "flujo_negativo_total", "critica",
+            "⚠️ ALERTA CRÍTICA: El flujo neto es NEGATIVO en todos los periodos. El negocio pierde dinero cada mes.",
+            "periodos_negativos_pct >= 100", grupo="flujo",
+        ),
+        _rule(
+            "flujo_negativo", "advertencia",
+            "⚠️ ALERTA: El flujo neto es negativo en {periodos_negativos:.0f} de {periodos:.0f} {unidad}.",
+            "periodos_negativos > 0", grupo="flujo",
+        ),
+        _rule(
+            "racha_negativa", "advertencia",
+            "⚠️ ALERTA DE LIQUIDEZ: Flujo negativo durante {racha_negativa:.0f} {unidad} consecutivos.",
+            "racha_negativa_meses > racha_negativa_maxima",
+        ),
+        _rule(
+            "insolvencia", "critica",
+            "⚠️ ALERTA DE INSOLVENCIA: El saldo acumulado es negativo (${saldo_final:,.2f}).",
+            "saldo_final < 0", grupo="saldo",
+        ),
+        _rule(
+            "saldo_negativo", "advertencia",
+            "⚠️ ALERTA DE LIQUIDEZ: El saldo acumulado llega a ${saldo_minimo:,.2f} en el periodo {periodo_saldo_minimo:.0f}; se requiere financiamiento temporal.",
+            "saldo_minimo < 0", grupo="saldo",
+        ),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class AlertMasks:
+    """Resultado de evaluar un conjunto de reglas sobre un portafolio.
+
+    `masks` tiene una fila por regla y una columna por negocio.
+    """
+    rules: Tuple[AlertRule, ...]
+    masks: np.ndarray
+    columns: Mapping[str, np.ndarray]
+    thresholds: Mapping[str, float]
+
+    def __len__(self) -> int:
+        return self.masks.shape[1]
+
+    @property
+    def by_severity(self) -> Dict[str, np.ndarray]:
+        """Máscaras (reglas × negocios) de cada severidad."""
+        severities = np.array([rule.severidad for rule in self.rules])
+        return {severity: self.masks[severities == severity] for severity in SEVERITIES}
+
+    def any(self, severidad: str) -> np.ndarray:
+        """Negocios con al menos una alerta de la severidad indicada."""
+        return self.by_severity[severidad].any(axis=0)
+
+    def counts(self) -> Dict[str, np.ndarray]:
+        """Número de alertas por severidad y negocio."""
+        return {severity: mask.sum(axis=0) for severity, mask in self.by_severity.items()}
+
+    def rule_ids(self, index: int = 0) -> List[str]:
+        """IDs de las reglas activas de un negocio."""
+        return [rule.id for rule, active in zip(self.rules, self.masks[:, index]) if active]
+
+    def alerts(self, index: int = 0, **context) -> List[Alert]:
+        """Alertas de un negocio con sus mensajes ya formateados."""
+        values = {name: column[index] for name, column in self.columns.items()}
+        values.update(self.thresholds)
+        values.update(context)
+        return [
+            Alert(tipo=rule.severidad, mensaje=rule.mensaje.format(**values))
+            for rule, active in zip(self.rules, self.masks[:, index])
+            if active
+        ]
+
+    def messages(self, index: int = 0, **context) -> List[str]:
+        """Solo los textos de las alertas de un negocio."""
+        return [alert.mensaje for alert in self.alerts(index, **context)]
+
+
+class CompiledRuleSet:
+    """Conjunto de reglas compilado una vez a arreglos de NumPy.
+
+    Las condiciones distintas se agrupan por operador; al evaluar, cada operador
+    se aplica en una sola operación sobre una matriz (condiciones × negocios), y
+    las reglas combinan sus condiciones con una multiplicación de matrices.
+    """
+
+    def __init__(self, rules: Sequence[AlertRule], thresholds: Mapping[str, float]):
+        self.rules = tuple(rules)
+        self.thresholds = dict(thresholds)
+
+        conditions: Dict[Tuple[str, str, float], int] = {}
+        incidence = []
+        for rule in self.rules:
+            if rule.severidad not in SEVERITIES:
+                raise ValueError(f"Severidad '{rule.severidad}' no válida en la regla '{rule.id}'. Usa: {', '.join(SEVERITIES)}")
+            row = []
+            for text in rule.condiciones:
+                condition = self._parse(text, rule.id)
+                row.append(conditions.setdefault(condition, len(conditions)))
+            incidence.append(row)
+
+        self.conditions = tuple(conditions)
+        self.metrics = tuple(dict.fromkeys(metric for metric, _, _ in self.conditions))
+        self._metric_rows = np.array([self.metrics.index(metric) for metric, _, _ in self.conditions], dtype=np.intp)
+        self._limits = np.array([limit for _, _, limit in self.conditions], dtype=np.float64)
+        self._by_operator = {
+            op: np.array([i for i, (_, o, _) in enumerate(self.conditions) if o == op], dtype=np.intp)
+            for op in dict.fromkeys(o for _, o, _ in self.conditions)
+        }
+
+        # incidencia[regla, condición] = 1 si la regla exige la condición
+        self._incidence = np.zeros((len(self.rules), len(self.conditions)), dtype=np.int32)
+        for r, row in enumerate(incidence):
+            self._incidence[r, row] = 1
+        self._required = self._incidence.sum(axis=1)
+
+        groups: Dict[str, List[int]] = {}
+        for r, rule in enumerate(self.rules):
+            if rule.grupo:
+                groups.setdefault(rule.grupo, []).append(r)
+        self._groups = [np.array(rows, dtype=np.intp) for rows in groups.values() if len(rows) > 1]
+
+    def _parse(self, text: str, rule_id: str) -> Tuple[str, str, float]:
+        match = _CONDITION.match(text)
+        if not match:
+            raise ValueError(f"Condición no válida en la regla '{rule_id}': '{text}'")
+        metric, op, limit = match.groups()
+        if limit in self.thresholds:
+            return metric, op, float(self.thresholds[limit])
+        try:
+            return metric, op, float(limit)
+        except ValueError:
+            raise ValueError(f"Umbral '{limit}' desconocido en la regla '{rule_id}'") from None
+
+    def evaluate(self, columns: Mapping[str, np.ndarray]) -> AlertMasks:
+        """
+        Evalúa todas las reglas sobre todos los negocios en una sola pasada.
+
+        Args:
+            columns: Arreglos de métricas (uno por nombre, todos del mismo largo)
+
+        Returns:
+            `AlertMasks` con la máscara de cada regla
+        """
+        missing = [metric for metric in self.metrics if metric not in columns]
+        if missing:
+            raise ValueError(f"Faltan métricas para las reglas: {', '.join(missing)}")
+
+        size = len(next(iter(columns.values()))) if columns else 1
+        values = np.empty((len(self.metrics), size))
+        for i, metric in enumerate(self.metrics):
+            values[i] = columns[metric]
+
+        lhs = values[self._metric_rows]
+        passed = np.zeros((len(self.conditions), size), dtype=bool)
+        for op, rows in self._by_operator.items():
+            passed[rows] = _OPERATORS[op](lhs[rows], self._limits[rows, None])
+
+        masks = (self._incidence @ passed.astype(np.int32)) == self._required[:, None]
+        for rows in self._groups:
+            # Solo la primera regla del grupo que se cumple (if/elif/else)
+            earlier = np.logical_or.accumulate(masks[rows], axis=0)
+            masks[rows[1:]] &= ~earlier[:-1]
+
+        return AlertMasks(rules=self.rules, masks=masks, columns=columns, thresholds=self.thresholds)
+
+
+class AlertRuleBook:
+    """Tabla de reglas y umbrales de un cliente; compila cada conjunto una sola vez."""
+
+    def __init__(
+        self,
+        rules: Optional[Mapping[str, Iterable[AlertRule]]] = None,
+        thresholds: Optional[Mapping[str, float]] = None,
+    ):
+        self.rules = {name: tuple(rule_set) for name, rule_set in (rules or DEFAULT_RULES).items()}
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self._compiled: Dict[str, CompiledRuleSet] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "AlertRuleBook":
+        """
+        Crea la tabla desde un diccionario (ej. JSON de un cliente).
+
+        Formato: {"umbrales": {"ros_minimo": 12}, "reglas": {"alertas": [{...}]}}.
+        Los umbrales omitidos y los conjuntos de reglas omitidos usan los valores por defecto.
+        """
+        rules = dict(DEFAULT_RULES)
+        for name, rule_set in config.get("reglas", {}).items():
+            rules[name] = tuple(AlertRule.from_dict(raw) for raw in rule_set)
+        return cls(rules=rules, thresholds=config.get("umbrales"))
+
+    def compiled(self, rule_set: str) -> CompiledRuleSet:
+        """Conjunto de reglas compilado (se compila en el primer uso)."""
+        compiled = self._compiled.get(rule_set)
+        if compiled is None:
+            if rule_set not in self.rules:
+                raise ValueError(f"Conjunto de reglas '{rule_set}' no existe. Usa: {', '.join(self.rules)}")
+            with self._lock:
+                compiled = self._compiled.get(rule_set)
+                if compiled is None:
+                    compiled = CompiledRuleSet(self.rules[rule_set], self.thresholds)
+                    self._compiled[rule_set] = compiled
+        return compiled
+
+    def evaluate(self, rule_set: str, columns: Mapping[str, np.ndarray]) -> AlertMasks:
+        """Evalúa un conjunto de reglas sobre columnas de métricas."""
+        return self.compiled(rule_set).evaluate(columns)
+
+
+def load_rule_book(path: str) -> AlertRuleBook:
+    """Carga la tabla de reglas de un cliente desde un archivo JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        return AlertRuleBook.from_config(json.load(f))
+
+
+def metric_columns(metrics: BatchMetrics, volumen_ventas_estimado) -> Dict[str, np.ndarray]:
+    """
+    Columnas disponibles para las reglas de negocio.
+
+    Incluye todas las métricas de `BatchMetrics`, el volumen estimado y el punto
+    de equilibrio como porcentaje del volumen (`equilibrio_sobre_volumen`).
+    """
+    columns = {name: getattr(metrics, name) for name in metrics.__dataclass_fields__}
+    volumen = np.broadcast_to(np.asarray(volumen_ventas_estimado, dtype=np.float64), metrics.ventas_totales.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns["equilibrio_sobre_volumen"] = metrics.punto_equilibrio_unidades / volumen * 100
+    columns["volumen_ventas_estimado"] = volumen
+    return columns
+
+
+def business_columns(data: BusinessInputData) -> Dict[str, np.ndarray]:
+    """Columnas de métricas de un solo negocio."""
+    metrics = compute_batch_metrics(
+        data.costos_fijos_mensuales,
+        data.costo_variable_unitario,
+        data.precio_venta_unitario,
+        data.volumen_ventas_estimado,
+        data.inversion_inicial,
+    )
+    return metric_columns(metrics, data.volumen_ventas_estimado)
+
+
+_books: Dict[Optional[str], AlertRuleBook] = {}
+_books_lock = threading.Lock()
+
+
+def get_rule_book(tenant: Optional[str] = None) -> AlertRuleBook:
+    """
+    Devuelve la tabla de reglas de un cliente.
+
+    Sin cliente se usa `ANAFI_ALERT_RULES` (archivo JSON) si está definida. Para un
+    cliente se busca `<ANAFI_ALERT_RULES_DIR>/<cliente>.json`; si no existe, se usa
+    la tabla por defecto.
+    """
+    book = _books.get(tenant)
+    if book is not None:
+        return book
+    with _books_lock:
+        book = _books.get(tenant)
+        if book is None:
+            if tenant is None:
+                path = os.getenv("ANAFI_ALERT_RULES")
+            else:
+                path = os.path.join(os.getenv("ANAFI_ALERT_RULES_DIR", "config/alert_rules"), f"{tenant}.json")
+            book = load_rule_book(path) if path and os.path.exists(path) else AlertRuleBook()
+            logger.info(f"Reglas de alerta ({tenant or 'por defecto'}): {path if path and os.path.exists(path) else 'tabla por defecto'}")
+            _books[tenant] = book
+    return book
+
+
+def set_rule_book(book: Optional[AlertRuleBook], tenant: Optional[str] = None) -> None:
+    """Reemplaza (o con None, olvida) la tabla de un cliente."""
+    with _books_lock:
+        if book is None:
+            _books.pop(tenant, None)
+        else:
+            _books[tenant] = book
+    # Los resultados memoizados de las herramientas dependen de los umbrales
+    from src.tools.cache import tool_cache
+
+    tool_cache.clear()
+
+
+def evaluate_portfolio(
+    portfolio: Mapping,
+    rule_set: str = "alertas",
+    tenant: Optional[str] = None,
+) -> AlertMasks:
+    """
+    Evalúa las reglas de un conjunto sobre un portafolio completo.
+
+    Args:
+        portfolio: DataFrame o diccionario de columnas (ver `compute_portfolio_metrics`)
+        rule_set: Conjunto de reglas ("alertas", "recomendaciones", ...)
+        tenant: Cliente cuyos umbrales se aplican
+
+    Returns:
+        `AlertMasks` con una columna por negocio
+    """
+    metrics = compute_portfolio_metrics(portfolio)
+    columns = metric_columns(metrics, portfolio["volumen_ventas_estimado"])
+    return get_rule_book(tenant).evaluate(rule_set, columns)
+
+
+def evaluate_business(
+    data: BusinessInputData,
+    rule_set: str = "alertas",
+    tenant: Optional[str] = None,
+) -> AlertMasks:
+    """Evalúa las reglas de un conjunto sobre un solo negocio."""
+    return get_rule_book(tenant).evaluate(rule_set, business_columns(data))
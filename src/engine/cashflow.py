@@ -0,0 +1,122 @@
+"""Vectorized long-horizon cashflow projection."""
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from src.engine.alerts import get_rule_book
+from src.models.financial_data import BusinessInputData, ColumnarCashflowProjection
+
+logger = logging.getLogger(__name__)
+
+MAX_MONTHS = 600
+FREQUENCIES = ("mensual", "diaria")
+DAYS_PER_YEAR = 365
+
+
+def _max_consecutive(mask: np.ndarray) -> int:
+    """Longitud de la racha más larga de valores verdaderos."""
+    if not mask.any():
+        return 0
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[0::2]).max())
+
+
+def project_cashflow_series(
+    business_data: BusinessInputData,
+    months: int = 12,
+    frequency: str = "mensual",
+    growth_rate: float = 0.0,
+    cost_inflation: float = 0.0,
+    seasonality: Optional[Sequence[float]] = None,
+    investments: Optional[List[dict]] = None,
+) -> ColumnarCashflowProjection:
+    """
+    Proyecta el flujo de efectivo con sumas acumuladas sobre arreglos.
+
+    Args:
+        business_data: Datos del negocio (valores del primer mes)
+        months: Horizonte en meses (máximo 600)
+        frequency: "mensual" o "diaria"
+        growth_rate: Crecimiento anual del volumen de ventas en porcentaje
+        cost_inflation: Inflación anual de costos fijos y variables en porcentaje
+        seasonality: 12 factores multiplicativos de volumen, uno por mes del año
+        investments: Inversiones puntuales, ej. [{"periodo": 13, "monto": 5000}]
+    """
+    if months < 1 or months > MAX_MONTHS:
+        raise ValueError(f"El número de meses debe estar entre 1 y {MAX_MONTHS}.")
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Frecuencia '{frequency}' no válida. Usa: {', '.join(FREQUENCIES)}")
+
+    if frequency == "mensual":
+        n_periods = months
+        periods_per_year = 12
+        month_of_year = np.arange(n_periods) % 12
+    else:
+        n_periods = round(months * DAYS_PER_YEAR / 12)
+        periods_per_year = DAYS_PER_YEAR
+        month_of_year = (np.arange(n_periods) % DAYS_PER_YEAR * 12) // DAYS_PER_YEAR
+    scale = 12 / periods_per_year
+
+    years_elapsed = np.arange(n_periods) / periods_per_year
+    volumen = business_data.volumen_ventas_estimado * scale * (1 + growth_rate / 100) ** years_elapsed
+    if seasonality is not None:
+        factors = np.asarray(seasonality, dtype=np.float64)
+        if factors.shape != (12,):
+            raise ValueError("La estacionalidad debe tener exactamente 12 factores (uno por mes).")
+        volumen = volumen * factors[month_of_year]
+
+    inflacion = (1 + cost_inflation / 100) ** years_elapsed
+    entradas = business_data.precio_venta_unitario * volumen
+    salidas = (
+        business_data.costos_fijos_mensuales * scale
+        + business_data.costo_variable_unitario * volumen
+    ) * inflacion
+
+    for investment in investments or []:
+        periodo = int(investment["periodo"])
+        if periodo < 1 or periodo > n_periods:
+            raise ValueError(f"El periodo de inversión {periodo} está fuera del horizonte (1-{n_periods}).")
+        salidas[periodo - 1] += float(investment["monto"])
+
+    flujo_neto = entradas - salidas
+    saldo_acumulado = np.cumsum(flujo_neto)
+
+    logger.debug(f"Flujo de efectivo proyectado: {n_periods} periodos ({frequency})")
+
+    projection = ColumnarCashflowProjection(
+        proyeccion_meses=months,
+        frecuencia=frequency,
+        periodos=np.arange(1, n_periods + 1),
+        entradas=entradas,
+        salidas=salidas,
+        flujo_neto=flujo_neto,
+        saldo_acumulado=saldo_acumulado,
+    )
+    return projection.model_copy(update={"alertas": cashflow_alerts(projection)})
+
+
+def cashflow_columns(series: ColumnarCashflowProjection) -> Dict[str, np.ndarray]:
+    """Resumen de la serie como columnas de un solo valor para las reglas de alerta."""
+    negativos = series.flujo_neto < 0
+    racha = _max_consecutive(negativos)
+    periodos_por_mes = 1 if series.frecuencia == "mensual" else DAYS_PER_YEAR / 12
+    peor = int(np.argmin(series.saldo_acumulado))
+    resumen = {
+        "periodos": len(series),
+        "periodos_negativos": int(negativos.sum()),
+        "periodos_negativos_pct": float(negativos.mean()) * 100,
+        "racha_negativa": racha,
+        "racha_negativa_meses": racha / periodos_por_mes,
+        "saldo_final": series.saldo_acumulado[-1],
+        "saldo_minimo": series.saldo_acumulado[peor],
+        "periodo_saldo_minimo": series.periodos[peor],
+    }
+    return {name: np.array([value], dtype=np.float64) for name, value in resumen.items()}
+
+
+def cashflow_alerts(series: ColumnarCashflowProjection, tenant: Optional[str] = None) -> List[str]:
+    """Alertas de liquidez calculadas sobre toda la serie (reglas del conjunto "flujo")."""
+    unidad = "meses" if series.frecuencia == "mensual" else "días"
+    masks = get_rule_book(tenant).evaluate("flujo", cashflow_columns(series))
+    return masks.messages(unidad=unidad)
@@ -0,0 +1,251 @@
+"""Goal seek: closed-form inverse of the metrics with a vectorized root-finding fallback."""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+from src.engine.metrics import BatchMetrics, INPUT_COLUMNS, compute_batch_metrics
+from src.engine.sensitivity import SENSITIVITY_FIELDS
+from src.models.financial_data import BusinessInputData
+
+logger = logging.getLogger(__name__)
+
+# Objetivos con solución cerrada → métrica de BatchMetrics que representan
+GOAL_TARGETS = {
+    "utilidad_neta": "utilidad_neta",
+    "ros": "rentabilidad_sobre_ventas",
+    "roi": "rentabilidad_sobre_inversion",
+}
+
+# Dominio válido de cada variable (mínimo, y si el mínimo es exclusivo)
+_DOMAIN = {
+    "precio_venta": (0.0, True),
+    "costo_variable": (0.0, False),
+    "costo_fijo": (0.0, False),
+    "volumen_ventas": (0.0, True),
+}
+
+BISECTION_ITERATIONS = 200
+# Rejilla para encerrar la raíz: de 2^-20 a 2^40 veces el valor actual de la variable
+BRACKET_MIN_EXP = -20
+BRACKET_MAX_EXP = 40
+
+
+@dataclass(frozen=True)
+class GoalSeekResult:
+    """Valor que debe tomar una variable para alcanzar el objetivo, por negocio.
+
+    `valor` es NaN donde el objetivo no se puede alcanzar dentro del dominio de
+    la variable (precio o volumen positivos, costos no negativos).
+    """
+    variable: str
+    objetivo: str
+    valor_objetivo: np.ndarray
+    valor: np.ndarray
+    valor_actual: np.ndarray
+    metodo: str  # "cerrado", "numerico" o "cerrado+numerico"
+
+    def __len__(self) -> int:
+        return self.valor.shape[0]
+
+    @property
+    def factible(self) -> np.ndarray:
+        return ~np.isnan(self.valor)
+
+    @property
+    def cambio_porcentual(self) -> np.ndarray:
+        """Cambio respecto al valor actual, en porcentaje."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.valor - self.valor_actual) / np.abs(self.valor_actual) * 100
+
+
+def _required_profit(objetivo: str, target: np.ndarray, inversion: np.ndarray) -> np.ndarray:
+    """Utilidad neta mensual equivalente a un objetivo de utilidad o de ROI anual."""
+    if objetivo == "utilidad_neta":
+        return target
+    # ROI anual = Utilidad × 12 / Inversión × 100
+    return np.where(inversion > 0, target * inversion / 1200, np.nan)
+
+
+def _closed_form(variable: str, objetivo: str, cols: Dict[str, np.ndarray], target: np.ndarray) -> np.ndarray:
+    """
+    Despeja la variable de Utilidad = (Precio - CV) × Volumen - CF.
+
+    Para ROS el objetivo es Utilidad = r × Precio × Volumen (r = ROS / 100).
+    """
+    p, cv, cf, v = cols["precio_venta"], cols["costo_variable"], cols["costo_fijo"], cols["volumen_ventas"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if objetivo == "ros":
+            r = target / 100
+            if variable == "precio_venta":
+                return np.where(r < 1, (cf + cv * v) / ((1 - r) * v), np.nan)
+            if variable == "costo_variable":
+                return p * (1 - r) - cf / v
+            if variable == "costo_fijo":
+                return v * (p * (1 - r) - cv)
+            return cf / (p * (1 - r) - cv)
+
+        utilidad = _required_profit(objetivo, target, cols["inversion"])
+        if variable == "precio_venta":
+            return cv + (utilidad + cf) / v
+        if variable == "costo_variable":
+            return p - (utilidad + cf) / v
+        if variable == "costo_fijo":
+            return (p - cv) * v - utilidad
+        return (utilidad + cf) / (p - cv)
+
+
+def _metric(metric: str, cols: Dict[str, np.ndarray]) -> np.ndarray:
+    metrics: BatchMetrics = compute_batch_metrics(
+        cols["costo_fijo"], cols["costo_variable"], cols["precio_venta"], cols["volumen_ventas"], cols["inversion"]
+    )
+    return getattr(metrics, metric)
+
+
+def _bracket(residual: Callable[[np.ndarray], np.ndarray], lo: np.ndarray, scale: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encierra una raíz por negocio recorriendo una rejilla geométrica desde `lo`.
+
+    Toma el primer cambio de signo entre puntos donde la métrica está definida
+    (ej. el punto de equilibrio no existe si el margen no es positivo).
+    """
+    steps = scale[:, None] * 2.0 ** np.arange(BRACKET_MIN_EXP, BRACKET_MAX_EXP + 1)
+    xs = np.concatenate([lo[:, None], lo[:, None] + steps], axis=1)
+    fx = residual(xs.ravel(), xs.shape[1]).reshape(xs.shape)
+
+    defined = ~np.isnan(fx)
+    change = defined[:, :-1] & defined[:, 1:] & (np.sign(fx[:, :-1]) != np.sign(fx[:, 1:]))
+    found = change.any(axis=1)
+    first = np.argmax(change, axis=1)
+    rows = np.arange(xs.shape[0])
+    lo = np.where(found, xs[rows, first], np.nan)
+    hi = np.where(found, xs[rows, first + 1], np.nan)
+    return lo, hi
+
+
+def _bisect(residual: Callable[[np.ndarray], np.ndarray], lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Bisección vectorizada: una raíz por negocio en [lo, hi] (NaN = sin raíz)."""
+    f_lo = residual(lo)
+    for _ in range(BISECTION_ITERATIONS):
+        mid = (lo + hi) / 2
+        f_mid = residual(mid)
+        left = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(left, mid, lo)
+        f_lo = np.where(left, f_mid, f_lo)
+        hi = np.where(left, hi, mid)
+        if not np.any(hi - lo > 1e-12 * np.maximum(1.0, np.abs(hi))):
+            break
+    return (lo + hi) / 2
+
+
+def _numeric(variable: str, metric: str, cols: Dict[str, np.ndarray], target: np.ndarray) -> np.ndarray:
+    """Resuelve métrica(variable) = objetivo con bisección sobre el motor de métricas."""
+    def residual(x: np.ndarray, repeat: int = 1) -> np.ndarray:
+        fixed = {name: np.repeat(column, repeat) for name, column in cols.items()}
+        fixed[variable] = x
+        return _metric(metric, fixed) - np.repeat(target, repeat)
+
+    minimo, _ = _DOMAIN[variable]
+    lo = np.full(target.shape, minimo)
+    scale = np.maximum(np.abs(cols[variable]), 1.0)
+    lo, hi = _bracket(residual, lo, scale)
+
+    solved = ~np.isnan(lo)
+    valor = np.full(target.shape, np.nan)
+    if solved.any():
+        subset = {name: column[solved] for name, column in cols.items()}
+        valor[solved] = _bisect(
+            lambda x: _metric(metric, {**subset, variable: x}) - target[solved], lo[solved], hi[solved]
+        )
+    return valor
+
+
+def _columns(portfolio: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    missing = [c for c in INPUT_COLUMNS[:-1] if c not in portfolio]
+    if missing:
+        raise ValueError(f"Faltan columnas requeridas: {', '.join(missing)}")
+    cols = {
+        parameter: np.atleast_1d(np.asarray(portfolio[field], dtype=np.float64))
+        for parameter, field in SENSITIVITY_FIELDS.items()
+    }
+    inversion = portfolio["inversion_inicial"] if "inversion_inicial" in portfolio else None
+    cols["inversion"] = np.atleast_1d(np.asarray(np.nan if inversion is None else inversion, dtype=np.float64))
+    arrays = np.broadcast_arrays(*cols.values())
+    return {name: np.array(array) for name, array in zip(cols, arrays)}
+
+
+def goal_seek_batch(
+    portfolio: Mapping[str, Any],
+    variable: str,
+    objetivo: str,
+    valor_objetivo: Any,
+    method: Optional[str] = None,
+) -> GoalSeekResult:
+    """
+    Calcula, para cada negocio, el valor de una variable que alcanza el objetivo.
+
+    Args:
+        portfolio: DataFrame o diccionario de columnas con los campos de `BusinessInputData`
+        variable: precio_venta, costo_variable, costo_fijo o volumen_ventas
+        objetivo: utilidad_neta ($/mes), ros (%) o roi (% anual); también cualquier
+            métrica de `BatchMetrics` (se resuelve numéricamente)
+        valor_objetivo: Valor buscado (escalar o uno por negocio)
+        method: "cerrado", "numerico" o None (cerrado si existe, si no numérico)
+
+    Las demás variables se mantienen fijas. La solución cerrada despeja la fórmula
+    de utilidad; la numérica usa bisección vectorizada sobre el motor de métricas
+    y sirve para objetivos sin fórmula cerrada.
+    """
+    if variable not in SENSITIVITY_FIELDS:
+        raise ValueError(f"Variable '{variable}' no válida. Usa: {', '.join(SENSITIVITY_FIELDS)}")
+    metric = GOAL_TARGETS.get(objetivo, objetivo)
+    if metric not in BatchMetrics.__dataclass_fields__:
+        raise ValueError(f"Objetivo '{objetivo}' no válido. Usa: {', '.join(GOAL_TARGETS)} o una métrica básica")
+    if method not in (None, "cerrado", "numerico"):
+        raise ValueError(f"Método '{method}' no válido. Usa: cerrado, numerico")
+    if method == "cerrado" and objetivo not in GOAL_TARGETS:
+        raise ValueError(f"El objetivo '{objetivo}' no tiene solución cerrada.")
+
+    cols = _columns(portfolio)
+    target = np.broadcast_to(np.asarray(valor_objetivo, dtype=np.float64), cols["precio_venta"].shape).copy()
+
+    if method == "numerico" or objetivo not in GOAL_TARGETS:
+        valor = _numeric(variable, metric, cols, target)
+        method = "numerico"
+    else:
+        valor = _closed_form(variable, objetivo, cols, target)
+        # Donde la fórmula se indetermina (ej. volumen cero), se intenta la búsqueda numérica
+        pending = ~np.isfinite(valor) & ~np.isnan(target)
+        if method is None and pending.any():
+            subset = {name: column[pending] for name, column in cols.items()}
+            valor[pending] = _numeric(variable, metric, subset, target[pending])
+            method = "cerrado+numerico"
+        method = method or "cerrado"
+
+    # Fuera del dominio de la variable → objetivo inalcanzable
+    minimo, exclusivo = _DOMAIN[variable]
+    valid = np.isfinite(valor) & ((valor > minimo) if exclusivo else (valor >= minimo))
+    valor = np.where(valid, valor, np.nan)
+
+    logger.debug(f"Goal seek ({method}) {variable} → {objetivo}: {int(valid.sum())}/{valor.size} factibles")
+
+    return GoalSeekResult(
+        variable=variable,
+        objetivo=objetivo,
+        valor_objetivo=target,
+        valor=valor,
+        valor_actual=cols[variable],
+        metodo=method,
+    )
+
+
+def goal_seek(
+    business_data: BusinessInputData,
+    variable: str,
+    objetivo: str,
+    valor_objetivo: float,
+    method: Optional[str] = None,
+) -> Tuple[float, GoalSeekResult]:
+    """Goal seek para un solo negocio; devuelve (valor requerido o NaN, resultado completo)."""
+    result = goal_seek_batch(business_data.model_dump(), variable, objetivo, valor_objetivo, method)
+    return float(result.valor[0]), result
@@ -0,0 +1,217 @@
+"""Vectorized metrics engine and single-pass metrics kernel shared by all tools."""
+import logging
+import math
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Union
+
+import numpy as np
+from src.models.financial_data import BusinessInputData, FinancialMetrics
+
+logger = logging.getLogger(__name__)
+
+INPUT_COLUMNS = (
+    "costos_fijos_mensuales",
+    "costo_variable_unitario",
+    "precio_venta_unitario",
+    "volumen_ventas_estimado",
+    "inversion_inicial",
+)
+
+
+@dataclass(frozen=True)
+class BatchMetrics:
+    """Métricas básicas calculadas para un portafolio completo de negocios.
+
+    Cada atributo es un arreglo de NumPy con una posición por negocio. Los valores
+    indefinidos se representan con NaN: punto de equilibrio cuando el margen de
+    contribución no es positivo y ROI cuando no hay inversión inicial.
+    """
+    ventas_totales: np.ndarray
+    costos_variables_totales: np.ndarray
+    costos_totales: np.ndarray
+    margen_contribucion: np.ndarray
+    punto_equilibrio_unidades: np.ndarray
+    punto_equilibrio_dinero: np.ndarray
+    utilidad_bruta: np.ndarray
+    utilidad_neta: np.ndarray
+    rentabilidad_sobre_ventas: np.ndarray
+    rentabilidad_sobre_inversion: np.ndarray
+
+    def __len__(self) -> int:
+        return self.ventas_totales.shape[0]
+
+    def row(self, index: int) -> dict:
+        """Devuelve las métricas de un negocio como diccionario de floats."""
+        return {f.name: float(getattr(self, f.name)[index]) for f in fields(self)}
+
+    def to_frame(self):
+        """Convierte las métricas a un DataFrame de pandas (una fila por negocio)."""
+        import pandas as pd
+
+        return pd.DataFrame({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+def _as_column(values: Any) -> np.ndarray:
+    """Convierte una columna (lista, Series, escalar) a un arreglo float64 1-D."""
+    return np.atleast_1d(np.asarray(values, dtype=np.float64))
+
+
+def compute_batch_metrics(
+    costos_fijos_mensuales: Any,
+    costo_variable_unitario: Any,
+    precio_venta_unitario: Any,
+    volumen_ventas_estimado: Any,
+    inversion_inicial: Optional[Any] = None,
+) -> BatchMetrics:
+    """
+    Calcula todas las métricas básicas para muchos negocios en una sola pasada.
+
+    Args:
+        costos_fijos_mensuales: Columna de costos fijos mensuales
+        costo_variable_unitario: Columna de costos variables por unidad
+        precio_venta_unitario: Columna de precios de venta por unidad
+        volumen_ventas_estimado: Columna de volúmenes de ventas estimados
+        inversion_inicial: Columna de inversiones iniciales (opcional, NaN = sin inversión)
+
+    Fórmulas (elemento a elemento):
+    - Ventas Totales = Precio de Venta × Volumen
+    - Costos Totales = Costos Fijos + (Costo Variable Unitario × Volumen)
+    - Punto de Equilibrio (unidades) = Costos Fijos / (Precio - Costo Variable)
+    - Utilidad Neta = Ventas Totales - Costos Totales
+    - ROS = (Utilidad Neta / Ventas Totales) × 100
+    - ROI anual = (Utilidad Neta × 12 / Inversión Inicial) × 100
+    """
+    costos_fijos = _as_column(costos_fijos_mensuales)
+    costo_variable = _as_column(costo_variable_unitario)
+    precio = _as_column(precio_venta_unitario)
+    volumen = _as_column(volumen_ventas_estimado)
+    costos_fijos, costo_variable, precio, volumen = np.broadcast_arrays(
+        costos_fijos, costo_variable, precio, volumen
+    )
+
+    if inversion_inicial is None:
+        inversion = np.full(costos_fijos.shape, np.nan)
+    else:
+        inversion = np.broadcast_to(_as_column(inversion_inicial), costos_fijos.shape)
+
+    ventas_totales = precio * volumen
+    costos_variables_totales = costo_variable * volumen
+    costos_totales = costos_fijos + costos_variables_totales
+    margen_contribucion = precio - costo_variable
+    utilidad_bruta = ventas_totales - costos_variables_totales
+    utilidad_neta = ventas_totales - costos_totales
+
+    pe_unidades = np.full(costos_fijos.shape, np.nan)
+    np.divide(costos_fijos, margen_contribucion, out=pe_unidades, where=margen_contribucion > 0)
+    pe_dinero = pe_unidades * precio
+
+    ros = np.zeros(costos_fijos.shape)
+    np.divide(utilidad_neta, ventas_totales, out=ros, where=ventas_totales > 0)
+    ros *= 100
+
+    roi_anual = np.full(costos_fijos.shape, np.nan)
+    con_inversion = np.nan_to_num(inversion, nan=0.0) > 0
+    np.divide(utilidad_neta * 12, inversion, out=roi_anual, where=con_inversion)
+    roi_anual *= 100
+
+    logger.debug(f"Métricas calculadas para {costos_fijos.shape[0]} negocios")
+
+    return BatchMetrics(
+        ventas_totales=ventas_totales,
+        costos_variables_totales=costos_variables_totales,
+        costos_totales=costos_totales,
+        margen_contribucion=margen_contribucion,
+        punto_equilibrio_unidades=pe_unidades,
+        punto_equilibrio_dinero=pe_dinero,
+        utilidad_bruta=utilidad_bruta,
+        utilidad_neta=utilidad_neta,
+        rentabilidad_sobre_ventas=ros,
+        rentabilidad_sobre_inversion=roi_anual,
+    )
+
+
+def compute_portfolio_metrics(portfolio: Mapping[str, Any]) -> BatchMetrics:
+    """
+    Calcula las métricas básicas de un portafolio expresado por columnas.
+
+    Args:
+        portfolio: DataFrame de pandas o diccionario de columnas con los campos
+            de `BusinessInputData`. La columna `inversion_inicial` es opcional.
+    """
+    missing = [c for c in INPUT_COLUMNS[:-1] if c not in portfolio]
+    if missing:
+        raise ValueError(f"Faltan columnas requeridas: {', '.join(missing)}")
+
+    return compute_batch_metrics(
+        portfolio["costos_fijos_mensuales"],
+        portfolio["costo_variable_unitario"],
+        portfolio["precio_venta_unitario"],
+        portfolio["volumen_ventas_estimado"],
+        portfolio["inversion_inicial"] if "inversion_inicial" in portfolio else None,
+    )
+
+
+def load_business_data(data: Union[dict, BusinessInputData]) -> BusinessInputData:
+    """
+    Valida los datos del negocio una sola vez por contenido.
+
+    Los diccionarios con el mismo contenido reutilizan el mismo modelo validado
+    (inmutable), por lo que varias herramientas en un mismo turno no repiten la
+    validación de Pydantic.
+    """
+    if isinstance(data, BusinessInputData):
+        return data
+    try:
+        key = tuple(sorted(data.items()))
+        hash(key)
+    except TypeError:
+        return BusinessInputData(**data)
+    return _validate_cached(key)
+
+
+@lru_cache(maxsize=1024)
+def _validate_cached(items: tuple) -> BusinessInputData:
+    return BusinessInputData(**dict(items))
+
+
+def compute_metrics(data: Union[dict, BusinessInputData]) -> FinancialMetrics:
+    """
+    Calcula (una sola vez por entrada) el registro completo de métricas de un negocio.
+
+    Args:
+        data: Diccionario con los datos del negocio o `BusinessInputData` ya validado
+
+    Returns:
+        `FinancialMetrics` inmutable con métricas básicas y componentes intermedios
+    """
+    return _compute_metrics_cached(load_business_data(data))
+
+
+@lru_cache(maxsize=1024)
+def _compute_metrics_cached(business_data: BusinessInputData) -> FinancialMetrics:
+    row = compute_batch_metrics(
+        business_data.costos_fijos_mensuales,
+        business_data.costo_variable_unitario,
+        business_data.precio_venta_unitario,
+        business_data.volumen_ventas_estimado,
+        business_data.inversion_inicial,
+    ).row(0)
+    roi = row["rentabilidad_sobre_inversion"]
+    ventas_totales = row["ventas_totales"]
+
+    return FinancialMetrics(
+        costos_totales=row["costos_totales"],
+        punto_equilibrio_unidades=row["punto_equilibrio_unidades"],
+        punto_equilibrio_dinero=row["punto_equilibrio_dinero"],
+        utilidad_bruta=row["utilidad_bruta"],
+        utilidad_neta=row["utilidad_neta"],
+        rentabilidad_sobre_ventas=row["rentabilidad_sobre_ventas"],
+        rentabilidad_sobre_inversion=None if math.isnan(roi) else roi,
+        ventas_totales=ventas_totales,
+        costos_fijos=business_data.costos_fijos_mensuales,
+        costos_variables_totales=row["costos_variables_totales"],
+        margen_contribucion=row["margen_contribucion"],
+        margen_bruto_porcentaje=(row["utilidad_bruta"] / ventas_totales * 100) if ventas_totales > 0 else 0,
+        volumen_ventas=business_data.volumen_ventas_estimado,
+    )
@@ -0,0 +1,183 @@
+"""Chunked Monte Carlo simulation of business scenarios."""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from src.models.financial_data import BusinessInputData
+
+logger = logging.getLogger(__name__)
+
+# Parámetro del escenario -> campo de BusinessInputData
+PARAMETER_FIELDS = {
+    "precio_venta": "precio_venta_unitario",
+    "costo_variable": "costo_variable_unitario",
+    "volumen_ventas": "volumen_ventas_estimado",
+    "costos_fijos": "costos_fijos_mensuales",
+}
+
+DISTRIBUTION_TYPES = ("fijo", "normal", "uniforme", "triangular", "lognormal")
+
+# Claves obligatorias de cada distribución (las demás toman el valor base del negocio)
+REQUIRED_KEYS = {
+    "fijo": (),
+    "normal": ("desviacion",),
+    "uniforme": ("minimo", "maximo"),
+    "triangular": ("minimo", "maximo"),
+    "lognormal": ("sigma",),
+}
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+MAX_DRAWS = 1_000_000
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    """Resumen de una simulación Monte Carlo.
+
+    Los percentiles se estiman por bloques (promedio ponderado de los percentiles
+    de cada bloque), de modo que la memoria no crece con el número de simulaciones.
+    """
+    simulaciones: int
+    utilidad_neta_media: float
+    utilidad_neta_desviacion: float
+    utilidad_neta_percentiles: Dict[int, float]
+    ros_percentiles: Dict[int, float]
+    probabilidad_bajo_equilibrio: float
+
+
+def _draw(rng: np.random.Generator, spec: dict, base: float, size: int) -> np.ndarray:
+    """Genera `size` valores de un parámetro según su especificación de distribución."""
+    tipo = spec.get("tipo", "fijo")
+    if tipo == "fijo":
+        return np.full(size, float(spec.get("valor", base)))
+    if tipo == "normal":
+        return rng.normal(spec.get("media", base), spec["desviacion"], size)
+    if tipo == "uniforme":
+        return rng.uniform(spec["minimo"], spec["maximo"], size)
+    if tipo == "triangular":
+        return rng.triangular(spec["minimo"], spec.get("moda", base), spec["maximo"], size)
+    if tipo == "lognormal":
+        # `sigma` es la desviación del logaritmo; la mediana coincide con `media`
+        return spec.get("media", base) * rng.lognormal(0.0, spec["sigma"], size)
+    raise ValueError(f"Distribución '{tipo}' no válida. Usa: {', '.join(DISTRIBUTION_TYPES)}")
+
+
+def validate_distributions(distributions: dict, business_data: Optional[BusinessInputData] = None) -> None:
+    """
+    Verifica parámetros, tipos y valores de cada distribución antes de simular.
+
+    Args:
+        distributions: Especificación por parámetro (ver `run_monte_carlo`)
+        business_data: Datos base; si se indican, también se verifica la moda
+            por defecto de las distribuciones triangulares
+
+    Raises:
+        ValueError: Si falta una clave obligatoria o un valor está fuera de rango
+    """
+    for parameter, spec in distributions.items():
+        if parameter not in PARAMETER_FIELDS:
+            raise ValueError(f"Parámetro '{parameter}' no válido. Usa: {', '.join(PARAMETER_FIELDS)}")
+        if not isinstance(spec, dict):
+            raise ValueError(f"La distribución de '{parameter}' debe ser un diccionario con 'tipo' y sus valores.")
+        tipo = spec.get("tipo", "fijo")
+        if tipo not in DISTRIBUTION_TYPES:
+            raise ValueError(f"Distribución '{tipo}' no válida. Usa: {', '.join(DISTRIBUTION_TYPES)}")
+
+        missing = [key for key in REQUIRED_KEYS[tipo] if key not in spec]
+        if missing:
+            raise ValueError(f"La distribución {tipo} de '{parameter}' requiere: {', '.join(missing)}")
+        for key, value in spec.items():
+            if key != "tipo" and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f"El valor '{key}' de '{parameter}' debe ser numérico.")
+
+        if tipo == "normal" and spec["desviacion"] < 0:
+            raise ValueError(f"La desviación de '{parameter}' no puede ser negativa.")
+        if tipo == "lognormal" and spec["sigma"] < 0:
+            raise ValueError(f"El sigma de '{parameter}' no puede ser negativo.")
+        if tipo == "uniforme" and spec["minimo"] > spec["maximo"]:
+            raise ValueError(f"En '{parameter}' el mínimo no puede ser mayor que el máximo.")
+        if tipo == "triangular":
+            if spec["minimo"] >= spec["maximo"]:
+                raise ValueError(f"En '{parameter}' el mínimo debe ser menor que el máximo.")
+            base = getattr(business_data, PARAMETER_FIELDS[parameter]) if business_data is not None else None
+            moda = spec.get("moda", base)
+            if moda is not None and not spec["minimo"] <= moda <= spec["maximo"]:
+                raise ValueError(
+                    f"En '{parameter}' la moda ({moda:,.2f}) debe estar entre el mínimo y el máximo; "
+                    f"sin 'moda' se usa el valor base del negocio."
+                )
+
+
+def run_monte_carlo(
+    business_data: BusinessInputData,
+    distributions: dict,
+    n_draws: int = 100_000,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: Optional[int] = None,
+) -> MonteCarloResult:
+    """
+    Simula el negocio con parámetros aleatorios, procesando las simulaciones por bloques.
+
+    Args:
+        business_data: Datos base del negocio (valores por defecto de cada parámetro)
+        distributions: Especificación por parámetro, ej.
+            {"precio_venta": {"tipo": "normal", "desviacion": 1.5},
+             "volumen_ventas": {"tipo": "triangular", "minimo": 400, "maximo": 700}}
+            Los parámetros omitidos se mantienen fijos en su valor base.
+        n_draws: Número total de simulaciones (máximo 1,000,000)
+        chunk_size: Simulaciones por bloque; acota la memoria usada
+        seed: Semilla para resultados reproducibles
+    """
+    if n_draws < 1 or n_draws > MAX_DRAWS:
+        raise ValueError(f"El número de simulaciones debe estar entre 1 y {MAX_DRAWS:,}.")
+    validate_distributions(distributions, business_data)
+
+    rng = np.random.default_rng(seed)
+    percentiles = np.array(PERCENTILES, dtype=np.float64)
+    utilidad_pct_acumulado = np.zeros(len(PERCENTILES))
+    ros_pct_acumulado = np.zeros(len(PERCENTILES))
+    suma = suma_cuadrados = 0.0
+    bajo_equilibrio = 0
+
+    restantes = n_draws
+    while restantes > 0:
+        size = min(chunk_size, restantes)
+        draws = {
+            parameter: np.maximum(
+                _draw(rng, distributions.get(parameter, {}), getattr(business_data, field), size), 0.0
+            )
+            for parameter, field in PARAMETER_FIELDS.items()
+        }
+        volumen = np.rint(draws["volumen_ventas"])
+        margen = draws["precio_venta"] - draws["costo_variable"]
+
+        ventas = draws["precio_venta"] * volumen
+        utilidad = margen * volumen - draws["costos_fijos"]
+        ros = np.zeros(size)
+        np.divide(utilidad, ventas, out=ros, where=ventas > 0)
+        ros *= 100
+
+        # Bajo el punto de equilibrio <=> el margen no cubre los costos fijos
+        bajo_equilibrio += int(np.count_nonzero(margen * volumen < draws["costos_fijos"]))
+        suma += float(utilidad.sum())
+        suma_cuadrados += float(np.square(utilidad).sum())
+        utilidad_pct_acumulado += np.percentile(utilidad, percentiles) * size
+        ros_pct_acumulado += np.percentile(ros, percentiles) * size
+        restantes -= size
+
+    media = suma / n_draws
+    varianza = max(suma_cuadrados / n_draws - media ** 2, 0.0)
+
+    logger.info(f"Monte Carlo: {n_draws} simulaciones, utilidad media ${media:,.2f}")
+
+    return MonteCarloResult(
+        simulaciones=n_draws,
+        utilidad_neta_media=media,
+        utilidad_neta_desviacion=varianza ** 0.5,
+        utilidad_neta_percentiles=dict(zip(PERCENTILES, (utilidad_pct_acumulado / n_draws).tolist())),
+        ros_percentiles=dict(zip(PERCENTILES, (ros_pct_acumulado / n_draws).tolist())),
+        probabilidad_bajo_equilibrio=bajo_equilibrio / n_draws,
+    )
@@ -0,0 +1,49 @@
+"""Bounded process pools shared by the batch paths (sensitivity grids, PDF and chart batches)."""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Tope de procesos por llamada si no se define ANAFI_MAX_WORKERS
+DEFAULT_MAX_WORKERS = 4
+
+# El servidor (langgraph dev) es multihilo: un fork copiaría locks tomados por otros
+# hilos, así que los procesos se crean con forkserver (o spawn donde no existe)
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def max_workers() -> int:
+    """Procesos permitidos por llamada: `ANAFI_MAX_WORKERS`, sin superar los CPU disponibles."""
+    cap = int(os.getenv("ANAFI_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    return max(1, min(cap, os.cpu_count() or 1))
+
+
+def bounded_workers(workers: Optional[int], jobs: Optional[int] = None) -> int:
+    """
+    Procesos a usar para un lote: min(workers, jobs, CPU, tope).
+
+    Args:
+        workers: Procesos pedidos (None o ≤ 1 = en el proceso actual)
+        jobs: Tareas del lote, si se conocen; con una sola no se crea el pool
+
+    Returns:
+        Número de procesos; 1 significa ejecutar en el proceso actual
+    """
+    if not workers or workers <= 1 or (jobs is not None and jobs <= 1):
+        return 1
+    bounded = min(int(workers), max_workers(), jobs if jobs is not None else int(workers))
+    if bounded < workers:
+        logger.debug(f"Procesos acotados de {workers} a {bounded}")
+    return bounded
+
+
+def process_pool(workers: int, **kwargs) -> ProcessPoolExecutor:
+    """Pool de `workers` procesos (ya acotados con `bounded_workers`) sin usar fork."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(START_METHOD),
+        **kwargs,
+    )
@@ -0,0 +1,135 @@
+"""Broadcasted multi-parameter sensitivity sweeps with optional process sharding."""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from src.engine.parallel import bounded_workers, process_pool
+from src.models.financial_data import BusinessInputData
+
+logger = logging.getLogger(__name__)
+
+# Mismos nombres de parámetro que simulate_parameter_change
+SENSITIVITY_FIELDS = {
+    "precio_venta": "precio_venta_unitario",
+    "costo_variable": "costo_variable_unitario",
+    "costo_fijo": "costos_fijos_mensuales",
+    "volumen_ventas": "volumen_ventas_estimado",
+}
+
+MAX_GRID_POINTS = 20_000_000
+
+
+@dataclass(frozen=True)
+class SensitivityGrid:
+    """Superficie de utilidad neta sobre una rejilla de cambios porcentuales.
+
+    `utilidad` tiene un eje por parámetro, en el orden de `parametros`; el eje i
+    recorre los porcentajes de `ejes[parametros[i]]`.
+    """
+    parametros: tuple
+    ejes: Dict[str, np.ndarray]
+    utilidad: np.ndarray
+    utilidad_base: float
+    tornado: List[dict]
+
+
+def _base_values(business_data: BusinessInputData) -> Dict[str, float]:
+    return {parameter: float(getattr(business_data, field)) for parameter, field in SENSITIVITY_FIELDS.items()}
+
+
+def _profit_surface(base: Dict[str, float], axes: Dict[str, np.ndarray], order: Sequence[str]) -> np.ndarray:
+    """Evalúa la utilidad neta en toda la rejilla mediante broadcasting."""
+    values = {}
+    ndim = len(order)
+    for parameter, base_value in base.items():
+        if parameter in axes:
+            shape = [1] * ndim
+            shape[order.index(parameter)] = -1
+            values[parameter] = base_value * (1 + axes[parameter] / 100).reshape(shape)
+        else:
+            values[parameter] = np.float64(base_value)
+
+    # Igual que simulate_parameter_change: el volumen se trunca a unidades enteras
+    volumen = np.trunc(values["volumen_ventas"])
+    return (values["precio_venta"] - values["costo_variable"]) * volumen - values["costo_fijo"]
+
+
+def _evaluate_shard(base: Dict[str, float], axes: Dict[str, np.ndarray], order: Sequence[str]) -> np.ndarray:
+    """Punto de entrada de los procesos: evalúa un bloque del primer eje."""
+    return np.broadcast_to(
+        _profit_surface(base, axes, order), tuple(len(axes[p]) for p in order)
+    ).copy()
+
+
+def _tornado(base: Dict[str, float], axes: Dict[str, np.ndarray]) -> List[dict]:
+    """Ordena los parámetros por el rango de utilidad que producen en sus extremos."""
+    ranking = []
+    for parameter, pct in axes.items():
+        extremes = _profit_surface(base, {parameter: np.array([pct.min(), pct.max()])}, [parameter])
+        ranking.append({
+            "parametro": parameter,
+            "cambio_minimo": float(pct.min()),
+            "cambio_maximo": float(pct.max()),
+            "utilidad_en_minimo": float(extremes[0]),
+            "utilidad_en_maximo": float(extremes[1]),
+            "rango": float(abs(extremes[1] - extremes[0])),
+        })
+    return sorted(ranking, key=lambda item: item["rango"], reverse=True)
+
+
+def sweep_sensitivity_grid(
+    business_data: BusinessInputData,
+    ranges: Dict[str, Sequence[float]],
+    steps: int = 11,
+    workers: Optional[int] = None,
+) -> SensitivityGrid:
+    """
+    Barre N parámetros sobre M pasos cada uno y devuelve la superficie de utilidad.
+
+    Args:
+        business_data: Datos base del negocio
+        ranges: Cambio porcentual mínimo y máximo por parámetro,
+            ej. {"precio_venta": [-20, 20], "volumen_ventas": [-30, 30]}
+        steps: Número de pasos por eje (incluye ambos extremos)
+        workers: Procesos para repartir la rejilla (None o 1 = en el proceso actual;
+            se acota con `bounded_workers`)
+    """
+    if not ranges:
+        raise ValueError("Debes indicar al menos un parámetro para la rejilla.")
+    invalid = [p for p in ranges if p not in SENSITIVITY_FIELDS]
+    if invalid:
+        raise ValueError(f"Parámetro '{invalid[0]}' no válido. Usa: {', '.join(SENSITIVITY_FIELDS)}")
+    if steps < 2:
+        raise ValueError("La rejilla necesita al menos 2 pasos por eje.")
+    if steps ** len(ranges) > MAX_GRID_POINTS:
+        raise ValueError(f"La rejilla excede {MAX_GRID_POINTS:,} puntos. Reduce pasos o parámetros.")
+
+    order = tuple(ranges)
+    axes = {p: np.linspace(float(ranges[p][0]), float(ranges[p][1]), steps) for p in order}
+    base = _base_values(business_data)
+
+    workers = bounded_workers(workers, steps)
+    if workers > 1:
+        first = order[0]
+        shards = [
+            {**axes, first: chunk}
+            for chunk in np.array_split(axes[first], workers)
+        ]
+        with process_pool(workers) as executor:
+            parts = list(executor.map(_evaluate_shard, [base] * len(shards), shards, [order] * len(shards)))
+        utilidad = np.concatenate(parts, axis=0)
+    else:
+        utilidad = _evaluate_shard(base, axes, order)
+
+    utilidad_base = float(_profit_surface(base, {}, ()))
+
+    logger.info(f"Rejilla de sensibilidad evaluada: {utilidad.shape} ({utilidad.size:,} puntos)")
+
+    return SensitivityGrid(
+        parametros=order,
+        ejes=axes,
+        utilidad=utilidad,
+        utilidad_base=utilidad_base,
+        tornado=_tornado(base, axes),
+    )
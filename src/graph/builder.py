@@ -1,25 +1,108 @@
-from deepagents import create_deep_agent
-from langchain.chat_models import init_chat_model
-
-from src.tools import *
-from src.agents.sub_agents_config import *
-from src.prompts.supervisor_prompts import *
-
-# Create LLM model
-llm_model = init_chat_model(model="openai:gpt-4o-mini")
-
-# Define sub-agents
-sub_agents = [
-    data_input_agent,
-    basic_calculations_agent,
-    advanced_analysis_agent,
-    scenario_analysis_agent,
-    report_generation_agent
-]
-
-# Create ANAFI deep agent
-anafi_financial_agent = create_deep_agent(
-    system_prompt=INSTRUCTIONS_SUPERVISOR,
-    subagents=sub_agents,
-    model=llm_model
-)
+"""ANAFI graph: cached factories for the chat model, the deep agent and the routed graph."""
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# "replay" (o "replay:<grabación.json>") reproduce respuestas grabadas sin llamar a OpenAI
+DEFAULT_MODEL = os.getenv("ANAFI_MODEL", "openai:gpt-4o-mini")
+
+# El modelo, los subagentes y el grafo se construyen en el primer uso y no al importar
+# este módulo: así `langgraph dev` y los tests no pagan el arranque de deepagents,
+# langchain_openai ni de las herramientas de reportes hasta que realmente los necesitan.
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str = DEFAULT_MODEL, agent: str = "supervisor"):
+    """Modelo de chat de un agente (uno por identificador de modelo y agente)."""
+    from src.llm import init_model
+
+    return init_model(model, agent)
+
+
+@lru_cache(maxsize=None)
+def get_sub_agent_specs(model: str = DEFAULT_MODEL) -> list:
+    """
+    Subagentes con sus herramientas resueltas y el middleware de trazado y de caché.
+
+    En modo replay cada subagente reproduce su propio guion; con un modelo real
+    conservan el modelo declarado en su configuración.
+    """
+    from src.agents.sub_agents_config import get_sub_agents
+    from src.llm import is_replay_model
+    from src.llm.cache import LLMCacheMiddleware
+    from src.observability.middleware import AgentTracingMiddleware
+
+    specs = []
+    for spec in get_sub_agents():
+        spec = {**spec, "middleware": [AgentTracingMiddleware(spec["name"]), LLMCacheMiddleware(spec["name"])]}
+        if is_replay_model(model):
+            spec["model"] = get_chat_model(model, spec["name"])
+        specs.append(spec)
+    return specs
+
+
+@lru_cache(maxsize=None)
+def get_deep_agent(model: str = DEFAULT_MODEL):
+    """Agente ANAFI (supervisor con sus subagentes)."""
+    from deepagents import create_deep_agent
+    from src.llm.cache import LLMCacheMiddleware
+    from src.observability.middleware import AgentTracingMiddleware, SubAgentMetricsMiddleware
+    from src.graph.state import allow_file_types
+    from src.prompts.supervisor_prompts import INSTRUCTIONS_SUPERVISOR
+
+    return allow_file_types(create_deep_agent(
+        system_prompt=INSTRUCTIONS_SUPERVISOR,
+        subagents=get_sub_agent_specs(model),
+        model=get_chat_model(model),
+        middleware=[
+            SubAgentMetricsMiddleware(),
+            AgentTracingMiddleware("supervisor"),
+            LLMCacheMiddleware("supervisor"),
+        ],
+    ))
+
+
+@lru_cache(maxsize=None)
+def get_parallel_dispatcher(model: str = DEFAULT_MODEL):
+    """Análisis completo: cálculos básicos, avanzados y escenarios en paralelo, luego el reporte."""
+    from src.graph.dispatch import ParallelDispatcher, build_subagent_runners
+
+    return ParallelDispatcher(build_subagent_runners(get_sub_agent_specs(model)))
+
+
+@lru_cache(maxsize=None)
+def build_anafi_agent(model: str = DEFAULT_MODEL):
+    """
+    Grafo completo de ANAFI, construido una sola vez por modelo.
+
+    Cálculos puros con datos ya guardados se responden sin pasar por el LLM.
+    """
+    from src.graph.router import build_routed_agent, fast_path_router
+
+    graph = build_routed_agent(
+        get_deep_agent(model),
+        fast_path_router,
+        parallel_analysis=get_parallel_dispatcher(model).as_node(),
+    )
+    logger.info(f"Grafo ANAFI construido con {model}")
+    return graph
+
+
+def get_anafi_agent():
+    """Fábrica registrada en langgraph.json."""
+    return build_anafi_agent()
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.graph.builder import anafi_financial_agent`
+    if name == "anafi_financial_agent":
+        return build_anafi_agent()
+    if name == "anafi_deep_agent":
+        return get_deep_agent()
+    if name == "llm_model":
+        return get_chat_model()
+    if name == "parallel_dispatcher":
+        return get_parallel_dispatcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
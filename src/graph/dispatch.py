@@ -0,0 +1,133 @@
+"""Concurrent dispatch of independent sub-agent tasks."""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agents.sub_agents_config import SUBAGENT_DEPENDENCIES
+from src.graph.state import allow_file_types, file_reducer
+from src.observability.instrument import timed
+
+logger = logging.getLogger(__name__)
+
+# Tareas del análisis completo (mismas descripciones que el playbook del supervisor)
+FULL_ANALYSIS_TASKS = {
+    "basic_calculations_agent": "Calcular costos totales, punto de equilibrio, utilidad y rentabilidad.",
+    "advanced_analysis_agent": "Generar flujo de efectivo, estado de resultados y Business Model Canvas.",
+    "scenario_analysis_agent": "Crear y comparar escenarios pesimista, moderado y optimista.",
+    "report_generation_agent": "Consolidar todos los análisis y generar reporte final en PDF/Excel.",
+}
+
+
+def plan_waves(
+    tasks: Sequence[str],
+    dependencies: Mapping[str, Sequence[str]] = SUBAGENT_DEPENDENCIES,
+) -> List[List[str]]:
+    """
+    Agrupa las tareas en oleadas: cada oleada solo depende de las anteriores.
+
+    Las dependencias que no forman parte de `tasks` se consideran ya satisfechas
+    (por ejemplo, los datos de entrada guardados previamente).
+    """
+    pending = list(dict.fromkeys(tasks))
+    done = set()
+    waves = []
+    while pending:
+        wave = [
+            task for task in pending
+            if all(dep in done or dep not in pending for dep in dependencies.get(task, ()))
+        ]
+        if not wave:
+            raise ValueError(f"Dependencias circulares entre subagentes: {', '.join(pending)}")
+        waves.append(wave)
+        done.update(wave)
+        pending = [task for task in pending if task not in done]
+    return waves
+
+
+def _last_message_text(result: dict) -> str:
+    messages = result.get("messages") or []
+    return str(messages[-1].content) if messages else ""
+
+
+class ParallelDispatcher:
+    """Ejecuta subagentes por oleadas, en paralelo dentro de cada oleada."""
+
+    def __init__(self, runners: Mapping[str, Any], tasks: Optional[Mapping[str, str]] = None):
+        """
+        Args:
+            runners: Subagente compilado (con `ainvoke`) por nombre
+            tasks: Descripción de la tarea por subagente
+        """
+        self.runners = dict(runners)
+        self.tasks = dict(tasks if tasks is not None else FULL_ANALYSIS_TASKS)
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.branches = 0
+        self.last_wall_time = 0.0
+
+    async def _run_branch(self, name: str, files: Optional[dict]) -> dict:
+        state = {"messages": [HumanMessage(content=self.tasks[name])]}
+        if files:
+            state["files"] = files
+        logger.debug(f"Subagente {name} iniciado")
+        with timed("subagent", name):
+            return await self.runners[name].ainvoke(state)
+
+    async def arun(self, state: dict) -> dict:
+        """Ejecuta el análisis completo y devuelve la actualización de estado."""
+        start = time.perf_counter()
+        files = state.get("files")
+        messages = []
+
+        for wave in plan_waves(list(self.tasks)):
+            results = await asyncio.gather(*(self._run_branch(name, files) for name in wave))
+            # Unión en orden fijo para que el resultado no dependa de qué rama termina primero
+            for name, result in zip(wave, results):
+                files = file_reducer(files, result.get("files"))
+                messages.append(AIMessage(content=_last_message_text(result), name=name))
+            with self._lock:
+                self.branches += len(wave)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.runs += 1
+            self.last_wall_time = elapsed
+        logger.info(f"Análisis completo en paralelo: {len(messages)} subagentes en {elapsed:.2f}s")
+
+        update = {"messages": messages}
+        if files:
+            update["files"] = files
+        return update
+
+    def run(self, state: dict) -> dict:
+        return asyncio.run(self.arun(state))
+
+    def as_node(self) -> RunnableLambda:
+        """Nodo del grafo utilizable con `invoke` y con `ainvoke`."""
+        return RunnableLambda(self.run, afunc=self.arun, name="parallel_analysis")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"runs": self.runs, "branches": self.branches, "last_wall_time": self.last_wall_time}
+
+
+def build_subagent_runners(sub_agents: Sequence[dict]) -> Dict[str, Any]:
+    """Compila cada subagente como agente independiente con sistema de archivos."""
+    from deepagents import create_deep_agent
+
+    return {
+        spec["name"]: allow_file_types(create_deep_agent(
+            model=spec["model"],
+            tools=spec["tools"],
+            system_prompt=spec["system_prompt"],
+            middleware=spec.get("middleware", ()),
+            name=spec["name"],
+        ))
+        for spec in sub_agents
+        if spec["name"] in FULL_ANALYSIS_TASKS
+    }
@@ -0,0 +1,313 @@
+"""Persistent mapping and file types for the virtual file system."""
+import json
+import threading
+from typing import Any, Iterator, Mapping, MutableMapping, Optional, Tuple
+
+BUSINESS_DATA_PATH = "/business_data/input_data.json"
+
+# Tipos que el serializador de checkpoints debe reconstruir (modo estricto de msgpack)
+FILE_MSGPACK_TYPES = (("src.graph.file_store", "FileMap"), ("src.graph.file_store", "JsonFile"))
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+
+
+def _hash(key: str) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+class _Leaf:
+    """Entrada única de un nodo."""
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: str, value: Any):
+        self.key = key
+        self.value = value
+
+
+def _get(node: dict, key: str, h: int, shift: int) -> Tuple[bool, Any]:
+    while True:
+        if shift >= _HASH_BITS:
+            # Hash agotado: el nodo es un cubo de colisiones {clave: valor}
+            return (True, node[key]) if key in node else (False, None)
+        child = node.get((h >> shift) & _MASK)
+        if child is None:
+            return False, None
+        if isinstance(child, _Leaf):
+            return (True, child.value) if child.key == key else (False, None)
+        node, shift = child, shift + _BITS
+
+
+def _assoc(node: dict, key: str, value: Any, h: int, shift: int) -> Tuple[dict, bool]:
+    """Devuelve una copia del camino hasta la clave; el resto de nodos se comparte."""
+    if shift >= _HASH_BITS:
+        added = key not in node
+        return {**node, key: value}, added
+
+    slot = (h >> shift) & _MASK
+    child = node.get(slot)
+    if child is None:
+        new_child, added = _Leaf(key, value), True
+    elif isinstance(child, _Leaf):
+        if child.key == key:
+            new_child, added = _Leaf(key, value), False
+        else:
+            branch, _ = _assoc({}, child.key, child.value, _hash(child.key), shift + _BITS)
+            new_child, added = _assoc(branch, key, value, h, shift + _BITS)
+    else:
+        new_child, added = _assoc(child, key, value, h, shift + _BITS)
+
+    copy = dict(node)
+    copy[slot] = new_child
+    return copy, added
+
+
+def _dissoc(node: dict, key: str, h: int, shift: int) -> Tuple[dict, bool]:
+    """Devuelve una copia del camino sin la clave; los nodos vacíos se eliminan."""
+    if shift >= _HASH_BITS:
+        if key not in node:
+            return node, False
+        return {k: v for k, v in node.items() if k != key}, True
+
+    slot = (h >> shift) & _MASK
+    child = node.get(slot)
+    if child is None:
+        return node, False
+    if isinstance(child, _Leaf):
+        if child.key != key:
+            return node, False
+        new_child = None
+    else:
+        new_child, removed = _dissoc(child, key, h, shift + _BITS)
+        if not removed:
+            return node, False
+        if not new_child:
+            new_child = None
+        elif len(new_child) == 1 and shift + _BITS < _HASH_BITS:
+            # Una rama con una sola hoja se sustituye por la hoja
+            only = next(iter(new_child.values()))
+            if isinstance(only, _Leaf):
+                new_child = only
+
+    copy = dict(node)
+    if new_child is None:
+        del copy[slot]
+    else:
+        copy[slot] = new_child
+    return copy, True
+
+
+def _iter(node: dict, shift: int) -> Iterator[Tuple[str, Any]]:
+    if shift >= _HASH_BITS:
+        yield from node.items()
+        return
+    for child in node.values():
+        if isinstance(child, _Leaf):
+            yield child.key, child.value
+        else:
+            yield from _iter(child, shift + _BITS)
+
+
+class FileMap(Mapping):
+    """
+    Diccionario inmutable de archivos virtuales con estructura compartida.
+
+    Es un trie de hash (HAMT) con nodos de hasta 32 hijos: escribir una clave
+    copia solo los nodos de su camino (O(log n)), de modo que los estados
+    anteriores del grafo siguen compartiendo las entradas no modificadas.
+    Como en deepagents, un valor None en `update` elimina el archivo.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, files: Optional[Mapping[str, Any]] = None, **entries: Any):
+        self._root: dict = {}
+        self._size = 0
+        for source in (files or {}, entries):
+            for key, value in source.items():
+                if value is not None:
+                    self._root, added = _assoc(self._root, key, value, _hash(key), 0)
+                    self._size += added
+
+    @classmethod
+    def _from_root(cls, root: dict, size: int) -> "FileMap":
+        new = cls.__new__(cls)
+        new._root = root
+        new._size = size
+        return new
+
+    def __getitem__(self, key: str) -> Any:
+        found, value = _get(self._root, key, _hash(key), 0)
+        if not found:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and _get(self._root, key, _hash(key), 0)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in _iter(self._root, 0):
+            yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set(self, key: str, value: Any) -> "FileMap":
+        """Nuevo mapa con la clave escrita; este no se modifica."""
+        root, added = _assoc(self._root, key, value, _hash(key), 0)
+        return FileMap._from_root(root, self._size + added)
+
+    def delete(self, key: str) -> "FileMap":
+        """Nuevo mapa sin la clave (si no existe, devuelve este mismo)."""
+        root, removed = _dissoc(self._root, key, _hash(key), 0)
+        return FileMap._from_root(root, self._size - 1) if removed else self
+
+    def update(self, changes: Mapping[str, Any]) -> "FileMap":
+        """Nuevo mapa con los cambios aplicados (None elimina), en O(cambios · log n)."""
+        root, size = self._root, self._size
+        for key, value in changes.items():
+            h = _hash(key)
+            if value is None:
+                root, removed = _dissoc(root, key, h, 0)
+                size -= removed
+                continue
+            found, current = _get(root, key, h, 0)
+            if found and current is value:
+                # Un subagente devuelve el mapa completo: las entradas sin cambios no se copian
+                continue
+            root, added = _assoc(root, key, value, h, 0)
+            size += added
+        return FileMap._from_root(root, size)
+
+    def model_dump(self) -> dict:
+        """Diccionario plano (para serializar checkpoints y respuestas)."""
+        return dict(_iter(self._root, 0))
+
+    def __reduce__(self):
+        return FileMap, (self.model_dump(),)
+
+    def __repr__(self) -> str:
+        return f"FileMap({self.model_dump()!r})"
+
+
+_STALE = object()
+
+
+class JsonFile(MutableMapping):
+    """
+    Archivo virtual JSON que guarda los datos estructurados una sola vez.
+
+    Expone las mismas claves que los archivos `{"data": ..., "content": ...}`,
+    pero `content` se serializa solo la primera vez que se lee y queda en caché
+    hasta la siguiente escritura. Escribir `content` (p. ej. con `edit_file`)
+    invalida `data`, que se vuelve a interpretar al leerla; si el texto escrito
+    no es JSON, `data` es None y el archivo se conserva como texto plano.
+    """
+
+    __slots__ = ("_data", "_content", "_metadata", "_lock")
+
+    def __init__(self, data: Any = None, content: Optional[str] = None, **metadata: Any):
+        self._data = data if content is None else _STALE
+        self._content = content
+        self._metadata = metadata
+        self._lock = threading.Lock()
+
+    def _parse(self) -> Tuple[bool, Any]:
+        """(es JSON, datos); con el lock tomado."""
+        if self._data is _STALE:
+            try:
+                self._data = json.loads(self._content)
+            except (TypeError, ValueError):
+                return False, None
+        return True, self._data
+
+    @property
+    def data(self) -> Any:
+        with self._lock:
+            return self._parse()[1]
+
+    @property
+    def content(self) -> str:
+        with self._lock:
+            if self._content is None:
+                self._content = json.dumps(self._data, indent=2, ensure_ascii=False, default=str)
+            return self._content
+
+    @property
+    def is_rendered(self) -> bool:
+        """Indica si `content` ya está en caché."""
+        return self._content is not None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "data":
+            return self.data
+        if key == "content":
+            return self.content
+        return self._metadata[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            if key == "data":
+                self._data, self._content = value, None
+            elif key == "content":
+                self._data, self._content = _STALE, value
+            else:
+                self._metadata[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in ("data", "content"):
+            raise KeyError(f"'{key}' no se puede eliminar de un archivo JSON")
+        del self._metadata[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "data"
+        yield "content"
+        yield from self._metadata
+
+    def __len__(self) -> int:
+        return 2 + len(self._metadata)
+
+    def model_dump(self) -> dict:
+        """Solo los datos y metadatos: `content` se regenera al leerlo (o el texto, si no es JSON)."""
+        with self._lock:
+            is_json, data = self._parse()
+            if not is_json:
+                return {"content": self._content, **self._metadata}
+        return {"data": data, **self._metadata}
+
+    def __reduce__(self):
+        return _restore_json_file, (self.model_dump(),)
+
+    def __repr__(self) -> str:
+        return f"JsonFile({self.model_dump()!r})"
+
+
+def _restore_json_file(fields: dict) -> JsonFile:
+    return JsonFile(**fields)
+
+
+def read_json_file(files: Optional[Mapping], path: str) -> Any:
+    """
+    Lee un archivo JSON del sistema de archivos virtual.
+
+    Acepta `JsonFile` (se usa el dato sin volver a parsear) y el formato de
+    deepagents ({"content": str | list de líneas}). Devuelve None si el archivo
+    no existe o no es JSON válido.
+    """
+    file_data = (files or {}).get(path)
+    if file_data is None:
+        return None
+    if isinstance(file_data, JsonFile):
+        return file_data.data
+
+    if isinstance(file_data, Mapping) and "content" not in file_data and "data" in file_data:
+        # JsonFile restaurado como diccionario por un checkpointer que no lo tiene registrado
+        return file_data["data"]
+    content = file_data.get("content") if isinstance(file_data, Mapping) else file_data
+    if isinstance(content, list):
+        content = "\n".join(content)
+    try:
+        return json.loads(content)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,246 @@
+"""Deterministic fast-path router that answers pure calculations without the LLM."""
+import logging
+import re
+import inspect
+import threading
+import unicodedata
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.base import coerce_to_runnable
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from src.engine.metrics import load_business_data
+from src.graph.file_store import BUSINESS_DATA_PATH, read_json_file
+from src.graph.state import DeepAgentState, allow_file_types
+from src.observability.tracing import get_tracer, trace_span
+from src.tools import (
+    calculate_breakeven_point,
+    calculate_profit,
+    calculate_profitability_ratios,
+    calculate_total_costs,
+)
+
+logger = logging.getLogger(__name__)
+
+AGENT_NODE = "anafi_deep_agent"
+PARALLEL_NODE = "parallel_analysis"
+
+# Intenciones reconocidas: palabras clave (sin acentos, en minúsculas) → herramientas
+FAST_PATH_INTENTS: Dict[str, Tuple[Tuple[str, ...], Tuple[Callable, ...]]] = {
+    "metricas_basicas": (
+        ("metricas basicas", "todas las metricas", "indicadores basicos"),
+        (calculate_total_costs, calculate_breakeven_point, calculate_profit, calculate_profitability_ratios),
+    ),
+    "costos": (("costos totales", "costo total", "costos variables totales"), (calculate_total_costs,)),
+    "punto_equilibrio": (("punto de equilibrio", "equilibrio"), (calculate_breakeven_point,)),
+    "utilidad": (("utilidad", "ganancia"), (calculate_profit,)),
+    "rentabilidad": (("rentabilidad", "roi", "retorno"), (calculate_profitability_ratios,)),
+}
+
+# Solo se responden sin LLM las peticiones redactadas como cálculo explícito
+# ("calcula…", "¿cuál es mi…?", "dame…"); el resto va al agente.
+CALCULATION_PHRASINGS = re.compile(
+    r"^(calcula\w*|dame|dime|muestra\w*|obten|cual es|cuales son|cuanto es|cuanto son|que \w+( \w+)? tiene)\b"
+)
+
+# Cualquiera de estas palabras indica que la petición necesita razonamiento del agente
+DELEGATE_KEYWORDS = (
+    "escenario", "sensibilidad", "simula", "flujo", "proyec", "reporte", "informe", "pdf",
+    "excel", "grafic", "alerta", "canvas", "estado de resultados", "compar", "cambi",
+    "aument", "reduc", "subo", "bajo", "que pasa", "si el", "si la", "explica", "por que",
+    "recomienda", "guarda", "actualiza", "nuevo", "nueva", "complet", "integral",
+    "necesit", "mejor", "deberi", "conviene", "puedo", "quiero", "buen", "mal",
+    "entiend", "significa", "optimiz", "ayud", "consejo", "meta", "objetivo", "alcanz",
+)
+
+# Preguntas abiertas (explicaciones, consejos): siempre al agente
+QUESTION_WORDS = ("como", "que es", "que son", "que significa", "para que", "cuando", "donde", "cual deberia")
+
+# Peticiones que recorren todos los subagentes de análisis
+FULL_ANALYSIS_PHRASES = ("analisis completo", "analisis financiero completo", "analisis integral")
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _message_text(message) -> str:
+    content = message.content
+    if isinstance(content, list):
+        content = " ".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return content
+
+
+def classify_request(text: str) -> Optional[str]:
+    """
+    Asocia la petición a una intención de cálculo puro.
+
+    Devuelve None si la petición no está redactada como un cálculo explícito, es
+    ambigua, menciona varias intenciones, trae cifras nuevas o pide algo que
+    requiere al agente (explicaciones, consejos, metas).
+    """
+    normalized = _normalize(text)
+    if re.search(r"\d", normalized) or any(word in normalized for word in DELEGATE_KEYWORDS):
+        return None
+    if any(re.search(rf"\b{word}\b", normalized) for word in QUESTION_WORDS):
+        return None
+    if not CALCULATION_PHRASINGS.match(normalized.lstrip("¿¡ ")):
+        return None
+
+    matches = [
+        intent
+        for intent, (keywords, _) in FAST_PATH_INTENTS.items()
+        if any(re.search(rf"\b{re.escape(keyword)}\b", normalized) for keyword in keywords)
+    ]
+    if "metricas_basicas" in matches:
+        return "metricas_basicas"
+    return matches[0] if len(matches) == 1 else None
+
+
+def is_full_analysis_request(text: str) -> bool:
+    """Indica si se pide el análisis financiero completo."""
+    normalized = _normalize(text)
+    return any(phrase in normalized for phrase in FULL_ANALYSIS_PHRASES)
+
+
+def read_business_data(state: dict) -> Optional[dict]:
+    """Obtiene los datos del negocio guardados en el sistema de archivos virtual."""
+    data = read_json_file(state.get("files"), BUSINESS_DATA_PATH)
+    return data if isinstance(data, dict) else None
+
+
+def _call_tool(tool: Callable, fields: dict) -> str:
+    """Invoca la herramienta con los campos del negocio que acepta como argumentos."""
+    parameters = inspect.signature(tool).parameters
+    return tool(**{name: value for name, value in fields.items() if name in parameters})
+
+
+class FastPathRouter:
+    """Responde peticiones de métricas básicas llamando directamente a las herramientas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast_path = 0
+        self.delegated = 0
+
+    def _count(self, handled: bool) -> None:
+        with self._lock:
+            if handled:
+                self.fast_path += 1
+            else:
+                self.delegated += 1
+
+    def try_fast_path(self, state: dict) -> Optional[str]:
+        """Devuelve la respuesta calculada, o None si la petición debe ir al agente."""
+        messages = state.get("messages") or []
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+
+        intent = classify_request(_message_text(messages[-1]))
+        if intent is None:
+            return None
+
+        data = read_business_data(state)
+        if data is None:
+            return None
+
+        try:
+            fields = load_business_data(data).model_dump()
+        except Exception:
+            return None
+
+        results: List[str] = [_call_tool(tool, fields) for tool in FAST_PATH_INTENTS[intent][1]]
+        if any(result.startswith("❌") for result in results):
+            return None
+        logger.info(f"Ruta rápida: '{intent}' resuelto sin LLM")
+        return "\n\n".join(results)
+
+    def node(self, state: dict, parallel: bool = False) -> Command:
+        """
+        Nodo del grafo: responde directamente o delega al agente ANAFI.
+
+        Con `parallel=True`, el análisis completo con datos ya guardados va al
+        nodo que ejecuta los subagentes independientes en paralelo.
+        """
+        answer = self.try_fast_path(state)
+        self._count(answer is not None)
+        if answer is not None:
+            return Command(goto=END, update={"messages": [AIMessage(content=answer, name="anafi_fast_path")]})
+
+        messages = state.get("messages") or []
+        if (
+            parallel
+            and messages
+            and isinstance(messages[-1], HumanMessage)
+            and is_full_analysis_request(_message_text(messages[-1]))
+            and read_business_data(state) is not None
+        ):
+            return Command(goto=PARALLEL_NODE)
+        return Command(goto=AGENT_NODE)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.fast_path + self.delegated
+            return {
+                "fast_path": self.fast_path,
+                "delegated": self.delegated,
+                "fast_path_ratio": self.fast_path / total if total else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.fast_path = 0
+            self.delegated = 0
+
+
+fast_path_router = FastPathRouter()
+
+
+def traced_turn(node, name: str) -> RunnableLambda:
+    """Nodo que mide cada ejecución como un turno (span raíz "turn", exportado al cerrarse)."""
+    runnable = coerce_to_runnable(node)
+
+    def run(state, config):
+        with trace_span("turno", "turn", node=name):
+            return runnable.invoke(state, config)
+
+    async def arun(state, config):
+        with trace_span("turno", "turn", node=name):
+            return await runnable.ainvoke(state, config)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+def build_routed_agent(agent, router: Optional[FastPathRouter] = None, parallel_analysis=None):
+    """
+    Coloca el enrutador de ruta rápida delante del agente ANAFI.
+
+    Args:
+        agent: Agente ANAFI (deep agent) para las peticiones generales
+        router: Enrutador de ruta rápida (por defecto el global)
+        parallel_analysis: Nodo opcional para el análisis completo en paralelo
+    """
+    router = router or fast_path_router
+    if get_tracer() is not None:
+        # Con trazado activo (ANAFI_TRACE_FILE) cada delegación es un turno con su propia traza
+        agent = traced_turn(agent, AGENT_NODE)
+        if parallel_analysis is not None:
+            parallel_analysis = traced_turn(parallel_analysis, PARALLEL_NODE)
+    graph = StateGraph(DeepAgentState)
+    if parallel_analysis is None:
+        graph.add_node("fast_path", router.node, destinations=(AGENT_NODE, END))
+    else:
+        graph.add_node("fast_path", partial(router.node, parallel=True), destinations=(AGENT_NODE, PARALLEL_NODE, END))
+        graph.add_node(PARALLEL_NODE, parallel_analysis)
+        graph.add_edge(PARALLEL_NODE, END)
+    graph.add_node(AGENT_NODE, agent)
+    graph.add_edge(START, "fast_path")
+    graph.add_edge(AGENT_NODE, END)
+    return allow_file_types(graph.compile())
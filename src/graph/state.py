@@ -3,6 +3,9 @@
 from typing import Annotated, Literal, Any
 from typing_extensions import TypedDict, NotRequired
 from langchain.agents import AgentState
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.graph.file_store import FILE_MSGPACK_TYPES, FileMap
 
 
 class Todo(TypedDict):
@@ -12,13 +15,40 @@ class Todo(TypedDict):
 
 
 def file_reducer(left, right):
-    """Merge two file dictionaries, with right side taking precedence."""
+    """Merge two file dictionaries, with right side taking precedence.
+
+    The result is a `FileMap`: only the changed keys are written, and the
+    previous state keeps sharing every unchanged entry. As in deepagents, a
+    `None` value deletes the file.
+
+    Only the outer ANAFI graph (router, fast path and parallel dispatcher) uses
+    this reducer. Inside the deep agent the `files` channel belongs to the
+    deepagents FilesystemMiddleware (a DeltaChannel that already checkpoints
+    only the writes of each step); its result is merged back here without
+    copying the entries it did not change.
+    """
     if left is None:
-        return right
+        return right if right is None or isinstance(right, FileMap) else FileMap(right)
     elif right is None:
         return left
     else:
-        return {**left, **right}
+        base = left if isinstance(left, FileMap) else FileMap(left)
+        return base.update(right)
+
+
+def allow_file_types(graph):
+    """Permite a los checkpointers del grafo reconstruir `FileMap` y `JsonFile`.
+
+    Con `LANGGRAPH_STRICT_MSGPACK` LangGraph solo restaura los tipos que deduce
+    del esquema del estado; `files` es un `dict[str, Any]`, así que sin este
+    registro los archivos volverían como diccionarios planos.
+    """
+    allowlist = getattr(graph, "_serde_allowlist", None)
+    if allowlist is not None:
+        allowlist.update(FILE_MSGPACK_TYPES)
+    if isinstance(getattr(graph, "checkpointer", None), BaseCheckpointSaver):
+        graph.checkpointer = graph.checkpointer.with_allowlist(FILE_MSGPACK_TYPES)
+    return graph
 
 
 class DeepAgentState(AgentState):
@@ -0,0 +1,34 @@
+"""Chat model selection, including the offline replay model for benchmarks."""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "replay" usa la grabación incluida; "replay:<ruta.json>" una grabación propia
+REPLAY_PREFIX = "replay"
+
+
+def is_replay_model(model: str) -> bool:
+    return model == REPLAY_PREFIX or model.startswith(f"{REPLAY_PREFIX}:")
+
+
+def init_model(model: str, agent: str = "supervisor"):
+    """
+    Modelo de chat para un agente.
+
+    Args:
+        model: Identificador de LangChain (ej. "openai:gpt-4o-mini") o "replay[:ruta]"
+        agent: "supervisor" o el nombre del subagente (elige su guion en modo replay)
+    """
+    if is_replay_model(model):
+        from src.llm.replay import ReplayChatModel
+
+        path = model.partition(":")[2] or None
+        logger.info(f"Modelo de reproducción para {agent}" + (f" ({path})" if path else ""))
+        return ReplayChatModel.from_recording(agent, path)
+
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model(model=model)
+
+
+__all__ = ["REPLAY_PREFIX", "init_model", "is_replay_model"]
@@ -0,0 +1,289 @@
+"""Exact-match chat completion cache on SQLite, applied as agent middleware."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ModelResponse
+from langchain_core.messages import AIMessage, BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from src.observability.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _digest(payload: Any) -> str:
+    text = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _message_payload(message: BaseMessage) -> dict:
+    """Contenido semántico de un mensaje: sin IDs de mensaje ni de llamadas a herramientas."""
+    payload = {"type": message.type, "content": message.content, "name": message.name}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        payload["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in tool_calls]
+    return payload
+
+
+def model_identifier(model) -> dict:
+    """Tipo, nombre y parámetros del modelo (temperatura, etc.)."""
+    name = getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+    params = getattr(model, "_identifying_params", {}) or {}
+    return {"type": getattr(model, "_llm_type", type(model).__name__), "name": str(name), **params}
+
+
+def tool_schemas(tools: Sequence[Any]) -> List[dict]:
+    """Esquemas de herramientas en formato OpenAI, ordenados por nombre."""
+    schemas = [tool if isinstance(tool, dict) else convert_to_openai_tool(tool) for tool in tools]
+    return sorted(schemas, key=lambda schema: json.dumps(schema, sort_keys=True, default=str))
+
+
+def system_prompt_hash(system_prompt: Optional[str]) -> str:
+    return hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+
+
+def make_llm_cache_key(
+    model: dict,
+    system_prompt: Optional[str],
+    messages: Sequence[BaseMessage],
+    tools: Sequence[dict] = (),
+    tool_choice: Any = None,
+) -> str:
+    """
+    Hash canónico (SHA-256) de una llamada al modelo.
+
+    Args:
+        model: Identificador del modelo (ver `model_identifier`)
+        system_prompt: Prompt de sistema completo
+        messages: Historial enviado al modelo (sin el prompt de sistema)
+        tools: Esquemas de herramientas (ver `tool_schemas`)
+        tool_choice: Elección de herramienta forzada, si la hay
+    """
+    return _digest({
+        "model": model,
+        "system": system_prompt_hash(system_prompt),
+        "messages": [_message_payload(message) for message in messages],
+        "tools": list(tools),
+        "tool_choice": tool_choice,
+    })
+
+
+class SQLiteLLMCache:
+    """Respuestas del modelo en SQLite, con expulsión por tamaño del menos usado (LRU).
+
+    Args:
+        path: Archivo SQLite (":memory:" para una caché en proceso)
+        max_bytes: Tamaño máximo de las respuestas almacenadas
+        timer: Reloj usado para ordenar por último acceso
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, timer: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._timer = timer
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    system_hash TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed)")
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[List[BaseMessage]]:
+        """Mensajes de la respuesta almacenada, o None."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed = ?, hits = hits + 1 WHERE key = ?", (self._timer(), key)
+            )
+            self.hits += 1
+        return messages_from_dict(json.loads(row[0]))
+
+    def set(self, key: str, messages: Sequence[BaseMessage], model: str = "", system_hash: str = "") -> None:
+        """Almacena una respuesta y expulsa las menos usadas si se excede `max_bytes`."""
+        response = json.dumps(messages_to_dict(list(messages)), ensure_ascii=False)
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                """INSERT OR REPLACE INTO llm_cache (key, model, system_hash, response, size, accessed)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (key, model, system_hash, response, size, self._timer()),
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                break
+            expelled = []
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                expelled.append((key,))
+                self._bytes -= size
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", expelled)
+            self.evictions += len(expelled)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Resumen de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0],
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+_cache: Optional[SQLiteLLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """Caché global; se activa solo si está definida `ANAFI_LLM_CACHE_DB`."""
+    global _cache
+    if _cache is None and os.getenv("ANAFI_LLM_CACHE_DB"):
+        with _cache_lock:
+            if _cache is None:
+                max_mb = float(os.getenv("ANAFI_LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 1024 / 1024))
+                _cache = SQLiteLLMCache(os.environ["ANAFI_LLM_CACHE_DB"], int(max_mb * 1024 * 1024))
+                logger.info(f"Caché de respuestas del modelo en {_cache.path}")
+    return _cache
+
+
+def set_llm_cache(cache: Optional[SQLiteLLMCache]) -> None:
+    """Reemplaza la caché global (None = sin caché)."""
+    global _cache
+    _cache = cache
+
+
+def _fresh_copy(message: BaseMessage) -> BaseMessage:
+    """Copia de un mensaje almacenado con IDs nuevos para las llamadas a herramientas."""
+    if not isinstance(message, AIMessage):
+        return message
+    tool_calls = [{**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in message.tool_calls]
+    return message.model_copy(update={
+        "id": None,
+        "tool_calls": tool_calls,
+        "usage_metadata": None,
+        "response_metadata": {**message.response_metadata, "anafi_cache": "hit"},
+    })
+
+
+class LLMCacheMiddleware(AgentMiddleware):
+    """Responde desde la caché las llamadas al modelo idénticas a una anterior.
+
+    La clave cubre el modelo, el hash del prompt de sistema, el historial y los
+    esquemas de herramientas. Sin caché activa no hace nada.
+    """
+
+    def __init__(self, agent: str, cache: Optional[SQLiteLLMCache] = None):
+        super().__init__()
+        self.agent = agent
+        self.cache = cache
+        self._schemas: Dict[tuple, tuple] = {}
+
+    def _tool_schemas(self, tools: Sequence[Any]) -> List[dict]:
+        # Las herramientas de un agente no cambian entre llamadas: se convierten una vez
+        key = tuple(id(tool) for tool in tools)
+        entry = self._schemas.get(key)
+        if entry is None:
+            entry = self._schemas[key] = (list(tools), tool_schemas(tools))
+        return entry[1]
+
+    def _entry(self, request) -> Optional[tuple]:
+        """(caché, clave, modelo, hash del prompt de sistema), o None si no aplica."""
+        cache = self.cache if self.cache is not None else get_llm_cache()
+        if cache is None or request.response_format is not None:
+            return None
+        system_prompt = request.system_message.text if request.system_message is not None else None
+        model = model_identifier(request.model)
+        key = make_llm_cache_key(
+            {**model, **(request.model_settings or {})},
+            system_prompt,
+            request.messages,
+            self._tool_schemas(request.tools),
+            request.tool_choice,
+        )
+        return cache, key, model["name"], system_prompt_hash(system_prompt)
+
+    def _cached(self, entry: Optional[tuple]) -> Optional[ModelResponse]:
+        if entry is None:
+            return None
+        cache, key = entry[:2]
+        messages = cache.get(key)
+        get_registry().counter(
+            "anafi_llm_cache_requests_total", "Consultas a la caché de respuestas del modelo", ("agent", "result")
+        ).inc(agent=self.agent, result="miss" if messages is None else "hit")
+        if messages is None:
+            return None
+        logger.debug(f"Caché de respuestas: acierto para {self.agent}")
+        return ModelResponse(result=[_fresh_copy(message) for message in messages])
+
+    @staticmethod
+    def _store(entry: Optional[tuple], response) -> None:
+        if entry is not None:
+            cache, key, model, system_hash = entry
+            cache.set(key, response.result, model, system_hash)
+
+    def wrap_model_call(self, request, handler):
+        entry = self._entry(request)
+        cached = self._cached(entry)
+        if cached is not None:
+            return cached
+        response = handler(request)
+        self._store(entry, response)
+        return response
+
+    async def awrap_model_call(self, request, handler):
+        entry = self._entry(request)
+        cached = self._cached(entry)
+        if cached is not None:
+            return cached
+        response = await handler(request)
+        self._store(entry, response)
+        return response
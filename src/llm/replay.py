@@ -0,0 +1,136 @@
+"""Recorded-response chat model that replays tool-call sequences offline."""
+import asyncio
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORDING = Path(__file__).parent / "recordings" / "analisis_completo.json"
+DEFAULT_REPLY = "✅ Listo."
+
+
+@lru_cache(maxsize=None)
+def load_recording(path: str = str(DEFAULT_RECORDING)) -> dict:
+    """
+    Lee una grabación: {"latency_s": s, "agents": {agente: [paso, ...]}}.
+
+    Cada paso es {"content": texto, "tool_calls": [{"name": ..., "args": {...}}]}.
+    """
+    recording = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(recording.get("agents"), dict):
+        raise ValueError(f"Grabación sin agentes: {path}")
+    return recording
+
+
+def _turn_step(messages: Sequence[BaseMessage]) -> int:
+    """Respuestas del modelo desde el último mensaje del usuario (paso actual del guion)."""
+    step = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage):
+            step += 1
+    return step
+
+
+def _estimate_tokens(text: str) -> int:
+    # Aproximación de ~4 caracteres por token; solo sirve para el desglose de trazas
+    return max(len(text) // 4, 1) if text else 0
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Modelo de chat que reproduce el guion grabado de un agente.
+
+    El paso se deduce de la conversación (respuestas del modelo desde el último
+    mensaje del usuario), así que el mismo modelo sirve para turnos repetidos y
+    para ramas en paralelo sin estado compartido. Agotado el guion, responde el
+    último texto grabado.
+    """
+
+    agent: str = "supervisor"
+    steps: List[Dict[str, Any]] = []
+    latency_s: float = 0.0
+
+    @classmethod
+    def from_recording(
+        cls,
+        agent: str,
+        path: Optional[str] = None,
+        latency_s: Optional[float] = None,
+    ) -> "ReplayChatModel":
+        """
+        Args:
+            agent: "supervisor" o el nombre del subagente
+            path: Grabación JSON (por defecto, el análisis completo incluido)
+            latency_s: Latencia artificial por llamada; por defecto `ANAFI_REPLAY_LATENCY_S`
+                o la de la grabación
+        """
+        recording = load_recording(str(path or DEFAULT_RECORDING))
+        if latency_s is None:
+            latency_s = float(os.getenv("ANAFI_REPLAY_LATENCY_S", recording.get("latency_s", 0.0)))
+        return cls(agent=agent, steps=recording["agents"].get(agent, []), latency_s=latency_s)
+
+    @property
+    def _llm_type(self) -> str:
+        return "anafi-replay"
+
+    @property
+    def model_name(self) -> str:
+        return f"replay:{self.agent}"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ReplayChatModel":
+        """Comprueba que el guion solo llame a herramientas disponibles para el agente."""
+        available = {convert_to_openai_tool(tool)["function"]["name"] for tool in tools}
+        missing = {
+            call["name"] for step in self.steps for call in step.get("tool_calls", ())
+        } - available
+        if missing:
+            raise ValueError(f"El guion de {self.agent} usa herramientas no disponibles: {', '.join(sorted(missing))}")
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        step = _turn_step(messages)
+        if step < len(self.steps):
+            entry = self.steps[step]
+        else:
+            final = [s for s in self.steps if not s.get("tool_calls")]
+            entry = final[-1] if final else {}
+
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"{self.agent}-{step}-{i}", "type": "tool_call"}
+            for i, call in enumerate(entry.get("tool_calls", ()))
+        ]
+        content = entry.get("content", "" if tool_calls else DEFAULT_REPLY)
+        prompt = "".join(str(message.content) for message in messages)
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(content)
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return self._reply(messages)
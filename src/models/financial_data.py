@@ -1,9 +1,14 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+import io
+import json
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Iterator, Optional, List, Literal
+import numpy as np
 
 
 class BusinessInputData(BaseModel):
     """Datos de entrada del negocio proporcionados por el usuario."""
+    model_config = ConfigDict(frozen=True)
+
     nombre_negocio: str = Field(description="Nombre del negocio")
     tipo_negocio: str = Field(description="Tipo de negocio (ej: cafetería, tienda)")
     costos_fijos_mensuales: float = Field(gt=0, description="Costos fijos mensuales")
@@ -24,6 +29,22 @@ class BasicMetrics(BaseModel):
     rentabilidad_sobre_inversion: Optional[float] = None  # ROI en porcentaje
 
 
+class FinancialMetrics(BasicMetrics):
+    """Registro inmutable con las métricas básicas y sus componentes intermedios.
+
+    Se calcula una sola vez por entrada y lo comparten todas las herramientas.
+    `punto_equilibrio_unidades` es NaN cuando el margen de contribución no es positivo.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    ventas_totales: float
+    costos_fijos: float
+    costos_variables_totales: float
+    margen_contribucion: float  # Precio - costo variable unitario
+    margen_bruto_porcentaje: float
+    volumen_ventas: int
+
+
 class MonthlyFlow(BaseModel):
     """Flujo de efectivo de un mes específico."""
     mes: int
@@ -40,6 +61,96 @@ class CashflowProjection(BaseModel):
     alertas: List[str] = []
 
 
+class ColumnarCashflowProjection(BaseModel):
+    """Proyección de flujo de efectivo almacenada por columnas.
+
+    Cada columna es un arreglo float64 contiguo; los `MonthlyFlow` solo se crean al
+    acceder a un periodo. En frecuencia diaria, `mes` de cada vista es el número de día.
+    """
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    proyeccion_meses: int
+    frecuencia: Literal["mensual", "diaria"] = "mensual"
+    periodos: np.ndarray
+    entradas: np.ndarray
+    salidas: np.ndarray
+    flujo_neto: np.ndarray
+    saldo_acumulado: np.ndarray
+    alertas: List[str] = []
+
+    @field_validator("periodos", "entradas", "salidas", "flujo_neto", "saldo_acumulado", mode="before")
+    @classmethod
+    def _as_contiguous_array(cls, value):
+        return np.ascontiguousarray(value, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.periodos.shape[0]
+
+    def __getitem__(self, index: int) -> MonthlyFlow:
+        """Materializa un solo periodo como `MonthlyFlow`."""
+        return MonthlyFlow(
+            mes=int(self.periodos[index]),
+            entradas=float(self.entradas[index]),
+            salidas=float(self.salidas[index]),
+            flujo_neto=float(self.flujo_neto[index]),
+            saldo_acumulado=float(self.saldo_acumulado[index]),
+        )
+
+    def iter_flows(self) -> Iterator[MonthlyFlow]:
+        """Recorre los periodos creando cada `MonthlyFlow` bajo demanda."""
+        return (self[i] for i in range(len(self)))
+
+    def to_projection(self) -> CashflowProjection:
+        """Convierte a la representación clásica (un modelo por periodo)."""
+        return CashflowProjection(
+            proyeccion_meses=self.proyeccion_meses,
+            flujos_mensuales=list(self.iter_flows()),
+            alertas=self.alertas,
+        )
+
+    def columns(self) -> dict:
+        """Columnas de la proyección con los nombres de `MonthlyFlow`."""
+        return {
+            "mes": self.periodos.astype(np.int64),
+            "entradas": self.entradas,
+            "salidas": self.salidas,
+            "flujo_neto": self.flujo_neto,
+            "saldo_acumulado": self.saldo_acumulado,
+        }
+
+    def to_json(self) -> str:
+        """Serializa a JSON por columnas sin crear modelos por fila."""
+        payload = {
+            "proyeccion_meses": self.proyeccion_meses,
+            "frecuencia": self.frecuencia,
+            "alertas": self.alertas,
+            **{name: column.tolist() for name, column in self.columns().items()},
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+    def to_csv(self) -> str:
+        """Serializa a CSV (una fila por periodo)."""
+        buffer = io.StringIO()
+        columns = self.columns()
+        np.savetxt(
+            buffer,
+            np.column_stack(list(columns.values())),
+            delimiter=",",
+            fmt=["%d"] + ["%.2f"] * (len(columns) - 1),
+            header=",".join(columns),
+            comments="",
+        )
+        return buffer.getvalue()
+
+    def to_arrow(self):
+        """Convierte a una tabla de Apache Arrow (requiere `pyarrow`)."""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Exportar a Arrow requiere pyarrow: pip install pyarrow") from e
+        return pa.table(self.columns())
+
+
 class ScenarioData(BaseModel):
     """Datos de un escenario financiero."""
     nombre_escenario: str
@@ -0,0 +1,24 @@
+from .metrics import Counter, Histogram, MetricsRegistry, get_registry, set_registry
+from .instrument import instrument_tool, record_cache_request, record_call, timed, tool_error
+from .tracing import Span, Tracer, get_tracer, profile_run, set_tracer, start_tracing, stop_tracing, trace_span
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "get_registry",
+    "set_registry",
+    "instrument_tool",
+    "record_cache_request",
+    "record_call",
+    "timed",
+    "tool_error",
+    "Span",
+    "Tracer",
+    "get_tracer",
+    "profile_run",
+    "set_tracer",
+    "start_tracing",
+    "stop_tracing",
+    "trace_span",
+]
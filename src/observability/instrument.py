@@ -0,0 +1,158 @@
+"""Uniform latency/call-count instrumentation for tools and sub-agents."""
+import functools
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from src.observability.metrics import MetricsRegistry, get_registry
+from src.observability.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+# Estado de una llamada: ok, invalido (la herramienta rechazó la entrada con "❌") o error
+# (excepción interna, propagada o convertida en mensaje con `tool_error`)
+STATUS_OK = "ok"
+STATUS_INVALID = "invalido"
+STATUS_ERROR = "error"
+
+# Excepciones que indican datos de entrada rechazados (incluye ValidationError de pydantic)
+INVALID_INPUT_ERRORS = (ValueError,)
+
+
+class ToolError(str):
+    """Mensaje "❌" de una herramienta que conserva el estado de la falla para las métricas."""
+
+    status = STATUS_ERROR
+
+
+def tool_error(message: str, error: BaseException) -> str:
+    """
+    Mensaje de error de una herramienta a partir de la excepción capturada.
+
+    Las entradas rechazadas (ValueError, ValidationError) cuentan como "invalido";
+    cualquier otra excepción, como "error".
+
+    Args:
+        message: Descripción de la operación (ej. "Error al calcular utilidad")
+        error: Excepción capturada
+    """
+    result = ToolError(f"❌ {message}: {error}")
+    result.status = STATUS_INVALID if isinstance(error, INVALID_INPUT_ERRORS) else STATUS_ERROR
+    return result
+
+
+def current_conversation() -> Optional[str]:
+    """thread_id de la conversación en curso, si la llamada ocurre dentro del grafo."""
+    # Solo se consulta si langchain ya está cargado: fuera del grafo no hay conversación
+    config_module = sys.modules.get("langchain_core.runnables.config")
+    if config_module is None:
+        return None
+    config = config_module.var_child_runnable_config.get() or {}
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
+def result_status(result: Any) -> str:
+    """Clasifica el resultado de una herramienta (texto o Command con ToolMessage)."""
+    if isinstance(result, ToolError):
+        return result.status
+    text = result
+    update = getattr(result, "update", None)
+    if isinstance(update, dict) and update.get("messages"):
+        text = getattr(update["messages"][-1], "content", "")
+    if isinstance(text, str) and text.startswith("❌"):
+        return STATUS_INVALID
+    return STATUS_OK
+
+
+def record_call(
+    kind: str,
+    name: str,
+    seconds: float,
+    status: str,
+    registry: Optional[MetricsRegistry] = None,
+) -> None:
+    """
+    Registra una llamada a herramienta o subagente.
+
+    Args:
+        kind: "tool" o "subagent" (prefijo y etiqueta de las métricas)
+        name: Nombre de la herramienta o del subagente
+        seconds: Duración de la llamada
+        status: ok, invalido o error
+    """
+    registry = registry or get_registry()
+    registry.counter(
+        f"anafi_{kind}_calls_total", f"Llamadas por {kind} y estado", (kind, "status")
+    ).inc(**{kind: name, "status": status})
+    registry.histogram(
+        f"anafi_{kind}_latency_seconds", f"Latencia por {kind} en segundos", (kind,)
+    ).observe(seconds, **{kind: name})
+    if status == STATUS_INVALID:
+        registry.counter(
+            f"anafi_{kind}_validation_failures_total", f"Entradas rechazadas por {kind}", (kind,)
+        ).inc(**{kind: name})
+
+    conversation = current_conversation()
+    if conversation is not None:
+        registry.record_conversation(conversation, kind, name, seconds)
+
+
+def record_cache_request(tool: str, hit: bool, registry: Optional[MetricsRegistry] = None) -> None:
+    """Registra un acierto o fallo de la caché de resultados de herramientas."""
+    (registry or get_registry()).counter(
+        "anafi_tool_cache_requests_total", "Consultas a la caché de herramientas", ("tool", "result")
+    ).inc(tool=tool, result="hit" if hit else "miss")
+
+
+@contextmanager
+def timed(kind: str, name: str, registry: Optional[MetricsRegistry] = None) -> Iterator[dict]:
+    """
+    Mide un bloque y lo registra (y lo traza si hay un trazador activo); el bloque
+    puede fijar `call["status"]`.
+
+    Las excepciones se registran con estado "error" y se propagan.
+    """
+    call = {"status": STATUS_OK}
+    start = time.perf_counter()
+    try:
+        with trace_span(name, kind) as span:
+            yield call
+            if span is not None:
+                span.attrs["status"] = call["status"]
+    except BaseException:
+        call["status"] = STATUS_ERROR
+        raise
+    finally:
+        record_call(kind, name, time.perf_counter() - start, call["status"], registry)
+
+
+def instrument_tool(
+    func: Optional[Callable] = None,
+    *,
+    name: Optional[str] = None,
+    registry: Optional[MetricsRegistry] = None,
+) -> Callable:
+    """
+    Envuelve una herramienta para registrar latencia, llamadas y rechazos.
+
+    Se usa como decorador (`@instrument_tool`) o como función. La firma, el
+    docstring y los atributos (ej. `.cache` de `memoize_tool`) se conservan.
+    """
+    if func is None:
+        return functools.partial(instrument_tool, name=name, registry=registry)
+
+    tool_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed("tool", tool_name, registry) as call:
+            result = func(*args, **kwargs)
+            call["status"] = result_status(result)
+        # El agente recibe el texto plano
+        return str(result) if isinstance(result, ToolError) else result
+
+    wrapper.instrumented = True
+    return wrapper
@@ -0,0 +1,201 @@
+"""In-process metrics registry (counters and histograms) with Prometheus text output."""
+import bisect
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cubetas de latencia en segundos: de 1 ms (herramientas) a 2 min (subagentes con LLM)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotónico con etiquetas."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> List[Tuple[LabelValues, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> Iterable[str]:
+        for key, value in self.samples():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma acumulativo por cubetas (como el de Prometheus), con etiquetas."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteo por cubeta (+Inf al final), suma, total]
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            return entry[2] if entry else 0
+
+    def sum(self, **labels) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            return entry[1] if entry else 0.0
+
+    def samples(self) -> List[Tuple[LabelValues, list]]:
+        with self._lock:
+            return sorted((key, [list(entry[0]), entry[1], entry[2]]) for key, entry in self._values.items())
+
+    def render(self) -> Iterable[str]:
+        for key, (counts, total, count) in self.samples():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso.
+
+    Además de las series globales, acumula el tiempo por conversación (thread_id
+    de LangGraph) para ver qué herramienta o subagente domina cada una; se
+    conservan las últimas `max_conversations` conversaciones.
+    """
+
+    def __init__(self, max_conversations: int = 256):
+        self._metrics: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, Dict[Tuple[str, str], list]]" = OrderedDict()
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"La métrica '{name}' ya existe con otro tipo o etiquetas.")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str):
+        with self._lock:
+            return self._metrics.get(name)
+
+    def record_conversation(self, conversation: str, kind: str, name: str, seconds: float) -> None:
+        """Suma el tiempo de una llamada al desglose de su conversación."""
+        with self._lock:
+            times = self._conversations.pop(conversation, None) or {}
+            self._conversations[conversation] = times
+            entry = times.setdefault((kind, name), [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+
+    def conversation_breakdown(self, conversation: str) -> List[dict]:
+        """Llamadas y segundos por herramienta/subagente de una conversación, de mayor a menor tiempo."""
+        with self._lock:
+            times = dict(self._conversations.get(conversation, {}))
+        rows = [
+            {"tipo": kind, "nombre": name, "llamadas": calls, "segundos": seconds}
+            for (kind, name), (calls, seconds) in times.items()
+        ]
+        return sorted(rows, key=lambda row: row["segundos"], reverse=True)
+
+    def to_prometheus(self) -> str:
+        """Volcado en formato de texto de Prometheus (exposition format 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+            self._conversations.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Registro global del proceso."""
+    return _registry
+
+
+def set_registry(registry: Optional[MetricsRegistry]) -> None:
+    """Reemplaza el registro global (None = registro nuevo y vacío)."""
+    global _registry
+    _registry = registry if registry is not None else MetricsRegistry()
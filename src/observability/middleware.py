@@ -0,0 +1,91 @@
+"""Agent middleware for sub-agent hand-off metrics and LLM/tool tracing spans."""
+import logging
+
+from langchain.agents.middleware import AgentMiddleware
+
+from src.observability.instrument import timed
+from src.observability.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+TASK_TOOL = "task"
+
+
+def _subagent_name(request) -> str:
+    return str((request.tool_call.get("args") or {}).get("subagent_type", "desconocido"))
+
+
+def _model_name(request) -> str:
+    model = getattr(request, "model", None)
+    return str(getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__)
+
+
+def _is_instrumented(request) -> bool:
+    """Las herramientas de ANAFI ya abren su propio span (ver `instrument_tool`)."""
+    tool = getattr(request, "tool", None)
+    return bool(getattr(getattr(tool, "func", None), "instrumented", False))
+
+
+def _record_usage(span, response) -> None:
+    if span is None:
+        return
+    messages = getattr(response, "result", None) or []
+    usage = getattr(messages[-1], "usage_metadata", None) if messages else None
+    if usage:
+        span.attrs.update(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+
+
+class SubAgentMetricsMiddleware(AgentMiddleware):
+    """Registra cada delegación del supervisor como una llamada al subagente."""
+
+    def wrap_tool_call(self, request, handler):
+        if request.tool_call.get("name") != TASK_TOOL:
+            return handler(request)
+        with timed("subagent", _subagent_name(request)):
+            return handler(request)
+
+    async def awrap_tool_call(self, request, handler):
+        if request.tool_call.get("name") != TASK_TOOL:
+            return await handler(request)
+        with timed("subagent", _subagent_name(request)):
+            return await handler(request)
+
+
+class AgentTracingMiddleware(AgentMiddleware):
+    """Abre spans para las llamadas al modelo y a las herramientas integradas de un agente.
+
+    Las herramientas integradas (read_file, write_todos, ...) no pasan por
+    `instrument_tool`; la delegación `task` la mide `SubAgentMetricsMiddleware`.
+    Sin trazador activo no hace nada.
+    """
+
+    def __init__(self, agent: str):
+        super().__init__()
+        self.agent = agent
+
+    def _traces_tool(self, request) -> bool:
+        return request.tool_call.get("name") != TASK_TOOL and not _is_instrumented(request)
+
+    def wrap_model_call(self, request, handler):
+        with trace_span(self.agent, "llm", agent=self.agent, model=_model_name(request)) as span:
+            response = handler(request)
+            _record_usage(span, response)
+            return response
+
+    async def awrap_model_call(self, request, handler):
+        with trace_span(self.agent, "llm", agent=self.agent, model=_model_name(request)) as span:
+            response = await handler(request)
+            _record_usage(span, response)
+            return response
+
+    def wrap_tool_call(self, request, handler):
+        if not self._traces_tool(request):
+            return handler(request)
+        with trace_span(request.tool_call.get("name", "tool"), "tool", agent=self.agent):
+            return handler(request)
+
+    async def awrap_tool_call(self, request, handler):
+        if not self._traces_tool(request):
+            return await handler(request)
+        with trace_span(request.tool_call.get("name", "tool"), "tool", agent=self.agent):
+            return await handler(request)
@@ -0,0 +1,314 @@
+"""Span tracing for conversations (LLM, sub-agents, tools) with Chrome-trace JSON export."""
+import asyncio
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Categorías de span: el turno completo, llamadas al modelo, delegaciones y herramientas
+CATEGORIES = ("turn", "llm", "subagent", "tool")
+
+# Spans retenidos como máximo; al superarse se descartan los más antiguos
+DEFAULT_MAX_SPANS = 100_000
+# Espera máxima por el búfer al exportar desde el manejador de SIGTERM
+SIGNAL_FLUSH_TIMEOUT_S = 1.0
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("anafi_span", default=None)
+
+
+@dataclass
+class Span:
+    """Intervalo medido; `parent_id` enlaza el span que lo contiene y `root_id` el span raíz (el turno)."""
+    id: int
+    name: str
+    category: str
+    start: float
+    lane: int
+    parent_id: Optional[int] = None
+    root_id: Optional[int] = None
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer:
+    """Colecciona spans en memoria (seguro entre hilos y tareas asyncio).
+
+    Cada span se asigna a un carril por hilo y tarea asyncio, de modo que las
+    ramas paralelas (subagentes, llamadas a herramientas) no se solapan en el
+    visor de Chrome/Perfetto.
+
+    Los spans se agrupan por span raíz, de modo que los turnos que corren en
+    paralelo (ej. bajo `langgraph dev`) se exportan cada uno con sus propios spans.
+
+    Args:
+        path: Si se indica, cada turno (span raíz "turn") se exporta al cerrarse
+            a `<nombre>-<n>.json` junto a `path` y sus spans salen del búfer
+        max_spans: Tamaño máximo del búfer; los spans más antiguos se descartan
+    """
+
+    def __init__(self, path: Optional[str] = None, max_spans: int = DEFAULT_MAX_SPANS):
+        self.origin = time.perf_counter()
+        self.path = path
+        self.max_spans = max_spans
+        self._roots: Dict[int, deque] = {}  # id del span raíz -> spans cerrados, en orden de llegada
+        self._size = 0
+        self._ids = itertools.count(1)
+        self._lanes: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.flushes = 0
+
+    def _lane(self) -> int:
+        try:
+            task = id(asyncio.current_task())
+        except RuntimeError:
+            task = None
+        key = (threading.get_ident(), task)
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes))
+
+    @contextmanager
+    def span(self, name: str, category: str, **attrs) -> Iterator[Span]:
+        """Mide un bloque como span hijo del span activo en este contexto."""
+        parent = _current_span.get()
+        span = Span(
+            id=next(self._ids),
+            name=name,
+            category=category,
+            start=time.perf_counter(),
+            lane=self._lane(),
+            parent_id=parent.id if parent is not None else None,
+            attrs=dict(attrs),
+        )
+        span.root_id = parent.root_id if parent is not None else span.id
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            with self._lock:
+                self._append(span)
+            if self.path and span.parent_id is None and span.category == "turn":
+                self.flush(span.id)
+
+    def _append(self, span: Span) -> None:
+        # Con el búfer lleno se descarta el span más antiguo del turno más antiguo
+        if self._size >= self.max_spans and self._roots:
+            oldest = next(iter(self._roots))
+            self._roots[oldest].popleft()
+            if not self._roots[oldest]:
+                del self._roots[oldest]
+            self._size -= 1
+            self.dropped += 1
+        self._roots.setdefault(span.root_id, deque()).append(span)
+        self._size += 1
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return sorted((span for spans in self._roots.values() for span in spans), key=lambda s: s.start)
+
+    def flush(self, root_id: Optional[int] = None, timeout: float = -1) -> Optional[str]:
+        """
+        Exporta spans pendientes a un archivo numerado junto a `path` y los saca del búfer.
+
+        Args:
+            root_id: Span raíz cuyo turno se exporta (None = todo lo pendiente)
+            timeout: Espera máxima por el búfer en segundos (-1 = sin límite); si
+                se agota no se exporta nada
+        """
+        if not self.path:
+            return None
+        if not self._lock.acquire(timeout=timeout):
+            logger.warning("Traza no exportada: el búfer de spans está ocupado")
+            return None
+        try:
+            if root_id is None:
+                pending = [span for spans in self._roots.values() for span in spans]
+                self._roots.clear()
+            else:
+                pending = list(self._roots.pop(root_id, ()))
+            if not pending:
+                return None
+            self._size -= len(pending)
+            self.flushes += 1
+            number = self.flushes
+        finally:
+            self._lock.release()
+        spans = sorted(pending, key=lambda s: s.start)
+        path = Path(self.path)
+        return self._write(path.with_name(f"{path.stem}-{number:05d}{path.suffix}"), spans)
+
+    def to_chrome_trace(self, spans: Optional[Sequence[Span]] = None) -> dict:
+        """Eventos completos ("ph": "X") del formato Trace Event de Chrome, en microsegundos."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.lane,
+                "args": {key: value if isinstance(value, (int, float, bool)) else str(value) for key, value in span.attrs.items()},
+            }
+            for span in (self.spans() if spans is None else spans)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> str:
+        """Escribe la traza en JSON (se abre en chrome://tracing o ui.perfetto.dev)."""
+        return self._write(Path(path), self.spans())
+
+    def _write(self, path: Path, spans: Sequence[Span]) -> str:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(spans), ensure_ascii=False), encoding="utf-8")
+        dropped = f", {self.dropped} descartados" if self.dropped else ""
+        logger.info(f"Traza exportada a {path} ({len(spans)} spans{dropped})")
+        return str(path)
+
+    def breakdown(self) -> dict:
+        """
+        Tiempo por categoría: inclusivo (suma de spans) y exclusivo (sin los spans hijos).
+
+        El tiempo exclusivo de "subagent" es la sobrecarga de la delegación (lo que
+        no es LLM ni herramientas); el de "turn", la del grafo. Con ramas paralelas
+        la suma puede superar el tiempo de reloj (`wall_s`).
+        """
+        spans = self.spans()
+        children: Dict[int, float] = {}
+        for span in spans:
+            if span.parent_id is not None:
+                children[span.parent_id] = children.get(span.parent_id, 0.0) + span.duration
+
+        categories: Dict[str, dict] = {}
+        for span in spans:
+            entry = categories.setdefault(span.category, {"spans": 0, "inclusive_s": 0.0, "exclusive_s": 0.0})
+            entry["spans"] += 1
+            entry["inclusive_s"] += span.duration
+            entry["exclusive_s"] += max(span.duration - children.get(span.id, 0.0), 0.0)
+
+        wall = (max(s.end for s in spans) - min(s.start for s in spans)) if spans else 0.0
+        return {"wall_s": wall, "categories": categories}
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def set_tracer(tracer: Optional[Tracer], path: Optional[str] = None) -> Optional[Tracer]:
+    """
+    Reemplaza el trazador activo (None = sin trazado) y devuelve el anterior.
+
+    Args:
+        path: Si se indica, la traza se exporta ahí al terminar el proceso
+    """
+    global _tracer
+    with _tracer_lock:
+        previous, _tracer = _tracer, tracer
+    if tracer is not None and path:
+        atexit.register(tracer.export, path)
+    return previous
+
+
+def start_tracing(path: Optional[str] = None) -> Tracer:
+    """Activa el trazado con un trazador nuevo (exportado a `path` al salir, si se indica)."""
+    tracer = Tracer()
+    set_tracer(tracer, path)
+    return tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Desactiva el trazado y devuelve el trazador que estaba activo."""
+    return set_tracer(None)
+
+
+def _flush_on_sigterm(tracer: Tracer) -> None:
+    """Exporta los spans pendientes al recibir SIGTERM y luego aplica el manejador anterior."""
+    if threading.current_thread() is not threading.main_thread():
+        # signal.signal solo se puede llamar desde el hilo principal
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handler(signum, frame):
+        # El hilo principal puede tener tomado el lock del búfer al llegar la señal:
+        # esperar sin límite lo bloquearía para siempre
+        tracer.flush(timeout=SIGNAL_FLUSH_TIMEOUT_S)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, handler)
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Trazador activo; se activa solo si está definida `ANAFI_TRACE_FILE` (ej. bajo `langgraph dev`).
+
+    Cada turno se exporta al terminar a `<ANAFI_TRACE_FILE sin extensión>-<n>.json`; lo
+    pendiente se exporta al salir o al recibir SIGTERM. `ANAFI_TRACE_MAX_SPANS` acota el búfer.
+    """
+    global _tracer
+    if _tracer is None and os.getenv("ANAFI_TRACE_FILE"):
+        with _tracer_lock:
+            if _tracer is None:
+                max_spans = int(os.getenv("ANAFI_TRACE_MAX_SPANS", DEFAULT_MAX_SPANS))
+                _tracer = Tracer(os.environ["ANAFI_TRACE_FILE"], max_spans=max_spans)
+                atexit.register(_tracer.flush)
+                _flush_on_sigterm(_tracer)
+    return _tracer
+
+
+@contextmanager
+def trace_span(name: str, category: str, **attrs) -> Iterator[Optional[Span]]:
+    """Span en el trazador activo; sin trazado activo no hace nada."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **attrs) as span:
+        yield span
+
+
+def profile_run(graph, inputs: dict, config: Optional[dict] = None, path: Optional[str] = None):
+    """
+    Ejecuta un turno completo del grafo con trazado y devuelve (resultado, desglose).
+
+    Args:
+        graph: Grafo compilado (ej. `build_anafi_agent()`)
+        inputs: Estado de entrada, ej. {"messages": [HumanMessage(...)]}
+        config: Configuración de LangGraph (thread_id, etc.)
+        path: Ruta donde exportar la traza de Chrome (opcional)
+    """
+    tracer = Tracer()
+    previous = set_tracer(tracer)
+    try:
+        with tracer.span("turno", "turn"):
+            result = graph.invoke(inputs, config=config)
+    finally:
+        set_tracer(previous)
+    if path:
+        tracer.export(path)
+    return result, tracer.breakdown()
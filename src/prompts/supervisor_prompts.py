@@ -68,6 +68,10 @@ Tu PRIMERA acción debe ser llamar a `write_todos` con un plan maestro **dinámi
 
 Usa un ciclo de `read_todos` -> `task` -> `think_tool` -> `write_todos`.
 
+**Tareas independientes en paralelo:** "Calcular métricas básicas", "Análisis avanzado" y "Simulación de escenarios"
+solo dependen de los datos validados. Si el plan incluye varias de ellas, lánzalas con varias llamadas a `task`
+en el MISMO turno y espera a que terminen todas antes de "Generar reporte".
+
 **CUANDO el TODO `in_progress` contiene "Recopilar datos":**
   * **Agente a Llamar:** `subagent_type="data_input_agent"`
   * **Descripción de la Tarea:** "Recopilar y validar todos los datos financieros del negocio del usuario."
@@ -0,0 +1,16 @@
+from .charts import render_chart, render_chart_files_batch, render_charts, render_charts_batch
+from .context import AnalysisContext, context_from_state
+from .excel import write_excel_report
+from .pdf import render_pdf_batch, render_pdf_report
+
+__all__ = [
+    "AnalysisContext",
+    "context_from_state",
+    "render_chart",
+    "render_chart_files_batch",
+    "render_charts",
+    "render_charts_batch",
+    "render_pdf_batch",
+    "render_pdf_report",
+    "write_excel_report",
+]
@@ -0,0 +1,216 @@
+"""Financial chart rendering with matplotlib (Agg) and an input-hash cache."""
+import base64
+import hashlib
+import io
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+from matplotlib import rc_context
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.engine.parallel import bounded_workers, process_pool
+from src.models.financial_data import BusinessInputData
+from src.reports.naming import unique_slugs
+
+logger = logging.getLogger(__name__)
+
+CHART_NAMES = ("punto_equilibrio", "composicion_costos", "utilidad")
+CHART_FORMATS = ("png", "svg")
+CHART_VERSION = 1  # Subir al cambiar el diseño de los gráficos para invalidar la caché
+CHARTS_DIR = "/reports/charts"
+FIGURE_SIZE = (7, 4.5)
+DPI = 110
+
+ChartInputs = Tuple[float, float, float, int]
+
+
+def chart_inputs(data: BusinessInputData) -> ChartInputs:
+    """Valores de los que dependen los tres gráficos."""
+    return (
+        data.costos_fijos_mensuales,
+        data.costo_variable_unitario,
+        data.precio_venta_unitario,
+        data.volumen_ventas_estimado,
+    )
+
+
+def chart_key(chart: str, inputs: ChartInputs, fmt: str) -> str:
+    """Hash (SHA-256) de un gráfico: nombre, datos, formato y versión del diseño."""
+    payload = json.dumps([CHART_VERSION, chart, fmt, list(inputs)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _plot_breakeven(ax, cf, cv, precio, volumen) -> None:
+    margen = precio - cv
+    pe = cf / margen if margen > 0 else None
+    limite = max(volumen, pe or 0) * 1.5 or 1
+    unidades = [0, limite]
+    ax.plot(unidades, [0, precio * limite], label="Ingresos", color="#2E7D32")
+    ax.plot(unidades, [cf, cf + cv * limite], label="Costos Totales", color="#C62828")
+    ax.axhline(cf, linestyle=":", color="grey", label="Costos Fijos")
+    if pe is not None:
+        ax.plot([pe], [pe * precio], "o", color="#1F4E79")
+        ax.annotate(f"PE: {pe:,.0f} und", (pe, pe * precio), textcoords="offset points", xytext=(8, -14))
+    ax.axvline(volumen, linestyle="--", color="#1F4E79", alpha=0.5, label="Volumen estimado")
+    ax.set_xlabel("Unidades vendidas")
+    ax.set_ylabel("Dinero ($)")
+    ax.set_title("Punto de Equilibrio")
+    ax.legend(loc="upper left", fontsize=8)
+
+
+def _plot_cost_composition(ax, cf, cv, precio, volumen) -> None:
+    variables = cv * volumen
+    ax.pie(
+        [cf, variables],
+        labels=["Costos Fijos", "Costos Variables"],
+        autopct="%1.1f%%",
+        colors=["#1F4E79", "#F9A825"],
+        startangle=90,
+    )
+    ax.set_title("Composición de Costos")
+    ax.axis("equal")
+
+
+def _plot_profit(ax, cf, cv, precio, volumen) -> None:
+    ventas = precio * volumen
+    costos = cf + cv * volumen
+    utilidad = ventas - costos
+    barras = ax.bar(
+        ["Ventas", "Costos", "Utilidad"],
+        [ventas, costos, utilidad],
+        color=["#2E7D32", "#C62828", "#1F4E79" if utilidad >= 0 else "#B71C1C"],
+    )
+    ax.bar_label(barras, labels=[f"${v:,.0f}" for v in (ventas, costos, utilidad)], fontsize=8)
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.set_ylabel("Dinero ($/mes)")
+    ax.set_title("Ventas, Costos y Utilidad")
+
+
+_PLOTTERS = {
+    "punto_equilibrio": _plot_breakeven,
+    "composicion_costos": _plot_cost_composition,
+    "utilidad": _plot_profit,
+}
+
+
+def render_chart(chart: str, inputs: ChartInputs, fmt: str = "png") -> bytes:
+    """Dibuja un gráfico con el backend Agg (sin pyplot ni estado global) y devuelve sus bytes."""
+    if chart not in _PLOTTERS:
+        raise ValueError(f"Gráfico '{chart}' no válido. Usa: {', '.join(CHART_NAMES)}")
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Formato '{fmt}' no válido. Usa: {', '.join(CHART_FORMATS)}")
+
+    figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+    FigureCanvasAgg(figure)
+    _PLOTTERS[chart](figure.add_subplot(), *inputs)
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    # Sin fecha ni IDs aleatorios: el mismo gráfico produce siempre los mismos bytes
+    metadata = {"Date": None} if fmt == "svg" else {"Software": None}
+    with rc_context({"svg.hashsalt": "anafi"}):
+        figure.savefig(buffer, format=fmt, metadata=metadata)
+    return buffer.getvalue()
+
+
+def _render_job(job: Tuple[str, ChartInputs, str]) -> bytes:
+    return render_chart(*job)
+
+
+@lru_cache(maxsize=1)
+def get_chart_cache():
+    """Caché LRU de gráficos renderizados, por hash de los datos."""
+    # Importación diferida: src.tools importa los renderizadores de reportes
+    from src.tools.cache import ToolResultCache
+
+    return ToolResultCache(maxsize=512, ttl=None)
+
+
+def render_charts(data: BusinessInputData, fmt: str = "png") -> Dict[str, bytes]:
+    """Los tres gráficos de un negocio; los que no cambiaron salen de la caché."""
+    return render_charts_batch([data], fmt=fmt)[0]
+
+
+def render_charts_batch(
+    businesses: Sequence[BusinessInputData],
+    fmt: str = "png",
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+) -> list:
+    """
+    Renderiza los gráficos de varios negocios.
+
+    Solo se dibujan los gráficos que no están en caché, una vez por combinación
+    distinta de datos; con `workers > 1` se reparten en un pool de procesos
+    (acotado con `bounded_workers`).
+
+    Returns:
+        Un diccionario {gráfico: bytes} por negocio, en el mismo orden
+    """
+    cache = get_chart_cache()
+    keys = []
+    rendered: Dict[str, bytes] = {}
+    pending: Dict[str, Tuple[str, ChartInputs, str]] = {}
+
+    for data in businesses:
+        inputs = chart_inputs(data)
+        business_keys = {}
+        for chart in CHART_NAMES:
+            key = chart_key(chart, inputs, fmt)
+            business_keys[chart] = key
+            if key in rendered or key in pending:
+                continue
+            found, value = cache.get(key)
+            if found:
+                rendered[key] = value
+            else:
+                pending[key] = (chart, inputs, fmt)
+        keys.append(business_keys)
+
+    if pending:
+        jobs = list(pending.values())
+        workers = bounded_workers(workers, len(jobs))
+        if workers > 1:
+            with process_pool(workers) as executor:
+                images = list(executor.map(_render_job, jobs, chunksize=chunksize))
+        else:
+            images = [_render_job(job) for job in jobs]
+        for key, image in zip(pending, images):
+            cache.set(key, image)
+            rendered[key] = image
+
+    logger.debug(f"Gráficos: {len(pending)} renderizados, {len(keys) * len(CHART_NAMES) - len(pending)} reutilizados")
+    return [{chart: rendered[key] for chart, key in business_keys.items()} for business_keys in keys]
+
+
+def chart_files(images: Dict[str, bytes], fmt: str = "png", directory: str = CHARTS_DIR) -> Dict[str, dict]:
+    """Archivos virtuales (binario en base64) para guardar los gráficos en el estado."""
+    return {
+        f"{directory}/{chart}.{fmt}": {
+            "content": base64.b64encode(image).decode("ascii"),
+            "encoding": "base64",
+        }
+        for chart, image in images.items()
+    }
+
+
+def render_chart_files_batch(
+    businesses: Sequence[BusinessInputData],
+    fmt: str = "png",
+    workers: Optional[int] = None,
+) -> Dict[str, dict]:
+    """
+    Gráficos de un lote de negocios como archivos virtuales.
+
+    Cada negocio queda en /reports/charts/<negocio>/ (con sufijo si dos nombres
+    coinciden); el resultado se puede combinar con el sistema de archivos del
+    estado mediante `file_reducer`.
+    """
+    files: Dict[str, dict] = {}
+    slugs = unique_slugs([data.nombre_negocio for data in businesses])
+    for slug, images in zip(slugs, render_charts_batch(businesses, fmt=fmt, workers=workers)):
+        files.update(chart_files(images, fmt, f"{CHARTS_DIR}/{slug}"))
+    return files
@@ -0,0 +1,119 @@
+"""Analysis context (input data plus computed metrics) shared by the report tools."""
+import logging
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from src.engine.alerts import metric_columns
+from src.engine.metrics import BatchMetrics, compute_metrics, load_business_data
+from src.graph.file_store import BUSINESS_DATA_PATH, JsonFile, read_json_file
+from src.models.financial_data import BusinessInputData, FinancialMetrics
+from src.reports.naming import business_slug
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CONTEXT_PATH = "/analysis/context.json"
+
+
+class AnalysisContext(BaseModel):
+    """Datos de entrada de un negocio y sus métricas ya calculadas.
+
+    Las herramientas de reportes trabajan sobre este objeto en lugar de leer y
+    recalcular por su cuenta; se construye desde los datos, desde el estado del
+    grafo o desde el archivo que dejó una herramienta anterior.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    data: BusinessInputData
+    metrics: FinancialMetrics
+
+    @classmethod
+    def from_data(cls, data) -> "AnalysisContext":
+        """Valida los datos y calcula (una sola vez por entrada) sus métricas."""
+        data = load_business_data(data)
+        return cls(data=data, metrics=compute_metrics(data))
+
+    @property
+    def slug(self) -> str:
+        """Nombre del negocio apto para rutas."""
+        return business_slug(self.data.nombre_negocio)
+
+    def to_file(self) -> JsonFile:
+        """Archivo virtual para que otras herramientas reutilicen las métricas."""
+        return JsonFile(self.model_dump(mode="json"))
+
+
+def context_from_state(state: Optional[Mapping]) -> Optional[AnalysisContext]:
+    """
+    Construye el contexto desde el sistema de archivos virtual del grafo.
+
+    Si el estado ya tiene un contexto guardado para los mismos datos de entrada,
+    se reutilizan sus métricas sin recalcularlas.
+    """
+    files = (state or {}).get("files")
+    data = read_json_file(files, BUSINESS_DATA_PATH)
+    saved = read_json_file(files, ANALYSIS_CONTEXT_PATH)
+
+    if isinstance(saved, dict):
+        try:
+            context = AnalysisContext.model_validate(saved)
+        except ValueError:
+            context = None
+        if context is not None and (data is None or load_business_data(data) == context.data):
+            return context
+
+    if not isinstance(data, dict):
+        return None
+    return AnalysisContext.from_data(data)
+
+
+def resolve_contexts(data: Any = None, state: Optional[Mapping] = None) -> Tuple[List[AnalysisContext], bool]:
+    """
+    Normaliza el argumento de las herramientas de reportes.
+
+    Args:
+        data: Contexto, diccionario de datos, lista de ambos (lote) o None para
+            usar los datos guardados en el estado
+        state: Estado del grafo (inyectado por la herramienta)
+
+    Returns:
+        (contextos, es_lote)
+    """
+    if data is None:
+        context = context_from_state(state)
+        if context is None:
+            raise ValueError("No se encontraron datos de entrada.")
+        return [context], False
+
+    if isinstance(data, (list, tuple)):
+        if not data:
+            raise ValueError("La lista de negocios está vacía.")
+        return [_as_context(item) for item in data], True
+    return [_as_context(data)], False
+
+
+def _as_context(item: Any) -> AnalysisContext:
+    return item if isinstance(item, AnalysisContext) else AnalysisContext.from_data(item)
+
+
+def context_columns(contexts: Sequence[AnalysisContext]) -> Dict[str, np.ndarray]:
+    """Columnas de métricas de un lote (para las reglas de alerta), sin recalcular nada."""
+    def column(getter) -> np.ndarray:
+        return np.array([getter(context.metrics) for context in contexts], dtype=np.float64)
+
+    roi = [context.metrics.rentabilidad_sobre_inversion for context in contexts]
+    metrics = BatchMetrics(
+        ventas_totales=column(lambda m: m.ventas_totales),
+        costos_variables_totales=column(lambda m: m.costos_variables_totales),
+        costos_totales=column(lambda m: m.costos_totales),
+        margen_contribucion=column(lambda m: m.margen_contribucion),
+        punto_equilibrio_unidades=column(lambda m: m.punto_equilibrio_unidades),
+        punto_equilibrio_dinero=column(lambda m: m.punto_equilibrio_dinero),
+        utilidad_bruta=column(lambda m: m.utilidad_bruta),
+        utilidad_neta=column(lambda m: m.utilidad_neta),
+        rentabilidad_sobre_ventas=column(lambda m: m.rentabilidad_sobre_ventas),
+        rentabilidad_sobre_inversion=np.array([math.nan if r is None else r for r in roi], dtype=np.float64),
+    )
+    return metric_columns(metrics, [context.data.volumen_ventas_estimado for context in contexts])
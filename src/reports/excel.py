@@ -0,0 +1,212 @@
+"""Streaming Excel workbook writer (openpyxl write-only mode) with live formulas."""
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from src.models.financial_data import BusinessInputData, ColumnarCashflowProjection, ScenarioData
+
+logger = logging.getLogger(__name__)
+
+MONEY_FORMAT = '"$"#,##0.00'
+UNITS_FORMAT = "#,##0.00"
+PERCENT_FORMAT = "0.00%"
+
+INPUT_SHEET = "Datos de Entrada"
+METRICS_SHEET = "Métricas Básicas"
+CASHFLOW_SHEET = "Flujo de Efectivo"
+SCENARIOS_SHEET = "Escenarios"
+FORMULAS_SHEET = "Fórmulas"
+
+# Celdas de los datos de entrada a las que apuntan las fórmulas
+INPUT_CELLS = {
+    "costos_fijos": f"'{INPUT_SHEET}'!$B$4",
+    "costo_variable": f"'{INPUT_SHEET}'!$B$5",
+    "precio": f"'{INPUT_SHEET}'!$B$6",
+    "volumen": f"'{INPUT_SHEET}'!$B$7",
+    "inversion": f"'{INPUT_SHEET}'!$B$8",
+}
+
+FORMULA_DESCRIPTIONS = [
+    ["Costos Totales", "Costos Fijos + (Costo Variable × Volumen)"],
+    ["Punto Equilibrio (und)", "Costos Fijos / (Precio - Costo Variable)"],
+    ["Utilidad Bruta", "Ventas - Costos Variables"],
+    ["Utilidad Neta", "Ventas - Costos Totales"],
+    ["ROS", "(Utilidad Neta / Ventas) × 100"],
+    ["ROI", "(Utilidad Neta Anual / Inversión) × 100"],
+]
+
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_FILL = PatternFill("solid", fgColor="1F4E79")
+
+
+def _header(ws, titles) -> list:
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        cell.alignment = Alignment(horizontal="center")
+        cells.append(cell)
+    return cells
+
+
+def _cell(ws, value, number_format: Optional[str] = None) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    if number_format:
+        cell.number_format = number_format
+    return cell
+
+
+def _text(ws, value) -> WriteOnlyCell:
+    """Texto del usuario (nombres, tipos): se guarda como cadena aunque empiece con "="."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.data_type = "s"
+    return cell
+
+
+def _new_sheet(wb: Workbook, title: str, headers, widths):
+    ws = wb.create_sheet(title)
+    for letter, width in zip("ABCDEFGHIJ", widths):
+        ws.column_dimensions[letter].width = width
+    ws.freeze_panes = "A2"
+    ws.append(_header(ws, headers))
+    return ws
+
+
+def _write_inputs(wb: Workbook, data: BusinessInputData) -> int:
+    ws = _new_sheet(wb, INPUT_SHEET, ["Campo", "Valor"], [28, 22])
+    rows = [
+        ("Nombre del Negocio", data.nombre_negocio, None),
+        ("Tipo de Negocio", data.tipo_negocio, None),
+        ("Costos Fijos Mensuales", data.costos_fijos_mensuales, MONEY_FORMAT),
+        ("Costo Variable Unitario", data.costo_variable_unitario, MONEY_FORMAT),
+        ("Precio de Venta Unitario", data.precio_venta_unitario, MONEY_FORMAT),
+        ("Volumen Ventas Estimado", data.volumen_ventas_estimado, "#,##0"),
+        ("Inversión Inicial", data.inversion_inicial or 0, MONEY_FORMAT),
+    ]
+    for label, value, number_format in rows:
+        ws.append([label, _cell(ws, value, number_format) if number_format else _text(ws, value)])
+    return len(rows)
+
+
+def _write_metrics(wb: Workbook) -> int:
+    ws = _new_sheet(wb, METRICS_SHEET, ["Métrica", "Valor"], [32, 22])
+    c = INPUT_CELLS
+    # Las métricas ocupan las filas 2-11 y sus fórmulas se referencian entre sí
+    rows = [
+        ("Ventas Totales", f"={c['precio']}*{c['volumen']}", MONEY_FORMAT),
+        ("Costos Variables Totales", f"={c['costo_variable']}*{c['volumen']}", MONEY_FORMAT),
+        ("Costos Totales", f"={c['costos_fijos']}+B3", MONEY_FORMAT),
+        ("Margen de Contribución Unitario", f"={c['precio']}-{c['costo_variable']}", MONEY_FORMAT),
+        ("Punto de Equilibrio (unidades)", f'=IF(B5>0,{c["costos_fijos"]}/B5,"No alcanzable")', UNITS_FORMAT),
+        ("Punto de Equilibrio (dinero)", f'=IF(B5>0,B6*{c["precio"]},"No alcanzable")', MONEY_FORMAT),
+        ("Utilidad Bruta", "=B2-B3", MONEY_FORMAT),
+        ("Utilidad Neta", "=B2-B4", MONEY_FORMAT),
+        ("Rentabilidad sobre Ventas (ROS)", "=IF(B2>0,B9/B2,0)", PERCENT_FORMAT),
+        ("Rentabilidad sobre Inversión (ROI anual)", f'=IF({c["inversion"]}>0,B9*12/{c["inversion"]},"N/A")', PERCENT_FORMAT),
+    ]
+    for label, formula, number_format in rows:
+        ws.append([label, _cell(ws, formula, number_format)])
+    return len(rows)
+
+
+def _write_cashflow(wb: Workbook, cashflow: Optional[ColumnarCashflowProjection]) -> int:
+    unidad = "Día" if cashflow is not None and cashflow.frecuencia == "diaria" else "Mes"
+    ws = _new_sheet(wb, CASHFLOW_SHEET, [unidad, "Entradas", "Salidas", "Flujo Neto", "Saldo Acumulado"], [10, 18, 18, 18, 20])
+    if cashflow is None:
+        return 0
+
+    periodos = cashflow.periodos.tolist()
+    entradas = cashflow.entradas.tolist()
+    salidas = cashflow.salidas.tolist()
+    for i, (periodo, entrada, salida) in enumerate(zip(periodos, entradas, salidas)):
+        row = i + 2
+        saldo = f"=D{row}" if i == 0 else f"=E{row - 1}+D{row}"
+        ws.append([
+            int(periodo),
+            _cell(ws, entrada, MONEY_FORMAT),
+            _cell(ws, salida, MONEY_FORMAT),
+            _cell(ws, f"=B{row}-C{row}", MONEY_FORMAT),
+            _cell(ws, saldo, MONEY_FORMAT),
+        ])
+    return len(periodos)
+
+
+def _write_scenarios(wb: Workbook, scenarios: Iterable[ScenarioData]) -> int:
+    ws = _new_sheet(
+        wb,
+        SCENARIOS_SHEET,
+        ["Escenario", "Tipo", "Precio", "Costo Variable", "Volumen", "Costos Fijos", "Ventas", "Costos", "Utilidad", "ROS"],
+        [26, 14, 14, 14, 12, 16, 16, 16, 16, 10],
+    )
+    count = 0
+    for scenario in scenarios:
+        row = count + 2
+        ws.append([
+            _text(ws, scenario.nombre_escenario),
+            _text(ws, scenario.tipo),
+            _cell(ws, scenario.precio_venta, MONEY_FORMAT),
+            _cell(ws, scenario.costo_variable, MONEY_FORMAT),
+            _cell(ws, scenario.volumen_ventas, "#,##0"),
+            _cell(ws, scenario.costos_fijos, MONEY_FORMAT),
+            _cell(ws, f"=C{row}*E{row}", MONEY_FORMAT),
+            _cell(ws, f"=F{row}+D{row}*E{row}", MONEY_FORMAT),
+            _cell(ws, f"=G{row}-H{row}", MONEY_FORMAT),
+            _cell(ws, f"=IF(G{row}>0,I{row}/G{row},0)", PERCENT_FORMAT),
+        ])
+        count += 1
+    return count
+
+
+def _write_formulas(wb: Workbook) -> int:
+    ws = _new_sheet(wb, FORMULAS_SHEET, ["Fórmula", "Descripción"], [26, 48])
+    for row in FORMULA_DESCRIPTIONS:
+        ws.append(row)
+    return len(FORMULA_DESCRIPTIONS)
+
+
+def write_excel_report(
+    output_path: str,
+    data: BusinessInputData,
+    cashflow: Optional[ColumnarCashflowProjection] = None,
+    scenarios: Iterable[ScenarioData] = (),
+) -> Dict[str, int]:
+    """
+    Escribe el libro de Excel del análisis en modo de solo escritura.
+
+    Las filas se envían al archivo a medida que se generan, por lo que la memoria
+    no crece con la longitud del flujo de efectivo ni con el número de escenarios.
+    Las métricas y los resultados de cada escenario son fórmulas de Excel que
+    se recalculan si se editan los datos de entrada. En el flujo de efectivo,
+    las entradas y salidas son valores de la proyección; solo el flujo neto y
+    el saldo acumulado son fórmulas sobre ellas.
+
+    Args:
+        output_path: Ruta del archivo .xlsx
+        data: Datos del negocio
+        cashflow: Proyección de flujo de efectivo (opcional)
+        scenarios: Escenarios a incluir (puede ser un generador)
+
+    Returns:
+        Número de filas de datos escritas por hoja
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    wb = Workbook(write_only=True)
+    filas = {
+        INPUT_SHEET: _write_inputs(wb, data),
+        METRICS_SHEET: _write_metrics(wb),
+        CASHFLOW_SHEET: _write_cashflow(wb, cashflow),
+        SCENARIOS_SHEET: _write_scenarios(wb, scenarios),
+        FORMULAS_SHEET: _write_formulas(wb),
+    }
+    wb.save(output_path)
+
+    logger.debug(f"Excel generado: {output_path} ({filas})")
+    return filas
@@ -0,0 +1,65 @@
+"""File naming and output-path helpers shared by the report renderers."""
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# Carpeta de reportes por defecto: <proyecto>/reports, independiente del directorio de trabajo
+DEFAULT_REPORTS_DIR = str(Path(__file__).resolve().parents[2] / "reports")
+
+
+def business_slug(nombre_negocio: str) -> str:
+    """Nombre del negocio apto para rutas de archivo: "Café Ñandú" -> "cafe_nandu"."""
+    ascii_name = unicodedata.normalize("NFKD", nombre_negocio).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", ascii_name.lower()).strip("_") or "negocio"
+
+
+def unique_slugs(nombres: Sequence[str]) -> List[str]:
+    """
+    Slugs de un lote sin colisiones: "Café", "Cafe", "Cafe" -> "cafe", "cafe_2", "cafe_3".
+
+    La primera aparición conserva su slug; las siguientes reciben el primer
+    sufijo numérico libre (sin pisar el slug de otro negocio del lote).
+    """
+    slugs = [business_slug(nombre) for nombre in nombres]
+    used = set(slugs)
+    seen = set()
+    result = []
+    for slug in slugs:
+        if slug in seen:
+            n = 2
+            while f"{slug}_{n}" in used:
+                n += 1
+            slug = f"{slug}_{n}"
+            used.add(slug)
+        seen.add(slug)
+        result.append(slug)
+    return result
+
+
+def reports_dir() -> str:
+    """Carpeta absoluta donde se escriben los reportes (`ANAFI_REPORTS_DIR` o la predeterminada)."""
+    return os.path.realpath(os.getenv("ANAFI_REPORTS_DIR") or DEFAULT_REPORTS_DIR)
+
+
+def resolve_report_path(path: Optional[str], base: Optional[str] = None) -> str:
+    """
+    Ruta de salida confinada a la carpeta de reportes.
+
+    Args:
+        path: Ruta relativa indicada por el agente (None = la carpeta misma)
+        base: Carpeta de reportes (por defecto `reports_dir()`)
+
+    Raises:
+        ValueError: Si la ruta es absoluta o sale de la carpeta de reportes
+    """
+    base = os.path.realpath(base or reports_dir())
+    if not path:
+        return base
+    if os.path.isabs(path) or ".." in Path(path).parts:
+        raise ValueError(f"Ruta de salida no permitida: '{path}'. Usa una ruta relativa a la carpeta de reportes")
+    resolved = os.path.realpath(os.path.join(base, path))
+    if os.path.commonpath([resolved, base]) != base:
+        raise ValueError(f"Ruta de salida no permitida: '{path}' sale de la carpeta de reportes")
+    return resolved
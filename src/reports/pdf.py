@@ -0,0 +1,216 @@
+"""PDF rendering of financial report structures with reportlab."""
+import logging
+import os
+import threading
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+
+from src.engine.parallel import bounded_workers, process_pool
+
+logger = logging.getLogger(__name__)
+
+FONT_NAME = "ANAFISans"
+FALLBACK_FONT = "Helvetica"
+PAGE_MARGIN = 2 * cm
+
+# Emojis de los mensajes del análisis → símbolos disponibles en la fuente
+SYMBOLS = {"\ufe0f": "", "✅": "✓", "🔴": "●", "ℹ": "i"}
+ASCII_SYMBOLS = {"✓": "[OK]", "⚠": "[!]", "●": "*"}
+
+_font_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def register_fonts() -> Tuple[str, str]:
+    """
+    Registra una sola vez por proceso la fuente Unicode de los reportes.
+
+    Usa DejaVu Sans (incluida con matplotlib) para acentos y símbolos; si no está
+    disponible, recurre a Helvetica.
+    """
+    with _font_lock:
+        try:
+            import matplotlib
+
+            font_dir = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+            pdfmetrics.registerFont(TTFont(FONT_NAME, os.path.join(font_dir, "DejaVuSans.ttf")))
+            pdfmetrics.registerFont(TTFont(f"{FONT_NAME}-Bold", os.path.join(font_dir, "DejaVuSans-Bold.ttf")))
+            return FONT_NAME, f"{FONT_NAME}-Bold"
+        except Exception as e:
+            logger.warning(f"Fuente DejaVu no disponible, se usa {FALLBACK_FONT}: {str(e)}")
+            return FALLBACK_FONT, f"{FALLBACK_FONT}-Bold"
+
+
+class PdfTemplate:
+    """Estilos, fuentes y decoración de página compartidos por todos los reportes."""
+
+    def __init__(self):
+        self.font, self.bold_font = register_fonts()
+        self.unicode_symbols = self.font != FALLBACK_FONT
+        self.title = ParagraphStyle("Titulo", fontName=self.bold_font, fontSize=18, leading=22, alignment=TA_CENTER, spaceAfter=6)
+        self.subtitle = ParagraphStyle("Subtitulo", fontName=self.font, fontSize=10, leading=13, alignment=TA_CENTER, textColor=colors.grey)
+        self.heading = ParagraphStyle("Seccion", fontName=self.bold_font, fontSize=13, leading=16, spaceBefore=14, spaceAfter=6, textColor=colors.HexColor("#1F4E79"))
+        self.body = ParagraphStyle("Texto", fontName=self.font, fontSize=10, leading=13)
+        self.table_style = TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), self.font),
+            ("FONTNAME", (0, 0), (0, -1), self.bold_font),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.whitesmoke, colors.white]),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ])
+
+    def plain(self, value) -> str:
+        """Texto con los emojis adaptados a la fuente."""
+        text = str(value)
+        for symbol, replacement in SYMBOLS.items():
+            text = text.replace(symbol, replacement)
+        if not self.unicode_symbols:
+            for symbol, replacement in ASCII_SYMBOLS.items():
+                text = text.replace(symbol, replacement)
+        return text
+
+    def text(self, value) -> str:
+        """Texto seguro para Paragraph."""
+        return escape(self.plain(value))
+
+    def draw_page(self, canvas, doc) -> None:
+        """Pie de página con el título del reporte y el número de página."""
+        canvas.saveState()
+        canvas.setFont(self.font, 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(PAGE_MARGIN, cm, self.plain(doc.title))
+        canvas.drawRightString(A4[0] - PAGE_MARGIN, cm, f"Página {doc.page}")
+        canvas.restoreState()
+
+
+@lru_cache(maxsize=1)
+def get_pdf_template() -> PdfTemplate:
+    """Plantilla compartida del proceso (se crea en el primer reporte)."""
+    return PdfTemplate()
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").capitalize()
+
+
+def _section_flowables(section: dict, template: PdfTemplate) -> Iterator:
+    yield Paragraph(template.text(f"{section['numero']}. {section['titulo']}"), template.heading)
+
+    contenido = section.get("contenido")
+    if isinstance(contenido, dict):
+        rows = [[Paragraph(template.text(_label(k)), template.body), template.plain(v)] for k, v in contenido.items()]
+        table = Table(rows, colWidths=[9 * cm, 7 * cm], hAlign="LEFT")
+        table.setStyle(template.table_style)
+        yield table
+    elif isinstance(contenido, (list, tuple)):
+        yield ListFlowable(
+            [ListItem(Paragraph(template.text(item), template.body), leftIndent=12) for item in contenido],
+            bulletType="bullet",
+            start="•",
+        )
+    elif contenido:
+        yield Paragraph(template.text(contenido), template.body)
+
+
+def render_pdf_report(structure: dict, output_path: str) -> str:
+    """
+    Escribe en disco el PDF de una estructura de reporte.
+
+    Args:
+        structure: Estructura con "metadata" y "secciones" (ver create_pdf_report)
+        output_path: Ruta del archivo PDF
+
+    Returns:
+        Ruta del PDF generado
+    """
+    template = get_pdf_template()
+    metadata = structure.get("metadata", {})
+    title = metadata.get("titulo", "Análisis Financiero")
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=A4,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        title=title,
+        author="ANAFI",
+    )
+
+    story = [
+        Paragraph(template.text(title), template.title),
+        Paragraph(
+            template.text(f"{metadata.get('tipo_negocio', '')} · {metadata.get('fecha_generacion', '')}"),
+            template.subtitle,
+        ),
+        Spacer(1, 0.5 * cm),
+    ]
+    for section in structure.get("secciones", []):
+        story.extend(_section_flowables(section, template))
+
+    doc.build(story, onFirstPage=template.draw_page, onLaterPages=template.draw_page)
+    logger.debug(f"PDF generado: {output_path}")
+    return output_path
+
+
+def _render_job(job: Tuple[dict, str]) -> str:
+    structure, output_path = job
+    return render_pdf_report(structure, output_path)
+
+
+def iter_render_pdf_batch(
+    jobs: Iterable[Tuple[dict, str]],
+    workers: Optional[int] = None,
+    chunksize: int = 4,
+) -> Iterator[str]:
+    """
+    Genera los PDF de un lote y devuelve cada ruta en cuanto el archivo está en disco.
+
+    Cada proceso registra las fuentes y crea la plantilla una sola vez y
+    reutiliza ambas en todos los reportes que le tocan.
+
+    Args:
+        jobs: Pares (estructura, ruta de salida)
+        workers: Procesos para el lote (None o 1 = en el proceso actual; se acota
+            con `bounded_workers` y un solo reporte no crea el pool)
+        chunksize: Reportes enviados a cada proceso por tanda
+    """
+    jobs = iter(jobs)
+    head = list(islice(jobs, 2))
+    jobs = chain(head, jobs)
+    workers = bounded_workers(workers) if len(head) > 1 else 1
+    if workers > 1:
+        with process_pool(workers, initializer=get_pdf_template) as executor:
+            yield from executor.map(_render_job, jobs, chunksize=chunksize)
+    else:
+        for job in jobs:
+            yield _render_job(job)
+
+
+def render_pdf_batch(
+    jobs: Sequence[Tuple[dict, str]],
+    workers: Optional[int] = None,
+    chunksize: int = 4,
+) -> List[str]:
+    """Genera los PDF de un lote de negocios (ver `iter_render_pdf_batch`)."""
+    paths = list(iter_render_pdf_batch(jobs, workers=workers, chunksize=chunksize))
+    logger.info(f"Lote de PDF generado: {len(paths)} reportes")
+    return paths
@@ -0,0 +1,20 @@
+from .business_store import BusinessColumnStore, IngestionResult, ingest_business_file, ingest_business_rows
+from .scenario_store import (
+    InMemoryScenarioStore,
+    SQLiteScenarioStore,
+    get_scenario_store,
+    scenario_scope,
+    set_scenario_store,
+)
+
+__all__ = [
+    "BusinessColumnStore",
+    "IngestionResult",
+    "ingest_business_file",
+    "ingest_business_rows",
+    "InMemoryScenarioStore",
+    "SQLiteScenarioStore",
+    "get_scenario_store",
+    "scenario_scope",
+    "set_scenario_store",
+]
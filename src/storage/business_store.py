@@ -0,0 +1,211 @@
+"""Streaming bulk ingestion of business data into a columnar store."""
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("nombre_negocio", "tipo_negocio")
+NUMERIC_FIELDS = (
+    "costos_fijos_mensuales",
+    "costo_variable_unitario",
+    "precio_venta_unitario",
+    "volumen_ventas_estimado",
+    "inversion_inicial",
+)
+SUPPORTED_FORMATS = (".csv", ".jsonl", ".xlsx")
+MAX_REJECTED_SAMPLE = 1000
+
+
+def iter_business_rows(path: str) -> Iterator[dict]:
+    """Lee un archivo CSV, JSONL o XLSX fila por fila, sin cargarlo completo."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                yield {k.strip(): v for k, v in row.items() if k is not None}
+    elif suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+            for values in rows:
+                if any(v is not None for v in values):
+                    yield dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Formato '{suffix}' no soportado. Usa: {', '.join(SUPPORTED_FORMATS)}")
+
+
+def _is_blank(values: pd.Series) -> np.ndarray:
+    return (values.isna() | (values.astype(str).str.strip() == "")).to_numpy()
+
+
+def validate_business_batch(rows: List[dict]) -> tuple:
+    """
+    Valida un lote de filas por columnas con las mismas reglas que `BusinessInputData`.
+
+    Returns:
+        (columnas válidas, máscara de filas válidas, errores por fila rechazada)
+    """
+    frame = pd.DataFrame.from_records(rows, columns=list(TEXT_FIELDS + NUMERIC_FIELDS))
+    n = len(frame)
+    errors: Dict[str, np.ndarray] = {}
+
+    for name in TEXT_FIELDS:
+        errors[f"{name}: requerido"] = frame[name].isna().to_numpy()
+
+    numeric = {}
+    for name in NUMERIC_FIELDS:
+        blank = _is_blank(frame[name])
+        values = pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=np.float64)
+        invalid = np.isnan(values) & ~blank
+        if name == "inversion_inicial":
+            errors[f"{name}: no es un número válido"] = invalid
+        else:
+            errors[f"{name}: requerido"] = blank
+            errors[f"{name}: no es un número válido"] = invalid
+        numeric[name] = values
+
+    with np.errstate(invalid="ignore"):
+        errors["costos_fijos_mensuales: debe ser mayor a 0"] = numeric["costos_fijos_mensuales"] <= 0
+        errors["costo_variable_unitario: no puede ser negativo"] = numeric["costo_variable_unitario"] < 0
+        errors["precio_venta_unitario: debe ser mayor a 0"] = numeric["precio_venta_unitario"] <= 0
+        volumen = numeric["volumen_ventas_estimado"]
+        fraccionario = (volumen != np.trunc(volumen)) & ~np.isnan(volumen)
+        errors["volumen_ventas_estimado: debe ser un entero mayor a 0"] = (volumen <= 0) | fraccionario
+        errors["inversion_inicial: no puede ser negativa"] = numeric["inversion_inicial"] < 0
+
+    error_matrix = np.column_stack(list(errors.values())) if n else np.zeros((0, len(errors)), dtype=bool)
+    valid = ~error_matrix.any(axis=1)
+
+    messages = list(errors)
+    rejected = {
+        int(i): [messages[j] for j in np.flatnonzero(error_matrix[i])]
+        for i in np.flatnonzero(~valid)
+    }
+
+    columns = {name: frame[name].to_numpy(dtype=object)[valid].astype(str) for name in TEXT_FIELDS}
+    columns.update({name: values[valid] for name, values in numeric.items()})
+    columns["volumen_ventas_estimado"] = columns["volumen_ventas_estimado"].astype(np.int64)
+    return columns, valid, rejected
+
+
+class BusinessColumnStore:
+    """Almacén columnar de negocios validados, construido por lotes."""
+
+    def __init__(self):
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name in TEXT_FIELDS + NUMERIC_FIELDS}
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        for name, values in columns.items():
+            self._chunks[name].append(values)
+        self._columns = None
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columnas concatenadas (compatibles con `compute_portfolio_metrics`)."""
+        if self._columns is None:
+            self._columns = {
+                name: np.concatenate(chunks) if chunks else np.empty(0)
+                for name, chunks in self._chunks.items()
+            }
+            self._chunks = {name: [values] for name, values in self._columns.items()}
+        return self._columns
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns())
+
+    def save(self, path: str) -> None:
+        """Guarda el almacén en un archivo `.npz` comprimido."""
+        np.savez_compressed(path, **self.columns())
+
+    @classmethod
+    def load(cls, path: str) -> "BusinessColumnStore":
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            store.append({name: data[name] for name in data.files})
+        return store
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks["costos_fijos_mensuales"])
+
+
+@dataclass
+class IngestionResult:
+    """Resultado de una carga masiva."""
+    store: BusinessColumnStore
+    total_filas: int = 0
+    filas_validas: int = 0
+    filas_rechazadas: int = 0
+    muestra_rechazos: List[dict] = field(default_factory=list)
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_business_rows(
+    rows: Iterable[dict],
+    batch_size: int = 5000,
+    rejected_path: Optional[str] = None,
+) -> IngestionResult:
+    """
+    Valida filas por lotes y las acumula en un almacén columnar.
+
+    Args:
+        rows: Iterable de diccionarios con los campos de `BusinessInputData`
+        batch_size: Filas por lote de validación
+        rejected_path: CSV opcional donde se escriben todas las filas rechazadas
+    """
+    result = IngestionResult(store=BusinessColumnStore())
+    report = None
+    report_file = None
+    if rejected_path:
+        report_file = open(rejected_path, "w", newline="", encoding="utf-8")
+        report = csv.writer(report_file)
+        report.writerow(["fila", "errores"])
+
+    try:
+        for batch in _batches(rows, batch_size):
+            columns, valid, rejected = validate_business_batch(batch)
+            result.store.append(columns)
+
+            for index, errores in rejected.items():
+                fila = result.total_filas + index + 1
+                if report is not None:
+                    report.writerow([fila, "; ".join(errores)])
+                if len(result.muestra_rechazos) < MAX_REJECTED_SAMPLE:
+                    result.muestra_rechazos.append({"fila": fila, "errores": errores})
+
+            result.total_filas += len(batch)
+            result.filas_validas += int(valid.sum())
+            result.filas_rechazadas += len(rejected)
+    finally:
+        if report_file is not None:
+            report_file.close()
+
+    logger.info(f"Carga masiva: {result.filas_validas}/{result.total_filas} filas válidas")
+    return result
+
+
+def ingest_business_file(path: str, batch_size: int = 5000, rejected_path: Optional[str] = None) -> IngestionResult:
+    """Carga masiva desde un archivo CSV, JSONL o XLSX."""
+    return ingest_business_rows(iter_business_rows(path), batch_size=batch_size, rejected_path=rejected_path)
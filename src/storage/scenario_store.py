@@ -0,0 +1,217 @@
+"""Indexed storage for scenarios built by create_scenario."""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+from src.models.financial_data import BusinessInputData, ScenarioData
+from src.observability.instrument import current_conversation
+
+logger = logging.getLogger(__name__)
+
+
+def make_scenario_id(scenario: ScenarioData) -> str:
+    """ID estable de un escenario: su tipo, o el nombre normalizado si es personalizado."""
+    if scenario.tipo != "personalizado":
+        return scenario.tipo
+    slug = re.sub(r"[^a-z0-9]+", "_", scenario.nombre_escenario.lower()).strip("_")
+    return slug or "personalizado"
+
+
+def scenario_scope(data: BusinessInputData, conversation: Optional[str] = None) -> str:
+    """
+    Ámbito de los escenarios de un negocio: la conversación (thread_id de LangGraph)
+    más un digest de los datos validados.
+
+    Así dos conversaciones, o dos negocios con el mismo nombre y cifras distintas,
+    no comparten ni sobrescriben sus escenarios.
+    """
+    conversation = conversation if conversation is not None else current_conversation()
+    digest = hashlib.sha256(data.model_dump_json().encode("utf-8")).hexdigest()[:16]
+    return f"{conversation or '-'}:{digest}"
+
+
+class InMemoryScenarioStore:
+    """Almacén de escenarios en memoria con índices por ámbito y por tipo.
+
+    Los escenarios se identifican por (ámbito, ID); guardar el mismo ID de nuevo
+    reemplaza el escenario anterior. Se conservan los `max_scopes` ámbitos usados
+    más recientemente; al superarlos se descartan los escenarios del más antiguo.
+    """
+
+    def __init__(self, max_scopes: int = 1024):
+        self.max_scopes = max_scopes
+        self._scenarios: Dict[tuple, ScenarioData] = {}
+        self._by_scope: "OrderedDict[str, Dict[str, None]]" = OrderedDict()
+        self._by_type: Dict[str, Dict[tuple, None]] = defaultdict(dict)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _touch(self, scope: str) -> Dict[str, None]:
+        ids = self._by_scope.setdefault(scope, {})
+        self._by_scope.move_to_end(scope)
+        while len(self._by_scope) > self.max_scopes:
+            expired, expired_ids = self._by_scope.popitem(last=False)
+            for scenario_id in expired_ids:
+                scenario = self._scenarios.pop((expired, scenario_id))
+                self._by_type[scenario.tipo].pop((expired, scenario_id), None)
+            self.evictions += 1
+        return ids
+
+    def save(self, scope: str, scenario: ScenarioData, scenario_id: Optional[str] = None) -> str:
+        """Guarda un escenario y devuelve su ID."""
+        scenario_id = scenario_id or make_scenario_id(scenario)
+        key = (scope, scenario_id)
+        with self._lock:
+            previous = self._scenarios.get(key)
+            if previous is not None:
+                self._by_type[previous.tipo].pop(key, None)
+            self._scenarios[key] = scenario
+            self._touch(scope)[scenario_id] = None
+            self._by_type[scenario.tipo][key] = None
+        return scenario_id
+
+    def get(self, scope: str, scenario_id: str) -> Optional[ScenarioData]:
+        """Busca un escenario por ámbito e ID."""
+        return self.get_many(scope, [scenario_id])[0]
+
+    def get_many(self, scope: str, scenario_ids: List[str]) -> List[Optional[ScenarioData]]:
+        """Busca varios escenarios en una sola llamada (None para los inexistentes)."""
+        with self._lock:
+            if scope in self._by_scope:
+                self._by_scope.move_to_end(scope)
+            return [self._scenarios.get((scope, scenario_id)) for scenario_id in scenario_ids]
+
+    def list_ids(self, scope: str) -> List[str]:
+        """IDs de los escenarios de un ámbito, en orden de creación."""
+        with self._lock:
+            return list(self._by_scope.get(scope, {}))
+
+    def find_by_type(self, tipo: str, scope: Optional[str] = None) -> List[ScenarioData]:
+        """Escenarios de un tipo, opcionalmente filtrados por ámbito."""
+        with self._lock:
+            return [
+                self._scenarios[key]
+                for key in self._by_type.get(tipo, {})
+                if scope is None or key[0] == scope
+            ]
+
+    def clear(self) -> None:
+        """Elimina todos los escenarios."""
+        with self._lock:
+            self._scenarios.clear()
+            self._by_scope.clear()
+            self._by_type.clear()
+
+    def __len__(self) -> int:
+        return len(self._scenarios)
+
+
+class SQLiteScenarioStore:
+    """Almacén de escenarios persistente en SQLite con la misma interfaz que el de memoria.
+
+    La columna `negocio` guarda el ámbito de cada escenario (ver `scenario_scope`).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS scenarios (
+                    negocio TEXT NOT NULL,
+                    scenario_id TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    creado INTEGER NOT NULL,
+                    PRIMARY KEY (negocio, scenario_id)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scenarios_tipo ON scenarios (tipo, negocio)")
+
+    def save(self, scope: str, scenario: ScenarioData, scenario_id: Optional[str] = None) -> str:
+        scenario_id = scenario_id or make_scenario_id(scenario)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO scenarios (negocio, scenario_id, tipo, payload, creado)
+                   VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(creado), 0) + 1 FROM scenarios))
+                   ON CONFLICT (negocio, scenario_id) DO UPDATE SET tipo = excluded.tipo, payload = excluded.payload""",
+                (scope, scenario_id, scenario.tipo, scenario.model_dump_json()),
+            )
+        return scenario_id
+
+    def get(self, scope: str, scenario_id: str) -> Optional[ScenarioData]:
+        return self.get_many(scope, [scenario_id])[0]
+
+    def get_many(self, scope: str, scenario_ids: List[str]) -> List[Optional[ScenarioData]]:
+        placeholders = ", ".join("?" for _ in scenario_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT scenario_id, payload FROM scenarios WHERE negocio = ? AND scenario_id IN ({placeholders})",
+                (scope, *scenario_ids),
+            ).fetchall()
+        found = {scenario_id: ScenarioData.model_validate_json(payload) for scenario_id, payload in rows}
+        return [found.get(scenario_id) for scenario_id in scenario_ids]
+
+    def list_ids(self, scope: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT scenario_id FROM scenarios WHERE negocio = ? ORDER BY creado", (scope,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def find_by_type(self, tipo: str, scope: Optional[str] = None) -> List[ScenarioData]:
+        query = "SELECT payload FROM scenarios WHERE tipo = ?"
+        params: tuple = (tipo,)
+        if scope is not None:
+            query += " AND negocio = ?"
+            params += (scope,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY creado", params).fetchall()
+        return [ScenarioData.model_validate_json(row[0]) for row in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+
+_store = None
+
+
+def get_scenario_store():
+    """Devuelve el almacén global; usa SQLite si está definida `ANAFI_SCENARIO_DB`."""
+    global _store
+    if _store is None:
+        db_path = os.getenv("ANAFI_SCENARIO_DB")
+        _store = SQLiteScenarioStore(db_path) if db_path else InMemoryScenarioStore()
+        logger.info(f"Almacén de escenarios: {type(_store).__name__}")
+    return _store
+
+
+def set_scenario_store(store) -> None:
+    """Reemplaza el almacén global (ej. en tests o para usar otro backend)."""
+    global _store
+    _store = store
+
+
+def scenario_columns(scenarios: List[ScenarioData]) -> Dict[str, np.ndarray]:
+    """Extrae las métricas de varios escenarios como columnas de NumPy."""
+    precio = np.array([s.precio_venta for s in scenarios], dtype=np.float64)
+    volumen = np.array([s.volumen_ventas for s in scenarios], dtype=np.float64)
+    return {
+        "ventas_totales": precio * volumen,
+        "utilidad_neta": np.array([s.metricas_calculadas.utilidad_neta for s in scenarios]),
+        "ros": np.array([s.metricas_calculadas.rentabilidad_sobre_ventas for s in scenarios]),
+        "punto_equilibrio_unidades": np.array([s.metricas_calculadas.punto_equilibrio_unidades for s in scenarios]),
+        "punto_equilibrio_dinero": np.array([s.metricas_calculadas.punto_equilibrio_dinero for s in scenarios]),
+    }
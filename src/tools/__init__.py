@@ -1,12 +1,81 @@
+import importlib
+import threading
+
+from src.observability.instrument import instrument_tool
+from .cache import memoize_tool, tool_cache
+# Estos módulos se llaman igual que su herramienta: importarlos después sobrescribiría la
+# herramienta con el módulo, así que se cargan aquí (son ligeros: solo el motor de métricas)
 from .validate_financial_data import validate_financial_data
 from .save_business_data import save_business_data
-from .calculate_costs import calculate_total_costs
-from .calculate_breakeven import calculate_breakeven_point
 from .calculate_profit import calculate_profit
-from .calculate_profitability import calculate_profitability_ratios
-from .advanced_analysis_tools import project_cashflow, generate_income_statement, create_business_canvas
-from .scenario_analysis_tools import create_scenario, compare_scenarios, simulate_parameter_change
-from .report_generation_tools import generate_charts, create_pdf_report, create_excel_report, generate_alerts
+
+# Las demás herramientas se importan la primera vez que se usan: los reportes cargan
+# matplotlib, reportlab, openpyxl y langchain, que no hacen falta para arrancar el grafo.
+_LAZY_TOOLS = {
+    "calculate_total_costs": ".calculate_costs",
+    "calculate_breakeven_point": ".calculate_breakeven",
+    "calculate_profitability_ratios": ".calculate_profitability",
+    "calculate_target_value": ".calculate_goal_seek",
+    "project_cashflow": ".advanced_analysis_tools",
+    "generate_income_statement": ".advanced_analysis_tools",
+    "create_business_canvas": ".advanced_analysis_tools",
+    "create_scenario": ".scenario_analysis_tools",
+    "compare_scenarios": ".scenario_analysis_tools",
+    "simulate_parameter_change": ".scenario_analysis_tools",
+    "simulate_sensitivity_grid": ".scenario_analysis_tools",
+    "generate_charts": ".report_generation_tools",
+    "create_pdf_report": ".report_generation_tools",
+    "create_excel_report": ".report_generation_tools",
+    "generate_alerts": ".report_generation_tools",
+}
+
+# Las herramientas expuestas a los agentes reutilizan resultados de llamadas idénticas.
+# create_scenario y compare_scenarios leen/escriben el almacén de escenarios, por lo que no se memoizan.
+# save_business_data, simulate_sensitivity_grid y las herramientas de reportes tampoco: devuelven un
+# Command ligado a la llamada (tool_call_id) que escribe en el estado; lo costoso (métricas, gráficos)
+# ya se reutiliza dentro de ellas y la rejilla se evalúa vectorizada.
+_MEMOIZED = {
+    "validate_financial_data",
+    "calculate_total_costs",
+    "calculate_breakeven_point",
+    "calculate_profit",
+    "calculate_profitability_ratios",
+    "calculate_target_value",
+    "project_cashflow",
+    "generate_income_statement",
+    "create_business_canvas",
+    "simulate_parameter_change",
+}
+
+
+def _prepare(name: str, tool):
+    """Memoiza (si corresponde) e instrumenta una herramienta; la latencia incluye los aciertos de caché."""
+    return instrument_tool(memoize_tool(tool) if name in _MEMOIZED else tool, name=name)
+
+
+validate_financial_data = _prepare("validate_financial_data", validate_financial_data)
+save_business_data = _prepare("save_business_data", save_business_data)
+calculate_profit = _prepare("calculate_profit", calculate_profit)
+
+_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """Resuelve una herramienta en su primer uso y la deja fija en el paquete."""
+    module_name = _LAZY_TOOLS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    with _lock:
+        if name not in globals():
+            tool = getattr(importlib.import_module(module_name, __name__), name)
+            globals()[name] = _prepare(name, tool)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_TOOLS))
+
 
 __all__ = [
     "validate_financial_data",
@@ -15,12 +84,14 @@ __all__ = [
     "calculate_breakeven_point",
     "calculate_profit",
     "calculate_profitability_ratios",
+    "calculate_target_value",
     "project_cashflow",
     "generate_income_statement",
     "create_business_canvas",
     "create_scenario",
     "compare_scenarios",
     "simulate_parameter_change",
+    "simulate_sensitivity_grid",
     "generate_charts",
     "create_pdf_report",
     "create_excel_report",
@@ -1,6 +1,10 @@
 """Advanced Analysis Agent tools - Complete implementations."""
 import logging
-from src.models.financial_data import BusinessInputData, MonthlyFlow, CashflowProjection
+import math
+import numpy as np
+from src.engine.cashflow import project_cashflow_series
+from src.engine.metrics import compute_metrics, load_business_data
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
@@ -8,88 +12,75 @@ logger = logging.getLogger(__name__)
 def project_cashflow(
     data: dict,
     months: int = 12,
+    frequency: str = "mensual",
+    growth_rate: float = 0.0,
+    cost_inflation: float = 0.0,
+    seasonality: list = None,
+    investments: list = None,
 ) -> str:
     """
-    Proyecta flujo de efectivo mensual.
+    Proyecta flujo de efectivo mensual o diario hasta 600 meses (50 años).
     
-    Asume que las ventas y costos se mantienen constantes mes a mes.
+    Args:
+        data: Diccionario con los datos del negocio
+        months: Horizonte de la proyección en meses
+        frequency: "mensual" o "diaria"
+        growth_rate: Crecimiento anual del volumen de ventas (%)
+        cost_inflation: Inflación anual de costos (%)
+        seasonality: 12 factores de estacionalidad del volumen (ene-dic), ej. [0.8, 0.9, ..., 1.3]
+        investments: Inversiones puntuales, ej. [{"periodo": 13, "monto": 5000}]
+    
+    Sin crecimiento, inflación ni estacionalidad, ventas y costos se mantienen constantes.
     """
     try:
-        # Validar parámetros
-        if months < 1 or months > 24:
-            return "❌ Error: El número de meses debe estar entre 1 y 24."
-        
         # Validar datos de entrada
-        business_data = BusinessInputData(**data)
-        
-        # Calcular flujos mensuales
-        ventas_mensuales = business_data.precio_venta_unitario * business_data.volumen_ventas_estimado
-        costos_variables_mensuales = business_data.costo_variable_unitario * business_data.volumen_ventas_estimado
-        costos_totales_mensuales = business_data.costos_fijos_mensuales + costos_variables_mensuales
-        flujo_neto_mensual = ventas_mensuales - costos_totales_mensuales
+        business_data = load_business_data(data)
         
         # Proyectar flujos
-        flujos_mensuales = []
-        saldo_acumulado = 0
-        meses_negativos_consecutivos = 0
-        
-        for mes in range(1, months + 1):
-            saldo_acumulado += flujo_neto_mensual
-            
-            flujo = MonthlyFlow(
-                mes=mes,
-                entradas=ventas_mensuales,
-                salidas=costos_totales_mensuales,
-                flujo_neto=flujo_neto_mensual,
-                saldo_acumulado=saldo_acumulado
-            )
-            flujos_mensuales.append(flujo)
-            
-            # Contar meses negativos consecutivos
-            if flujo_neto_mensual < 0:
-                meses_negativos_consecutivos += 1
-            else:
-                meses_negativos_consecutivos = 0
-        
-        # Generar alertas
-        alertas = []
-        if flujo_neto_mensual < 0:
-            alertas.append("⚠️ ALERTA CRÍTICA: El flujo neto mensual es NEGATIVO. El negocio pierde dinero cada mes.")
-        
-        if meses_negativos_consecutivos > 3:
-            alertas.append(f"⚠️ ALERTA DE LIQUIDEZ: Flujo negativo durante {meses_negativos_consecutivos} meses consecutivos.")
-        
-        if saldo_acumulado < 0:
-            alertas.append(f"⚠️ ALERTA DE INSOLVENCIA: El saldo acumulado es negativo (${saldo_acumulado:,.2f}).")
-        
-        # Crear proyección
-        projection = CashflowProjection(
-            proyeccion_meses=months,
-            flujos_mensuales=flujos_mensuales,
-            alertas=alertas
+        series = project_cashflow_series(
+            business_data,
+            months=months,
+            frequency=frequency,
+            growth_rate=growth_rate,
+            cost_inflation=cost_inflation,
+            seasonality=seasonality,
+            investments=investments,
         )
         
         # Generar mensaje
-        alertas_msg = "\n".join(alertas) if alertas else ""
+        alertas_msg = "\n".join(series.alertas) if series.alertas else ""
+        periodo = "Flujo mensual" if frequency == "mensual" else "Flujo diario"
+        saldo_final = series.saldo_acumulado[-1]
+        peor = int(np.argmin(series.saldo_acumulado))
         
-        message = f"""✅ Proyección de flujo de efectivo generada ({months} meses):
-
-Flujo mensual:
-- Entradas: ${ventas_mensuales:,.2f}
-- Salidas: ${costos_totales_mensuales:,.2f}
-- Flujo neto: ${flujo_neto_mensual:,.2f}
+        ultimo_periodo = ""
+        if not np.isclose(series.flujo_neto[0], series.flujo_neto[-1]):
+            ultimo_periodo = f"""
+{periodo} (último periodo):
+- Entradas: ${series.entradas[-1]:,.2f}
+- Salidas: ${series.salidas[-1]:,.2f}
+- Flujo neto: ${series.flujo_neto[-1]:,.2f}
+"""
+        
+        message = f"""✅ Proyección de flujo de efectivo generada ({months} meses, {len(series)} periodos):
 
-Saldo acumulado al mes {months}: ${saldo_acumulado:,.2f}
+{periodo}:
+- Entradas: ${series.entradas[0]:,.2f}
+- Salidas: ${series.salidas[0]:,.2f}
+- Flujo neto: ${series.flujo_neto[0]:,.2f}
+{ultimo_periodo}
+Saldo acumulado al mes {months}: ${saldo_final:,.2f}
+Saldo mínimo: ${series.saldo_acumulado[peor]:,.2f} (periodo {peor + 1})
 
 {alertas_msg}"""
         
-        logger.info(f"Proyección de flujo de efectivo: {months} meses, saldo final: ${saldo_acumulado:,.2f}")
+        logger.info(f"Proyección de flujo de efectivo: {months} meses, saldo final: ${saldo_final:,.2f}")
         
         return message
         
     except Exception as e:
         logger.error(f"Error proyectando flujo de efectivo: {str(e)}")
-        return f"❌ Error al proyectar flujo de efectivo: {str(e)}"
+        return tool_error("Error al proyectar flujo de efectivo", e)
 
 
 def generate_income_statement(data: dict) -> str:
@@ -105,18 +96,19 @@ def generate_income_statement(data: dict) -> str:
     """
     try:
         # Validar datos de entrada
-        business_data = BusinessInputData(**data)
+        business_data = load_business_data(data)
         
-        # Calcular componentes del estado de resultados
-        ventas_totales = business_data.precio_venta_unitario * business_data.volumen_ventas_estimado
-        costos_variables_totales = business_data.costo_variable_unitario * business_data.volumen_ventas_estimado
-        utilidad_bruta = ventas_totales - costos_variables_totales
-        costos_fijos = business_data.costos_fijos_mensuales
-        utilidad_neta = utilidad_bruta - costos_fijos
+        # Componentes del estado de resultados
+        metrics = compute_metrics(business_data)
+        ventas_totales = metrics.ventas_totales
+        costos_variables_totales = metrics.costos_variables_totales
+        utilidad_bruta = metrics.utilidad_bruta
+        costos_fijos = metrics.costos_fijos
+        utilidad_neta = metrics.utilidad_neta
         
-        # Calcular porcentajes
-        margen_bruto_pct = (utilidad_bruta / ventas_totales * 100) if ventas_totales > 0 else 0
-        margen_neto_pct = (utilidad_neta / ventas_totales * 100) if ventas_totales > 0 else 0
+        # Porcentajes
+        margen_bruto_pct = metrics.margen_bruto_porcentaje
+        margen_neto_pct = metrics.rentabilidad_sobre_ventas
         
         # Crear estado de resultados
         income_statement = {
@@ -157,7 +149,7 @@ Ventas Totales                ${ventas_totales:>12,.2f}
         
     except Exception as e:
         logger.error(f"Error generando estado de resultados: {str(e)}")
-        return f"❌ Error al generar estado de resultados: {str(e)}"
+        return tool_error("Error al generar estado de resultados", e)
 
 
 def create_business_canvas(data: dict) -> str:
@@ -166,13 +158,14 @@ def create_business_canvas(data: dict) -> str:
     """
     try:
         # Validar datos
-        business_data = BusinessInputData(**data)
+        business_data = load_business_data(data)
         
-        # Calcular métricas básicas
-        ventas_totales = business_data.precio_venta_unitario * business_data.volumen_ventas_estimado
-        costos_totales = business_data.costos_fijos_mensuales + (business_data.costo_variable_unitario * business_data.volumen_ventas_estimado)
-        utilidad_neta = ventas_totales - costos_totales
-        ros = (utilidad_neta / ventas_totales * 100) if ventas_totales > 0 else 0
+        # Métricas básicas
+        metrics = compute_metrics(business_data)
+        ventas_totales = metrics.ventas_totales
+        costos_totales = metrics.costos_totales
+        ros = metrics.rentabilidad_sobre_ventas
+        pe_unidades = metrics.punto_equilibrio_unidades
         
         # Crear Business Model Canvas
         canvas = {
@@ -190,7 +183,7 @@ def create_business_canvas(data: dict) -> str:
                     "descripcion": "Valor ofrecido a los clientes",
                     "metricas_relacionadas": {
                         "precio_venta_unitario": f"${business_data.precio_venta_unitario:,.2f}",
-                        "margen_contribucion": f"${business_data.precio_venta_unitario - business_data.costo_variable_unitario:,.2f}"
+                        "margen_contribucion": f"${metrics.margen_contribucion:,.2f}"
                     }
                 },
                 "canales": {
@@ -221,7 +214,7 @@ def create_business_canvas(data: dict) -> str:
                 "actividades_clave": {
                     "descripcion": "Actividades principales del negocio",
                     "metricas_relacionadas": {
-                        "costos_variables_totales": f"${business_data.costo_variable_unitario * business_data.volumen_ventas_estimado:,.2f}/mes"
+                        "costos_variables_totales": f"${metrics.costos_variables_totales:,.2f}/mes"
                     }
                 },
                 "alianzas_clave": {
@@ -236,7 +229,7 @@ def create_business_canvas(data: dict) -> str:
                         "costos_fijos": f"${business_data.costos_fijos_mensuales:,.2f}/mes",
                         "costos_variables": f"${business_data.costo_variable_unitario:,.2f}/unidad",
                         "costos_totales": f"${costos_totales:,.2f}/mes",
-                        "punto_equilibrio": f"{business_data.costos_fijos_mensuales / (business_data.precio_venta_unitario - business_data.costo_variable_unitario):.0f} unidades"
+                        "punto_equilibrio": f"{pe_unidades:.0f} unidades" if not math.isnan(pe_unidades) else "No alcanzable (precio ≤ costo variable)"
                     }
                 }
             }
@@ -257,7 +250,7 @@ Los 9 bloques del canvas han sido relacionados con tus métricas financieras:
         
     except Exception as e:
         logger.error(f"Error creando Business Canvas: {str(e)}")
-        return f"❌ Error al crear Business Canvas: {str(e)}"
+        return tool_error("Error al crear Business Canvas", e)
 
 
 
@@ -0,0 +1,139 @@
+"""Content-addressed memoization of tool results with LRU/TTL eviction."""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from pydantic import ValidationError
+from src.engine.metrics import load_business_data
+from src.observability.instrument import record_cache_request
+
+logger = logging.getLogger(__name__)
+
+
+class ToolResultCache:
+    """Caché LRU acotada con expiración por tiempo (TTL) y contadores de aciertos.
+
+    Args:
+        maxsize: Número máximo de resultados almacenados
+        ttl: Segundos de vida de cada resultado (None = sin expiración)
+        timer: Reloj monotónico usado para la expiración
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 3600.0,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Devuelve (encontrado, valor) y actualiza los contadores."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or self._timer() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        """Almacena un resultado, expulsando el menos usado si se excede el tamaño."""
+        with self._lock:
+            self._entries[key] = (self._timer(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Resumen de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Caché compartida por todas las herramientas exportadas en src/tools/__init__.py
+tool_cache = ToolResultCache()
+
+
+def _canonical_argument(name: str, value: Any) -> Any:
+    """Normaliza un argumento; los datos del negocio se validan y se vuelcan en orden fijo."""
+    if name == "data" and isinstance(value, dict):
+        try:
+            return load_business_data(value).model_dump(mode="json")
+        except ValidationError:
+            return value
+    return value
+
+
+def make_cache_key(tool_name: str, arguments: dict) -> str:
+    """Calcula el hash canónico (SHA-256) de una llamada a herramienta."""
+    canonical = {name: _canonical_argument(name, value) for name, value in arguments.items()}
+    payload = json.dumps([tool_name, canonical], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def memoize_tool(func: Callable[..., str], cache: Optional[ToolResultCache] = None) -> Callable[..., str]:
+    """
+    Envuelve una herramienta para reutilizar su resultado ante argumentos idénticos.
+
+    Los mensajes de error (que empiezan con "❌") no se almacenan. La firma y el
+    docstring se conservan para que el agente vea la misma herramienta.
+    """
+    cache = cache if cache is not None else tool_cache
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = make_cache_key(func.__name__, bound.arguments)
+
+        found, result = cache.get(key)
+        record_cache_request(func.__name__, found)
+        if found:
+            logger.debug(f"Caché: acierto para {func.__name__}")
+            return result
+
+        result = func(*args, **kwargs)
+        if not (isinstance(result, str) and result.startswith("❌")):
+            cache.set(key, result)
+        return result
+
+    wrapper.cache = cache
+    return wrapper
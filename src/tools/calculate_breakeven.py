@@ -1,4 +1,7 @@
 import logging
+from src.engine.alerts import get_rule_book, metric_columns
+from src.engine.metrics import compute_batch_metrics
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
@@ -23,20 +26,21 @@ def calculate_breakeven_point(
     - Punto de Equilibrio (dinero) = Punto de Equilibrio (unidades) × Precio de Venta
     """
     try:
-        # Calcular margen de contribución unitario
-        margen_contribucion = precio_venta_unitario - costo_variable_unitario
+        # Calcular métricas con el motor vectorizado
+        batch = compute_batch_metrics(
+            costos_fijos_mensuales, costo_variable_unitario, precio_venta_unitario, volumen_ventas_estimado
+        )
+        metrics = batch.row(0)
         
-        if margen_contribucion <= 0:
+        if metrics["margen_contribucion"] <= 0:
             return "❌ Error: El precio de venta debe ser mayor que el costo variable unitario."
         
-        # Calcular punto de equilibrio
-        pe_unidades = costos_fijos_mensuales / margen_contribucion
-        pe_dinero = pe_unidades * precio_venta_unitario
+        pe_unidades = metrics["punto_equilibrio_unidades"]
+        pe_dinero = metrics["punto_equilibrio_dinero"]
         
         # Verificar alerta
-        alerta = ""
-        if pe_unidades > volumen_ventas_estimado:
-            alerta = f"\n\n⚠️ ALERTA CRÍTICA: El punto de equilibrio ({pe_unidades:.0f} unidades) es MAYOR que las ventas proyectadas ({volumen_ventas_estimado} unidades). El negocio NO sería viable con estos parámetros."
+        alertas = get_rule_book().evaluate("equilibrio", metric_columns(batch, volumen_ventas_estimado)).messages()
+        alerta = "\n\n" + "\n".join(alertas) if alertas else ""
         
         message = f"""✅ Punto de equilibrio calculado:
 - En unidades: {pe_unidades:.2f} unidades/mes
@@ -48,4 +52,4 @@ def calculate_breakeven_point(
         
     except Exception as e:
         logger.error(f"Error calculando punto de equilibrio: {str(e)}")
-        return f"❌ Error al calcular punto de equilibrio: {str(e)}"
+        return tool_error("Error al calcular punto de equilibrio", e)
@@ -1,4 +1,6 @@
 import logging
+from src.engine.metrics import compute_batch_metrics
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +22,12 @@ def calculate_total_costs(
     Costos Totales = Costos Fijos + (Costo Variable Unitario × Volumen de Ventas)
     """
     try:
-        # Calcular costos variables totales
-        costos_variables_totales = costo_variable_unitario * volumen_ventas_estimado
-        
-        # Calcular costos totales
-        costos_totales = costos_fijos_mensuales + costos_variables_totales
+        # Calcular costos con el motor vectorizado (el precio no interviene en los costos)
+        metrics = compute_batch_metrics(
+            costos_fijos_mensuales, costo_variable_unitario, 0.0, volumen_ventas_estimado
+        ).row(0)
+        costos_variables_totales = metrics["costos_variables_totales"]
+        costos_totales = metrics["costos_totales"]
         
         message = f"""✅ Costos calculados:
 - Costos fijos: ${costos_fijos_mensuales:,.2f}/mes
@@ -37,4 +40,4 @@ def calculate_total_costs(
         
     except Exception as e:
         logger.error(f"Error calculando costos: {str(e)}")
-        return f"❌ Error al calcular costos: {str(e)}"
+        return tool_error("Error al calcular costos", e)
@@ -0,0 +1,95 @@
+import logging
+import math
+from typing import Optional
+from src.engine.goal_seek import goal_seek_batch
+from src.observability.instrument import tool_error
+
+logger = logging.getLogger(__name__)
+
+# Unidades con las que se presenta cada objetivo y cada variable
+_OBJECTIVE_LABELS = {
+    "utilidad_neta": ("utilidad neta", "${:,.2f}/mes"),
+    "ros": ("ROS", "{:.2f}%"),
+    "roi": ("ROI anual", "{:.2f}%"),
+}
+_VARIABLE_LABELS = {
+    "precio_venta": ("Precio de venta unitario", "${:,.2f}"),
+    "costo_variable": ("Costo variable unitario", "${:,.2f}"),
+    "costo_fijo": ("Costos fijos mensuales", "${:,.2f}"),
+    "volumen_ventas": ("Volumen de ventas mensual", "{:,.2f} unidades"),
+}
+
+
+def calculate_target_value(
+    variable: str,
+    objetivo: str,
+    valor_objetivo: float,
+    precio_venta_unitario: float,
+    costo_variable_unitario: float,
+    costos_fijos_mensuales: float,
+    volumen_ventas_estimado: int,
+    inversion_inicial: Optional[float] = None,
+) -> str:
+    """
+    Calcula el valor que debe tomar una variable para alcanzar una meta (goal seek).
+
+    Args:
+        variable: Variable a despejar: precio_venta, costo_variable, costo_fijo o volumen_ventas
+        objetivo: Meta: utilidad_neta ($/mes), ros (%) o roi (% anual)
+        valor_objetivo: Valor de la meta (ej. 5000 para $5,000/mes o 25 para 25%)
+        precio_venta_unitario: Precio de venta por unidad
+        costo_variable_unitario: Costo variable por unidad
+        costos_fijos_mensuales: Costos fijos mensuales del negocio
+        volumen_ventas_estimado: Volumen de ventas estimado mensual
+        inversion_inicial: Inversión inicial (requerida para la meta de ROI)
+
+    Las demás variables se mantienen fijas. Ejemplo: "¿a qué precio llego a $5,000 de utilidad?"
+    → variable="precio_venta", objetivo="utilidad_neta", valor_objetivo=5000.
+    """
+    try:
+        result = goal_seek_batch(
+            {
+                "costos_fijos_mensuales": costos_fijos_mensuales,
+                "costo_variable_unitario": costo_variable_unitario,
+                "precio_venta_unitario": precio_venta_unitario,
+                "volumen_ventas_estimado": volumen_ventas_estimado,
+                "inversion_inicial": inversion_inicial,
+            },
+            variable,
+            objetivo,
+            valor_objetivo,
+        )
+
+        objetivo_label, objetivo_fmt = _OBJECTIVE_LABELS.get(objetivo, (objetivo, "{:,.2f}"))
+        variable_label, variable_fmt = _VARIABLE_LABELS[variable]
+        meta = objetivo_fmt.format(valor_objetivo)
+
+        valor = float(result.valor[0])
+        if math.isnan(valor):
+            if objetivo == "roi" and not inversion_inicial:
+                return "❌ Error: Se requiere la inversión inicial para calcular una meta de ROI."
+            return (
+                f"❌ La meta de {objetivo_label} de {meta} no es alcanzable modificando solo "
+                f"{variable_label.lower()} (el valor requerido queda fuera del rango válido)."
+            )
+
+        actual = float(result.valor_actual[0])
+        cambio = float(result.cambio_porcentual[0])
+        cambio_texto = f"{cambio:+.2f}%" if math.isfinite(cambio) else "n/d"
+
+        detalle = ""
+        if variable == "volumen_ventas":
+            detalle = f"\n- Equivale a vender al menos {math.ceil(valor - 1e-9):,} unidades/mes"
+
+        message = f"""✅ Meta de {objetivo_label} de {meta}:
+- {variable_label} requerido: {variable_fmt.format(valor)}
+- Valor actual: {variable_fmt.format(actual)} (cambio: {cambio_texto}){detalle}
+- Método: {result.metodo}"""
+
+        logger.info(f"Goal seek {variable} → {objetivo}={valor_objetivo}: {valor:,.4f} ({result.metodo})")
+
+        return message
+
+    except Exception as e:
+        logger.error(f"Error calculando valor objetivo: {str(e)}")
+        return tool_error("Error al calcular valor objetivo", e)
@@ -1,4 +1,7 @@
 import logging
+from src.engine.alerts import get_rule_book, metric_columns
+from src.engine.metrics import compute_batch_metrics
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
@@ -25,23 +28,18 @@ def calculate_profit(
     - Utilidad Neta = Ventas Totales - Costos Totales
     """
     try:
-        # Calcular ventas totales
-        ventas_totales = precio_venta_unitario * volumen_ventas_estimado
-        
-        # Calcular costos
-        costos_variables_totales = costo_variable_unitario * volumen_ventas_estimado
-        costos_totales = costos_fijos_mensuales + costos_variables_totales
-        
-        # Calcular utilidades
-        utilidad_bruta = ventas_totales - costos_variables_totales
-        utilidad_neta = ventas_totales - costos_totales
+        # Calcular ventas y utilidades con el motor vectorizado
+        batch = compute_batch_metrics(
+            costos_fijos_mensuales, costo_variable_unitario, precio_venta_unitario, volumen_ventas_estimado
+        )
+        metrics = batch.row(0)
+        ventas_totales = metrics["ventas_totales"]
+        utilidad_bruta = metrics["utilidad_bruta"]
+        utilidad_neta = metrics["utilidad_neta"]
         
         # Verificar alertas
-        alerta = ""
-        if utilidad_neta < 0:
-            alerta = "\n\n⚠️ ALERTA: El negocio está generando PÉRDIDAS. La utilidad neta es negativa."
-        elif utilidad_neta < (ventas_totales * 0.10):
-            alerta = "\n\n⚠️ ADVERTENCIA: La utilidad neta es menor al 10% de las ventas. Considera optimizar costos o aumentar precios."
+        alertas = get_rule_book().evaluate("utilidad", metric_columns(batch, volumen_ventas_estimado)).messages()
+        alerta = "\n\n" + "\n".join(alertas) if alertas else ""
         
         message = f"""✅ Utilidades calculadas:
 - Ventas totales: ${ventas_totales:,.2f}/mes
@@ -54,4 +52,4 @@ def calculate_profit(
         
     except Exception as e:
         logger.error(f"Error calculando utilidad: {str(e)}")
-        return f"❌ Error al calcular utilidad: {str(e)}"
+        return tool_error("Error al calcular utilidad", e)
@@ -1,4 +1,8 @@
 import logging
+import math
+from src.engine.alerts import get_rule_book, metric_columns
+from src.engine.metrics import compute_batch_metrics
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +29,25 @@ def calculate_profitability_ratios(
     - ROI (Rentabilidad sobre Inversión) = (Utilidad Neta / Inversión Inicial) × 100
     """
     try:
-        # Calcular ventas y utilidad
-        ventas_totales = precio_venta_unitario * volumen_ventas_estimado
-        costos_variables_totales = costo_variable_unitario * volumen_ventas_estimado
-        costos_totales = costos_fijos_mensuales + costos_variables_totales
-        utilidad_neta = ventas_totales - costos_totales
-        
-        # Calcular ROS
-        ros = (utilidad_neta / ventas_totales) * 100 if ventas_totales > 0 else 0
-        
-        # Calcular ROI (si hay inversión inicial)
-        roi_anual = None
-        if inversion_inicial and inversion_inicial > 0:
-            utilidad_neta_anual = utilidad_neta * 12  # Anualizar
-            roi_anual = (utilidad_neta_anual / inversion_inicial) * 100
+        # Calcular ROS y ROI anual con el motor vectorizado
+        batch = compute_batch_metrics(
+            costos_fijos_mensuales,
+            costo_variable_unitario,
+            precio_venta_unitario,
+            volumen_ventas_estimado,
+            inversion_inicial,
+        )
+        metrics = batch.row(0)
+        ros = metrics["rentabilidad_sobre_ventas"]
+        
+        # ROI solo existe si hay inversión inicial
+        roi_anual = metrics["rentabilidad_sobre_inversion"]
+        if math.isnan(roi_anual):
+            roi_anual = None
         
         # Verificar alertas
-        alerta = ""
-        if ros < 10:
-            alerta = "\n\n⚠️ ADVERTENCIA: La rentabilidad sobre ventas (ROS) es menor al 10%. Considera optimizar costos."
-        if roi_anual and roi_anual < 15:
-            alerta += "\n⚠️ ADVERTENCIA: El ROI anual es menor al 15%. La inversión podría no ser atractiva."
+        alertas = get_rule_book().evaluate("rentabilidad", metric_columns(batch, volumen_ventas_estimado)).messages()
+        alerta = "\n\n" + "\n".join(alertas) if alertas else ""
         
         roi_msg = f"\n- ROI anual: {roi_anual:.2f}%" if roi_anual else ""
         
@@ -58,4 +60,4 @@ def calculate_profitability_ratios(
         
     except Exception as e:
         logger.error(f"Error calculando rentabilidad: {str(e)}")
-        return f"❌ Error al calcular rentabilidad: {str(e)}"
+        return tool_error("Error al calcular rentabilidad", e)
@@ -1,190 +1,286 @@
 """Report Generation Agent tools - Complete implementations."""
 import logging
-from typing import Annotated
+import math
+import os
+from typing import Annotated, Any, Dict, List, Optional, Union
 from datetime import datetime
-from src.models.financial_data import BusinessInputData
+from langchain.tools import InjectedState, InjectedToolCallId
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+from src.engine.alerts import evaluate_business, get_rule_book
+from src.engine.cashflow import project_cashflow_series
+from src.graph.file_store import JsonFile
+from src.models.financial_data import BusinessInputData, FinancialMetrics
 from src.models.reports import Alert
+from src.observability.instrument import tool_error
+from src.reports.charts import CHARTS_DIR, chart_files, chart_inputs, chart_key, render_charts_batch
+from src.reports.context import ANALYSIS_CONTEXT_PATH, AnalysisContext, context_columns, resolve_contexts
+from src.reports.excel import write_excel_report
+from src.reports.naming import business_slug, reports_dir, resolve_report_path, unique_slugs
+from src.reports.pdf import render_pdf_batch, render_pdf_report
+from src.storage.scenario_store import get_scenario_store, scenario_scope
 
 logger = logging.getLogger(__name__)
 
+# Datos de un negocio o lista de negocios (lote); None = datos guardados en el estado
+BusinessArgument = Optional[Union[dict, List[dict]]]
 
-def generate_charts(data: dict
-) -> str:
+
+def _report_file(slug: str, name: str, batch: bool) -> str:
+    """Ruta virtual de un archivo de reporte (en los lotes, una carpeta por negocio)."""
+    return f"/reports/{slug}/{name}" if batch else f"/reports/{name}"
+
+
+def _slugs(contexts: List[AnalysisContext]) -> List[str]:
+    """Slug de cada negocio; en un lote, los nombres repetidos reciben un sufijo."""
+    return unique_slugs([context.data.nombre_negocio for context in contexts])
+
+
+def _tool_result(message: str, files: Dict[str, Any], tool_call_id: Optional[str]) -> Union[str, Command]:
     """
-    Genera descripciones de gráficos financieros.
-    
-    Nota: Esta implementación genera descripciones de gráficos.
-    Para generar gráficos reales con matplotlib, se requiere implementación adicional.
+    Resultado de una herramienta de reportes.
+
+    Llamada por el agente, devuelve un `Command` que guarda los archivos en el
+    estado junto con el mensaje; llamada directamente, devuelve solo el mensaje.
     """
-    try:
-        # Leer datos
-        input_data_file = state.get("files", {}).get("/business_data/input_data.json")
-        if not input_data_file:
-            return "❌ Error: No se encontraron datos de entrada."
-        
-        data = BusinessInputData(**input_data_file["data"])
-        
-        # Calcular métricas para gráficos
-        ventas_totales = data.precio_venta_unitario * data.volumen_ventas_estimado
-        costos_totales = data.costos_fijos_mensuales + (data.costo_variable_unitario * data.volumen_ventas_estimado)
-        pe_unidades = data.costos_fijos_mensuales / (data.precio_venta_unitario - data.costo_variable_unitario)
-        
-        # Definir gráficos a generar
-        charts = {
-            "grafico_punto_equilibrio": {
-                "tipo": "Líneas",
-                "descripcion": "Muestra costos totales, ingresos totales y punto de equilibrio",
-                "eje_x": "Unidades vendidas",
-                "eje_y": "Dinero ($)",
-                "lineas": [
-                    {"nombre": "Ingresos", "formula": f"y = {data.precio_venta_unitario} * x"},
-                    {"nombre": "Costos Totales", "formula": f"y = {data.costos_fijos_mensuales} + {data.costo_variable_unitario} * x"},
-                    {"nombre": "Punto de Equilibrio", "valor": f"{pe_unidades:.0f} unidades, ${pe_unidades * data.precio_venta_unitario:,.2f}"}
-                ]
-            },
-            "grafico_composicion_costos": {
-                "tipo": "Pastel",
-                "descripcion": "Desglose de costos fijos vs variables",
-                "datos": [
-                    {"categoria": "Costos Fijos", "valor": data.costos_fijos_mensuales, "porcentaje": f"{data.costos_fijos_mensuales/costos_totales*100:.1f}%"},
-                    {"categoria": "Costos Variables", "valor": data.costo_variable_unitario * data.volumen_ventas_estimado, "porcentaje": f"{(data.costo_variable_unitario * data.volumen_ventas_estimado)/costos_totales*100:.1f}%"}
-                ]
-            },
-            "grafico_utilidad": {
-                "tipo": "Barras",
-                "descripcion": "Comparación de ventas, costos y utilidad",
-                "datos": [
-                    {"categoria": "Ventas", "valor": ventas_totales},
-                    {"categoria": "Costos", "valor": costos_totales},
-                    {"categoria": "Utilidad", "valor": ventas_totales - costos_totales}
-                ]
-            }
-        }
-        
-        # Guardar descripciones de gráficos
-        if "files" not in state:
-            state["files"] = {}
-        
-        state["files"]["/reports/charts/chart_descriptions.json"] = {
-            "data": charts,
-            "content": json.dumps(charts, indent=2, ensure_ascii=False)
+    if tool_call_id is None:
+        return message
+    return Command(update={
+        "files": files,
+        "messages": [ToolMessage(message, tool_call_id=tool_call_id)],
+    })
+
+
+def _breakeven_text(metrics: FinancialMetrics, with_money: bool = False) -> str:
+    """Punto de equilibrio legible; con margen ≤ 0 no existe (las métricas son NaN)."""
+    if math.isnan(metrics.punto_equilibrio_unidades):
+        return "No alcanzable (precio ≤ costo variable)"
+    text = f"{metrics.punto_equilibrio_unidades:.0f} unidades"
+    return f"{text}, ${metrics.punto_equilibrio_dinero:,.2f}" if with_money else text
+
+
+def _chart_descriptions(context: AnalysisContext) -> dict:
+    """Descripción de los tres gráficos a partir de las métricas del contexto."""
+    data = context.data
+    metrics = context.metrics
+    costos_totales = metrics.costos_totales
+    costos_variables_totales = metrics.costos_variables_totales
+    
+    return {
+        "grafico_punto_equilibrio": {
+            "tipo": "Líneas",
+            "descripcion": "Muestra costos totales, ingresos totales y punto de equilibrio",
+            "eje_x": "Unidades vendidas",
+            "eje_y": "Dinero ($)",
+            "lineas": [
+                {"nombre": "Ingresos", "formula": f"y = {data.precio_venta_unitario} * x"},
+                {"nombre": "Costos Totales", "formula": f"y = {data.costos_fijos_mensuales} + {data.costo_variable_unitario} * x"},
+                {"nombre": "Punto de Equilibrio", "valor": _breakeven_text(metrics, with_money=True)}
+            ]
+        },
+        "grafico_composicion_costos": {
+            "tipo": "Pastel",
+            "descripcion": "Desglose de costos fijos vs variables",
+            "datos": [
+                {"categoria": "Costos Fijos", "valor": data.costos_fijos_mensuales, "porcentaje": f"{data.costos_fijos_mensuales/costos_totales*100:.1f}%"},
+                {"categoria": "Costos Variables", "valor": costos_variables_totales, "porcentaje": f"{costos_variables_totales/costos_totales*100:.1f}%"}
+            ]
+        },
+        "grafico_utilidad": {
+            "tipo": "Barras",
+            "descripcion": "Comparación de ventas, costos y utilidad",
+            "datos": [
+                {"categoria": "Ventas", "valor": metrics.ventas_totales},
+                {"categoria": "Costos", "valor": costos_totales},
+                {"categoria": "Utilidad", "valor": metrics.utilidad_neta}
+            ]
         }
-        
-        message = f"""✅ Descripciones de gráficos generadas:
+    }
 
-1. 📊 Gráfico de Punto de Equilibrio
+
+def generate_charts(
+    data: BusinessArgument = None,
+    fmt: str = "png",
+    workers: int = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
+    """
+    Genera los gráficos financieros (PNG o SVG) y sus descripciones.
+    
+    Args:
+        data: Datos del negocio, o lista de negocios para generar un lote en una sola
+            llamada. Si se omite, se usan los datos guardados en /business_data/input_data.json
+        fmt: Formato de imagen, "png" o "svg"
+        workers: Procesos para renderizar un lote en paralelo (None o 1 = secuencial;
+            como máximo ANAFI_MAX_WORKERS y los CPU disponibles)
+    
+    Los gráficos se dibujan con matplotlib (backend Agg) y se guardan en el
+    sistema de archivos virtual en base64; si los datos no cambiaron desde la
+    última llamada, se reutilizan las imágenes de la caché.
+    """
+    try:
+        contexts, batch = resolve_contexts(data, state)
+        
+        # Renderizar (o reutilizar de la caché) las imágenes de todo el lote
+        images = render_charts_batch([context.data for context in contexts], fmt=fmt, workers=workers)
+        
+        files = {}
+        directories = []
+        for context, slug, charts in zip(contexts, _slugs(contexts), images):
+            directory = f"{CHARTS_DIR}/{slug}" if batch else CHARTS_DIR
+            descriptions = _chart_descriptions(context)
+            for chart in charts:
+                descriptions[f"grafico_{chart}"]["archivo"] = f"{directory}/{chart}.{fmt}"
+                descriptions[f"grafico_{chart}"]["hash"] = chart_key(chart, chart_inputs(context.data), fmt)
+            files.update(chart_files(charts, fmt, directory))
+            files[f"{directory}/chart_descriptions.json"] = JsonFile(descriptions)
+            directories.append(directory)
+        
+        if batch:
+            message = f"""✅ Gráficos generados para {len(contexts)} negocios ({fmt}):
+
+{chr(10).join(f'- {context.data.nombre_negocio}: {directory}/' for context, directory in zip(contexts, directories))}"""
+        else:
+            context = contexts[0]
+            data = context.data
+            metrics = context.metrics
+            costos_totales = metrics.costos_totales
+            costos_variables_totales = metrics.costos_variables_totales
+            files[ANALYSIS_CONTEXT_PATH] = context.to_file()
+            
+            message = f"""✅ Gráficos generados:
+
+1. 📊 Gráfico de Punto de Equilibrio ({CHARTS_DIR}/punto_equilibrio.{fmt})
    - Muestra intersección de ingresos y costos
-   - Punto de equilibrio: {pe_unidades:.0f} unidades
+   - Punto de equilibrio: {_breakeven_text(metrics)}
 
-2. 🥧 Gráfico de Composición de Costos
+2. 🥧 Gráfico de Composición de Costos ({CHARTS_DIR}/composicion_costos.{fmt})
    - Costos fijos: ${data.costos_fijos_mensuales:,.2f} ({data.costos_fijos_mensuales/costos_totales*100:.1f}%)
-   - Costos variables: ${data.costo_variable_unitario * data.volumen_ventas_estimado:,.2f} ({(data.costo_variable_unitario * data.volumen_ventas_estimado)/costos_totales*100:.1f}%)
+   - Costos variables: ${costos_variables_totales:,.2f} ({costos_variables_totales/costos_totales*100:.1f}%)
 
-3. 📈 Gráfico de Utilidad
+3. 📈 Gráfico de Utilidad ({CHARTS_DIR}/utilidad.{fmt})
    - Comparación visual de ventas, costos y utilidad
 
-Guardado en: /reports/charts/chart_descriptions.json
-
-Nota: Para generar gráficos visuales, implementa matplotlib en esta herramienta."""
+Descripciones guardadas en: {CHARTS_DIR}/chart_descriptions.json"""
         
-        logger.info("Descripciones de gráficos generadas")
+        logger.info(f"Gráficos generados ({fmt}) para {len(contexts)} negocio(s)")
         
-        return message
+        return _tool_result(message, files, tool_call_id)
         
     except Exception as e:
         logger.error(f"Error generando gráficos: {str(e)}")
-        return f"❌ Error al generar gráficos: {str(e)}"
+        return tool_error("Error al generar gráficos", e)
 
 
 
-def create_pdf_report(data: dict
-) -> str:
+def build_pdf_report_structure(data: BusinessInputData, metrics: FinancialMetrics) -> dict:
+    """Estructura por secciones del reporte PDF de un negocio."""
+    utilidad_neta = metrics.utilidad_neta
+    ros = metrics.rentabilidad_sobre_ventas
+    return {
+        "metadata": {
+            "titulo": f"Análisis Financiero - {data.nombre_negocio}",
+            "fecha_generacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tipo_negocio": data.tipo_negocio
+        },
+        "secciones": [
+            {
+                "numero": 1,
+                "titulo": "Resumen Ejecutivo",
+                "contenido": {
+                    "utilidad_neta_mensual": f"${utilidad_neta:,.2f}",
+                    "rentabilidad": f"{ros:.2f}%",
+                    "punto_equilibrio": _breakeven_text(metrics),
+                    "viabilidad": "Viable" if utilidad_neta > 0 else "No viable con parámetros actuales"
+                }
+            },
+            {
+                "numero": 2,
+                "titulo": "Datos de Entrada",
+                "contenido": {
+                    "costos_fijos": f"${data.costos_fijos_mensuales:,.2f}/mes",
+                    "costo_variable_unitario": f"${data.costo_variable_unitario:,.2f}",
+                    "precio_venta": f"${data.precio_venta_unitario:,.2f}",
+                    "volumen_estimado": f"{data.volumen_ventas_estimado} unidades/mes"
+                }
+            },
+            {
+                "numero": 3,
+                "titulo": "Métricas Financieras",
+                "contenido": {
+                    "ventas_totales": f"${metrics.ventas_totales:,.2f}",
+                    "costos_totales": f"${metrics.costos_totales:,.2f}",
+                    "utilidad_neta": f"${utilidad_neta:,.2f}",
+                    "ros": f"{ros:.2f}%",
+                    "punto_equilibrio": _breakeven_text(metrics, with_money=True)
+                }
+            },
+            {
+                "numero": 4,
+                "titulo": "Gráficos",
+                "contenido": "Referencias a gráficos generados"
+            },
+            {
+                "numero": 5,
+                "titulo": "Conclusiones y Recomendaciones",
+                "contenido": _generate_recommendations(data)
+            }
+        ]
+    }
+
+
+
+def create_pdf_report(
+    data: BusinessArgument = None,
+    output_path: str = None,
+    workers: int = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
     """
-    Crea estructura de reporte PDF.
+    Crea el reporte PDF del negocio.
     
-    Nota: Esta implementación genera la estructura del reporte.
-    Para generar PDF real con reportlab, se requiere implementación adicional.
+    Args:
+        data: Datos del negocio, o lista de negocios para generar un lote en una sola
+            llamada. Si se omite, se usan los datos guardados en /business_data/input_data.json
+        output_path: Ruta del PDF relativa a la carpeta de reportes (por defecto
+            <negocio>_analisis_financiero.pdf); en un lote, subcarpeta de salida
+        workers: Procesos para renderizar un lote en paralelo (None o 1 = secuencial;
+            como máximo ANAFI_MAX_WORKERS y los CPU disponibles)
     """
     try:
-        # Leer todos los datos necesarios
-        input_data_file = state.get("files", {}).get("/business_data/input_data.json")
-        if not input_data_file:
-            return "❌ Error: No se encontraron datos de entrada."
-        
-        data = BusinessInputData(**input_data_file["data"])
-        
-        # Calcular métricas
-        ventas_totales = data.precio_venta_unitario * data.volumen_ventas_estimado
-        costos_totales = data.costos_fijos_mensuales + (data.costo_variable_unitario * data.volumen_ventas_estimado)
-        utilidad_neta = ventas_totales - costos_totales
-        ros = (utilidad_neta / ventas_totales * 100) if ventas_totales > 0 else 0
-        pe_unidades = data.costos_fijos_mensuales / (data.precio_venta_unitario - data.costo_variable_unitario)
-        
-        # Crear estructura del reporte
-        report_structure = {
-            "metadata": {
-                "titulo": f"Análisis Financiero - {data.nombre_negocio}",
-                "fecha_generacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "tipo_negocio": data.tipo_negocio
-            },
-            "secciones": [
-                {
-                    "numero": 1,
-                    "titulo": "Resumen Ejecutivo",
-                    "contenido": {
-                        "utilidad_neta_mensual": f"${utilidad_neta:,.2f}",
-                        "rentabilidad": f"{ros:.2f}%",
-                        "punto_equilibrio": f"{pe_unidades:.0f} unidades",
-                        "viabilidad": "Viable" if utilidad_neta > 0 else "No viable con parámetros actuales"
-                    }
-                },
-                {
-                    "numero": 2,
-                    "titulo": "Datos de Entrada",
-                    "contenido": {
-                        "costos_fijos": f"${data.costos_fijos_mensuales:,.2f}/mes",
-                        "costo_variable_unitario": f"${data.costo_variable_unitario:,.2f}",
-                        "precio_venta": f"${data.precio_venta_unitario:,.2f}",
-                        "volumen_estimado": f"{data.volumen_ventas_estimado} unidades/mes"
-                    }
-                },
-                {
-                    "numero": 3,
-                    "titulo": "Métricas Financieras",
-                    "contenido": {
-                        "ventas_totales": f"${ventas_totales:,.2f}",
-                        "costos_totales": f"${costos_totales:,.2f}",
-                        "utilidad_neta": f"${utilidad_neta:,.2f}",
-                        "ros": f"{ros:.2f}%",
-                        "punto_equilibrio_unidades": f"{pe_unidades:.0f}",
-                        "punto_equilibrio_dinero": f"${pe_unidades * data.precio_venta_unitario:,.2f}"
-                    }
-                },
-                {
-                    "numero": 4,
-                    "titulo": "Gráficos",
-                    "contenido": "Referencias a gráficos generados"
-                },
-                {
-                    "numero": 5,
-                    "titulo": "Conclusiones y Recomendaciones",
-                    "contenido": _generate_recommendations(utilidad_neta, ros, pe_unidades, data.volumen_ventas_estimado)
-                }
-            ]
-        }
-        
-        # Guardar estructura
-        if "files" not in state:
-            state["files"] = {}
-        
-        state["files"]["/reports/final_report_structure.json"] = {
-            "data": report_structure,
-            "content": json.dumps(report_structure, indent=2, ensure_ascii=False)
-        }
-        
-        message = f"""✅ Estructura de reporte PDF generada:
-
-📄 Reporte: {data.nombre_negocio}
+        contexts, batch = resolve_contexts(data, state)
+        
+        files = {}
+        jobs = []
+        output_dir = resolve_report_path(output_path if batch else None)
+        for context, slug in zip(contexts, _slugs(contexts)):
+            report_structure = build_pdf_report_structure(context.data, context.metrics)
+            files[_report_file(slug, "final_report_structure.json", batch)] = JsonFile(report_structure)
+            if batch or not output_path:
+                path = default_report_path(context.data.nombre_negocio, "pdf", output_dir, slug=slug)
+            else:
+                path = resolve_report_path(output_path)
+            jobs.append((report_structure, path))
+        
+        # Generar PDF (un lote se puede repartir entre procesos)
+        if batch:
+            paths = render_pdf_batch(jobs, workers=workers)
+            message = f"""✅ {len(paths)} reportes PDF generados en {output_dir}:
+
+{chr(10).join(f'- {context.data.nombre_negocio}: {path}' for context, path in zip(contexts, paths))}"""
+            logger.info(f"Lote de {len(paths)} reportes PDF generado en {output_dir}")
+            return _tool_result(message, files, tool_call_id)
+        
+        context = contexts[0]
+        report_structure, output_path = jobs[0]
+        render_pdf_report(report_structure, output_path)
+        files[ANALYSIS_CONTEXT_PATH] = context.to_file()
+        
+        message = f"""✅ Reporte PDF generado:
+
+📄 Reporte: {context.data.nombre_negocio}
 📅 Fecha: {datetime.now().strftime("%Y-%m-%d")}
 
 Secciones incluidas:
@@ -194,241 +290,190 @@ Secciones incluidas:
 4. ✅ Gráficos
 5. ✅ Conclusiones y Recomendaciones
 
-Guardado en: /reports/final_report_structure.json
-
-Nota: Para generar PDF real, implementa reportlab en esta herramienta."""
+Archivo PDF: {output_path}
+Estructura guardada en: /reports/final_report_structure.json"""
         
-        logger.info(f"Estructura de reporte PDF generada para {data.nombre_negocio}")
+        logger.info(f"Reporte PDF generado para {context.data.nombre_negocio}: {output_path}")
         
-        return message
+        return _tool_result(message, files, tool_call_id)
         
     except Exception as e:
         logger.error(f"Error creando reporte PDF: {str(e)}")
-        return f"❌ Error al crear reporte PDF: {str(e)}"
+        return tool_error("Error al crear reporte PDF", e)
 
 
-def _generate_recommendations(utilidad_neta, ros, pe_unidades, volumen_estimado):
-    """Genera recomendaciones basadas en métricas."""
-    recommendations = []
-    
-    if utilidad_neta < 0:
-        recommendations.append("⚠️ CRÍTICO: El negocio genera pérdidas. Considere reducir costos o aumentar precios.")
-    elif utilidad_neta < 1000:
-        recommendations.append("⚠️ Utilidad baja. Busque oportunidades para mejorar márgenes.")
-    else:
-        recommendations.append("✅ El negocio es rentable.")
-    
-    if ros < 10:
-        recommendations.append("⚠️ Rentabilidad sobre ventas baja (<10%). Optimice estructura de costos.")
-    elif ros < 20:
-        recommendations.append("✓ Rentabilidad aceptable. Hay espacio para mejora.")
-    else:
-        recommendations.append("✅ Excelente rentabilidad sobre ventas.")
-    
-    if pe_unidades > volumen_estimado:
-        recommendations.append("⚠️ CRÍTICO: Punto de equilibrio mayor que ventas estimadas. Revise modelo de negocio.")
-    elif pe_unidades > volumen_estimado * 0.8:
-        recommendations.append("⚠️ Punto de equilibrio muy cercano a ventas estimadas. Poco margen de seguridad.")
-    else:
-        recommendations.append("✅ Margen de seguridad adecuado sobre punto de equilibrio.")
-    
-    return recommendations
+def default_report_path(
+    nombre_negocio: str,
+    extension: str,
+    output_dir: Optional[str] = None,
+    slug: Optional[str] = None,
+) -> str:
+    """
+    Ruta de salida de un reporte a partir del nombre del negocio (en la carpeta de reportes).
 
+    Args:
+        slug: Slug ya asignado (en los lotes, sin colisiones; ver `unique_slugs`)
+    """
+    slug = slug or business_slug(nombre_negocio)
+    return os.path.join(output_dir or reports_dir(), f"{slug}_analisis_financiero.{extension}")
 
 
-def create_excel_report(data: dict
-) -> str:
+def _generate_recommendations(data: BusinessInputData):
+    """Genera recomendaciones basadas en métricas (reglas del conjunto "recomendaciones")."""
+    return evaluate_business(data, "recomendaciones").messages()
+
+
+
+def _write_workbook(context: AnalysisContext, output_path: str, cashflow_months: int) -> Dict[str, int]:
+    """Libro de Excel de un negocio con su flujo y sus escenarios guardados."""
+    data = context.data
+    store = get_scenario_store()
+    scope = scenario_scope(data)
+    scenario_ids = store.list_ids(scope)
+    scenarios = [s for s in store.get_many(scope, scenario_ids) if s is not None]
+    
+    return write_excel_report(
+        output_path,
+        data,
+        cashflow=project_cashflow_series(data, months=cashflow_months),
+        scenarios=scenarios,
+    )
+
+
+def create_excel_report(
+    data: BusinessArgument = None,
+    output_path: str = None,
+    cashflow_months: int = 12,
+    state: Annotated[Optional[dict], InjectedState] = None,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
     """
-    Crea estructura de reporte Excel.
+    Crea el libro de Excel del análisis con fórmulas vivas.
     
-    Nota: Esta implementación genera la estructura del Excel.
-    Para generar archivo Excel real con openpyxl, se requiere implementación adicional.
+    Args:
+        data: Datos del negocio, o lista de negocios para generar un lote en una sola
+            llamada. Si se omite, se usan los datos guardados en /business_data/input_data.json
+        output_path: Ruta del .xlsx relativa a la carpeta de reportes (por defecto
+            <negocio>_analisis_financiero.xlsx); en un lote, subcarpeta de salida
+        cashflow_months: Meses de la hoja de flujo de efectivo
     """
     try:
-        # Leer datos
-        input_data_file = state.get("files", {}).get("/business_data/input_data.json")
-        if not input_data_file:
-            return "❌ Error: No se encontraron datos de entrada."
-        
-        data = BusinessInputData(**input_data_file["data"])
-        
-        # Crear estructura de hojas
-        excel_structure = {
-            "archivo": f"{data.nombre_negocio}_analisis_financiero.xlsx",
-            "hojas": [
-                {
-                    "nombre": "Datos de Entrada",
-                    "columnas": ["Campo", "Valor"],
-                    "datos": [
-                        ["Nombre del Negocio", data.nombre_negocio],
-                        ["Tipo de Negocio", data.tipo_negocio],
-                        ["Costos Fijos Mensuales", f"${data.costos_fijos_mensuales:,.2f}"],
-                        ["Costo Variable Unitario", f"${data.costo_variable_unitario:,.2f}"],
-                        ["Precio de Venta Unitario", f"${data.precio_venta_unitario:,.2f}"],
-                        ["Volumen Ventas Estimado", data.volumen_ventas_estimado],
-                        ["Inversión Inicial", f"${data.inversion_inicial:,.2f}" if data.inversion_inicial else "N/A"]
-                    ]
-                },
-                {
-                    "nombre": "Métricas Básicas",
-                    "columnas": ["Métrica", "Valor"],
-                    "datos": "Calculadas desde /calculations/basic_metrics.json"
-                },
-                {
-                    "nombre": "Flujo de Efectivo",
-                    "columnas": ["Mes", "Entradas", "Salidas", "Flujo Neto", "Saldo Acumulado"],
-                    "datos": "Desde /analysis/cashflow_projection.json si existe"
-                },
-                {
-                    "nombre": "Escenarios",
-                    "columnas": ["Escenario", "Ventas", "Costos", "Utilidad", "ROS"],
-                    "datos": "Desde /scenarios/ si existen"
-                },
-                {
-                    "nombre": "Fórmulas",
-                    "columnas": ["Fórmula", "Descripción"],
-                    "datos": [
-                        ["Costos Totales", "Costos Fijos + (Costo Variable × Volumen)"],
-                        ["Punto Equilibrio (und)", "Costos Fijos / (Precio - Costo Variable)"],
-                        ["Utilidad Bruta", "Ventas - Costos Variables"],
-                        ["Utilidad Neta", "Ventas - Costos Totales"],
-                        ["ROS", "(Utilidad Neta / Ventas) × 100"],
-                        ["ROI", "(Utilidad Neta Anual / Inversión) × 100"]
-                    ]
-                }
-            ]
-        }
+        contexts, batch = resolve_contexts(data, state)
+        
+        files = {}
+        summaries = []
+        output_dir = resolve_report_path(output_path if batch else None)
+        for context, slug in zip(contexts, _slugs(contexts)):
+            if batch or not output_path:
+                path = default_report_path(context.data.nombre_negocio, "xlsx", output_dir, slug=slug)
+            else:
+                path = resolve_report_path(output_path)
+            filas = _write_workbook(context, path, cashflow_months)
+            
+            excel_summary = {
+                "archivo": path,
+                "hojas": [{"nombre": nombre, "filas": n} for nombre, n in filas.items()]
+            }
+            files[_report_file(slug, "excel_structure.json", batch)] = JsonFile(excel_summary)
+            summaries.append((context, path, filas))
         
-        # Guardar estructura
-        if "files" not in state:
-            state["files"] = {}
+        if batch:
+            message = f"""✅ {len(summaries)} reportes Excel generados:
+
+{chr(10).join(f'- {context.data.nombre_negocio}: {path}' for context, path, _ in summaries)}"""
+            logger.info(f"Lote de {len(summaries)} libros de Excel generado")
+            return _tool_result(message, files, tool_call_id)
         
-        state["files"]["/reports/excel_structure.json"] = {
-            "data": excel_structure,
-            "content": json.dumps(excel_structure, indent=2, ensure_ascii=False)
-        }
+        context, output_path, filas = summaries[0]
+        files[ANALYSIS_CONTEXT_PATH] = context.to_file()
         
-        message = f"""✅ Estructura de reporte Excel generada:
+        message = f"""✅ Reporte Excel generado:
 
-📊 Archivo: {excel_structure['archivo']}
+📊 Archivo: {output_path}
 
 Hojas incluidas:
-1. ✅ Datos de Entrada
-2. ✅ Métricas Básicas
-3. ✅ Flujo de Efectivo
-4. ✅ Escenarios
-5. ✅ Fórmulas
+{chr(10).join(f'{i}. ✅ {nombre} ({n} filas)' for i, (nombre, n) in enumerate(filas.items(), 1))}
 
-Guardado en: /reports/excel_structure.json
+Las métricas y los resultados de escenarios son fórmulas de Excel: si cambias
+los datos de entrada, se recalculan. En el flujo de efectivo, las entradas y
+salidas son valores proyectados; el flujo neto y el saldo se recalculan a partir de ellas.
 
-Nota: Para generar archivo Excel real, implementa openpyxl en esta herramienta."""
+Resumen guardado en: /reports/excel_structure.json"""
         
-        logger.info("Estructura de Excel generada")
+        logger.info(f"Excel generado: {output_path}")
         
-        return message
+        return _tool_result(message, files, tool_call_id)
         
     except Exception as e:
         logger.error(f"Error creando Excel: {str(e)}")
-        return f"❌ Error al crear Excel: {str(e)}"
+        return tool_error("Error al crear Excel", e)
 
 
 
-def generate_alerts(data: dict
-) -> str:
+def _alerts_data(alerts: List[Alert]) -> dict:
+    """Contenido del archivo de alertas de un negocio."""
+    return {
+        "fecha_generacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_alertas": len(alerts),
+        "alertas_por_tipo": {
+            "criticas": len([a for a in alerts if a.tipo == "critica"]),
+            "advertencias": len([a for a in alerts if a.tipo == "advertencia"]),
+            "informativas": len([a for a in alerts if a.tipo == "informacion"])
+        },
+        "alertas": [a.model_dump() for a in alerts]
+    }
+
+
+def generate_alerts(
+    data: BusinessArgument = None,
+    state: Annotated[Optional[dict], InjectedState] = None,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
     """
     Genera alertas basadas en análisis financiero.
+    
+    Args:
+        data: Datos del negocio, o lista de negocios para evaluar un lote en una sola
+            llamada. Si se omite, se usan los datos guardados en /business_data/input_data.json
     """
     try:
-        # Leer datos
-        input_data_file = state.get("files", {}).get("/business_data/input_data.json")
-        if not input_data_file:
-            return "❌ Error: No se encontraron datos de entrada."
-        
-        data = BusinessInputData(**input_data_file["data"])
-        
-        # Calcular métricas
-        ventas_totales = data.precio_venta_unitario * data.volumen_ventas_estimado
-        costos_totales = data.costos_fijos_mensuales + (data.costo_variable_unitario * data.volumen_ventas_estimado)
-        utilidad_neta = ventas_totales - costos_totales
-        ros = (utilidad_neta / ventas_totales * 100) if ventas_totales > 0 else 0
-        pe_unidades = data.costos_fijos_mensuales / (data.precio_venta_unitario - data.costo_variable_unitario)
-        
-        # Generar alertas
-        alerts = []
-        
-        # Alertas críticas
-        if pe_unidades > data.volumen_ventas_estimado:
-            alerts.append(Alert(
-                tipo="critica",
-                mensaje=f"Punto de equilibrio ({pe_unidades:.0f} und) MAYOR que ventas proyectadas ({data.volumen_ventas_estimado} und). Negocio NO viable."
-            ))
-        
-        if utilidad_neta < 0:
-            alerts.append(Alert(
-                tipo="critica",
-                mensaje=f"Utilidad neta NEGATIVA (${utilidad_neta:,.2f}). El negocio genera pérdidas."
-            ))
-        
-        # Alertas de advertencia
-        if ros < 10 and utilidad_neta > 0:
-            alerts.append(Alert(
-                tipo="advertencia",
-                mensaje=f"Rentabilidad baja (ROS: {ros:.2f}%). Considere optimizar costos o aumentar precios."
-            ))
-        
-        if pe_unidades > data.volumen_ventas_estimado * 0.8:
-            alerts.append(Alert(
-                tipo="advertencia",
-                mensaje=f"Punto de equilibrio muy cercano a ventas estimadas. Poco margen de seguridad."
-            ))
-        
-        if data.inversion_inicial and data.inversion_inicial > 0:
-            roi_anual = ((utilidad_neta * 12) / data.inversion_inicial * 100)
-            if roi_anual < 15:
+        contexts, batch = resolve_contexts(data, state)
+        
+        # Evaluar la tabla de reglas compilada sobre todo el lote de una vez
+        masks = get_rule_book().evaluate("alertas", context_columns(contexts))
+        
+        files = {}
+        per_business = []
+        for i, slug in enumerate(_slugs(contexts)):
+            alerts = masks.alerts(i)
+            
+            # Si no hay alertas, agregar mensaje positivo
+            if not alerts:
                 alerts.append(Alert(
-                    tipo="advertencia",
-                    mensaje=f"ROI anual bajo ({roi_anual:.2f}%). La inversión podría no ser atractiva."
+                    tipo="informacion",
+                    mensaje="No se detectaron situaciones críticas. El negocio presenta métricas saludables."
                 ))
+            
+            files[_report_file(slug, "alerts.json", batch)] = JsonFile(_alerts_data(alerts))
+            per_business.append(alerts)
+        
+        if batch:
+            counts = masks.counts()
+            lines = [
+                f"- {context.data.nombre_negocio}: {counts['critica'][i]} críticas, "
+                f"{counts['advertencia'][i]} advertencias, {counts['informacion'][i]} informativas"
+                for i, context in enumerate(contexts)
+            ]
+            message = f"""✅ Alertas generadas para {len(contexts)} negocios ({int(masks.any('critica').sum())} con alertas críticas):
+
+{chr(10).join(lines)}
+
+Guardado en: /reports/<negocio>/alerts.json"""
+            logger.info(f"Alertas generadas para un lote de {len(contexts)} negocios")
+            return _tool_result(message, files, tool_call_id)
         
-        # Alertas informativas
-        if utilidad_neta > 0 and ros >= 20:
-            alerts.append(Alert(
-                tipo="informacion",
-                mensaje=f"Excelente rentabilidad (ROS: {ros:.2f}%). El negocio es muy rentable."
-            ))
-        
-        if pe_unidades < data.volumen_ventas_estimado * 0.5:
-            alerts.append(Alert(
-                tipo="informacion",
-                mensaje=f"Buen margen de seguridad. Punto de equilibrio al {(pe_unidades/data.volumen_ventas_estimado*100):.1f}% de ventas estimadas."
-            ))
-        
-        # Si no hay alertas, agregar mensaje positivo
-        if not alerts:
-            alerts.append(Alert(
-                tipo="informacion",
-                mensaje="No se detectaron situaciones críticas. El negocio presenta métricas saludables."
-            ))
-        
-        # Guardar alertas
-        alerts_data = {
-            "fecha_generacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "total_alertas": len(alerts),
-            "alertas_por_tipo": {
-                "criticas": len([a for a in alerts if a.tipo == "critica"]),
-                "advertencias": len([a for a in alerts if a.tipo == "advertencia"]),
-                "informativas": len([a for a in alerts if a.tipo == "informacion"])
-            },
-            "alertas": [a.model_dump() for a in alerts]
-        }
-        
-        if "files" not in state:
-            state["files"] = {}
-        
-        state["files"]["/reports/alerts.json"] = {
-            "data": alerts_data,
-            "content": json.dumps(alerts_data, indent=2, ensure_ascii=False)
-        }
+        alerts = per_business[0]
+        files[ANALYSIS_CONTEXT_PATH] = contexts[0].to_file()
         
         # Generar mensaje
         criticas = [a for a in alerts if a.tipo == "critica"]
@@ -450,9 +495,8 @@ Guardado en: /reports/alerts.json"""
         
         logger.info(f"Alertas generadas: {len(criticas)} críticas, {len(advertencias)} advertencias, {len(informativas)} informativas")
         
-        return message
+        return _tool_result(message, files, tool_call_id)
         
     except Exception as e:
         logger.error(f"Error generando alertas: {str(e)}")
-        return f"❌ Error al generar alertas: {str(e)}"
-
+        return tool_error("Error al generar alertas", e)
@@ -1,27 +1,37 @@
 import json
 import logging
-from src.models.financial_data import BusinessInputData
+from typing import Annotated, Optional, Union
+from langchain.tools import InjectedToolCallId
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+from src.engine.metrics import load_business_data
+from src.graph.file_store import BUSINESS_DATA_PATH, JsonFile
+from src.observability.instrument import tool_error
 
 logger = logging.getLogger(__name__)
 
 
-def save_business_data(data: dict) -> str:
-    """Valida y formatea los datos del negocio.
+def save_business_data(
+    data: dict,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
+    """Valida los datos del negocio y los guarda en /business_data/input_data.json.
     
     Args:
         data: Diccionario con los datos del negocio
         
     Returns:
-        Mensaje de confirmación con resumen de los datos validados
+        Mensaje de confirmación con resumen de los datos validados; llamada por el
+        agente, un `Command` que además escribe los datos en el estado
     """
     
     try:
         # Validar con Pydantic
-        business_data = BusinessInputData(**data)
+        business_data = load_business_data(data)
         
         logger.info(f"Datos validados: {business_data.nombre_negocio}")
         
-        return f"""✅ Datos validados exitosamente
+        message = f"""✅ Datos validados y guardados en {BUSINESS_DATA_PATH}
 
 Resumen de datos:
 - Negocio: {business_data.nombre_negocio} ({business_data.tipo_negocio})
@@ -34,7 +44,66 @@ Resumen de datos:
 Datos JSON:
 {json.dumps(business_data.model_dump(), indent=2, ensure_ascii=False)}
 """
+        if tool_call_id is None:
+            return message
+        # Mismo archivo que leen la ruta rápida, el análisis en paralelo y los reportes
+        return Command(update={
+            "files": {BUSINESS_DATA_PATH: JsonFile(business_data.model_dump(mode="json"))},
+            "messages": [ToolMessage(message, tool_call_id=tool_call_id)],
+        })
         
     except Exception as e:
         logger.error(f"Error al validar datos: {str(e)}")
-        return f"❌ Error al validar datos: {str(e)}"
+        return tool_error("Error al validar datos", e)
+
+
+def save_business_data_bulk(
+    file_path: str,
+    output_path: str = None,
+    rejected_path: str = None,
+    batch_size: int = 5000,
+) -> str:
+    """Valida y almacena en bloque los negocios de un archivo CSV, JSONL o XLSX.
+    
+    El archivo se lee en streaming y se valida por lotes; los negocios válidos se
+    guardan en un almacén columnar (`.npz`) y los rechazados en un reporte CSV.
+    
+    Args:
+        file_path: Ruta del archivo a cargar
+        output_path: Ruta `.npz` donde guardar el almacén columnar (opcional)
+        rejected_path: Ruta CSV para el reporte de filas rechazadas (opcional)
+        batch_size: Filas por lote de validación
+        
+    Returns:
+        Mensaje con el resumen de la carga
+    """
+    
+    # Importación diferida: el almacén columnar carga pandas, que solo hace falta en la carga masiva
+    from src.storage.business_store import ingest_business_file
+    
+    try:
+        result = ingest_business_file(file_path, batch_size=batch_size, rejected_path=rejected_path)
+        
+        if output_path:
+            result.store.save(output_path)
+        
+        rechazos = "\n".join(
+            f"- Fila {r['fila']}: {', '.join(r['errores'])}" for r in result.muestra_rechazos[:10]
+        )
+        
+        logger.info(f"Carga masiva de {file_path}: {result.filas_validas}/{result.total_filas} válidas")
+        
+        return f"""✅ Carga masiva completada
+
+Resumen:
+- Filas leídas: {result.total_filas:,}
+- Negocios válidos: {result.filas_validas:,}
+- Filas rechazadas: {result.filas_rechazadas:,}
+{f'- Almacén columnar: {output_path}' if output_path else ''}
+{f'- Reporte de rechazos: {rejected_path}' if rejected_path else ''}
+{f'{chr(10)}Primeros rechazos:{chr(10)}{rechazos}' if rechazos else ''}
+"""
+        
+    except Exception as e:
+        logger.error(f"Error en carga masiva: {str(e)}")
+        return tool_error("Error en carga masiva", e)
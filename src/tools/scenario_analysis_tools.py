@@ -1,10 +1,26 @@
 """Scenario Analysis Agent tools - Complete implementations."""
 import logging
-from typing import List
-from src.models.financial_data import BusinessInputData, BasicMetrics, ScenarioData
+import math
+import numpy as np
+import pandas as pd
+from typing import Annotated, List, Optional, Union
+from langchain.tools import InjectedToolCallId
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+from src.engine.metrics import compute_metrics, load_business_data
+from src.engine.montecarlo import PERCENTILES, run_monte_carlo
+from src.engine.sensitivity import SensitivityGrid, sweep_sensitivity_grid
+from src.graph.file_store import JsonFile
+from src.models.financial_data import BasicMetrics, ScenarioData
+from src.observability.instrument import tool_error
+from src.storage.scenario_store import get_scenario_store, scenario_columns, scenario_scope
 
 logger = logging.getLogger(__name__)
 
+SENSITIVITY_GRID_PATH = "/scenarios/sensitivity_grid.json"
+# Puntos máximos de la superficie que se guardan en el estado; por encima solo se guardan ejes y tornado
+MAX_SURFACE_FILE_POINTS = 250_000
+
 
 def create_scenario(
     data: dict,
@@ -19,10 +35,17 @@ def create_scenario(
     - moderado: datos actuales sin cambios
     - optimista: +20% ventas, -5% costos fijos, -5% costos variables
     - personalizado: usa parámetros proporcionados
+    - montecarlo: simulación estocástica; `parameters` acepta
+      {"distribuciones": {"precio_venta": {"tipo": "normal", "desviacion": 1.5}, ...},
+       "simulaciones": 100000, "semilla": 42}
+      Distribuciones: fijo, normal, uniforme, triangular, lognormal.
     """
     try:
         # Validar datos base
-        business_data = BusinessInputData(**data)
+        business_data = load_business_data(data)
+        
+        if scenario_type == "montecarlo":
+            return _create_monte_carlo_scenario(business_data, parameters or {})
         
         # Aplicar modificaciones según tipo de escenario
         if scenario_type == "pesimista":
@@ -54,38 +77,33 @@ def create_scenario(
             nombre = parameters.get("nombre", "Escenario Personalizado")
             
         else:
-            return f"❌ Error: Tipo de escenario '{scenario_type}' no válido. Usa: pesimista, moderado, optimista, o personalizado."
+            return f"❌ Error: Tipo de escenario '{scenario_type}' no válido. Usa: pesimista, moderado, optimista, personalizado o montecarlo."
         
         # Calcular métricas del escenario
-        ventas_totales = precio_venta * volumen_ventas
-        costos_variables_totales = costo_variable * volumen_ventas
-        costos_totales = costos_fijos + costos_variables_totales
-        
-        # Punto de equilibrio
-        margen_contribucion = precio_venta - costo_variable
-        if margen_contribucion > 0:
-            pe_unidades = costos_fijos / margen_contribucion
-            pe_dinero = pe_unidades * precio_venta
-        else:
+        metrics = compute_metrics(business_data.model_copy(update={
+            "precio_venta_unitario": precio_venta,
+            "costo_variable_unitario": costo_variable,
+            "volumen_ventas_estimado": volumen_ventas,
+            "costos_fijos_mensuales": costos_fijos,
+        }))
+        ventas_totales = metrics.ventas_totales
+        utilidad_neta = metrics.utilidad_neta
+        ros = metrics.rentabilidad_sobre_ventas
+        roi_anual = metrics.rentabilidad_sobre_inversion
+        
+        # Punto de equilibrio (0 si el margen de contribución no es positivo)
+        pe_unidades = metrics.punto_equilibrio_unidades
+        pe_dinero = metrics.punto_equilibrio_dinero
+        if math.isnan(pe_unidades):
             pe_unidades = 0
             pe_dinero = 0
         
-        # Utilidades
-        utilidad_bruta = ventas_totales - costos_variables_totales
-        utilidad_neta = ventas_totales - costos_totales
-        
-        # Rentabilidad
-        ros = (utilidad_neta / ventas_totales * 100) if ventas_totales > 0 else 0
-        roi_anual = None
-        if business_data.inversion_inicial and business_data.inversion_inicial > 0:
-            roi_anual = ((utilidad_neta * 12) / business_data.inversion_inicial * 100)
-        
         # Crear métricas
         metricas = BasicMetrics(
-            costos_totales=round(costos_totales, 2),
+            costos_totales=round(metrics.costos_totales, 2),
             punto_equilibrio_unidades=round(pe_unidades, 2),
             punto_equilibrio_dinero=round(pe_dinero, 2),
-            utilidad_bruta=round(utilidad_bruta, 2),
+            utilidad_bruta=round(metrics.utilidad_bruta, 2),
             utilidad_neta=round(utilidad_neta, 2),
             rentabilidad_sobre_ventas=round(ros, 2),
             rentabilidad_sobre_inversion=round(roi_anual, 2) if roi_anual else None
@@ -101,8 +119,9 @@ def create_scenario(
             costos_fijos=round(costos_fijos, 2),
             metricas_calculadas=metricas
         )
+        scenario_id = get_scenario_store().save(scenario_scope(business_data), scenario)
         
-        message = f"""✅ {nombre} creado:
+        message = f"""✅ {nombre} creado (ID: {scenario_id}):
 
 Parámetros:
 - Precio de venta: ${precio_venta:,.2f}
@@ -122,7 +141,48 @@ Resultados:
         
     except Exception as e:
         logger.error(f"Error creando escenario: {str(e)}")
-        return f"❌ Error al crear escenario: {str(e)}"
+        return tool_error("Error al crear escenario", e)
+
+
+def _create_monte_carlo_scenario(business_data, parameters: dict) -> str:
+    """Ejecuta la simulación Monte Carlo y formatea las bandas de percentiles."""
+    distribuciones = parameters.get("distribuciones", {})
+    if not distribuciones:
+        return "❌ Error: El escenario montecarlo requiere 'distribuciones' para al menos un parámetro."
+    
+    result = run_monte_carlo(
+        business_data,
+        distribuciones,
+        n_draws=int(parameters.get("simulaciones", 100_000)),
+        seed=parameters.get("semilla"),
+    )
+    
+    utilidad_bandas = "\n".join(
+        f"- P{p}: ${result.utilidad_neta_percentiles[p]:,.2f}" for p in PERCENTILES
+    )
+    ros_bandas = "\n".join(
+        f"- P{p}: {result.ros_percentiles[p]:.2f}%" for p in PERCENTILES
+    )
+    
+    message = f"""✅ Escenario Monte Carlo creado ({result.simulaciones:,} simulaciones):
+
+Parámetros aleatorios: {', '.join(distribuciones)}
+
+Utilidad neta:
+- Media: ${result.utilidad_neta_media:,.2f} (desviación: ${result.utilidad_neta_desviacion:,.2f})
+{utilidad_bandas}
+
+ROS:
+{ros_bandas}
+
+Probabilidad de quedar bajo el punto de equilibrio: {result.probabilidad_bajo_equilibrio * 100:.2f}%"""
+    
+    if result.probabilidad_bajo_equilibrio > 0.25:
+        message += "\n\n⚠️ ALERTA: Más del 25% de las simulaciones generan pérdidas."
+    
+    logger.info(f"Escenario montecarlo creado: P(pérdida) {result.probabilidad_bajo_equilibrio:.2%}")
+    
+    return message
 
 
 
@@ -131,54 +191,48 @@ def compare_scenarios(
     scenario_ids: List[str],
 ) -> str:
     """
-    Compara hasta 3 escenarios y genera tabla comparativa.
+    Compara dos o más escenarios guardados y genera tabla comparativa.
+    
+    Args:
+        data: Diccionario con los datos del negocio
+        scenario_ids: IDs devueltos por create_scenario (ej. "pesimista", "optimista")
     """
     try:
-        if len(scenario_ids) > 3:
-            return "❌ Error: Máximo 3 escenarios para comparar."
-        
         if len(scenario_ids) < 2:
             return "❌ Error: Necesitas al menos 2 escenarios para comparar."
         
+        business_data = load_business_data(data)
+        
         # Leer escenarios
-        scenarios = []
-        for scenario_id in scenario_ids:
-            return f"❌ Error: Escenario '{scenario_id}' no encontrado. Créalo primero."
-        
-        # Crear comparativa
-        comparison = {
-            "escenarios_comparados": [s.nombre_escenario for s in scenarios],
-            "metricas_comparadas": {}
-        }
+        scenarios = get_scenario_store().get_many(scenario_scope(business_data), scenario_ids)
+        for scenario_id, scenario in zip(scenario_ids, scenarios):
+            if scenario is None:
+                return f"❌ Error: Escenario '{scenario_id}' no encontrado. Créalo primero."
         
-        # Comparar métricas
-        for i, scenario in enumerate(scenarios):
-            comparison["metricas_comparadas"][scenario.nombre_escenario] = {
-                "ventas_totales": scenario.precio_venta * scenario.volumen_ventas,
-                "utilidad_neta": scenario.metricas_calculadas.utilidad_neta,
-                "ros": scenario.metricas_calculadas.rentabilidad_sobre_ventas,
-                "punto_equilibrio_unidades": scenario.metricas_calculadas.punto_equilibrio_unidades,
-                "punto_equilibrio_dinero": scenario.metricas_calculadas.punto_equilibrio_dinero
-            }
+        # Crear comparativa por columnas
+        frame = pd.DataFrame(scenario_columns(scenarios), index=scenario_ids)
         
         # Generar tabla comparativa
-        header = f"{'Métrica':<30} " + " ".join([f"{s.tipo.capitalize():<20}" for s in scenarios])
-        separator = "=" * (30 + 20 * len(scenarios))
-        
-        rows = []
-        rows.append(f"{'Ventas Totales':<30} " + " ".join([f"${s.precio_venta * s.volumen_ventas:>18,.2f}" for s in scenarios]))
-        rows.append(f"{'Utilidad Neta':<30} " + " ".join([f"${s.metricas_calculadas.utilidad_neta:>18,.2f}" for s in scenarios]))
-        rows.append(f"{'ROS (%)':<30} " + " ".join([f"{s.metricas_calculadas.rentabilidad_sobre_ventas:>18.2f}%" for s in scenarios]))
-        rows.append(f"{'Punto Equilibrio (und)':<30} " + " ".join([f"{s.metricas_calculadas.punto_equilibrio_unidades:>18.0f}" for s in scenarios]))
-        rows.append(f"{'Punto Equilibrio ($)':<30} " + " ".join([f"${s.metricas_calculadas.punto_equilibrio_dinero:>18,.2f}" for s in scenarios]))
-        
-        message = f"""✅ Comparativa de Escenarios:
+        table = pd.DataFrame({
+            "Ventas Totales": frame["ventas_totales"].map("${:,.2f}".format),
+            "Utilidad Neta": frame["utilidad_neta"].map("${:,.2f}".format),
+            "ROS (%)": frame["ros"].map("{:.2f}%".format),
+            "Punto Equilibrio (und)": frame["punto_equilibrio_unidades"].map("{:.0f}".format),
+            "Punto Equilibrio ($)": frame["punto_equilibrio_dinero"].map("${:,.2f}".format),
+        }).T
+        table.index.name = "Métrica"
+        table_text = table.to_string(col_space=20, justify="right", index_names=False)
+        separator = "=" * max(len(line) for line in table_text.splitlines())
+        
+        mejor = frame["utilidad_neta"].idxmax()
+        
+        message = f"""✅ Comparativa de Escenarios ({len(scenarios)}):
 
 {separator}
-{header}
+{table_text}
 {separator}
-{chr(10).join(rows)}
-{separator}"""
+
+Mayor utilidad neta: {mejor} (${frame.loc[mejor, 'utilidad_neta']:,.2f})"""
         
         logger.info(f"Comparativa de {len(scenarios)} escenarios generada")
         
@@ -186,7 +240,7 @@ def compare_scenarios(
         
     except Exception as e:
         logger.error(f"Error comparando escenarios: {str(e)}")
-        return f"❌ Error al comparar escenarios: {str(e)}"
+        return tool_error("Error al comparar escenarios", e)
 
 
 
@@ -207,49 +261,43 @@ def simulate_parameter_change(
             return f"❌ Error: Parámetro '{parameter}' no válido. Usa: {', '.join(valid_params)}"
         
         # Validar datos base
-        business_data = BusinessInputData(**data)
+        business_data = load_business_data(data)
         
-        # Calcular métricas base
-        ventas_base = business_data.precio_venta_unitario * business_data.volumen_ventas_estimado
-        costos_totales_base = business_data.costos_fijos_mensuales + (business_data.costo_variable_unitario * business_data.volumen_ventas_estimado)
-        utilidad_base = ventas_base - costos_totales_base
+        # Métricas base
+        utilidad_base = compute_metrics(business_data).utilidad_neta
         
         # Aplicar cambio
         factor = 1 + (change_percentage / 100)
         
         if parameter == "precio_venta":
             nuevo_precio = business_data.precio_venta_unitario * factor
-            ventas_nuevo = nuevo_precio * business_data.volumen_ventas_estimado
-            costos_totales_nuevo = costos_totales_base
+            cambios = {"precio_venta_unitario": nuevo_precio}
             param_label = "Precio de venta"
             valor_base = f"${business_data.precio_venta_unitario:,.2f}"
             valor_nuevo = f"${nuevo_precio:,.2f}"
             
         elif parameter == "costo_variable":
             nuevo_costo_var = business_data.costo_variable_unitario * factor
-            ventas_nuevo = ventas_base
-            costos_totales_nuevo = business_data.costos_fijos_mensuales + (nuevo_costo_var * business_data.volumen_ventas_estimado)
+            cambios = {"costo_variable_unitario": nuevo_costo_var}
             param_label = "Costo variable"
             valor_base = f"${business_data.costo_variable_unitario:,.2f}"
             valor_nuevo = f"${nuevo_costo_var:,.2f}"
             
         elif parameter == "costo_fijo":
             nuevos_costos_fijos = business_data.costos_fijos_mensuales * factor
-            ventas_nuevo = ventas_base
-            costos_totales_nuevo = nuevos_costos_fijos + (business_data.costo_variable_unitario * business_data.volumen_ventas_estimado)
+            cambios = {"costos_fijos_mensuales": nuevos_costos_fijos}
             param_label = "Costos fijos"
             valor_base = f"${business_data.costos_fijos_mensuales:,.2f}"
             valor_nuevo = f"${nuevos_costos_fijos:,.2f}"
             
         else:  # volumen_ventas
             nuevo_volumen = int(business_data.volumen_ventas_estimado * factor)
-            ventas_nuevo = business_data.precio_venta_unitario * nuevo_volumen
-            costos_totales_nuevo = business_data.costos_fijos_mensuales + (business_data.costo_variable_unitario * nuevo_volumen)
+            cambios = {"volumen_ventas_estimado": nuevo_volumen}
             param_label = "Volumen de ventas"
             valor_base = f"{business_data.volumen_ventas_estimado} unidades"
             valor_nuevo = f"{nuevo_volumen} unidades"
         
-        utilidad_nuevo = ventas_nuevo - costos_totales_nuevo
+        utilidad_nuevo = compute_metrics(business_data.model_copy(update=cambios)).utilidad_neta
         cambio_utilidad = utilidad_nuevo - utilidad_base
         cambio_utilidad_pct = (cambio_utilidad / utilidad_base * 100) if utilidad_base != 0 else 0
         
@@ -287,5 +335,88 @@ Impacto en Utilidad Neta:
         
     except Exception as e:
         logger.error(f"Error simulando cambio: {str(e)}")
-        return f"❌ Error al simular cambio: {str(e)}"
+        return tool_error("Error al simular cambio", e)
+
+
+
+def _grid_file(grid: SensitivityGrid) -> JsonFile:
+    """Ejes, superficie de utilidad y tornado de una rejilla, para el sistema de archivos virtual."""
+    content = {
+        "parametros": list(grid.parametros),
+        "ejes": {parameter: grid.ejes[parameter].tolist() for parameter in grid.parametros},
+        "utilidad_base": grid.utilidad_base,
+        "tornado": grid.tornado,
+    }
+    if grid.utilidad.size <= MAX_SURFACE_FILE_POINTS:
+        # utilidad[i][j]... corresponde a ejes[parametros[0]][i], ejes[parametros[1]][j], ...
+        content["utilidad"] = grid.utilidad.tolist()
+    else:
+        content["utilidad_omitida"] = f"{grid.utilidad.size:,} puntos (máximo {MAX_SURFACE_FILE_POINTS:,})"
+    return JsonFile(content)
+
+
+def simulate_sensitivity_grid(
+    data: dict,
+    parameters: dict,
+    steps: int = 11,
+    workers: int = None,
+    tool_call_id: Annotated[Optional[str], InjectedToolCallId] = None,
+) -> Union[str, Command]:
+    """
+    Simula en una sola llamada todas las combinaciones de cambios en varios parámetros.
+    
+    Args:
+        data: Diccionario con los datos del negocio
+        parameters: Rango de cambio porcentual por parámetro, ej.
+            {"precio_venta": [-20, 20], "costo_variable": [-10, 10], "volumen_ventas": [-30, 30]}
+            Parámetros válidos: precio_venta, costo_variable, costo_fijo, volumen_ventas
+        steps: Pasos por parámetro entre el mínimo y el máximo (por defecto 11)
+        workers: Procesos para repartir rejillas grandes (None o 1 = en el proceso actual;
+            como máximo ANAFI_MAX_WORKERS y los CPU disponibles)
+    
+    Devuelve el rango de utilidad de la rejilla y el ranking tornado de sensibilidad;
+    la superficie completa se guarda en /scenarios/sensitivity_grid.json.
+    """
+    try:
+        business_data = load_business_data(data)
+        grid = sweep_sensitivity_grid(business_data, parameters, steps=steps, workers=workers)
+        
+        utilidad = grid.utilidad
+        idx_min = np.unravel_index(np.argmin(utilidad), utilidad.shape)
+        idx_max = np.unravel_index(np.argmax(utilidad), utilidad.shape)
+        porcentaje_perdida = float(np.count_nonzero(utilidad < 0)) / utilidad.size * 100
+        
+        def _combinacion(idx):
+            return ", ".join(
+                f"{p} {grid.ejes[p][i]:+.1f}%" for p, i in zip(grid.parametros, idx)
+            )
+        
+        tornado = "\n".join(
+            f"{n}. {t['parametro']}: ${t['utilidad_en_minimo']:,.2f} → ${t['utilidad_en_maximo']:,.2f} (rango ${t['rango']:,.2f})"
+            for n, t in enumerate(grid.tornado, start=1)
+        )
+        
+        message = f"""✅ Rejilla de sensibilidad evaluada ({' × '.join(str(n) for n in utilidad.shape)} = {utilidad.size:,} combinaciones):
+
+Utilidad base: ${grid.utilidad_base:,.2f}
+- Peor caso: ${utilidad[idx_min]:,.2f} ({_combinacion(idx_min)})
+- Mejor caso: ${utilidad[idx_max]:,.2f} ({_combinacion(idx_max)})
+- Combinaciones con pérdida: {porcentaje_perdida:.1f}%
 
+Ranking tornado (mayor a menor impacto):
+{tornado}
+
+Superficie guardada en: {SENSITIVITY_GRID_PATH}"""
+        
+        logger.info(f"Rejilla de sensibilidad: {utilidad.size} combinaciones, {len(grid.parametros)} parámetros")
+        
+        if tool_call_id is None:
+            return message
+        return Command(update={
+            "files": {SENSITIVITY_GRID_PATH: _grid_file(grid)},
+            "messages": [ToolMessage(message, tool_call_id=tool_call_id)],
+        })
+        
+    except Exception as e:
+        logger.error(f"Error evaluando rejilla de sensibilidad: {str(e)}")
+        return tool_error("Error al evaluar rejilla de sensibilidad", e)
@@ -0,0 +1,196 @@
+"""
+Unit tests for the ANAFI alert rule engine.
+
+Run with: pytest tests/test_alert_rules.py -v
+"""
+import json
+
+import numpy as np
+import pytest
+from src.engine.alerts import (
+    AlertRule,
+    AlertRuleBook,
+    CompiledRuleSet,
+    evaluate_business,
+    evaluate_portfolio,
+    get_rule_book,
+    set_rule_book,
+)
+from src.engine.cashflow import project_cashflow_series
+from src.engine.metrics import load_business_data
+from src.tools import calculate_profitability_ratios
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def portfolio():
+    """Three businesses: healthy, thin margin and losing money."""
+    return {
+        "costos_fijos_mensuales": [5000.0, 6500.0, 9000.0],
+        "costo_variable_unitario": [3.0, 3.0, 3.0],
+        "precio_venta_unitario": [10.0, 10.0, 10.0],
+        "volumen_ventas_estimado": [1000, 1000, 1000],
+        "inversion_inicial": [50000.0, np.nan, 50000.0],
+    }
+
+
+@pytest.fixture(autouse=True)
+def default_rule_book():
+    """Restore the default rule book after each test."""
+    yield
+    set_rule_book(None)
+
+
+class TestCompiledRuleSet:
+    """Tests for rule compilation and evaluation."""
+
+    def test_masks_per_rule(self):
+        """Test one mask row per rule and one column per business."""
+        rules = [
+            AlertRule(id="negativo", severidad="critica", mensaje="x", condiciones=("valor < 0",)),
+            AlertRule(id="alto", severidad="advertencia", mensaje="x", condiciones=("valor > limite",)),
+        ]
+        compiled = CompiledRuleSet(rules, {"limite": 10})
+
+        result = compiled.evaluate({"valor": np.array([-1.0, 5.0, 20.0])})
+
+        assert result.masks.tolist() == [[True, False, False], [False, False, True]]
+        assert result.any("critica").tolist() == [True, False, False]
+
+    def test_conditions_are_combined(self):
+        """Test that all conditions of a rule must hold."""
+        rule = AlertRule(id="r", severidad="advertencia", mensaje="x", condiciones=("a > 0", "b <= 2"))
+
+        result = CompiledRuleSet([rule], {}).evaluate({"a": np.array([1.0, 1.0, -1.0]), "b": np.array([2.0, 3.0, 0.0])})
+
+        assert result.masks[0].tolist() == [True, False, False]
+
+    def test_group_is_first_match(self):
+        """Test if/elif/else semantics inside a group."""
+        rules = [
+            AlertRule(id="bajo", severidad="critica", mensaje="x", condiciones=("v < 0",), grupo="g"),
+            AlertRule(id="medio", severidad="advertencia", mensaje="x", condiciones=("v < 10",), grupo="g"),
+            AlertRule(id="resto", severidad="informacion", mensaje="x", grupo="g"),
+        ]
+
+        result = CompiledRuleSet(rules, {}).evaluate({"v": np.array([-5.0, 5.0, 50.0])})
+
+        assert [result.rule_ids(i) for i in range(3)] == [["bajo"], ["medio"], ["resto"]]
+
+    def test_nan_never_matches(self):
+        """Test that undefined metrics (e.g. ROI without investment) raise no alert."""
+        rule = AlertRule(id="r", severidad="advertencia", mensaje="x", condiciones=("roi < 15",))
+
+        assert not CompiledRuleSet([rule], {}).evaluate({"roi": np.array([np.nan])}).masks.any()
+
+    def test_invalid_rules(self):
+        """Test errors for bad conditions, thresholds and severities."""
+        with pytest.raises(ValueError):
+            CompiledRuleSet([AlertRule(id="r", severidad="critica", mensaje="x", condiciones=("v ~ 1",))], {})
+        with pytest.raises(ValueError):
+            CompiledRuleSet([AlertRule(id="r", severidad="critica", mensaje="x", condiciones=("v < desconocido",))], {})
+        with pytest.raises(ValueError):
+            CompiledRuleSet([AlertRule(id="r", severidad="grave", mensaje="x")], {})
+
+
+class TestDefaultRules:
+    """Tests for the default rule table."""
+
+    def test_portfolio_single_pass(self, portfolio):
+        """Test severity masks over a whole portfolio."""
+        result = evaluate_portfolio(portfolio)
+
+        assert result.any("critica").tolist() == [False, False, True]
+        assert result.by_severity["advertencia"].shape[1] == 3
+        assert "roi_bajo" not in result.rule_ids(1)
+        assert "equilibrio_cercano" in result.rule_ids(1)
+
+    def test_recommendations(self, sample_business_data):
+        """Test one recommendation per group."""
+        data = load_business_data(sample_business_data)
+
+        messages = evaluate_business(data, "recomendaciones").messages()
+
+        assert messages == [
+            "✅ El negocio es rentable.",
+            "✅ Excelente rentabilidad sobre ventas.",
+            "✅ Margen de seguridad adecuado sobre punto de equilibrio.",
+        ]
+
+    def test_alert_messages(self, sample_business_data):
+        """Test formatted alert messages."""
+        data = load_business_data({**sample_business_data, "costos_fijos_mensuales": 9000.0})
+
+        alerts = evaluate_business(data, "alertas").alerts()
+
+        assert alerts[0].tipo == "critica"
+        assert "1286 und" in alerts[0].mensaje
+        assert "-2,000.00" in alerts[1].mensaje
+
+    def test_cashflow_rules(self, sample_business_data):
+        """Test that cashflow alerts come from the rule table."""
+        data = load_business_data({**sample_business_data, "precio_venta_unitario": 4.0})
+
+        series = project_cashflow_series(data, months=6)
+
+        assert any("CRÍTICA" in a for a in series.alertas)
+        assert any("6 meses consecutivos" in a for a in series.alertas)
+
+
+class TestTenantThresholds:
+    """Tests for tenant-specific thresholds."""
+
+    def test_from_config(self, portfolio):
+        """Test that a tenant can change thresholds without code changes."""
+        book = AlertRuleBook.from_config({"umbrales": {"margen_seguridad_minimo": 95}})
+
+        result = book.evaluate("alertas", evaluate_portfolio(portfolio).columns)
+
+        assert "equilibrio_cercano" not in result.rule_ids(1)
+
+    def test_tenant_file(self, portfolio, tmp_path, monkeypatch):
+        """Test loading a tenant rule book from a JSON file."""
+        config = {
+            "umbrales": {"ros_minimo": 15},
+            "reglas": {"alertas": [{"id": "ros", "severidad": "advertencia", "mensaje": "ROS < {ros_minimo:g}%", "condiciones": "rentabilidad_sobre_ventas < ros_minimo"}]},
+        }
+        (tmp_path / "acme.json").write_text(json.dumps(config), encoding="utf-8")
+        monkeypatch.setenv("ANAFI_ALERT_RULES_DIR", str(tmp_path))
+
+        result = evaluate_portfolio(portfolio, tenant="acme")
+
+        assert result.masks.tolist() == [[False, True, True]]
+        assert result.messages(1) == ["ROS < 15%"]
+        assert get_rule_book("acme") is get_rule_book("acme")
+        set_rule_book(None, tenant="acme")
+
+    def test_tools_use_active_thresholds(self, sample_business_data):
+        """Test that tools follow the active thresholds and drop memoized results."""
+        args = dict(
+            precio_venta_unitario=10.0,
+            costo_variable_unitario=3.0,
+            costos_fijos_mensuales=5000.0,
+            volumen_ventas_estimado=1000,
+        )
+        assert "ADVERTENCIA" not in calculate_profitability_ratios(**args)
+
+        set_rule_book(AlertRuleBook(thresholds={"ros_minimo": 30}))
+
+        assert "menor al 30%" in calculate_profitability_ratios(**args)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,134 @@
+"""
+Unit tests for the ANAFI vectorized metrics engine.
+
+Run with: pytest tests/test_batch_metrics.py -v
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from src.engine.metrics import (
+    compute_batch_metrics,
+    compute_metrics,
+    compute_portfolio_metrics,
+    load_business_data,
+)
+
+
+@pytest.fixture
+def sample_portfolio():
+    """Sample portfolio with three businesses (profit, breakeven, invalid margin)."""
+    return {
+        "costos_fijos_mensuales": [3000.0, 3000.0, 1000.0],
+        "costo_variable_unitario": [1.5, 1.5, 5.0],
+        "precio_venta_unitario": [4.0, 4.0, 4.0],
+        "volumen_ventas_estimado": [2000, 1200, 100],
+        "inversion_inicial": [10000.0, None, 0.0],
+    }
+
+
+class TestComputeBatchMetrics:
+    """Tests for the column-array batch API."""
+
+    def test_basic_metrics(self, sample_portfolio):
+        """Test every basic metric for a profitable business."""
+        metrics = compute_portfolio_metrics(sample_portfolio)
+        row = metrics.row(0)
+
+        assert len(metrics) == 3
+        assert row["ventas_totales"] == 8000.0
+        assert row["costos_totales"] == 6000.0
+        assert row["utilidad_bruta"] == 5000.0
+        assert row["utilidad_neta"] == 2000.0
+        assert row["punto_equilibrio_unidades"] == 1200.0
+        assert row["punto_equilibrio_dinero"] == 4800.0
+        assert row["rentabilidad_sobre_ventas"] == 25.0
+        assert row["rentabilidad_sobre_inversion"] == 240.0
+
+    def test_roi_without_investment(self, sample_portfolio):
+        """Test that ROI is NaN when there is no investment."""
+        metrics = compute_portfolio_metrics(sample_portfolio)
+
+        assert math.isnan(metrics.row(1)["rentabilidad_sobre_inversion"])
+        assert math.isnan(metrics.row(2)["rentabilidad_sobre_inversion"])
+
+    def test_invalid_margin(self, sample_portfolio):
+        """Test that breakeven is NaN when price <= variable cost."""
+        metrics = compute_portfolio_metrics(sample_portfolio)
+
+        assert math.isnan(metrics.row(2)["punto_equilibrio_unidades"])
+        assert metrics.row(2)["margen_contribucion"] == -1.0
+
+    def test_scalar_inputs_broadcast(self):
+        """Test that scalars behave as one-business portfolios."""
+        metrics = compute_batch_metrics(3000.0, 1.5, 4.0, 1200)
+
+        assert len(metrics) == 1
+        assert metrics.row(0)["utilidad_neta"] == 0.0
+
+    def test_dataframe_input(self, sample_portfolio):
+        """Test that a DataFrame is accepted and round-trips to a DataFrame."""
+        df = pd.DataFrame(sample_portfolio)
+        frame = compute_portfolio_metrics(df).to_frame()
+
+        assert len(frame) == 3
+        np.testing.assert_allclose(frame["utilidad_neta"], [2000.0, 0.0, -1100.0])
+
+    def test_missing_column(self, sample_portfolio):
+        """Test that missing required columns raise an error."""
+        del sample_portfolio["precio_venta_unitario"]
+
+        with pytest.raises(ValueError, match="precio_venta_unitario"):
+            compute_portfolio_metrics(sample_portfolio)
+
+
+class TestComputeMetrics:
+    """Tests for the single-pass metrics kernel."""
+
+    @pytest.fixture
+    def sample_business_data(self):
+        """Sample business data for testing."""
+        return {
+            "nombre_negocio": "Test Café",
+            "tipo_negocio": "cafetería",
+            "costos_fijos_mensuales": 3000.0,
+            "costo_variable_unitario": 1.5,
+            "precio_venta_unitario": 4.0,
+            "volumen_ventas_estimado": 2000,
+            "inversion_inicial": 10000.0
+        }
+
+    def test_record_contents(self, sample_business_data):
+        """Test that the record carries basic metrics plus extras."""
+        metrics = compute_metrics(sample_business_data)
+
+        assert metrics.utilidad_neta == 2000.0
+        assert metrics.rentabilidad_sobre_inversion == 240.0
+        assert metrics.costos_variables_totales == 3000.0
+        assert metrics.margen_contribucion == 2.5
+        assert metrics.margen_bruto_porcentaje == 62.5
+
+    def test_record_is_immutable(self, sample_business_data):
+        """Test that the shared record cannot be modified by a tool."""
+        metrics = compute_metrics(sample_business_data)
+
+        with pytest.raises(ValidationError):
+            metrics.utilidad_neta = 0.0
+
+    def test_computed_once_per_input(self, sample_business_data):
+        """Test that equal inputs reuse the same validated model and record."""
+        assert load_business_data(sample_business_data) is load_business_data(dict(sample_business_data))
+        assert compute_metrics(sample_business_data) is compute_metrics(dict(sample_business_data))
+
+    def test_invalid_input(self, sample_business_data):
+        """Test that invalid data still fails Pydantic validation."""
+        sample_business_data["costos_fijos_mensuales"] = -1.0
+
+        with pytest.raises(ValidationError):
+            compute_metrics(sample_business_data)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,201 @@
+"""
+Unit tests for the ANAFI bulk business data ingestion.
+
+Run with: pytest tests/test_bulk_ingestion.py -v
+"""
+import csv
+import json
+
+import numpy as np
+import pytest
+from src.engine.metrics import compute_portfolio_metrics
+from src.storage.business_store import (
+    BusinessColumnStore,
+    ingest_business_file,
+    ingest_business_rows,
+    validate_business_batch,
+)
+from src.tools.save_business_data import save_business_data_bulk
+
+FIELDS = [
+    "nombre_negocio",
+    "tipo_negocio",
+    "costos_fijos_mensuales",
+    "costo_variable_unitario",
+    "precio_venta_unitario",
+    "volumen_ventas_estimado",
+    "inversion_inicial",
+]
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def mixed_rows(sample_business_data):
+    """Two valid rows and two invalid rows."""
+    return [
+        sample_business_data,
+        {**sample_business_data, "costos_fijos_mensuales": -1},
+        {**sample_business_data, "volumen_ventas_estimado": 12.5, "precio_venta_unitario": "abc"},
+        {**sample_business_data, "nombre_negocio": "Otro", "inversion_inicial": None},
+    ]
+
+
+class TestValidateBusinessBatch:
+    """Tests for columnar batch validation."""
+
+    def test_error_masks(self, mixed_rows):
+        """Test that each invalid row reports all of its errors."""
+        columns, valid, rejected = validate_business_batch(mixed_rows)
+
+        assert valid.tolist() == [True, False, False, True]
+        assert rejected[1] == ["costos_fijos_mensuales: debe ser mayor a 0"]
+        assert "precio_venta_unitario: no es un número válido" in rejected[2]
+        assert "volumen_ventas_estimado: debe ser un entero mayor a 0" in rejected[2]
+
+    def test_valid_columns(self, mixed_rows):
+        """Test that only valid rows reach the columns, with numeric dtypes."""
+        columns, _, _ = validate_business_batch(mixed_rows)
+
+        assert columns["nombre_negocio"].tolist() == ["Test Restaurant", "Otro"]
+        assert columns["volumen_ventas_estimado"].dtype == np.int64
+        assert np.isnan(columns["inversion_inicial"][1])
+
+    def test_missing_required_field(self, sample_business_data):
+        """Test that missing required fields are rejected."""
+        row = dict(sample_business_data)
+        del row["costo_variable_unitario"]
+
+        _, valid, rejected = validate_business_batch([row])
+
+        assert not valid[0]
+        assert rejected[0] == ["costo_variable_unitario: requerido"]
+
+
+class TestIngestBusinessRows:
+    """Tests for batched ingestion."""
+
+    def test_row_numbers_across_batches(self, mixed_rows):
+        """Test that rejected row numbers are global, not per batch."""
+        result = ingest_business_rows(mixed_rows * 3, batch_size=3)
+
+        assert result.total_filas == 12
+        assert result.filas_validas == 6
+        assert [r["fila"] for r in result.muestra_rechazos] == [2, 3, 6, 7, 10, 11]
+        assert len(result.store) == 6
+
+    def test_rejected_report(self, mixed_rows, tmp_path):
+        """Test the CSV report of rejected rows."""
+        report = tmp_path / "rechazos.csv"
+
+        ingest_business_rows(mixed_rows, rejected_path=str(report))
+
+        with open(report, newline="", encoding="utf-8") as f:
+            lines = list(csv.reader(f))
+        assert lines[0] == ["fila", "errores"]
+        assert [line[0] for line in lines[1:]] == ["2", "3"]
+
+    def test_store_feeds_portfolio_metrics(self, mixed_rows):
+        """Test that the stored columns work with the batch metrics engine."""
+        result = ingest_business_rows(mixed_rows)
+
+        metrics = compute_portfolio_metrics(result.store.columns())
+
+        assert len(metrics) == 2
+        assert metrics.utilidad_neta[0] == pytest.approx(2000.0)
+
+    def test_save_and_load(self, mixed_rows, tmp_path):
+        """Test the npz round trip."""
+        path = tmp_path / "negocios.npz"
+        ingest_business_rows(mixed_rows).store.save(str(path))
+
+        store = BusinessColumnStore.load(str(path))
+
+        assert len(store) == 2
+        assert store.to_frame()["nombre_negocio"].tolist() == ["Test Restaurant", "Otro"]
+
+
+class TestIngestBusinessFile:
+    """Tests for the supported file formats."""
+
+    def test_csv(self, mixed_rows, tmp_path):
+        """Test CSV input with text values."""
+        path = tmp_path / "negocios.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(mixed_rows)
+
+        result = ingest_business_file(str(path))
+
+        assert result.filas_validas == 2
+        assert result.filas_rechazadas == 2
+
+    def test_jsonl(self, mixed_rows, tmp_path):
+        """Test JSON Lines input."""
+        path = tmp_path / "negocios.jsonl"
+        path.write_text("\n".join(json.dumps(row) for row in mixed_rows), encoding="utf-8")
+
+        result = ingest_business_file(str(path))
+
+        assert result.filas_validas == 2
+
+    def test_xlsx(self, mixed_rows, tmp_path):
+        """Test Excel input read in read-only mode."""
+        openpyxl = pytest.importorskip("openpyxl")
+        path = tmp_path / "negocios.xlsx"
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(FIELDS)
+        for row in mixed_rows:
+            sheet.append([row[name] for name in FIELDS])
+        workbook.save(path)
+
+        result = ingest_business_file(str(path))
+
+        assert result.filas_validas == 2
+        assert result.filas_rechazadas == 2
+
+    def test_unsupported_format(self, tmp_path):
+        """Test that unknown extensions are rejected."""
+        with pytest.raises(ValueError):
+            ingest_business_file(str(tmp_path / "negocios.txt"))
+
+
+class TestSaveBusinessDataBulk:
+    """Tests for the bulk save entry point."""
+
+    def test_summary(self, mixed_rows, tmp_path):
+        """Test the summary message and output files."""
+        source = tmp_path / "negocios.jsonl"
+        source.write_text("\n".join(json.dumps(row) for row in mixed_rows), encoding="utf-8")
+        output = tmp_path / "negocios.npz"
+
+        result = save_business_data_bulk(str(source), output_path=str(output))
+
+        assert "✅" in result
+        assert "Negocios válidos: 2" in result
+        assert "Fila 2" in result
+        assert output.exists()
+
+    def test_missing_file(self, tmp_path):
+        """Test error handling for missing files."""
+        result = save_business_data_bulk(str(tmp_path / "nada.csv"))
+
+        assert "❌" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""
+Unit tests for the ANAFI vectorized cashflow projection.
+
+Run with: pytest tests/test_cashflow.py -v
+"""
+import json
+
+import numpy as np
+import pytest
+from src.engine.cashflow import cashflow_alerts, project_cashflow_series
+from src.engine.metrics import load_business_data
+from src.models.financial_data import ColumnarCashflowProjection, MonthlyFlow
+from src.tools.advanced_analysis_tools import project_cashflow
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+class TestProjectCashflowSeries:
+    """Tests for the array-based projection engine."""
+
+    def test_constant_flows(self, sample_business_data):
+        """Test that without growth the flows are constant and cumulative."""
+        series = project_cashflow_series(load_business_data(sample_business_data), months=12)
+
+        assert len(series) == 12
+        np.testing.assert_allclose(series.flujo_neto, 2000.0)
+        assert series.saldo_acumulado[-1] == pytest.approx(24000.0)
+
+    def test_ten_year_growth(self, sample_business_data):
+        """Test that annual growth compounds over a 10-year horizon."""
+        series = project_cashflow_series(load_business_data(sample_business_data), months=120, growth_rate=10)
+
+        assert len(series) == 120
+        # Mes 13 = un año de crecimiento: 1100 unidades
+        assert series.entradas[12] == pytest.approx(11000.0)
+
+    def test_daily_frequency(self, sample_business_data):
+        """Test that daily flows add up to the monthly totals over a year."""
+        series = project_cashflow_series(load_business_data(sample_business_data), months=12, frequency="diaria")
+
+        assert len(series) == 365
+        assert series.saldo_acumulado[-1] == pytest.approx(24000.0)
+
+    def test_seasonality_and_investments(self, sample_business_data):
+        """Test seasonal factors and one-off investments."""
+        seasonality = [0.5] * 6 + [1.5] * 6
+        series = project_cashflow_series(
+            load_business_data(sample_business_data),
+            months=12,
+            seasonality=seasonality,
+            investments=[{"periodo": 3, "monto": 10000}],
+        )
+
+        assert series.entradas[0] == pytest.approx(5000.0)
+        assert series.entradas[6] == pytest.approx(15000.0)
+        assert series.flujo_neto[2] == pytest.approx(-1500.0 - 10000.0)
+
+    def test_invalid_seasonality(self, sample_business_data):
+        """Test that seasonality must have 12 factors."""
+        with pytest.raises(ValueError):
+            project_cashflow_series(load_business_data(sample_business_data), seasonality=[1.0] * 4)
+
+    def test_liquidity_alerts(self, sample_business_data):
+        """Test alerts for consecutive negative flows."""
+        sample_business_data["costos_fijos_mensuales"] = 15000.0
+        series = project_cashflow_series(load_business_data(sample_business_data), months=12)
+
+        alertas = cashflow_alerts(series)
+
+        assert any("CRÍTICA" in a for a in alertas)
+        assert any("12 meses consecutivos" in a for a in alertas)
+
+
+class TestColumnarCashflowProjection:
+    """Tests for the array-backed projection model."""
+
+    @pytest.fixture
+    def projection(self):
+        """Three-month projection."""
+        return ColumnarCashflowProjection(
+            proyeccion_meses=3,
+            periodos=[1, 2, 3],
+            entradas=[100.0, 110.0, 120.0],
+            salidas=[90.0, 90.0, 90.0],
+            flujo_neto=[10.0, 20.0, 30.0],
+            saldo_acumulado=[10.0, 30.0, 60.0],
+        )
+
+    def test_columns_are_contiguous_floats(self, projection):
+        """Test that columns are stored as contiguous float arrays."""
+        assert projection.entradas.dtype == np.float64
+        assert projection.entradas.flags["C_CONTIGUOUS"]
+        assert len(projection) == 3
+
+    def test_lazy_monthly_flow_views(self, projection):
+        """Test that MonthlyFlow objects are created on access."""
+        flow = projection[1]
+
+        assert isinstance(flow, MonthlyFlow)
+        assert flow.mes == 2
+        assert flow.saldo_acumulado == 30.0
+        assert len(projection.to_projection().flujos_mensuales) == 3
+
+    def test_to_json(self, projection):
+        """Test columnar JSON serialization."""
+        payload = json.loads(projection.to_json())
+
+        assert payload["mes"] == [1, 2, 3]
+        assert payload["flujo_neto"] == [10.0, 20.0, 30.0]
+
+    def test_to_csv(self, projection):
+        """Test CSV serialization."""
+        lines = projection.to_csv().splitlines()
+
+        assert lines[0] == "mes,entradas,salidas,flujo_neto,saldo_acumulado"
+        assert lines[3] == "3,120.00,90.00,30.00,60.00"
+
+    def test_to_arrow(self, projection):
+        """Test Arrow export when pyarrow is installed."""
+        pytest.importorskip("pyarrow")
+
+        table = projection.to_arrow()
+
+        assert table.num_rows == 3
+        assert table.column_names[0] == "mes"
+
+
+class TestProjectCashflowTool:
+    """Tests for the project_cashflow tool."""
+
+    def test_long_horizon(self, sample_business_data):
+        """Test a 10-year projection."""
+        result = project_cashflow(sample_business_data, months=120, growth_rate=5)
+
+        assert "✅" in result
+        assert "120 meses" in result
+        assert "último periodo" in result
+
+    def test_max_months(self, sample_business_data):
+        """Test the horizon limit."""
+        result = project_cashflow(sample_business_data, months=601)
+
+        assert "❌" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,177 @@
+"""
+Unit tests for the ANAFI chart renderer.
+
+Run with: pytest tests/test_charts.py -v
+"""
+import base64
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.engine.metrics import load_business_data
+from src.graph.state import file_reducer
+from src.reports.charts import (
+    CHART_NAMES,
+    chart_files,
+    chart_inputs,
+    chart_key,
+    get_chart_cache,
+    render_chart,
+    render_chart_files_batch,
+    render_charts,
+    render_charts_batch,
+)
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Café Ñandú",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty chart cache."""
+    get_chart_cache().clear()
+    yield
+    get_chart_cache().clear()
+
+
+class TestRenderChart:
+    """Tests for single chart rendering."""
+
+    def test_png(self, sample_business_data):
+        """Test that PNG bytes are produced for every chart."""
+        inputs = chart_inputs(load_business_data(sample_business_data))
+
+        for chart in CHART_NAMES:
+            assert render_chart(chart, inputs, "png").startswith(b"\x89PNG")
+
+    def test_svg_is_deterministic(self, sample_business_data):
+        """Test that the same inputs give byte-identical SVG."""
+        inputs = chart_inputs(load_business_data(sample_business_data))
+
+        first = render_chart("utilidad", inputs, "svg")
+
+        assert b"<svg" in first
+        assert first == render_chart("utilidad", inputs, "svg")
+
+    def test_losses_without_breakeven(self):
+        """Test the breakeven chart when price does not cover variable cost."""
+        assert render_chart("punto_equilibrio", (5000.0, 12.0, 10.0, 1000), "png").startswith(b"\x89PNG")
+
+    def test_invalid_chart_or_format(self, sample_business_data):
+        """Test validation of chart names and formats."""
+        inputs = chart_inputs(load_business_data(sample_business_data))
+
+        with pytest.raises(ValueError):
+            render_chart("radar", inputs)
+        with pytest.raises(ValueError):
+            render_chart("utilidad", inputs, "gif")
+
+
+class TestChartCache:
+    """Tests for the input-hash cache."""
+
+    def test_key_depends_on_inputs(self, sample_business_data):
+        """Test that keys change with data, chart and format."""
+        inputs = chart_inputs(load_business_data(sample_business_data))
+        key = chart_key("utilidad", inputs, "png")
+
+        assert key == chart_key("utilidad", inputs, "png")
+        assert key != chart_key("utilidad", inputs[:3] + (1001,), "png")
+        assert key != chart_key("punto_equilibrio", inputs, "png")
+        assert key != chart_key("utilidad", inputs, "svg")
+
+    def test_unchanged_data_is_reused(self, sample_business_data):
+        """Test that a second call takes every chart from the cache."""
+        data = load_business_data(sample_business_data)
+
+        first = render_charts(data)
+        second = render_charts(data)
+
+        assert second == first
+        assert get_chart_cache().stats()["hits"] == len(CHART_NAMES)
+
+    def test_batch_renders_duplicates_once(self, sample_business_data):
+        """Test that businesses with the same inputs share renders."""
+        data = load_business_data(sample_business_data)
+        other = load_business_data({**sample_business_data, "volumen_ventas_estimado": 2000})
+
+        images = render_charts_batch([data, other, data])
+
+        assert images[0] == images[2]
+        assert images[0]["utilidad"] != images[1]["utilidad"]
+        assert get_chart_cache().stats()["size"] == 2 * len(CHART_NAMES)
+
+    def test_worker_pool(self, sample_business_data, monkeypatch):
+        """Test rendering a batch with a process pool."""
+        monkeypatch.setattr("src.engine.parallel.os.cpu_count", lambda: 4)
+        businesses = [
+            load_business_data({**sample_business_data, "volumen_ventas_estimado": v})
+            for v in (800, 1000)
+        ]
+
+        images = render_charts_batch(businesses, workers=2)
+
+        assert images == render_charts_batch(businesses)
+        assert all(image.startswith(b"\x89PNG") for charts in images for image in charts.values())
+
+    def test_worker_count_is_bounded(self, sample_business_data, monkeypatch):
+        """Test that a requested worker count is capped before creating the pool."""
+        monkeypatch.setattr("src.engine.parallel.os.cpu_count", lambda: 8)
+        monkeypatch.delenv("ANAFI_MAX_WORKERS", raising=False)
+        pools = []
+        monkeypatch.setattr("src.reports.charts.process_pool", lambda workers: pools.append(workers) or ThreadPoolExecutor(workers))
+        businesses = [load_business_data({**sample_business_data, "volumen_ventas_estimado": 900 + v}) for v in range(5)]
+
+        render_charts_batch(businesses, workers=1000)
+
+        assert pools == [4]
+
+
+class TestChartFiles:
+    """Tests for charts as virtual files."""
+
+    def test_base64_files(self, sample_business_data):
+        """Test that images are stored as base64 FileData."""
+        images = render_charts(load_business_data(sample_business_data))
+
+        files = chart_files(images)
+
+        entry = files["/reports/charts/utilidad.png"]
+        assert entry["encoding"] == "base64"
+        assert base64.b64decode(entry["content"]) == images["utilidad"]
+
+    def test_batch_files_merge_into_state(self, sample_business_data):
+        """Test per-business directories merged with the state file system."""
+        businesses = [
+            load_business_data(sample_business_data),
+            load_business_data({**sample_business_data, "nombre_negocio": "Otro"}),
+        ]
+
+        files = file_reducer({"/notas.md": {"content": "x", "encoding": "utf-8"}}, render_chart_files_batch(businesses))
+
+        assert "/notas.md" in files
+        assert "/reports/charts/cafe_nandu/punto_equilibrio.png" in files
+        assert "/reports/charts/otro/composicion_costos.png" in files
+
+    def test_batch_files_with_duplicate_names(self, sample_business_data):
+        """Test that businesses with the same name do not overwrite each other's charts."""
+        businesses = [load_business_data(sample_business_data)] * 2
+
+        files = render_chart_files_batch(businesses)
+
+        assert "/reports/charts/cafe_nandu/utilidad.png" in files
+        assert "/reports/charts/cafe_nandu_2/utilidad.png" in files
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
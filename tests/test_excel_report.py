@@ -0,0 +1,138 @@
+"""
+Unit tests for the ANAFI Excel report writer.
+
+Run with: pytest tests/test_excel_report.py -v
+"""
+import pytest
+from openpyxl import load_workbook
+from src.engine.cashflow import project_cashflow_series
+from src.engine.metrics import load_business_data
+from src.models.financial_data import BasicMetrics, ScenarioData
+from src.reports.excel import write_excel_report
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+def make_scenarios(n):
+    """Generate n custom scenarios lazily."""
+    metrics = BasicMetrics(
+        costos_totales=0.0,
+        punto_equilibrio_unidades=0.0,
+        punto_equilibrio_dinero=0.0,
+        utilidad_bruta=0.0,
+        utilidad_neta=0.0,
+        rentabilidad_sobre_ventas=0.0,
+    )
+    for i in range(n):
+        yield ScenarioData(
+            nombre_escenario=f"Escenario {i}",
+            tipo="personalizado",
+            precio_venta=10.0 + i,
+            costo_variable=3.0,
+            volumen_ventas=1000,
+            costos_fijos=5000.0,
+            metricas_calculadas=metrics,
+        )
+
+
+@pytest.fixture
+def workbook_path(sample_business_data, tmp_path):
+    """Workbook with a 10-year cashflow and 500 scenarios."""
+    data = load_business_data(sample_business_data)
+    path = tmp_path / "reportes" / "analisis.xlsx"
+    write_excel_report(
+        str(path),
+        data,
+        cashflow=project_cashflow_series(data, months=120),
+        scenarios=make_scenarios(500),
+    )
+    return path
+
+
+class TestWriteExcelReport:
+    """Tests for the write-only workbook."""
+
+    def test_sheets(self, workbook_path):
+        """Test the five sheets in order."""
+        wb = load_workbook(workbook_path, read_only=True)
+
+        assert wb.sheetnames == ["Datos de Entrada", "Métricas Básicas", "Flujo de Efectivo", "Escenarios", "Fórmulas"]
+
+    def test_row_counts(self, sample_business_data, tmp_path):
+        """Test the rows written per sheet."""
+        data = load_business_data(sample_business_data)
+
+        filas = write_excel_report(str(tmp_path / "a.xlsx"), data, scenarios=make_scenarios(3))
+
+        assert filas == {
+            "Datos de Entrada": 7,
+            "Métricas Básicas": 10,
+            "Flujo de Efectivo": 0,
+            "Escenarios": 3,
+            "Fórmulas": 6,
+        }
+
+    def test_input_values(self, workbook_path):
+        """Test that input data is stored as numbers."""
+        ws = load_workbook(workbook_path)["Datos de Entrada"]
+
+        assert ws["B4"].value == 5000.0
+        assert ws["B7"].value == 1000
+        assert ws["B4"].number_format == '"$"#,##0.00'
+
+    def test_metric_formulas(self, workbook_path):
+        """Test that metrics are live formulas over the input sheet."""
+        ws = load_workbook(workbook_path)["Métricas Básicas"]
+
+        assert ws["B2"].value == "='Datos de Entrada'!$B$6*'Datos de Entrada'!$B$7"
+        assert ws["B9"].value == "=B2-B4"
+        assert ws["A9"].value == "Utilidad Neta"
+
+    def test_cashflow_rows(self, workbook_path):
+        """Test that the whole projection is written with running-balance formulas."""
+        ws = load_workbook(workbook_path)["Flujo de Efectivo"]
+
+        assert ws.max_row == 121
+        assert ws["B2"].value == pytest.approx(10000.0)
+        assert ws["D2"].value == "=B2-C2"
+        assert ws["E2"].value == "=D2"
+        assert ws["E121"].value == "=E120+D121"
+
+    def test_scenario_rows(self, workbook_path):
+        """Test that every scenario is written with formula outputs."""
+        ws = load_workbook(workbook_path)["Escenarios"]
+
+        assert ws.max_row == 501
+        assert ws["A501"].value == "Escenario 499"
+        assert ws["I3"].value == "=G3-H3"
+
+    def test_user_text_is_not_a_formula(self, sample_business_data, tmp_path):
+        """Test that names starting with "=" are stored as strings."""
+        payload = '=HYPERLINK("http://example.com","clic")'
+        data = load_business_data({**sample_business_data, "nombre_negocio": payload, "tipo_negocio": "=1+1"})
+        scenario = next(make_scenarios(1)).model_copy(update={"nombre_escenario": payload})
+        path = tmp_path / "analisis.xlsx"
+
+        write_excel_report(str(path), data, scenarios=[scenario])
+        wb = load_workbook(path)
+
+        assert wb["Datos de Entrada"]["B2"].value == payload
+        assert wb["Datos de Entrada"]["B2"].data_type == "s"
+        assert wb["Datos de Entrada"]["B3"].data_type == "s"
+        assert wb["Escenarios"]["A2"].data_type == "s"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,196 @@
+"""
+Unit tests for the ANAFI fast-path router.
+
+Run with: pytest tests/test_fast_path_router.py -v
+"""
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from src.graph.builder import get_deep_agent
+from src.graph.file_store import JsonFile
+from src.graph.router import (
+    BUSINESS_DATA_PATH,
+    FastPathRouter,
+    build_routed_agent,
+    classify_request,
+    read_business_data,
+)
+from src.tools import save_business_data, tool_cache
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def files(sample_business_data):
+    """Virtual file system with saved business data."""
+    return {BUSINESS_DATA_PATH: {"content": json.dumps(sample_business_data), "encoding": "utf-8"}}
+
+
+def delegated_agent(state):
+    """Stand-in for the deep agent."""
+    return {"messages": [AIMessage(content="respuesta del agente")]}
+
+
+class TestClassifyRequest:
+    """Tests for request classification."""
+
+    @pytest.mark.parametrize("text,intent", [
+        ("¿Cuál es mi punto de equilibrio?", "punto_equilibrio"),
+        ("Calcula la utilidad", "utilidad"),
+        ("¿Qué rentabilidad tiene el negocio?", "rentabilidad"),
+        ("Dame los costos totales", "costos"),
+        ("Calcula todas las métricas", "metricas_basicas"),
+    ])
+    def test_known_intents(self, text, intent):
+        """Test that single-tool requests are recognized."""
+        assert classify_request(text) == intent
+
+    @pytest.mark.parametrize("text", [
+        "Calcula la utilidad y la rentabilidad",
+        "¿Qué pasa con la utilidad si el precio sube a 12?",
+        "Genera un reporte PDF",
+        "Hola",
+    ])
+    def test_ambiguous_requests(self, text):
+        """Test that ambiguous or complex requests go to the agent."""
+        assert classify_request(text) is None
+
+    @pytest.mark.parametrize("text", [
+        "¿Cómo puedo mejorar mi rentabilidad?",
+        "¿Qué es el punto de equilibrio?",
+        "¿Es buena mi utilidad para un restaurante?",
+        "No entiendo el ROI",
+        "Quiero ganancia de cinco mil, ¿qué precio necesito?",
+        "¿Debería preocuparme por mis costos totales?",
+        "Utilidad",
+    ])
+    def test_questions_and_advice(self, text):
+        """Test that explanations, advice and goals are not answered with a canned calculation."""
+        assert classify_request(text) is None
+
+
+class TestReadBusinessData:
+    """Tests for reading data from the virtual file system."""
+
+    def test_file_data(self, files, sample_business_data):
+        """Test FileData dictionaries."""
+        assert read_business_data({"files": files}) == sample_business_data
+
+    def test_line_list_content(self, sample_business_data):
+        """Test content stored as a list of lines."""
+        content = json.dumps(sample_business_data, indent=2).splitlines()
+        state = {"files": {BUSINESS_DATA_PATH: {"content": content}}}
+
+        assert read_business_data(state) == sample_business_data
+
+    def test_json_file(self, sample_business_data):
+        """Test structured JsonFile values without rendering their content."""
+        file = JsonFile(sample_business_data)
+
+        assert read_business_data({"files": {BUSINESS_DATA_PATH: file}}) == sample_business_data
+        assert not file.is_rendered
+
+    def test_missing_or_invalid(self):
+        """Test that missing or malformed files are ignored."""
+        assert read_business_data({}) is None
+        assert read_business_data({"files": {BUSINESS_DATA_PATH: "no es json"}}) is None
+
+
+class TestRoutedAgent:
+    """Tests for the routed graph."""
+
+    def test_fast_path(self, files):
+        """Test that pure calculations are answered without the agent."""
+        router = FastPathRouter()
+        agent = build_routed_agent(delegated_agent, router)
+
+        result = agent.invoke({"messages": [HumanMessage("¿Cuál es mi punto de equilibrio?")], "files": files})
+
+        assert "Punto de equilibrio calculado" in result["messages"][-1].content
+        assert "714.29" in result["messages"][-1].content
+        assert router.stats()["fast_path"] == 1
+
+    def test_delegates_without_data(self):
+        """Test that requests without saved data go to the agent."""
+        router = FastPathRouter()
+        agent = build_routed_agent(delegated_agent, router)
+
+        result = agent.invoke({"messages": [HumanMessage("¿Cuál es mi punto de equilibrio?")]})
+
+        assert result["messages"][-1].content == "respuesta del agente"
+        assert router.stats() == {"fast_path": 0, "delegated": 1, "fast_path_ratio": 0.0}
+
+    def test_delegates_complex_requests(self, files):
+        """Test that complex requests go to the agent."""
+        router = FastPathRouter()
+        agent = build_routed_agent(delegated_agent, router)
+
+        result = agent.invoke({"messages": [HumanMessage("Crea un escenario pesimista")], "files": files})
+
+        assert result["messages"][-1].content == "respuesta del agente"
+        assert router.delegated == 1
+
+    def test_delegates_invalid_data(self, files, sample_business_data):
+        """Test that invalid saved data goes to the agent."""
+        sample_business_data["precio_venta_unitario"] = -1
+        files[BUSINESS_DATA_PATH]["content"] = json.dumps(sample_business_data)
+        router = FastPathRouter()
+        agent = build_routed_agent(delegated_agent, router)
+
+        agent.invoke({"messages": [HumanMessage("Calcula la utilidad")], "files": files})
+
+        assert router.delegated == 1
+
+
+class TestSavedDataHandoff:
+    """Tests for the data saved by the data input agent reaching the fast path."""
+
+    def test_save_writes_business_data_file(self, sample_business_data):
+        """Test that the tool writes the validated data to the state."""
+        result = save_business_data(sample_business_data, tool_call_id="call_1")
+
+        saved = result.update["files"][BUSINESS_DATA_PATH]
+        assert isinstance(saved, JsonFile)
+        assert saved["data"]["precio_venta_unitario"] == 10.0
+        assert result.update["messages"][0].tool_call_id == "call_1"
+        assert read_business_data({"files": result.update["files"]})["nombre_negocio"] == "Test Restaurant"
+
+    def test_invalid_data_writes_nothing(self, sample_business_data):
+        """Test that rejected data is reported without touching the state."""
+        sample_business_data["precio_venta_unitario"] = -1
+
+        result = save_business_data(sample_business_data, tool_call_id="call_1")
+
+        assert isinstance(result, str) and result.startswith("❌")
+
+    def test_second_turn_takes_fast_path(self):
+        """Test that data saved in one turn lets the next calculation skip the agent."""
+        router = FastPathRouter()
+        agent = build_routed_agent(get_deep_agent("replay"), router)
+        tool_cache.clear()
+        try:
+            first = agent.invoke({"messages": [HumanMessage("Analiza mi negocio y genera un reporte")]})
+            second = agent.invoke({**first, "messages": first["messages"] + [HumanMessage("Calcula la utilidad")]})
+        finally:
+            tool_cache.clear()
+
+        assert isinstance(first["files"][BUSINESS_DATA_PATH], JsonFile)
+        assert router.stats()["delegated"] == 1 and router.stats()["fast_path"] == 1
+        assert second["messages"][-1].name == "anafi_fast_path"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,272 @@
+"""
+Unit tests for the ANAFI virtual file store and file types.
+
+Run with: pytest tests/test_file_store.py -v
+"""
+import json
+import pickle
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, START, StateGraph
+from src.graph.file_store import FILE_MSGPACK_TYPES, FileMap, JsonFile, read_json_file
+from src.graph.state import DeepAgentState, allow_file_types, file_reducer
+
+
+@pytest.fixture
+def files():
+    """Virtual files as written by the agents."""
+    return {f"/calculations/archivo_{i}.json": {"content": f'{{"i": {i}}}'} for i in range(2000)}
+
+
+class TestFileMap:
+    """Tests for the persistent mapping."""
+
+    def test_mapping_interface(self, files):
+        """Test that FileMap behaves like a read-only dict."""
+        file_map = FileMap(files)
+
+        assert len(file_map) == 2000
+        assert file_map == files
+        assert file_map["/calculations/archivo_7.json"] == files["/calculations/archivo_7.json"]
+        assert file_map.get("/nada.json") is None
+        assert "/calculations/archivo_1999.json" in file_map
+        assert sorted(file_map) == sorted(files)
+
+    def test_update_does_not_modify_original(self, files):
+        """Test that old versions keep their contents."""
+        old = FileMap(files)
+
+        new = old.update({"/calculations/archivo_0.json": {"content": "nuevo"}, "/nuevo.json": {"content": "{}"}})
+
+        assert old["/calculations/archivo_0.json"] == {"content": '{"i": 0}'}
+        assert new["/calculations/archivo_0.json"] == {"content": "nuevo"}
+        assert len(old) == 2000
+        assert len(new) == 2001
+
+    def test_unchanged_entries_are_shared(self, files):
+        """Test that unchanged values are the same objects in both versions."""
+        old = FileMap(files)
+
+        new = old.set("/calculations/archivo_0.json", {"content": "nuevo"})
+
+        assert all(new[key] is old[key] for key in files if key != "/calculations/archivo_0.json")
+
+    def test_hash_collisions(self, monkeypatch):
+        """Test keys whose hashes collide completely."""
+        monkeypatch.setattr("src.graph.file_store._hash", lambda key: 12345)
+
+        file_map = FileMap({"/a": 1, "/b": 2}).set("/c", 3).set("/a", 10)
+
+        assert dict(file_map) == {"/a": 10, "/b": 2, "/c": 3}
+        assert len(file_map) == 3
+
+    def test_delete(self, files):
+        """Test removing keys, including from collision buckets."""
+        old = FileMap(files)
+
+        new = old.delete("/calculations/archivo_0.json")
+
+        assert len(new) == 1999 and "/calculations/archivo_0.json" not in new
+        assert "/calculations/archivo_0.json" in old
+        assert new.delete("/nada.json") is new
+        assert dict(new.update({key: None for key in files})) == {}
+
+    def test_delete_hash_collisions(self, monkeypatch):
+        """Test deleting keys whose hashes collide completely."""
+        monkeypatch.setattr("src.graph.file_store._hash", lambda key: 12345)
+
+        file_map = FileMap({"/a": 1, "/b": 2, "/c": 3}).delete("/b")
+
+        assert dict(file_map) == {"/a": 1, "/c": 3}
+        assert len(file_map) == 2
+
+    def test_pickle(self, files):
+        """Test pickling round trip."""
+        file_map = FileMap(files)
+
+        assert pickle.loads(pickle.dumps(file_map)) == files
+
+    def test_checkpoint_serialization(self, files):
+        """Test the LangGraph checkpoint serializer round trip."""
+        serializer = JsonPlusSerializer()
+
+        restored = serializer.loads_typed(serializer.dumps_typed(FileMap(files)))
+
+        assert isinstance(restored, FileMap)
+        assert restored == files
+
+    def test_strict_checkpoint_serialization(self):
+        """Test the round trip with a strict msgpack allowlist."""
+        serializer = JsonPlusSerializer(allowed_msgpack_modules=FILE_MSGPACK_TYPES)
+        files = FileMap({"/reports/alerts.json": JsonFile({"alertas": []}), "/notas.txt": {"content": "hola"}})
+
+        restored = serializer.loads_typed(serializer.dumps_typed(files))
+
+        assert isinstance(restored, FileMap)
+        assert isinstance(restored["/reports/alerts.json"], JsonFile)
+        assert restored["/reports/alerts.json"]["content"] == files["/reports/alerts.json"]["content"]
+
+    def test_unregistered_types_fall_back_to_dicts(self):
+        """Test that a strict serializer without the registration still yields readable files."""
+        serializer = JsonPlusSerializer(allowed_msgpack_modules=None)
+        files = FileMap({"/reports/alerts.json": JsonFile({"alertas": []})})
+
+        restored = serializer.loads_typed(serializer.dumps_typed(files))
+
+        assert not isinstance(restored, FileMap)
+        assert read_json_file(restored, "/reports/alerts.json") == {"alertas": []}
+        assert isinstance(file_reducer(restored, {"/b.txt": {"content": ""}}), FileMap)
+
+
+class TestFileReducer:
+    """Tests for the state reducer."""
+
+    def test_merge(self):
+        """Test that the right side takes precedence."""
+        merged = file_reducer({"/a": 1, "/b": 2}, {"/b": 3, "/c": 4})
+
+        assert dict(merged) == {"/a": 1, "/b": 3, "/c": 4}
+        assert isinstance(merged, FileMap)
+
+    def test_none_sides(self):
+        """Test initialization and empty updates."""
+        assert file_reducer(None, None) is None
+        assert dict(file_reducer(None, {"/a": 1})) == {"/a": 1}
+
+        left = FileMap({"/a": 1})
+        assert file_reducer(left, None) is left
+
+    def test_none_deletes(self):
+        """Test deletion markers as written by deepagents."""
+        merged = file_reducer({"/a": 1, "/b": 2}, {"/a": None, "/c": 3})
+
+        assert dict(merged) == {"/b": 2, "/c": 3}
+        assert dict(file_reducer(None, {"/a": None, "/b": 2})) == {"/b": 2}
+
+    def test_full_map_update_shares_entries(self, files):
+        """Test that merging back a sub-agent's full file map keeps unchanged nodes."""
+        left = FileMap(files)
+        returned = {**files, "/nuevo.json": {"content": "{}"}}
+
+        merged = file_reducer(left, returned)
+
+        assert len(merged) == 2001
+        shared = set(map(id, left._root.values())) & set(map(id, merged._root.values()))
+        assert len(shared) >= len(left._root) - 1
+
+    def test_chained_updates(self, files):
+        """Test many single-file writes as in a long session."""
+        state = None
+        for key, value in files.items():
+            state = file_reducer(state, {key: value})
+
+        assert state == files
+
+
+class TestJsonFile:
+    """Tests for the lazily rendered JSON virtual file."""
+
+    @pytest.fixture
+    def alerts(self):
+        """Structured payload as written by the report tools."""
+        return {"negocio": "Café Ñandú", "alertas": [{"nivel": "alto", "valor": 1.5}]}
+
+    def test_content_is_lazy(self, alerts):
+        """Test that content is rendered on first access only."""
+        file = JsonFile(alerts)
+
+        assert not file.is_rendered
+        assert file["data"] is alerts
+        assert not file.is_rendered
+
+        content = file["content"]
+
+        assert json.loads(content) == alerts
+        assert "Ñandú" in content
+        assert file["content"] is content
+
+    def test_write_data_invalidates_content(self, alerts):
+        """Test that writing data drops the cached text."""
+        file = JsonFile(alerts)
+        file["content"]
+
+        file["data"] = {"alertas": []}
+
+        assert not file.is_rendered
+        assert json.loads(file["content"]) == {"alertas": []}
+
+    def test_write_content_updates_data(self, alerts):
+        """Test that edited text is parsed back into data."""
+        file = JsonFile(alerts)
+
+        file["content"] = '{"alertas": [1, 2]}'
+
+        assert file["data"] == {"alertas": [1, 2]}
+
+    def test_non_json_content_is_kept_as_text(self, alerts):
+        """Test that text that is not JSON does not break data reads or checkpoints."""
+        file = JsonFile(alerts)
+        file["content"] = "Notas: revisar costos {pendiente"
+
+        assert file["data"] is None
+        assert read_json_file({"/reports/alerts.json": file}, "/reports/alerts.json") is None
+        assert file.model_dump() == {"content": "Notas: revisar costos {pendiente"}
+        for serializer in (JsonPlusSerializer(), JsonPlusSerializer(allowed_msgpack_modules=FILE_MSGPACK_TYPES)):
+            restored = serializer.loads_typed(serializer.dumps_typed(FileMap({"/reports/alerts.json": file})))
+            assert restored["/reports/alerts.json"]["content"] == file["content"]
+        assert pickle.loads(pickle.dumps(file))["content"] == file["content"]
+
+    def test_dict_compatibility(self, alerts):
+        """Test that readers of the old {"data", "content"} dicts keep working."""
+        file = JsonFile(alerts, modified_at="2026-01-01")
+
+        assert set(file) == {"data", "content", "modified_at"}
+        assert file.get("content") == json.dumps(alerts, indent=2, ensure_ascii=False)
+        assert dict(file)["data"] == alerts
+
+    def test_serialization_skips_content(self, alerts):
+        """Test that checkpoints store the data once."""
+        file = JsonFile(alerts)
+        file["content"]
+        serializer = JsonPlusSerializer()
+
+        assert "content" not in file.model_dump()
+        restored = serializer.loads_typed(serializer.dumps_typed(file))
+        assert isinstance(restored, JsonFile)
+        assert restored["data"] == alerts
+        assert pickle.loads(pickle.dumps(file))["content"] == file["content"]
+
+    def test_inside_file_map(self, alerts):
+        """Test JsonFile values stored in the persistent file map."""
+        files = file_reducer({}, {"/reports/alerts.json": JsonFile(alerts)})
+
+        assert files["/reports/alerts.json"]["data"] == alerts
+
+
+class TestCheckpointer:
+    """Tests for the checkpointer registration of the file types."""
+
+    def test_allow_file_types(self):
+        """Test that compiled graphs extend their allowlist and checkpointer."""
+        graph = StateGraph(DeepAgentState)
+        graph.add_node("escribir", lambda state: {"files": {"/reports/alerts.json": JsonFile({"alertas": [1]})}})
+        graph.add_edge(START, "escribir")
+        graph.add_edge("escribir", END)
+        saver = InMemorySaver(serde=JsonPlusSerializer(allowed_msgpack_modules=[("datetime", "datetime")]))
+        compiled = graph.compile(checkpointer=saver)
+        compiled._serde_allowlist = set()
+
+        allow_file_types(compiled)
+        config = {"configurable": {"thread_id": "t1"}}
+        compiled.invoke({"messages": []}, config)
+        files = compiled.get_state(config).values["files"]
+
+        assert set(FILE_MSGPACK_TYPES) <= compiled._serde_allowlist
+        assert isinstance(files, FileMap)
+        assert isinstance(files["/reports/alerts.json"], JsonFile)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,188 @@
+"""
+Unit tests for the ANAFI goal seek solver.
+
+Run with: pytest tests/test_goal_seek.py -v
+"""
+import numpy as np
+import pytest
+from src.engine.goal_seek import goal_seek, goal_seek_batch
+from src.engine.metrics import compute_batch_metrics, load_business_data
+from src.tools import calculate_target_value
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def portfolio():
+    """Random portfolio of 200 businesses."""
+    rng = np.random.default_rng(7)
+    n = 200
+    return {
+        "costos_fijos_mensuales": rng.uniform(100, 20000, n),
+        "costo_variable_unitario": rng.uniform(0, 20, n),
+        "precio_venta_unitario": rng.uniform(1, 40, n),
+        "volumen_ventas_estimado": rng.integers(1, 5000, n).astype(float),
+        "inversion_inicial": rng.uniform(1000, 100000, n),
+    }
+
+
+VARIABLES = ["precio_venta", "costo_variable", "costo_fijo", "volumen_ventas"]
+OBJECTIVES = [("utilidad_neta", 5000.0), ("ros", 20.0), ("roi", 20.0)]
+
+
+def _metrics_with(portfolio, variable, valor):
+    fields = {
+        "precio_venta": "precio_venta_unitario",
+        "costo_variable": "costo_variable_unitario",
+        "costo_fijo": "costos_fijos_mensuales",
+        "volumen_ventas": "volumen_ventas_estimado",
+    }
+    data = {**portfolio, fields[variable]: valor}
+    return compute_batch_metrics(
+        data["costos_fijos_mensuales"],
+        data["costo_variable_unitario"],
+        data["precio_venta_unitario"],
+        data["volumen_ventas_estimado"],
+        data["inversion_inicial"],
+    )
+
+
+class TestClosedForm:
+    """Tests for the closed-form solutions."""
+
+    def test_single_business(self, sample_business_data):
+        """Test the price needed for $5,000/month."""
+        data = load_business_data(sample_business_data)
+
+        valor, result = goal_seek(data, "precio_venta", "utilidad_neta", 5000.0)
+
+        assert valor == pytest.approx(13.0)
+        assert result.metodo == "cerrado"
+        assert result.cambio_porcentual[0] == pytest.approx(30.0)
+
+    @pytest.mark.parametrize("variable", VARIABLES)
+    @pytest.mark.parametrize("objetivo,meta", OBJECTIVES)
+    def test_round_trip(self, portfolio, variable, objetivo, meta):
+        """Test that the solved values reach the target in the metrics engine."""
+        result = goal_seek_batch(portfolio, variable, objetivo, meta)
+        metric = {"utilidad_neta": "utilidad_neta", "ros": "rentabilidad_sobre_ventas", "roi": "rentabilidad_sobre_inversion"}[objetivo]
+
+        reached = getattr(_metrics_with(portfolio, variable, result.valor), metric)
+
+        ok = result.factible
+        assert ok.any()
+        np.testing.assert_allclose(reached[ok], meta, rtol=1e-9)
+
+    @pytest.mark.parametrize("variable", VARIABLES)
+    @pytest.mark.parametrize("objetivo,meta", OBJECTIVES)
+    def test_matches_numeric(self, portfolio, variable, objetivo, meta):
+        """Test that the closed form and the bisection fallback agree."""
+        closed = goal_seek_batch(portfolio, variable, objetivo, meta, method="cerrado")
+        numeric = goal_seek_batch(portfolio, variable, objetivo, meta, method="numerico")
+
+        assert np.array_equal(closed.factible, numeric.factible)
+        np.testing.assert_allclose(numeric.valor[closed.factible], closed.valor[closed.factible], rtol=1e-9)
+
+
+class TestFeasibility:
+    """Tests for targets that cannot be reached."""
+
+    def test_out_of_domain_is_nan(self, sample_business_data):
+        """Test that a negative required fixed cost is reported as infeasible."""
+        data = load_business_data(sample_business_data)
+
+        valor, result = goal_seek(data, "costo_fijo", "ros", 80.0)
+
+        assert np.isnan(valor)
+        assert not result.factible[0]
+
+    def test_roi_without_investment(self, sample_business_data):
+        """Test that ROI targets need an initial investment."""
+        data = load_business_data({**sample_business_data, "inversion_inicial": None})
+
+        valor, _ = goal_seek(data, "volumen_ventas", "roi", 30.0)
+
+        assert np.isnan(valor)
+
+    def test_per_business_targets(self, portfolio):
+        """Test one target value per business."""
+        metas = np.linspace(0, 10000, 200)
+
+        result = goal_seek_batch(portfolio, "precio_venta", "utilidad_neta", metas)
+
+        reached = _metrics_with(portfolio, "precio_venta", result.valor).utilidad_neta
+        np.testing.assert_allclose(reached, metas, atol=1e-6)
+
+
+class TestNumericFallback:
+    """Tests for targets without a closed form."""
+
+    def test_breakeven_target(self, portfolio):
+        """Test solving for the price that sets the breakeven point."""
+        result = goal_seek_batch(portfolio, "precio_venta", "punto_equilibrio_unidades", 500.0)
+
+        pe = _metrics_with(portfolio, "precio_venta", result.valor).punto_equilibrio_unidades
+
+        assert result.metodo == "numerico"
+        assert result.factible.any()
+        np.testing.assert_allclose(pe[result.factible], 500.0, rtol=1e-6)
+
+    def test_invalid_arguments(self, portfolio):
+        """Test errors for unknown variables, objectives and methods."""
+        with pytest.raises(ValueError):
+            goal_seek_batch(portfolio, "impuestos", "ros", 10.0)
+        with pytest.raises(ValueError):
+            goal_seek_batch(portfolio, "precio_venta", "ebitda", 10.0)
+        with pytest.raises(ValueError):
+            goal_seek_batch(portfolio, "precio_venta", "punto_equilibrio_unidades", 10.0, method="cerrado")
+
+
+class TestTargetValueTool:
+    """Tests for the calculate_target_value tool."""
+
+    def test_volume_message(self):
+        """Test the message for a volume target."""
+        result = calculate_target_value(
+            variable="volumen_ventas",
+            objetivo="roi",
+            valor_objetivo=30.0,
+            precio_venta_unitario=10.0,
+            costo_variable_unitario=3.0,
+            costos_fijos_mensuales=5000.0,
+            volumen_ventas_estimado=1000,
+            inversion_inicial=50000.0,
+        )
+
+        assert result.startswith("✅ Meta de ROI anual")
+        assert "892.86 unidades" in result
+        assert "al menos 893 unidades" in result
+
+    def test_unreachable_target(self):
+        """Test the message when the target is out of reach."""
+        result = calculate_target_value(
+            variable="costo_fijo",
+            objetivo="ros",
+            valor_objetivo=80.0,
+            precio_venta_unitario=10.0,
+            costo_variable_unitario=3.0,
+            costos_fijos_mensuales=5000.0,
+            volumen_ventas_estimado=1000,
+        )
+
+        assert result.startswith("❌") and "no es alcanzable" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,219 @@
+"""
+Unit tests for the exact-match LLM response cache.
+
+Run with: pytest tests/test_llm_cache.py -v
+"""
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import tool
+from src.graph.builder import build_anafi_agent
+from src.llm.cache import (
+    LLMCacheMiddleware,
+    SQLiteLLMCache,
+    make_llm_cache_key,
+    set_llm_cache,
+    tool_schemas,
+)
+from src.observability import MetricsRegistry, set_registry
+from src.tools import tool_cache
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@tool
+def calculate_profit(volumen_ventas_estimado: int) -> str:
+    """Calcula la utilidad."""
+    return "✅"
+
+
+@pytest.fixture
+def cache():
+    """In-process cache with a deterministic clock."""
+    clock = itertools.count()
+    return SQLiteLLMCache(":memory:", timer=lambda: next(clock))
+
+
+@pytest.fixture
+def registry():
+    """Fresh global registry for each test."""
+    registry = MetricsRegistry()
+    set_registry(registry)
+    yield registry
+    set_registry(None)
+
+
+def key(messages, system="Eres un analista.", model=None, tools=(calculate_profit,)):
+    return make_llm_cache_key(model or {"name": "gpt-4o-mini"}, system, messages, tool_schemas(tools))
+
+
+def model_request(messages, system="Eres un analista."):
+    return SimpleNamespace(
+        model=SimpleNamespace(model_name="gpt-4o-mini", _llm_type="openai-chat", _identifying_params={"temperature": 0}),
+        messages=messages,
+        system_message=SystemMessage(content=system),
+        tools=[calculate_profit],
+        tool_choice=None,
+        response_format=None,
+        model_settings={},
+    )
+
+
+def reply(_request):
+    message = AIMessage(
+        content="",
+        tool_calls=[{"name": "calculate_profit", "args": {"volumen_ventas_estimado": 1000}, "id": "call_1"}],
+    )
+    return SimpleNamespace(result=[message], structured_response=None)
+
+
+class TestCacheKey:
+    """Tests for the exact-match key."""
+
+    def test_ignores_message_ids(self):
+        """Test that message and tool call IDs do not change the key."""
+        first = [HumanMessage(content="hola", id="a"), AIMessage(content="", tool_calls=[{"name": "x", "args": {}, "id": "c1"}]),
+                 ToolMessage(content="✅", tool_call_id="c1")]
+        second = [HumanMessage(content="hola", id="b"), AIMessage(content="", tool_calls=[{"name": "x", "args": {}, "id": "c2"}]),
+                  ToolMessage(content="✅", tool_call_id="c2")]
+
+        assert key(first) == key(second)
+
+    def test_components_change_key(self):
+        """Test that model, system prompt, history and tools are all part of the key."""
+        messages = [HumanMessage(content="hola")]
+        base = key(messages)
+
+        assert key([HumanMessage(content="adiós")]) != base
+        assert key(messages, system="Otro prompt.") != base
+        assert key(messages, model={"name": "gpt-4o"}) != base
+        assert key(messages, tools=()) != base
+
+
+class TestSQLiteLLMCache:
+    """Tests for the SQLite backend."""
+
+    def test_roundtrip(self, cache):
+        """Test storing and reading back a response."""
+        cache.set("k", [AIMessage(content="respuesta")])
+
+        assert cache.get("k")[0].content == "respuesta"
+        assert cache.get("otra") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_persistence(self, tmp_path):
+        """Test that responses survive a new connection."""
+        path = str(tmp_path / "llm.db")
+        SQLiteLLMCache(path).set("k", [AIMessage(content="respuesta")])
+
+        reopened = SQLiteLLMCache(path)
+
+        assert reopened.get("k")[0].content == "respuesta"
+        assert reopened.stats()["bytes"] > 0
+
+    def test_size_bounded_lru_eviction(self, cache):
+        """Test that the least recently used responses are evicted first."""
+        cache.set("a", [AIMessage(content="x" * 100)])
+        entry_size = cache.stats()["bytes"]
+        cache.max_bytes = entry_size * 2
+        cache.set("b", [AIMessage(content="x" * 100)])
+        cache.get("a")
+        cache.set("c", [AIMessage(content="x" * 100)])
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+class TestMiddleware:
+    """Tests for the model-call middleware."""
+
+    def test_hit_skips_model(self, cache, registry):
+        """Test that an identical call is answered without calling the model."""
+        middleware = LLMCacheMiddleware("basic_calculations_agent", cache=cache)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return reply(request)
+
+        first = middleware.wrap_model_call(model_request([HumanMessage(content="calcula")]), handler)
+        second = middleware.wrap_model_call(model_request([HumanMessage(content="calcula")]), handler)
+
+        assert len(calls) == 1
+        assert second.result[0].tool_calls[0]["args"] == first.result[0].tool_calls[0]["args"]
+        assert second.result[0].tool_calls[0]["id"] != "call_1"
+        assert second.result[0].response_metadata["anafi_cache"] == "hit"
+        requests = registry.get("anafi_llm_cache_requests_total")
+        assert requests.value(agent="basic_calculations_agent", result="hit") == 1
+        assert requests.value(agent="basic_calculations_agent", result="miss") == 1
+
+    def test_different_system_prompt_misses(self, cache):
+        """Test that a changed system prompt reaches the model."""
+        middleware = LLMCacheMiddleware("supervisor", cache=cache)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return reply(request)
+
+        middleware.wrap_model_call(model_request([HumanMessage(content="hola")]), handler)
+        middleware.wrap_model_call(model_request([HumanMessage(content="hola")], system="Nuevo prompt."), handler)
+
+        assert len(calls) == 2
+
+    def test_disabled_without_cache(self):
+        """Test pass-through when no cache is configured."""
+        set_llm_cache(None)
+        middleware = LLMCacheMiddleware("supervisor")
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return reply(request)
+
+        for _ in range(2):
+            middleware.wrap_model_call(model_request([HumanMessage(content="hola")]), handler)
+
+        assert len(calls) == 2
+
+
+class TestRepeatedTurn:
+    """End-to-end repeated turn on the replay model."""
+
+    def test_repeated_turn_hits_cache(self, cache):
+        """Test that a repeated analysis is answered entirely from the cache."""
+        set_llm_cache(cache)
+        tool_cache.clear()
+        agent = build_anafi_agent("replay")
+        inputs = {"messages": [HumanMessage(content="Analiza mi negocio y genera un reporte")]}
+        try:
+            agent.invoke(inputs)
+            misses = cache.stats()["misses"]
+            result = agent.invoke(inputs)
+        finally:
+            set_llm_cache(None)
+            tool_cache.clear()
+
+        stats = cache.stats()
+        assert stats["hits"] == misses and stats["misses"] == misses
+        assert result["messages"][-1].content.startswith("✅ Análisis completo")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,202 @@
+"""
+Unit tests for the ANAFI metrics registry and tool instrumentation.
+
+Run with: pytest tests/test_metrics.py -v
+"""
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from src.graph.dispatch import ParallelDispatcher
+from src.observability import MetricsRegistry, get_registry, instrument_tool, set_registry, timed, tool_error
+from src.observability.middleware import SubAgentMetricsMiddleware
+from src.tools import calculate_profit, save_business_data, tool_cache, validate_financial_data
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def registry():
+    """Fresh global registry and tool cache for each test."""
+    registry = MetricsRegistry()
+    set_registry(registry)
+    tool_cache.clear()
+    yield registry
+    set_registry(None)
+    tool_cache.clear()
+
+
+class TestMetricsRegistry:
+    """Tests for counters, histograms and the Prometheus dump."""
+
+    def test_counter(self, registry):
+        """Test labelled counter values."""
+        counter = registry.counter("llamadas_total", "Llamadas", ("tool",))
+        counter.inc(tool="a")
+        counter.inc(2, tool="a")
+
+        assert counter.value(tool="a") == 3
+        assert registry.counter("llamadas_total", "Llamadas", ("tool",)) is counter
+
+    def test_histogram_buckets(self, registry):
+        """Test cumulative buckets, sum and count in the text format."""
+        histogram = registry.histogram("latencia_seconds", "Latencia", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, tool="a")
+
+        text = registry.to_prometheus()
+
+        assert "# TYPE latencia_seconds histogram" in text
+        assert 'latencia_seconds_bucket{tool="a",le="0.1"} 1' in text
+        assert 'latencia_seconds_bucket{tool="a",le="1"} 2' in text
+        assert 'latencia_seconds_bucket{tool="a",le="+Inf"} 3' in text
+        assert 'latencia_seconds_count{tool="a"} 3' in text
+        assert histogram.sum(tool="a") == pytest.approx(5.55)
+
+    def test_conflicting_definition(self, registry):
+        """Test that a name cannot be reused with other labels."""
+        registry.counter("x_total", "X", ("tool",))
+
+        with pytest.raises(ValueError):
+            registry.counter("x_total", "X", ("subagent",))
+
+    def test_label_escaping(self, registry):
+        """Test escaping of quotes in label values."""
+        registry.counter("x_total", "X", ("tool",)).inc(tool='a"b')
+
+        assert 'x_total{tool="a\\"b"} 1' in registry.to_prometheus()
+
+
+class TestToolInstrumentation:
+    """Tests for the tool decorator."""
+
+    def test_status_labels(self, registry):
+        """Test ok, rejected and raised calls."""
+        @instrument_tool
+        def tool(valor):
+            if valor is None:
+                raise RuntimeError("falla")
+            return "✅ listo" if valor > 0 else "❌ Error: valor inválido"
+
+        tool(1)
+        tool(-1)
+        with pytest.raises(RuntimeError):
+            tool(None)
+
+        calls = registry.get("anafi_tool_calls_total")
+        assert calls.value(tool="tool", status="ok") == 1
+        assert calls.value(tool="tool", status="invalido") == 1
+        assert calls.value(tool="tool", status="error") == 1
+        assert registry.get("anafi_tool_validation_failures_total").value(tool="tool") == 1
+        assert registry.get("anafi_tool_latency_seconds").count(tool="tool") == 3
+
+    def test_caught_exceptions(self, registry):
+        """Test that caught validation errors are rejections and other exceptions are errors."""
+        @instrument_tool
+        def tool(valor):
+            try:
+                if valor is None:
+                    raise ZeroDivisionError("división entre cero")
+                return "✅" if float(valor) > 0 else "❌ Error: valor inválido"
+            except Exception as e:
+                return tool_error("Error al calcular", e)
+
+        rejected = tool("abc")
+        failed = tool(None)
+
+        calls = registry.get("anafi_tool_calls_total")
+        assert calls.value(tool="tool", status="invalido") == 1
+        assert calls.value(tool="tool", status="error") == 1
+        assert registry.get("anafi_tool_validation_failures_total").value(tool="tool") == 1
+        assert type(failed) is str and failed == "❌ Error al calcular: división entre cero"
+        assert rejected.startswith("❌ Error al calcular: could not convert")
+
+    def test_pydantic_rejection(self, registry, sample_business_data):
+        """Test that data failing the pydantic model counts as a rejection."""
+        sample_business_data["precio_venta_unitario"] = -1
+
+        save_business_data(sample_business_data)
+
+        calls = registry.get("anafi_tool_calls_total")
+        assert calls.value(tool="save_business_data", status="invalido") == 1
+        assert calls.value(tool="save_business_data", status="error") == 0
+
+    def test_exported_tools_are_instrumented(self, registry):
+        """Test latency, rejections and cache hits for the exported tools."""
+        args = dict(costos_fijos_mensuales=5000.0, costo_variable_unitario=3.0,
+                    precio_venta_unitario=10.0, volumen_ventas_estimado=1000)
+        calculate_profit(**args)
+        calculate_profit(**args)
+        validate_financial_data("costos_fijos_mensuales", -1)
+
+        cache = registry.get("anafi_tool_cache_requests_total")
+        assert cache.value(tool="calculate_profit", result="miss") == 1
+        assert cache.value(tool="calculate_profit", result="hit") == 1
+        assert registry.get("anafi_tool_latency_seconds").count(tool="calculate_profit") == 2
+        assert registry.get("anafi_tool_validation_failures_total").value(tool="validate_financial_data") == 1
+        assert calculate_profit.instrumented and calculate_profit.cache is tool_cache
+
+    def test_conversation_breakdown(self, registry):
+        """Test per-conversation time from the LangGraph thread_id."""
+        tool = instrument_tool(lambda: "✅", name="rapida")
+        runnable = RunnableLambda(lambda _: tool())
+
+        runnable.invoke(None, config={"configurable": {"thread_id": "conv-1"}})
+        tool()
+
+        breakdown = registry.conversation_breakdown("conv-1")
+        assert [(row["tipo"], row["nombre"], row["llamadas"]) for row in breakdown] == [("tool", "rapida", 1)]
+
+
+class TestSubAgentInstrumentation:
+    """Tests for sub-agent timing."""
+
+    def test_timed_block(self, registry):
+        """Test the context manager used for sub-agents."""
+        with timed("subagent", "basic_calculations_agent"):
+            pass
+
+        text = get_registry().to_prometheus()
+        assert 'anafi_subagent_calls_total{subagent="basic_calculations_agent",status="ok"} 1' in text
+
+    def test_middleware_times_task_calls(self, registry):
+        """Test that only the supervisor's task tool counts as a sub-agent call."""
+        middleware = SubAgentMetricsMiddleware()
+        task = SimpleNamespace(tool_call={"name": "task", "args": {"subagent_type": "report_generation_agent"}})
+        other = SimpleNamespace(tool_call={"name": "read_file", "args": {}})
+
+        middleware.wrap_tool_call(task, lambda request: "hecho")
+        middleware.wrap_tool_call(other, lambda request: "hecho")
+
+        calls = registry.get("anafi_subagent_calls_total")
+        assert calls.value(subagent="report_generation_agent", status="ok") == 1
+        assert len(calls.samples()) == 1
+
+    def test_dispatcher_branches(self, registry):
+        """Test that each parallel branch is recorded."""
+        async def run(state):
+            return {"messages": [AIMessage(content="listo")]}
+
+        dispatcher = ParallelDispatcher(
+            {"basic_calculations_agent": RunnableLambda(run)}, tasks={"basic_calculations_agent": "calcular"}
+        )
+        dispatcher.run({"messages": []})
+
+        assert registry.get("anafi_subagent_latency_seconds").count(subagent="basic_calculations_agent") == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
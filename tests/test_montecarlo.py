@@ -0,0 +1,134 @@
+"""
+Unit tests for the ANAFI Monte Carlo scenario mode.
+
+Run with: pytest tests/test_montecarlo.py -v
+"""
+import re
+
+import pytest
+from src.engine.metrics import load_business_data
+from src.engine.montecarlo import run_monte_carlo
+from src.tools.scenario_analysis_tools import create_scenario
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Shop",
+        "tipo_negocio": "tienda",
+        "costos_fijos_mensuales": 2000.0,
+        "costo_variable_unitario": 5.0,
+        "precio_venta_unitario": 15.0,
+        "volumen_ventas_estimado": 500,
+        "inversion_inicial": 20000.0
+    }
+
+
+@pytest.fixture
+def distributions():
+    """Distributions for every scenario parameter."""
+    return {
+        "precio_venta": {"tipo": "normal", "desviacion": 2.0},
+        "costo_variable": {"tipo": "uniforme", "minimo": 4.0, "maximo": 6.0},
+        "volumen_ventas": {"tipo": "triangular", "minimo": 200, "maximo": 700},
+        "costos_fijos": {"tipo": "lognormal", "sigma": 0.1},
+    }
+
+
+class TestRunMonteCarlo:
+    """Tests for the chunked simulation engine."""
+
+    def test_fixed_parameters_are_deterministic(self, sample_business_data):
+        """Test that fixed distributions reproduce the deterministic profit."""
+        business_data = load_business_data(sample_business_data)
+        result = run_monte_carlo(business_data, {"precio_venta": {"tipo": "fijo"}}, n_draws=1000)
+
+        assert result.utilidad_neta_media == pytest.approx(3000.0)
+        assert result.utilidad_neta_percentiles[5] == pytest.approx(3000.0)
+        assert result.ros_percentiles[50] == pytest.approx(40.0)
+        assert result.probabilidad_bajo_equilibrio == 0.0
+
+    def test_seed_is_reproducible(self, sample_business_data, distributions):
+        """Test that the same seed yields the same result."""
+        business_data = load_business_data(sample_business_data)
+
+        first = run_monte_carlo(business_data, distributions, n_draws=20_000, seed=7)
+        second = run_monte_carlo(business_data, distributions, n_draws=20_000, seed=7)
+
+        assert first == second
+
+    def test_chunking_preserves_estimates(self, sample_business_data, distributions):
+        """Test that chunk size does not materially change the estimates."""
+        business_data = load_business_data(sample_business_data)
+
+        single = run_monte_carlo(business_data, distributions, n_draws=200_000, chunk_size=200_000, seed=1)
+        chunked = run_monte_carlo(business_data, distributions, n_draws=200_000, chunk_size=10_000, seed=1)
+
+        assert chunked.utilidad_neta_media == pytest.approx(single.utilidad_neta_media, rel=0.02)
+        assert chunked.utilidad_neta_percentiles[50] == pytest.approx(single.utilidad_neta_percentiles[50], rel=0.02)
+        assert chunked.probabilidad_bajo_equilibrio == pytest.approx(single.probabilidad_bajo_equilibrio, abs=0.01)
+
+    def test_invalid_distribution(self, sample_business_data):
+        """Test that unknown distributions are rejected."""
+        business_data = load_business_data(sample_business_data)
+
+        with pytest.raises(ValueError):
+            run_monte_carlo(business_data, {"precio_venta": {"tipo": "cauchy"}})
+
+    @pytest.mark.parametrize("spec, message", [
+        ({"tipo": "normal"}, "requiere: desviacion"),
+        ({"tipo": "uniforme", "minimo": 5.0}, "requiere: maximo"),
+        ({"tipo": "uniforme", "minimo": 20.0, "maximo": 10.0}, "mínimo no puede ser mayor"),
+        ({"tipo": "triangular", "minimo": 20.0, "maximo": 10.0}, "mínimo debe ser menor"),
+        ({"tipo": "triangular", "minimo": 16.0, "maximo": 20.0}, "la moda (15.00)"),
+        ({"tipo": "lognormal", "sigma": -0.1}, "no puede ser negativo"),
+        ({"tipo": "normal", "desviacion": "alta"}, "debe ser numérico"),
+        ("normal", "debe ser un diccionario"),
+    ])
+    def test_invalid_distribution_values(self, sample_business_data, spec, message):
+        """Test missing keys and out-of-range values before any draw."""
+        business_data = load_business_data(sample_business_data)
+
+        with pytest.raises(ValueError, match=re.escape(message)):
+            run_monte_carlo(business_data, {"precio_venta": spec}, n_draws=10)
+
+    def test_too_many_draws(self, sample_business_data, distributions):
+        """Test the upper bound on the number of draws."""
+        business_data = load_business_data(sample_business_data)
+
+        with pytest.raises(ValueError):
+            run_monte_carlo(business_data, distributions, n_draws=2_000_000)
+
+
+class TestMonteCarloScenario:
+    """Tests for create_scenario in montecarlo mode."""
+
+    def test_monte_carlo_scenario(self, sample_business_data, distributions):
+        """Test the Monte Carlo scenario message."""
+        result = create_scenario(
+            sample_business_data,
+            "montecarlo",
+            {"distribuciones": distributions, "simulaciones": 10_000, "semilla": 3},
+        )
+
+        assert "✅" in result
+        assert "P95" in result
+        assert "punto de equilibrio" in result
+
+    def test_invalid_distribution_is_rejected_input(self, sample_business_data):
+        """Test that a bad distribution is reported as invalid input, not an internal error."""
+        result = create_scenario(sample_business_data, "montecarlo", {"distribuciones": {"precio_venta": {"tipo": "normal"}}})
+
+        assert result.startswith("❌") and "desviacion" in result
+        assert result.status == "invalido"
+
+    def test_monte_carlo_requires_distributions(self, sample_business_data):
+        """Test that the mode requires at least one distribution."""
+        result = create_scenario(sample_business_data, "montecarlo")
+
+        assert "❌" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+"""
+Unit tests for the ANAFI bounded process pools.
+
+Run with: pytest tests/test_parallel.py -v
+"""
+import os
+
+import pytest
+from src.engine.parallel import START_METHOD, bounded_workers, max_workers, process_pool
+
+
+@pytest.fixture
+def cpus(monkeypatch):
+    """Pretend the machine has 8 CPUs and no configured cap."""
+    monkeypatch.setattr("src.engine.parallel.os.cpu_count", lambda: 8)
+    monkeypatch.delenv("ANAFI_MAX_WORKERS", raising=False)
+
+
+class TestBoundedWorkers:
+    """Tests for the worker count limits."""
+
+    def test_sequential(self, cpus):
+        """Test that missing, single or one-job requests run in process."""
+        assert bounded_workers(None) == 1
+        assert bounded_workers(1) == 1
+        assert bounded_workers(-3) == 1
+        assert bounded_workers(8, jobs=1) == 1
+
+    def test_default_cap(self, cpus):
+        """Test that a model-chosen count is capped by default."""
+        assert max_workers() == 4
+        assert bounded_workers(1000) == 4
+        assert bounded_workers(1000, jobs=3) == 3
+
+    def test_configured_cap(self, cpus, monkeypatch):
+        """Test the ANAFI_MAX_WORKERS cap, itself bounded by the CPU count."""
+        monkeypatch.setenv("ANAFI_MAX_WORKERS", "6")
+        assert bounded_workers(1000) == 6
+
+        monkeypatch.setenv("ANAFI_MAX_WORKERS", "64")
+        assert bounded_workers(1000) == 8
+
+    def test_pool_does_not_fork(self):
+        """Test that pools start their processes without fork."""
+        assert START_METHOD in ("forkserver", "spawn")
+        with process_pool(2) as executor:
+            assert executor.submit(os.getpid).result() != os.getpid()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
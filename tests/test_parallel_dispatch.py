@@ -0,0 +1,143 @@
+"""
+Unit tests for the ANAFI parallel sub-agent dispatch.
+
+Run with: pytest tests/test_parallel_dispatch.py -v
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from src.graph.dispatch import FULL_ANALYSIS_TASKS, ParallelDispatcher, plan_waves
+from src.graph.router import BUSINESS_DATA_PATH, FastPathRouter, build_routed_agent
+
+BRANCH_DELAY = 0.2
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def files(sample_business_data):
+    """Virtual file system with saved business data."""
+    return {BUSINESS_DATA_PATH: {"content": json.dumps(sample_business_data), "encoding": "utf-8"}}
+
+
+def fake_runner(name, seen_files):
+    """Sub-agent stand-in that sleeps and writes one file."""
+    async def run(state):
+        seen_files[name] = sorted(state.get("files", {}))
+        await asyncio.sleep(BRANCH_DELAY)
+        return {
+            "messages": state["messages"] + [AIMessage(content=f"{name} listo")],
+            "files": {**state.get("files", {}), f"/{name}.json": {"content": "{}"}},
+        }
+    return RunnableLambda(run)
+
+
+@pytest.fixture
+def seen_files():
+    """Files visible to each sub-agent when it starts."""
+    return {}
+
+
+@pytest.fixture
+def dispatcher(seen_files):
+    """Dispatcher over fake sub-agents."""
+    return ParallelDispatcher({name: fake_runner(name, seen_files) for name in FULL_ANALYSIS_TASKS})
+
+
+class TestPlanWaves:
+    """Tests for dependency-based scheduling."""
+
+    def test_full_analysis(self):
+        """Test that the three analysis branches share a wave before the report."""
+        waves = plan_waves(list(FULL_ANALYSIS_TASKS))
+
+        assert waves == [
+            ["basic_calculations_agent", "advanced_analysis_agent", "scenario_analysis_agent"],
+            ["report_generation_agent"],
+        ]
+
+    def test_with_data_input(self):
+        """Test that data input runs first when requested."""
+        waves = plan_waves(["data_input_agent"] + list(FULL_ANALYSIS_TASKS))
+
+        assert waves[0] == ["data_input_agent"]
+        assert len(waves) == 3
+
+    def test_cycle(self):
+        """Test that circular dependencies are rejected."""
+        with pytest.raises(ValueError):
+            plan_waves(["a", "b"], {"a": ("b",), "b": ("a",)})
+
+
+class TestParallelDispatcher:
+    """Tests for concurrent execution."""
+
+    def test_branches_run_concurrently(self, dispatcher, files):
+        """Test that wall time is close to two waves, not four sequential runs."""
+        start = time.perf_counter()
+        update = asyncio.run(dispatcher.arun({"files": files}))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 3 * BRANCH_DELAY
+        assert [m.name for m in update["messages"]] == list(FULL_ANALYSIS_TASKS)
+        assert dispatcher.stats()["branches"] == 4
+
+    def test_report_sees_branch_files(self, dispatcher, files, seen_files):
+        """Test that the report runs after the branch results are merged."""
+        update = dispatcher.run({"files": files})
+
+        assert "/scenario_analysis_agent.json" in seen_files["report_generation_agent"]
+        assert "/basic_calculations_agent.json" not in seen_files["advanced_analysis_agent"]
+        assert BUSINESS_DATA_PATH in update["files"]
+        assert len(update["files"]) == 5
+
+
+class TestRoutedParallelAnalysis:
+    """Tests for routing full-analysis requests."""
+
+    def test_full_analysis_route(self, dispatcher, files):
+        """Test that a full analysis with saved data uses the parallel node."""
+        router = FastPathRouter()
+        agent = build_routed_agent(
+            RunnableLambda(lambda state: {"messages": [AIMessage(content="agente")]}),
+            router,
+            parallel_analysis=dispatcher.as_node(),
+        )
+
+        result = asyncio.run(agent.ainvoke({"messages": [HumanMessage("Haz un análisis completo")], "files": files}))
+
+        assert result["messages"][-1].name == "report_generation_agent"
+        assert dispatcher.stats()["runs"] == 1
+
+    def test_without_data_goes_to_agent(self, dispatcher):
+        """Test that without saved data the supervisor handles the request."""
+        agent = build_routed_agent(
+            RunnableLambda(lambda state: {"messages": [AIMessage(content="agente")]}),
+            FastPathRouter(),
+            parallel_analysis=dispatcher.as_node(),
+        )
+
+        result = agent.invoke({"messages": [HumanMessage("Haz un análisis completo")]})
+
+        assert result["messages"][-1].content == "agente"
+        assert dispatcher.stats()["runs"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""
+Unit tests for the ANAFI PDF report renderer.
+
+Run with: pytest tests/test_pdf_report.py -v
+"""
+import pytest
+from src.engine.metrics import compute_metrics, load_business_data
+from src.reports.naming import unique_slugs
+from src.reports.pdf import get_pdf_template, register_fonts, render_pdf_batch, render_pdf_report
+from src.tools.report_generation_tools import build_pdf_report_structure, default_report_path
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Café Ñandú",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def report_structure(sample_business_data):
+    """Section structure of the report."""
+    data = load_business_data(sample_business_data)
+    return build_pdf_report_structure(data, compute_metrics(data))
+
+
+class TestBuildPdfReportStructure:
+    """Tests for the report sections."""
+
+    def test_sections(self, report_structure):
+        """Test the five report sections."""
+        titulos = [s["titulo"] for s in report_structure["secciones"]]
+
+        assert titulos == [
+            "Resumen Ejecutivo",
+            "Datos de Entrada",
+            "Métricas Financieras",
+            "Gráficos",
+            "Conclusiones y Recomendaciones",
+        ]
+        assert report_structure["secciones"][0]["contenido"]["viabilidad"] == "Viable"
+
+    def test_unreachable_breakeven(self, sample_business_data):
+        """Test the break-even text when the price does not cover the variable cost."""
+        data = load_business_data({**sample_business_data, "precio_venta_unitario": 10.0, "costo_variable_unitario": 20.0})
+
+        structure = build_pdf_report_structure(data, compute_metrics(data))
+
+        assert structure["secciones"][0]["contenido"]["punto_equilibrio"].startswith("No alcanzable")
+        assert structure["secciones"][2]["contenido"]["punto_equilibrio"].startswith("No alcanzable")
+        assert not any("nan" in value for section in structure["secciones"][:3] for value in section["contenido"].values())
+
+    def test_default_report_path(self):
+        """Test file names derived from the business name."""
+        assert default_report_path("Café Ñandú", "pdf", "out") == "out/cafe_nandu_analisis_financiero.pdf"
+        assert default_report_path("Café Ñandú", "pdf", "out", slug="cafe_nandu_2") == "out/cafe_nandu_2_analisis_financiero.pdf"
+
+    def test_unique_slugs(self):
+        """Test suffixes for names that map to the same file name."""
+        assert unique_slugs(["Café", "Cafe", "Otro", "Cafe"]) == ["cafe", "cafe_2", "otro", "cafe_3"]
+        assert unique_slugs(["Cafe", "Cafe", "Cafe 2"]) == ["cafe", "cafe_3", "cafe_2"]
+
+
+class TestRenderPdfReport:
+    """Tests for PDF rendering."""
+
+    def test_writes_pdf(self, report_structure, tmp_path):
+        """Test that a valid PDF file is written to disk."""
+        path = render_pdf_report(report_structure, str(tmp_path / "sub" / "reporte.pdf"))
+
+        content = (tmp_path / "sub" / "reporte.pdf").read_bytes()
+        assert path.endswith("reporte.pdf")
+        assert content.startswith(b"%PDF")
+        assert b"/Page" in content
+
+    def test_template_is_shared(self):
+        """Test that fonts and styles are created once per process."""
+        assert get_pdf_template() is get_pdf_template()
+        assert register_fonts() == register_fonts()
+
+    def test_symbols_are_adapted(self):
+        """Test that emoji from the recommendations are mapped to font glyphs."""
+        template = get_pdf_template()
+
+        text = template.text("⚠️ Utilidad baja & márgenes <10%")
+
+        assert "\ufe0f" not in text
+        assert "&amp;" in text and "&lt;10%" in text
+
+
+class TestRenderPdfBatch:
+    """Tests for batch rendering."""
+
+    def test_sequential(self, report_structure, tmp_path):
+        """Test rendering several reports in the current process."""
+        jobs = [(report_structure, str(tmp_path / f"r{i}.pdf")) for i in range(3)]
+
+        paths = render_pdf_batch(jobs)
+
+        assert paths == [job[1] for job in jobs]
+        assert all((tmp_path / f"r{i}.pdf").stat().st_size > 0 for i in range(3))
+
+    def test_worker_pool(self, report_structure, tmp_path, monkeypatch):
+        """Test rendering with a process pool."""
+        monkeypatch.setattr("src.engine.parallel.os.cpu_count", lambda: 4)
+        jobs = [(report_structure, str(tmp_path / f"r{i}.pdf")) for i in range(4)]
+
+        paths = render_pdf_batch(jobs, workers=2, chunksize=1)
+
+        assert sorted(paths) == sorted(job[1] for job in jobs)
+        assert all((tmp_path / f"r{i}.pdf").read_bytes().startswith(b"%PDF") for i in range(4))
+
+    def test_single_job_skips_pool(self, report_structure, tmp_path, monkeypatch):
+        """Test that one report is rendered in process even with workers."""
+        monkeypatch.setattr("src.reports.pdf.process_pool", lambda *args, **kwargs: pytest.fail("pool creado"))
+
+        paths = render_pdf_batch([(report_structure, str(tmp_path / "r.pdf"))], workers=8)
+
+        assert paths == [str(tmp_path / "r.pdf")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,192 @@
+"""
+Unit tests for the offline replay chat model.
+
+Run with: pytest tests/test_replay_model.py -v
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from src.agents.sub_agents_config import SUB_AGENTS
+from src.graph.builder import build_anafi_agent, get_sub_agent_specs
+from src.graph.file_store import BUSINESS_DATA_PATH
+from src.llm import init_model, is_replay_model
+from src.llm.replay import ReplayChatModel, load_recording
+from src.observability import MetricsRegistry, set_registry
+from src.tools import tool_cache
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def model():
+    """Two-step script: one tool call, then the final answer."""
+    return ReplayChatModel(
+        agent="basic_calculations_agent",
+        steps=[
+            {"tool_calls": [{"name": "calculate_profit", "args": {"volumen_ventas_estimado": 1000}}]},
+            {"content": "✅ Utilidad calculada."},
+        ],
+    )
+
+
+class TestReplay:
+    """Tests for script replay."""
+
+    def test_steps_follow_conversation(self, model):
+        """Test that each model reply advances the script."""
+        first = model.invoke([HumanMessage(content="calcula")])
+        second = model.invoke([
+            HumanMessage(content="calcula"),
+            first,
+            ToolMessage(content="✅", tool_call_id=first.tool_calls[0]["id"]),
+        ])
+
+        assert first.tool_calls[0]["name"] == "calculate_profit"
+        assert first.tool_calls[0]["args"] == {"volumen_ventas_estimado": 1000}
+        assert first.tool_calls[0]["id"] == "basic_calculations_agent-0-0"
+        assert second.content == "✅ Utilidad calculada." and not second.tool_calls
+
+    def test_new_turn_restarts_script(self, model):
+        """Test that a new user message replays the script from the start."""
+        history = [HumanMessage(content="uno"), AIMessage(content="x"), AIMessage(content="y")]
+
+        reply = model.invoke(history + [HumanMessage(content="dos")])
+
+        assert reply.tool_calls[0]["name"] == "calculate_profit"
+
+    def test_exhausted_script(self, model):
+        """Test that the last recorded answer is repeated past the end."""
+        history = [HumanMessage(content="uno")] + [AIMessage(content="x")] * 5
+
+        assert model.invoke(history).content == "✅ Utilidad calculada."
+
+    def test_usage_metadata(self, model):
+        """Test estimated token usage on every reply."""
+        usage = model.invoke([HumanMessage(content="calcula la utilidad")]).usage_metadata
+
+        assert usage["input_tokens"] > 0
+        assert usage["total_tokens"] == usage["input_tokens"] + usage["output_tokens"]
+
+    def test_bind_tools_checks_script(self, model):
+        """Test that scripts calling unavailable tools are rejected."""
+        @tool
+        def calculate_profit(volumen_ventas_estimado: int) -> str:
+            """Utilidad."""
+            return "✅"
+
+        @tool
+        def otra() -> str:
+            """Otra herramienta."""
+            return "✅"
+
+        assert model.bind_tools([calculate_profit]) is model
+        with pytest.raises(ValueError):
+            model.bind_tools([otra])
+
+
+class TestLatency:
+    """Tests for the artificial latency."""
+
+    def test_sync_latency(self, model):
+        """Test the delay on synchronous calls."""
+        model.latency_s = 0.05
+        start = time.perf_counter()
+        model.invoke([HumanMessage(content="calcula")])
+
+        assert time.perf_counter() - start >= 0.05
+
+    def test_async_calls_overlap(self, model):
+        """Test that concurrent async calls wait in parallel."""
+        model.latency_s = 0.1
+
+        async def run():
+            await asyncio.gather(*(model.ainvoke([HumanMessage(content="calcula")]) for _ in range(5)))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+
+        assert time.perf_counter() - start < 0.3
+
+    def test_env_latency(self, monkeypatch):
+        """Test the ANAFI_REPLAY_LATENCY_S override."""
+        monkeypatch.setenv("ANAFI_REPLAY_LATENCY_S", "0.25")
+
+        assert ReplayChatModel.from_recording("supervisor").latency_s == 0.25
+
+
+class TestModelSelection:
+    """Tests for swapping the model through configuration."""
+
+    def test_is_replay_model(self):
+        """Test the replay identifiers."""
+        assert is_replay_model("replay")
+        assert is_replay_model("replay:/tmp/guion.json")
+        assert not is_replay_model("openai:gpt-4o-mini")
+
+    def test_custom_recording(self, tmp_path):
+        """Test loading a recording from a path."""
+        path = tmp_path / "guion.json"
+        path.write_text(json.dumps({"agents": {"supervisor": [{"content": "hola"}]}}), encoding="utf-8")
+
+        model = init_model(f"replay:{path}")
+
+        assert model.invoke([HumanMessage(content="?")]).content == "hola"
+
+    def test_default_recording_covers_all_agents(self):
+        """Test that the bundled recording scripts the supervisor and every sub-agent."""
+        agents = load_recording()["agents"]
+
+        assert set(agents) == {"supervisor"} | {spec["name"] for spec in SUB_AGENTS}
+
+    def test_sub_agents_use_replay(self):
+        """Test that each sub-agent gets its own script in replay mode only."""
+        replay = {spec["name"]: spec["model"] for spec in get_sub_agent_specs("replay")}
+        real = {spec["name"]: spec["model"] for spec in get_sub_agent_specs("openai:gpt-4o-mini")}
+
+        assert all(isinstance(model, ReplayChatModel) and model.agent == name for name, model in replay.items())
+        assert set(real.values()) == {"openai:gpt-4o-mini"}
+
+
+class TestFullTurn:
+    """End-to-end turn through the supervisor and the five sub-agents."""
+
+    def test_full_analysis_offline(self):
+        """Test that the recorded analysis runs every sub-agent without errors."""
+        registry = MetricsRegistry()
+        set_registry(registry)
+        tool_cache.clear()
+        try:
+            result = build_anafi_agent("replay").invoke(
+                {"messages": [HumanMessage(content="Analiza mi negocio y genera un reporte")]}
+            )
+        finally:
+            set_registry(None)
+            tool_cache.clear()
+
+        delegated = registry.get("anafi_subagent_calls_total")
+        for spec in SUB_AGENTS:
+            assert delegated.value(subagent=spec["name"], status="ok") == 1
+        statuses = {labels[1] for labels, _ in registry.get("anafi_tool_calls_total").samples()}
+        assert statuses == {"ok"}
+        assert BUSINESS_DATA_PATH in result["files"]
+        assert result["messages"][-1].content.startswith("✅ Análisis completo")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,278 @@
+"""
+Unit tests for the ANAFI report generation tools.
+
+Run with: pytest tests/test_report_tools.py -v
+"""
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Command
+from src.graph.file_store import BUSINESS_DATA_PATH
+from src.graph.state import DeepAgentState
+from src.reports.context import ANALYSIS_CONTEXT_PATH, AnalysisContext, context_from_state, resolve_contexts
+from src.tools import create_excel_report, create_pdf_report, generate_alerts, generate_charts
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    """Temporary reports directory; the tools only write inside it."""
+    monkeypatch.setenv("ANAFI_REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def state(sample_business_data):
+    """Graph state with the business data in the virtual file system."""
+    return {"files": {BUSINESS_DATA_PATH: {"content": json.dumps(sample_business_data), "encoding": "utf-8"}}}
+
+
+@pytest.fixture
+def portfolio(sample_business_data):
+    """Three businesses for batch mode."""
+    return [
+        sample_business_data,
+        {**sample_business_data, "nombre_negocio": "Café Ñandú", "costos_fijos_mensuales": 9000.0},
+        {**sample_business_data, "nombre_negocio": "Panadería", "precio_venta_unitario": 12.0},
+    ]
+
+
+class TestAnalysisContext:
+    """Tests for building the analysis context."""
+
+    def test_from_state(self, state, sample_business_data):
+        """Test building the context from the graph state."""
+        context = context_from_state(state)
+
+        assert context.data.nombre_negocio == "Test Restaurant"
+        assert context.metrics.utilidad_neta == pytest.approx(2000.0)
+
+    def test_reuses_saved_metrics(self, state, sample_business_data):
+        """Test that metrics saved by a previous tool are not recomputed."""
+        context = AnalysisContext.from_data(sample_business_data)
+        saved = context.model_copy(update={"metrics": context.metrics.model_copy(update={"utilidad_neta": 1.0})})
+        state["files"][ANALYSIS_CONTEXT_PATH] = saved.to_file()
+
+        assert context_from_state(state).metrics.utilidad_neta == 1.0
+
+    def test_saved_metrics_for_other_data_are_ignored(self, state, sample_business_data):
+        """Test that a stale context file is recomputed."""
+        other = AnalysisContext.from_data({**sample_business_data, "costos_fijos_mensuales": 1.0})
+        state["files"][ANALYSIS_CONTEXT_PATH] = other.to_file()
+
+        assert context_from_state(state).data.costos_fijos_mensuales == 5000.0
+
+    def test_resolve_contexts(self, state, portfolio):
+        """Test single, batch and missing inputs."""
+        assert resolve_contexts(None, state)[1] is False
+        contexts, batch = resolve_contexts(portfolio)
+        assert batch and len(contexts) == 3
+        with pytest.raises(ValueError):
+            resolve_contexts(None, {"files": {}})
+
+
+class TestReportTools:
+    """Tests for the tools called with an explicit context."""
+
+    def test_direct_call_returns_message(self, sample_business_data):
+        """Test that a direct call returns only the message."""
+        result = generate_alerts(sample_business_data)
+
+        assert isinstance(result, str)
+        assert result.startswith("✅ Alertas generadas")
+
+    def test_tool_call_updates_files(self, state):
+        """Test that an agent call returns a Command with files and a ToolMessage."""
+        result = generate_alerts(state=state, tool_call_id="call_1")
+
+        assert isinstance(result, Command)
+        assert "/reports/alerts.json" in result.update["files"]
+        assert ANALYSIS_CONTEXT_PATH in result.update["files"]
+        assert result.update["messages"][0].tool_call_id == "call_1"
+
+    def test_unreachable_breakeven(self, sample_business_data):
+        """Test the message when the price does not cover the variable cost."""
+        sample_business_data["precio_venta_unitario"] = 2.5
+
+        result = generate_charts(sample_business_data, tool_call_id="call_1")
+
+        message = result.update["messages"][0].content
+        descriptions = result.update["files"]["/reports/charts/chart_descriptions.json"]["data"]
+        assert "Punto de equilibrio: No alcanzable" in message and "nan" not in message
+        assert descriptions["grafico_punto_equilibrio"]["lineas"][2]["valor"].startswith("No alcanzable")
+
+    def test_missing_data(self):
+        """Test the error message without input data."""
+        assert generate_charts(state={"files": {}}).startswith("❌ Error")
+
+    def test_context_argument(self, sample_business_data):
+        """Test passing a prebuilt context."""
+        context = AnalysisContext.from_data(sample_business_data)
+
+        result = generate_charts(context, tool_call_id="call_1")
+
+        assert "/reports/charts/utilidad.png" in result.update["files"]
+
+    def test_excel_from_state(self, state, reports_dir):
+        """Test the Excel tool reading its data from the state."""
+        path = reports_dir / "libro.xlsx"
+
+        result = create_excel_report(output_path="libro.xlsx", state=state, tool_call_id="call_1")
+
+        assert path.exists()
+        assert result.update["files"]["/reports/excel_structure.json"]["data"]["archivo"] == str(path)
+
+
+class TestOutputPath:
+    """Tests for confining report files to the reports directory."""
+
+    def test_default_path(self, sample_business_data, reports_dir):
+        """Test that the default file lands in the configured directory."""
+        create_pdf_report(sample_business_data)
+
+        assert (reports_dir / "test_restaurant_analisis_financiero.pdf").exists()
+
+    def test_subdirectory(self, sample_business_data, reports_dir):
+        """Test that relative subdirectories are allowed."""
+        create_excel_report(sample_business_data, output_path="clientes/libro.xlsx")
+
+        assert (reports_dir / "clientes" / "libro.xlsx").exists()
+
+    @pytest.mark.parametrize("output_path", ["/tmp/fuera.pdf", "../fuera.pdf", "sub/../../fuera.pdf"])
+    def test_pdf_rejects_escape(self, sample_business_data, reports_dir, output_path):
+        """Test that absolute paths and parent references are rejected."""
+        result = create_pdf_report(sample_business_data, output_path=output_path)
+
+        assert result.startswith("❌") and "no permitida" in result
+        assert not (reports_dir.parent / "fuera.pdf").exists()
+
+    @pytest.mark.parametrize("output_path", ["/tmp/fuera.xlsx", "../fuera.xlsx"])
+    def test_excel_rejects_escape(self, sample_business_data, reports_dir, output_path):
+        """Test the same confinement for the Excel report."""
+        result = create_excel_report(sample_business_data, output_path=output_path)
+
+        assert result.startswith("❌") and "no permitida" in result
+
+    def test_symlink_escape(self, sample_business_data, reports_dir, tmp_path_factory):
+        """Test that a symlink pointing outside the directory is rejected."""
+        outside = tmp_path_factory.mktemp("fuera")
+        (reports_dir / "enlace").symlink_to(outside)
+
+        result = create_pdf_report(sample_business_data, output_path="enlace/reporte.pdf")
+
+        assert result.startswith("❌")
+        assert not (outside / "reporte.pdf").exists()
+
+
+class TestBatchMode:
+    """Tests for one call over a list of businesses."""
+
+    def test_alerts_batch(self, portfolio):
+        """Test per-business alert files from a single rule evaluation."""
+        result = generate_alerts(portfolio, tool_call_id="call_1")
+
+        files = result.update["files"]
+        assert "/reports/cafe_nandu/alerts.json" in files
+        assert files["/reports/cafe_nandu/alerts.json"]["data"]["alertas_por_tipo"]["criticas"] == 2
+        assert "3 negocios (1 con alertas críticas)" in result.update["messages"][0].content
+
+    def test_pdf_batch(self, portfolio, reports_dir):
+        """Test one PDF per business in the output directory."""
+        result = create_pdf_report(portfolio, output_path="lote")
+
+        assert "3 reportes PDF" in result
+        assert (reports_dir / "lote" / "panaderia_analisis_financiero.pdf").read_bytes().startswith(b"%PDF")
+
+    def test_excel_batch(self, portfolio, reports_dir):
+        """Test one workbook per business."""
+        create_excel_report(portfolio)
+
+        assert len(list(reports_dir.glob("*.xlsx"))) == 3
+
+    def test_charts_batch(self, portfolio):
+        """Test chart directories per business."""
+        result = generate_charts(portfolio, tool_call_id="call_1")
+
+        assert "/reports/charts/panaderia/punto_equilibrio.png" in result.update["files"]
+
+    def test_charts_batch_workers(self, portfolio, monkeypatch):
+        """Test that the worker count reaches the chart renderer."""
+        from src.tools import report_generation_tools
+
+        calls = []
+        render = report_generation_tools.render_charts_batch
+        monkeypatch.setattr(report_generation_tools, "render_charts_batch",
+                            lambda *args, **kwargs: calls.append(kwargs) or render(*args, **kwargs))
+
+        generate_charts(portfolio, workers=2, tool_call_id="call_1")
+
+        assert calls[0]["workers"] == 2
+
+    def test_colliding_names(self, sample_business_data, reports_dir):
+        """Test that names with the same slug get suffixed files instead of overwriting."""
+        portfolio = [
+            {**sample_business_data, "nombre_negocio": "Café"},
+            {**sample_business_data, "nombre_negocio": "Cafe", "costos_fijos_mensuales": 9000.0},
+            {**sample_business_data, "nombre_negocio": "Cafe"},
+        ]
+
+        alerts = generate_alerts(portfolio, tool_call_id="call_1").update["files"]
+        charts = generate_charts(portfolio, tool_call_id="call_2").update["files"]
+        create_pdf_report(portfolio)
+        create_excel_report(portfolio)
+
+        assert {"/reports/cafe/alerts.json", "/reports/cafe_2/alerts.json", "/reports/cafe_3/alerts.json"} <= set(alerts)
+        assert "/reports/charts/cafe_3/utilidad.png" in charts
+        assert len(list(reports_dir.glob("cafe*_analisis_financiero.pdf"))) == 3
+        assert len(list(reports_dir.glob("cafe*_analisis_financiero.xlsx"))) == 3
+
+
+class TestStateInjection:
+    """Tests for the tools running inside the graph."""
+
+    def test_tool_node(self, state, portfolio):
+        """Test that the graph injects its state and merges the returned files."""
+        builder = StateGraph(DeepAgentState)
+        builder.add_node("tools", ToolNode([generate_alerts, generate_charts]))
+        builder.add_edge(START, "tools")
+        builder.add_edge("tools", END)
+        graph = builder.compile()
+
+        state["messages"] = [AIMessage("", tool_calls=[
+            {"name": "generate_alerts", "args": {}, "id": "call_1"},
+            {"name": "generate_charts", "args": {"data": portfolio[:2]}, "id": "call_2"},
+        ])]
+        result = graph.invoke(state)
+
+        assert "/reports/alerts.json" in result["files"]
+        assert "/reports/charts/test_restaurant/utilidad.png" in result["files"]
+        assert BUSINESS_DATA_PATH in result["files"]
+        assert [type(m) for m in result["messages"][1:]] == [ToolMessage, ToolMessage]
+
+    def test_injected_arguments_hidden_from_model(self):
+        """Test that the model only sees the business arguments."""
+        from langchain_core.tools import tool
+
+        schema = tool(generate_alerts).tool_call_schema.model_json_schema()
+
+        assert list(schema["properties"]) == ["data"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
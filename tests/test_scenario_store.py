@@ -0,0 +1,102 @@
+"""
+Unit tests for the ANAFI scenario store.
+
+Run with: pytest tests/test_scenario_store.py -v
+"""
+import pytest
+from src.models.financial_data import BasicMetrics, ScenarioData
+from src.storage.scenario_store import InMemoryScenarioStore, SQLiteScenarioStore
+
+
+def make_scenario(tipo, nombre, utilidad_neta):
+    """Build a minimal scenario."""
+    return ScenarioData(
+        nombre_escenario=nombre,
+        tipo=tipo,
+        precio_venta=15.0,
+        costo_variable=5.0,
+        volumen_ventas=500,
+        costos_fijos=2000.0,
+        metricas_calculadas=BasicMetrics(
+            costos_totales=4500.0,
+            punto_equilibrio_unidades=200.0,
+            punto_equilibrio_dinero=3000.0,
+            utilidad_bruta=5000.0,
+            utilidad_neta=utilidad_neta,
+            rentabilidad_sobre_ventas=40.0,
+        ),
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each test runs against both backends."""
+    if request.param == "memory":
+        return InMemoryScenarioStore()
+    return SQLiteScenarioStore(str(tmp_path / "scenarios.db"))
+
+
+class TestScenarioStore:
+    """Tests shared by the in-memory and SQLite backends."""
+
+    def test_save_and_get(self, store):
+        """Test lookup by business and ID."""
+        scenario_id = store.save("Café", make_scenario("pesimista", "Escenario Pesimista", 100.0))
+
+        assert scenario_id == "pesimista"
+        assert store.get("Café", "pesimista").metricas_calculadas.utilidad_neta == 100.0
+        assert store.get("Otro", "pesimista") is None
+
+    def test_custom_scenario_id(self, store):
+        """Test that custom scenarios are identified by their name."""
+        scenario_id = store.save("Café", make_scenario("personalizado", "Precio Premium", 1.0))
+
+        assert scenario_id == "precio_premium"
+
+    def test_overwrite_keeps_single_entry(self, store):
+        """Test that saving the same ID replaces the scenario."""
+        store.save("Café", make_scenario("moderado", "Base", 1.0))
+        store.save("Café", make_scenario("moderado", "Base", 2.0))
+
+        assert len(store) == 1
+        assert store.get("Café", "moderado").metricas_calculadas.utilidad_neta == 2.0
+
+    def test_indexes(self, store):
+        """Test lookup by business and by type."""
+        store.save("Café", make_scenario("pesimista", "P", 1.0))
+        store.save("Café", make_scenario("optimista", "O", 2.0))
+        store.save("Tienda", make_scenario("pesimista", "P", 3.0))
+
+        assert store.list_ids("Café") == ["pesimista", "optimista"]
+        assert len(store.find_by_type("pesimista")) == 2
+        assert len(store.find_by_type("pesimista", scope="Tienda")) == 1
+
+    def test_get_many(self, store):
+        """Test batch lookup preserves order and reports missing IDs."""
+        store.save("Café", make_scenario("pesimista", "P", 1.0))
+        store.save("Café", make_scenario("optimista", "O", 2.0))
+
+        found = store.get_many("Café", ["optimista", "nada", "pesimista"])
+
+        assert [s.nombre_escenario if s else None for s in found] == ["O", None, "P"]
+
+
+class TestInMemoryEviction:
+    """Tests for the bounded in-memory store."""
+
+    def test_least_recently_used_scope_is_evicted(self):
+        """Test that the oldest conversation's scenarios are dropped first."""
+        store = InMemoryScenarioStore(max_scopes=2)
+        store.save("conv-a", make_scenario("pesimista", "P", 1.0))
+        store.save("conv-b", make_scenario("pesimista", "P", 2.0))
+        store.get("conv-a", "pesimista")
+        store.save("conv-c", make_scenario("pesimista", "P", 3.0))
+
+        assert store.get("conv-b", "pesimista") is None
+        assert store.get("conv-a", "pesimista") is not None
+        assert len(store) == 2 and len(store.find_by_type("pesimista")) == 2
+        assert store.evictions == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,11 +4,14 @@ Unit tests for ANAFI scenario analysis tools.
 Run with: pytest tests/test_scenarios.py -v
 """
 import pytest
+from langchain_core.runnables import RunnableLambda
 from src.tools.scenario_analysis_tools import (
     create_scenario,
     compare_scenarios,
     simulate_parameter_change
 )
+from src.engine.metrics import load_business_data
+from src.storage.scenario_store import InMemoryScenarioStore, scenario_scope, set_scenario_store
 
 
 @pytest.fixture
@@ -88,45 +91,76 @@ class TestCreateScenario:
 class TestCompareScenarios:
     """Tests for scenario comparison."""
     
-    def test_compare_two_scenarios(self, mock_state):
+    @pytest.fixture(autouse=True)
+    def scenario_store(self):
+        """Isolated in-memory scenario store."""
+        store = InMemoryScenarioStore()
+        set_scenario_store(store)
+        yield store
+        set_scenario_store(None)
+    
+    def test_compare_two_scenarios(self, sample_business_data):
         """Test comparing two scenarios."""
         # Create scenarios first
-        create_scenario("pesimista", None, mock_state, "test_id")
-        create_scenario("optimista", None, mock_state, "test_id")
+        create_scenario(sample_business_data, "pesimista")
+        create_scenario(sample_business_data, "optimista")
         
-        result = compare_scenarios(["pesimista", "optimista"], mock_state, "test_id")
+        result = compare_scenarios(sample_business_data, ["pesimista", "optimista"])
         
         assert "Comparativa" in result
         assert "✅" in result
     
-    def test_compare_three_scenarios(self, mock_state):
+    def test_compare_three_scenarios(self, sample_business_data, scenario_store):
         """Test comparing three scenarios."""
         # Create all scenarios
-        create_scenario("pesimista", None, mock_state, "test_id")
-        create_scenario("moderado", None, mock_state, "test_id")
-        create_scenario("optimista", None, mock_state, "test_id")
+        create_scenario(sample_business_data, "pesimista")
+        create_scenario(sample_business_data, "moderado")
+        create_scenario(sample_business_data, "optimista")
         
-        result = compare_scenarios(["pesimista", "moderado", "optimista"], mock_state, "test_id")
+        result = compare_scenarios(sample_business_data, ["pesimista", "moderado", "optimista"])
         
         assert "✅" in result
-        assert "/scenarios/scenario_analysis.json" in mock_state["files"]
-    
-    def test_compare_too_many_scenarios(self, mock_state):
+        scope = scenario_scope(load_business_data(sample_business_data))
+        assert scenario_store.list_ids(scope) == ["pesimista", "moderado", "optimista"]
+    
+    def test_conversations_are_isolated(self, sample_business_data, scenario_store):
+        """Test that two conversations with the same business do not share scenarios."""
+        runnable_a = RunnableLambda(lambda _: create_scenario(sample_business_data, "pesimista"))
+        runnable_a.invoke(None, config={"configurable": {"thread_id": "conv-a"}})
+        compare_b = RunnableLambda(lambda _: compare_scenarios(sample_business_data, ["pesimista", "optimista"]))
+
+        result = compare_b.invoke(None, config={"configurable": {"thread_id": "conv-b"}})
+
+        assert "no encontrado" in result
+
+    def test_same_name_different_data(self, sample_business_data):
+        """Test that businesses sharing a name but not their figures are kept apart."""
+        create_scenario(sample_business_data, "pesimista")
+        create_scenario(sample_business_data, "optimista")
+        other = {**sample_business_data, "costos_fijos_mensuales": 9000.0}
+
+        assert "no encontrado" in compare_scenarios(other, ["pesimista", "optimista"])
+
+    def test_compare_many_scenarios(self, sample_business_data):
         """Test comparing more than 3 scenarios."""
-        result = compare_scenarios(["a", "b", "c", "d"], mock_state, "test_id")
+        for precio in (16.0, 17.0, 18.0, 19.0):
+            create_scenario(sample_business_data, "personalizado", {"precio_venta": precio, "nombre": f"Precio {precio:.0f}"})
         
-        assert "Error" in result or "❌" in result
-        assert "Máximo 3" in result
+        result = compare_scenarios(sample_business_data, ["precio_16", "precio_17", "precio_18", "precio_19"])
+        
+        assert "✅" in result
+        assert "Comparativa de Escenarios (4)" in result
+        assert "Mayor utilidad neta: precio_19" in result
     
-    def test_compare_too_few_scenarios(self, mock_state):
+    def test_compare_too_few_scenarios(self, sample_business_data):
         """Test comparing less than 2 scenarios."""
-        result = compare_scenarios(["pesimista"], mock_state, "test_id")
+        result = compare_scenarios(sample_business_data, ["pesimista"])
         
         assert "Error" in result or "❌" in result
     
-    def test_compare_nonexistent_scenario(self, mock_state):
+    def test_compare_nonexistent_scenario(self, sample_business_data):
         """Test comparing scenario that doesn't exist."""
-        result = compare_scenarios(["pesimista", "optimista"], mock_state, "test_id")
+        result = compare_scenarios(sample_business_data, ["pesimista", "optimista"])
         
         assert "Error" in result or "no encontrado" in result
 
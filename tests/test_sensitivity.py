@@ -0,0 +1,111 @@
+"""
+Unit tests for the ANAFI sensitivity grid sweep.
+
+Run with: pytest tests/test_sensitivity.py -v
+"""
+import numpy as np
+import pytest
+from src.engine.metrics import load_business_data
+from src.engine.sensitivity import sweep_sensitivity_grid
+from src.tools.scenario_analysis_tools import simulate_sensitivity_grid
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Shop",
+        "tipo_negocio": "tienda",
+        "costos_fijos_mensuales": 2000.0,
+        "costo_variable_unitario": 5.0,
+        "precio_venta_unitario": 15.0,
+        "volumen_ventas_estimado": 500,
+        "inversion_inicial": 20000.0
+    }
+
+
+@pytest.fixture
+def ranges():
+    """Percentage ranges for three parameters."""
+    return {
+        "precio_venta": [-20, 20],
+        "costo_variable": [-10, 10],
+        "volumen_ventas": [-30, 30],
+    }
+
+
+class TestSweepSensitivityGrid:
+    """Tests for the broadcasted grid evaluation."""
+
+    def test_surface_shape_and_values(self, sample_business_data, ranges):
+        """Test surface shape and a known grid point."""
+        grid = sweep_sensitivity_grid(load_business_data(sample_business_data), ranges, steps=5)
+
+        assert grid.utilidad.shape == (5, 5, 5)
+        assert grid.utilidad_base == 3000.0
+        # Centro de la rejilla = sin cambios
+        assert grid.utilidad[2, 2, 2] == pytest.approx(3000.0)
+        # Precio +20%: (18 - 5) * 500 - 2000
+        assert grid.utilidad[4, 2, 2] == pytest.approx(4500.0)
+
+    def test_tornado_ranking(self, sample_business_data, ranges):
+        """Test that the tornado ranking is sorted by profit range."""
+        grid = sweep_sensitivity_grid(load_business_data(sample_business_data), ranges, steps=3)
+
+        rangos = [t["rango"] for t in grid.tornado]
+        assert rangos == sorted(rangos, reverse=True)
+        assert grid.tornado[-1]["parametro"] == "costo_variable"
+
+    def test_process_pool_matches_in_process(self, sample_business_data, ranges, monkeypatch):
+        """Test that sharding across processes yields the same surface."""
+        monkeypatch.setattr("src.engine.parallel.os.cpu_count", lambda: 4)
+        business_data = load_business_data(sample_business_data)
+
+        local = sweep_sensitivity_grid(business_data, ranges, steps=6)
+        sharded = sweep_sensitivity_grid(business_data, ranges, steps=6, workers=2)
+
+        np.testing.assert_array_equal(local.utilidad, sharded.utilidad)
+
+    def test_invalid_parameter(self, sample_business_data):
+        """Test that unknown parameters are rejected."""
+        with pytest.raises(ValueError):
+            sweep_sensitivity_grid(load_business_data(sample_business_data), {"impuestos": [-5, 5]})
+
+
+class TestSimulateSensitivityGrid:
+    """Tests for the sensitivity grid tool."""
+
+    def test_tool_message(self, sample_business_data, ranges):
+        """Test the tool summary message."""
+        result = simulate_sensitivity_grid(sample_business_data, ranges, steps=5)
+
+        assert "✅" in result
+        assert "125 combinaciones" in result
+        assert "Ranking tornado" in result
+
+    def test_tool_writes_surface(self, sample_business_data, ranges):
+        """Test that an agent call stores the axes and the profit surface."""
+        result = simulate_sensitivity_grid(sample_business_data, ranges, steps=5, tool_call_id="call_1")
+
+        surface = result.update["files"]["/scenarios/sensitivity_grid.json"]["data"]
+        grid = sweep_sensitivity_grid(load_business_data(sample_business_data), ranges, steps=5)
+        assert surface["parametros"] == list(grid.parametros)
+        assert np.allclose(np.array(surface["utilidad"]), grid.utilidad)
+        assert surface["ejes"][grid.parametros[0]] == grid.ejes[grid.parametros[0]].tolist()
+        assert result.update["messages"][0].tool_call_id == "call_1"
+
+    def test_tool_workers(self, sample_business_data, ranges):
+        """Test the tool with a process pool."""
+        sequential = simulate_sensitivity_grid(sample_business_data, ranges, steps=5)
+
+        assert simulate_sensitivity_grid(sample_business_data, ranges, steps=5, workers=2) == sequential
+
+    def test_tool_invalid_parameter(self, sample_business_data):
+        """Test the tool error message."""
+        result = simulate_sensitivity_grid(sample_business_data, {"impuestos": [-5, 5]})
+
+        assert "❌" in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+"""
+Unit tests for lazy imports and the cached agent factory.
+
+Run with: pytest tests/test_startup.py -v
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Presupuesto de arranque en frío (ms) para importar el grafo; ajustable en máquinas lentas
+IMPORT_BUDGET_MS = float(os.getenv("ANAFI_IMPORT_BUDGET_MS", "500"))
+
+HEAVY_MODULES = ["deepagents", "langchain_openai", "matplotlib", "reportlab", "openpyxl", "pandas"]
+
+
+def cold_import(module: str) -> dict:
+    """Importa un módulo en un intérprete nuevo; devuelve los ms y los módulos pesados cargados."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        f"print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestLazyImports:
+    """Tests for deferred imports."""
+
+    def test_builder_import_is_light(self):
+        """Test that importing the graph module builds nothing."""
+        result = cold_import("src.graph.builder")
+
+        assert result["loaded"] == []
+
+    def test_builder_import_budget(self):
+        """Test the cold-start import time budget."""
+        result = cold_import("src.graph.builder")
+
+        assert result["ms"] < IMPORT_BUDGET_MS, f"Importar el grafo tomó {result['ms']:.0f} ms"
+
+    def test_tools_package_is_lazy(self):
+        """Test that report dependencies load only when a report tool is used."""
+        assert cold_import("src.tools")["loaded"] == []
+
+    def test_tool_resolved_on_first_use(self):
+        """Test that a lazy tool is wrapped and then fixed in the package."""
+        import inspect
+
+        import src.tools as tools
+        from src.tools.calculate_costs import calculate_total_costs
+
+        first = tools.calculate_total_costs
+
+        assert inspect.unwrap(first) is calculate_total_costs
+        assert tools.calculate_total_costs is first
+        assert "calculate_total_costs" in dir(tools)
+
+    def test_unknown_tool(self):
+        """Test the error for names that are not tools."""
+        import src.tools as tools
+
+        with pytest.raises(AttributeError):
+            tools.calculate_everything
+
+
+class TestAgentFactory:
+    """Tests for the cached sub-agent and graph factories."""
+
+    def test_sub_agents_resolved_once(self):
+        """Test that tool names become tool callables in a cached list."""
+        from src.agents.sub_agents_config import SUB_AGENTS, get_sub_agents
+
+        agents = get_sub_agents()
+
+        assert agents is get_sub_agents()
+        assert [agent["name"] for agent in agents] == [spec["name"] for spec in SUB_AGENTS]
+        assert [tool.__name__ for tool in agents[1]["tools"]] == SUB_AGENTS[1]["tools"]
+        assert all(isinstance(name, str) for spec in SUB_AGENTS for name in spec["tools"])
+
+    def test_every_declared_tool_exists(self):
+        """Test that the declared tool names match the exported tools."""
+        import src.tools as tools
+        from src.agents.sub_agents_config import SUB_AGENTS
+
+        declared = {name for spec in SUB_AGENTS for name in spec["tools"]}
+
+        assert declared == set(tools.__all__)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+"""
+Unit tests for the ANAFI tool result cache.
+
+Run with: pytest tests/test_tool_cache.py -v
+"""
+import pytest
+from src.tools.advanced_analysis_tools import generate_income_statement
+from src.tools.cache import ToolResultCache, make_cache_key, memoize_tool
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Shop",
+        "tipo_negocio": "tienda",
+        "costos_fijos_mensuales": 2000.0,
+        "costo_variable_unitario": 5.0,
+        "precio_venta_unitario": 15.0,
+        "volumen_ventas_estimado": 500,
+        "inversion_inicial": 20000.0
+    }
+
+
+class FakeClock:
+    """Controllable monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestToolResultCache:
+    """Tests for LRU/TTL eviction and counters."""
+
+    def test_hit_and_miss_counters(self):
+        """Test that hits and misses are counted."""
+        cache = ToolResultCache(maxsize=4)
+
+        assert cache.get("a") == (False, None)
+        cache.set("a", "resultado")
+        assert cache.get("a") == (True, "resultado")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = ToolResultCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = ToolResultCache(ttl=10.0, timer=clock)
+        cache.set("a", 1)
+
+        clock.now = 9.0
+        assert cache.get("a") == (True, 1)
+        clock.now = 20.0
+        assert cache.get("a") == (False, None)
+        assert len(cache) == 0
+
+
+class TestMemoizeTool:
+    """Tests for the tool memoization wrapper."""
+
+    def test_canonical_key(self, sample_business_data):
+        """Test that key order and numeric representation do not change the key."""
+        reordered = dict(reversed(list(sample_business_data.items())))
+        reordered["volumen_ventas_estimado"] = 500.0
+
+        assert make_cache_key("tool", {"data": sample_business_data}) == make_cache_key("tool", {"data": reordered})
+        assert make_cache_key("tool", {"data": sample_business_data}) != make_cache_key("other", {"data": sample_business_data})
+
+    def test_repeated_call_is_cached(self, sample_business_data):
+        """Test that identical calls are served from the cache."""
+        cache = ToolResultCache()
+        cached_tool = memoize_tool(generate_income_statement, cache=cache)
+
+        first = cached_tool(sample_business_data)
+        second = cached_tool(data=dict(sample_business_data))
+
+        assert first == second
+        assert cache.stats()["hits"] == 1
+        assert cached_tool.__doc__ == generate_income_statement.__doc__
+
+    def test_errors_are_not_cached(self, sample_business_data):
+        """Test that error messages are not stored."""
+        cache = ToolResultCache()
+        cached_tool = memoize_tool(generate_income_statement, cache=cache)
+        sample_business_data["costos_fijos_mensuales"] = -1.0
+
+        assert "❌" in cached_tool(sample_business_data)
+        assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,295 @@
+"""
+Unit tests for ANAFI span tracing and the Chrome-trace export.
+
+Run with: pytest tests/test_tracing.py -v
+"""
+import json
+import os
+import signal
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from src.observability import (
+    MetricsRegistry,
+    Tracer,
+    get_tracer,
+    instrument_tool,
+    profile_run,
+    set_registry,
+    start_tracing,
+    stop_tracing,
+    timed,
+    trace_span,
+)
+from src.graph.router import FastPathRouter, build_routed_agent
+from src.observability.middleware import AgentTracingMiddleware
+from src.tools import calculate_profit, tool_cache
+
+
+@pytest.fixture
+def sample_business_data():
+    """Sample business data for testing."""
+    return {
+        "nombre_negocio": "Test Restaurant",
+        "tipo_negocio": "restaurante",
+        "costos_fijos_mensuales": 5000.0,
+        "costo_variable_unitario": 3.0,
+        "precio_venta_unitario": 10.0,
+        "volumen_ventas_estimado": 1000,
+        "inversion_inicial": 50000.0
+    }
+
+
+@pytest.fixture
+def tracer():
+    """Active tracer with a fresh registry and tool cache for each test."""
+    set_registry(MetricsRegistry())
+    tool_cache.clear()
+    tracer = start_tracing()
+    yield tracer
+    stop_tracing()
+    set_registry(None)
+    tool_cache.clear()
+
+
+class TestSpans:
+    """Tests for span nesting and the export format."""
+
+    def test_nesting(self, tracer):
+        """Test parent links between nested spans."""
+        with trace_span("turno", "turn"):
+            with trace_span("supervisor", "llm"):
+                pass
+            with trace_span("basic_calculations_agent", "subagent"):
+                with trace_span("calculate_profit", "tool"):
+                    pass
+
+        spans = {span.name: span for span in tracer.spans()}
+        assert spans["turno"].parent_id is None
+        assert spans["supervisor"].parent_id == spans["turno"].id
+        assert spans["calculate_profit"].parent_id == spans["basic_calculations_agent"].id
+
+    def test_error_attribute(self, tracer):
+        """Test that a raised exception is recorded on the span."""
+        with pytest.raises(ValueError):
+            with trace_span("falla", "tool"):
+                raise ValueError("x")
+
+        assert tracer.spans()[0].attrs["error"] == "ValueError"
+
+    def test_chrome_trace_export(self, tracer, tmp_path):
+        """Test complete events in microseconds written to disk."""
+        with trace_span("calculate_profit", "tool", agent="basic_calculations_agent"):
+            pass
+
+        path = tracer.export(tmp_path / "traza.json")
+        events = json.loads(open(path, encoding="utf-8").read())["traceEvents"]
+
+        assert len(events) == 1
+        assert events[0]["ph"] == "X"
+        assert events[0]["cat"] == "tool"
+        assert events[0]["dur"] >= 0
+        assert events[0]["args"] == {"agent": "basic_calculations_agent"}
+
+    def test_disabled_is_noop(self):
+        """Test that nothing is recorded without an active tracer."""
+        stop_tracing()
+        with trace_span("x", "tool") as span:
+            assert span is None
+        assert get_tracer() is None
+
+    def test_env_enables_tracing(self, monkeypatch, tmp_path):
+        """Test auto-activation through ANAFI_TRACE_FILE."""
+        stop_tracing()
+        monkeypatch.setenv("ANAFI_TRACE_FILE", str(tmp_path / "traza.json"))
+        handler = signal.getsignal(signal.SIGTERM)
+        try:
+            assert isinstance(get_tracer(), Tracer)
+        finally:
+            stop_tracing()
+            signal.signal(signal.SIGTERM, handler)
+
+
+class TestLongRunning:
+    """Tests for bounded memory and per-turn export under ANAFI_TRACE_FILE."""
+
+    def test_span_cap(self):
+        """Test that the oldest spans are dropped past the cap."""
+        tracer = Tracer(max_spans=3)
+        for i in range(5):
+            with tracer.span(f"s{i}", "tool"):
+                pass
+
+        assert [span.name for span in tracer.spans()] == ["s2", "s3", "s4"]
+        assert tracer.dropped == 2
+
+    def test_flush_per_turn(self, tmp_path):
+        """Test that each root turn is exported to its own file and the buffer is reset."""
+        tracer = Tracer(str(tmp_path / "traza.json"))
+        for turn in range(2):
+            with tracer.span("turno", "turn"):
+                with tracer.span("supervisor", "llm"):
+                    pass
+
+        first = json.loads((tmp_path / "traza-00001.json").read_text(encoding="utf-8"))["traceEvents"]
+        assert sorted(event["name"] for event in first) == ["supervisor", "turno"]
+        assert (tmp_path / "traza-00002.json").exists()
+        assert tracer.spans() == []
+        assert tracer.flush() is None
+
+    def test_parallel_turns_export_their_own_spans(self, tmp_path):
+        """Test that a turn closing does not export spans of a turn still running."""
+        tracer = Tracer(str(tmp_path / "traza.json"))
+        child_closed, first_closed = threading.Event(), threading.Event()
+
+        def second_turn():
+            with tracer.span("turno_b", "turn"):
+                with tracer.span("modelo_b", "llm"):
+                    pass
+                child_closed.set()
+                first_closed.wait(5)
+
+        thread = threading.Thread(target=second_turn)
+        thread.start()
+        child_closed.wait(5)
+        with tracer.span("turno_a", "turn"):
+            with tracer.span("modelo_a", "llm"):
+                pass
+        first_closed.set()
+        thread.join(5)
+
+        first = json.loads((tmp_path / "traza-00001.json").read_text(encoding="utf-8"))["traceEvents"]
+        second = json.loads((tmp_path / "traza-00002.json").read_text(encoding="utf-8"))["traceEvents"]
+        assert sorted(event["name"] for event in first) == ["modelo_a", "turno_a"]
+        assert sorted(event["name"] for event in second) == ["modelo_b", "turno_b"]
+
+    def test_flush_does_not_wait_forever(self, tmp_path):
+        """Test that a flush with a timeout gives up while the buffer lock is held."""
+        tracer = Tracer(str(tmp_path / "traza.json"))
+        with tracer.span("calculate_profit", "tool"):
+            pass
+
+        with tracer._lock:
+            assert tracer.flush(timeout=0.01) is None
+        assert tracer.flush() is not None
+
+    def test_routed_agent_turns(self, monkeypatch, tmp_path):
+        """Test that delegated turns of the routed graph are exported as they finish."""
+        stop_tracing()
+        monkeypatch.setenv("ANAFI_TRACE_FILE", str(tmp_path / "anafi.json"))
+        handler = signal.getsignal(signal.SIGTERM)
+        try:
+            agent = build_routed_agent(lambda state: {"messages": [AIMessage(content="ok")]}, FastPathRouter())
+            agent.invoke({"messages": [HumanMessage("Hola")]})
+        finally:
+            stop_tracing()
+            signal.signal(signal.SIGTERM, handler)
+
+        events = json.loads((tmp_path / "anafi-00001.json").read_text(encoding="utf-8"))["traceEvents"]
+        assert [event["cat"] for event in events] == ["turn"]
+        assert events[0]["args"] == {"node": "anafi_deep_agent"}
+
+    def test_sigterm_exports(self, monkeypatch, tmp_path):
+        """Test that pending spans are exported on SIGTERM before the previous handler runs."""
+        stop_tracing()
+        monkeypatch.setenv("ANAFI_TRACE_FILE", str(tmp_path / "anafi.json"))
+        received = []
+        original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+        try:
+            with trace_span("calculate_profit", "tool"):
+                pass
+            os.kill(os.getpid(), signal.SIGTERM)
+        finally:
+            stop_tracing()
+            signal.signal(signal.SIGTERM, original)
+
+        assert received == [signal.SIGTERM]
+        assert (tmp_path / "anafi-00001.json").exists()
+
+
+class TestBreakdown:
+    """Tests for the LLM vs. tool time breakdown."""
+
+    def test_exclusive_time(self, tracer):
+        """Test that exclusive time excludes child spans."""
+        with trace_span("basic_calculations_agent", "subagent"):
+            with trace_span("modelo", "llm"):
+                time.sleep(0.02)
+            with trace_span("calculate_profit", "tool"):
+                time.sleep(0.01)
+
+        categories = tracer.breakdown()["categories"]
+        subagent = categories["subagent"]
+        children = categories["llm"]["inclusive_s"] + categories["tool"]["inclusive_s"]
+
+        assert categories["llm"]["inclusive_s"] > categories["tool"]["inclusive_s"]
+        assert subagent["exclusive_s"] == pytest.approx(subagent["inclusive_s"] - children, abs=1e-6)
+
+    def test_profile_run(self, tmp_path):
+        """Test a traced turn with an instrumented tool."""
+        stop_tracing()
+        tool = instrument_tool(lambda _: "✅ listo", name="rapida")
+        graph = RunnableLambda(tool)
+
+        result, breakdown = profile_run(graph, {"messages": []}, path=str(tmp_path / "turno.json"))
+
+        assert result == "✅ listo"
+        assert breakdown["categories"]["turn"]["spans"] == 1
+        assert breakdown["categories"]["tool"]["spans"] == 1
+        assert (tmp_path / "turno.json").exists()
+        assert get_tracer() is None
+
+
+class TestInstrumentation:
+    """Tests for spans opened by tools, sub-agents and the middleware."""
+
+    def test_tools_open_spans(self, tracer, sample_business_data):
+        """Test that exported tools trace their calls with the status."""
+        calculate_profit(
+            costos_fijos_mensuales=sample_business_data["costos_fijos_mensuales"],
+            costo_variable_unitario=sample_business_data["costo_variable_unitario"],
+            precio_venta_unitario=sample_business_data["precio_venta_unitario"],
+            volumen_ventas_estimado=sample_business_data["volumen_ventas_estimado"],
+        )
+
+        span = tracer.spans()[0]
+        assert (span.name, span.category, span.attrs["status"]) == ("calculate_profit", "tool", "ok")
+
+    def test_timed_opens_span(self, tracer):
+        """Test the sub-agent context manager."""
+        with timed("subagent", "report_generation_agent"):
+            pass
+
+        assert [(s.name, s.category) for s in tracer.spans()] == [("report_generation_agent", "subagent")]
+
+    def test_middleware_model_span(self, tracer):
+        """Test LLM spans with token usage."""
+        middleware = AgentTracingMiddleware("supervisor")
+        request = SimpleNamespace(model=SimpleNamespace(model_name="gpt-4o-mini"))
+        message = AIMessage(content="hola", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+
+        middleware.wrap_model_call(request, lambda r: SimpleNamespace(result=[message]))
+
+        span = tracer.spans()[0]
+        assert (span.name, span.category) == ("supervisor", "llm")
+        assert span.attrs == {"agent": "supervisor", "model": "gpt-4o-mini", "input_tokens": 12, "output_tokens": 3}
+
+    def test_middleware_tool_spans(self, tracer):
+        """Test that only built-in tools get a span from the middleware."""
+        middleware = AgentTracingMiddleware("supervisor")
+        builtin = SimpleNamespace(tool_call={"name": "write_todos"}, tool=SimpleNamespace(func=len))
+        own = SimpleNamespace(tool_call={"name": "calculate_profit"}, tool=SimpleNamespace(func=calculate_profit))
+        task = SimpleNamespace(tool_call={"name": "task"}, tool=None)
+
+        for request in (builtin, own, task):
+            middleware.wrap_tool_call(request, lambda r: "hecho")
+
+        assert [s.name for s in tracer.spans()] == ["write_todos"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])